@@ -1,10 +1,20 @@
-import requests
+import json
 import os
 
-def analyze_with_medical_model_fixed(patient_data, api_key):
-    """Fixed version using OpenAI-compatible endpoint"""
+import tracing
+from model_backends import BackendError, HFEndpointBackend, create_router
+
+MEDICAL_ENDPOINT_URL = "https://en32b8h73rhx94n0.us-east-1.aws.endpoints.huggingface.cloud/v1/completions"
+
+# Shared with the batch mode in batch_soap.py
+SOAP_INSTRUCTION = "You are a medical doctor. Create a SOAP note from this patient conversation."
+SOAP_MAX_TOKENS = 400
+SOAP_TEMPERATURE = 0.2
+
+def build_fixed_request(patient_data, api_key):
+    """Build the headers and payload for the OpenAI-compatible completions endpoint"""
     
-    medical_prompt = f"""You are a medical doctor. Create a SOAP note from this patient conversation.
+    medical_prompt = f"""{SOAP_INSTRUCTION}
 
 {patient_data}
 
@@ -19,35 +29,94 @@ S:"""
     # Use OpenAI-compatible endpoint format
     payload = {
         "prompt": medical_prompt,
-        "max_tokens": 400,
-        "temperature": 0.2,
+        "max_tokens": SOAP_MAX_TOKENS,
+        "temperature": SOAP_TEMPERATURE,
     }
     
+    return headers, payload
+
+def parse_fixed_response(result):
+    """Extract the SOAP note text from a completions response body"""
+    content = result.get("choices", [{}])[0].get("text", "").strip()
+    
+    tracing.debug('fixed_endpoint_response', length=len(content), usage=result.get("usage"), response=content)
+    
+    return content if content else "SOAP note generation in progress..."
+
+def analyze_with_medical_model_fixed(patient_data, api_key):
+    """Fixed version using OpenAI-compatible endpoint"""
+    
+    _, payload = build_fixed_request(patient_data, api_key)
+    backend = HFEndpointBackend(MEDICAL_ENDPOINT_URL, api_key)
+    
     try:
-        print(f"DEBUG - Using OpenAI-compatible endpoint...")
-        url = "https://en32b8h73rhx94n0.us-east-1.aws.endpoints.huggingface.cloud/v1/completions"
-        response = requests.post(url, headers=headers, json=payload)
-        
-        if response.status_code == 200:
-            result = response.json()
-            print(f"DEBUG - Full API response: {result}")
-            
-            content = result.get("choices", [{}])[0].get("text", "").strip()
-            
-            print(f"DEBUG - Response length: {len(content)}")
-            print(f"DEBUG - Content: {content}")
+        with tracing.span('model_call', backend=backend.name):
+            result = backend.post(payload)
+        with tracing.span('parse', stage='completion'):
+            return parse_fixed_response(result)
             
-            return content if content else "SOAP note generation in progress..."
-        else:
-            print(f"DEBUG - API Error {response.status_code}: {response.text}")
-            return f"Unable to generate SOAP note (Status: {response.status_code})"
-            
-    except Exception as e:
-        print(f"DEBUG - Exception: {str(e)}")
+    except BackendError as e:
+        tracing.warning('fixed_endpoint_error', status=e.status, error=str(e))
+        if e.status:
+            return f"Unable to generate SOAP note (Status: {e.status})"
         return f"Error: {str(e)}"
 
+def run_batch(args):
+    """Batch mode: SOAP notes for every transcript in --input, appended to --output"""
+    import batch_soap
+
+    def report(stats):
+        print(f"  {stats['succeeded']} notes, {stats['failed']} failed, {stats['skipped']} already done, "
+              f"{stats['notes_per_minute']} notes/min, failure rate {stats['failure_rate']:.1%}", flush=True)
+
+    runner = batch_soap.BatchRunner(
+        args.output,
+        router=create_router(args.backends) if args.backends else None,
+        concurrency=batch_soap.BATCH_CONCURRENCY if args.concurrency is None else args.concurrency,
+        retries=batch_soap.BATCH_RETRIES if args.retries is None else args.retries
+    )
+    print(f"Generating SOAP notes for {args.input} -> {args.output} "
+          f"({runner.concurrency} workers, backends: {', '.join(b.name for b in runner.router.backends)})")
+    stats = runner.run(batch_soap.iter_source(args.input), limit=args.limit, progress=report,
+                       progress_seconds=args.progress_seconds)
+
+    print("\nInterrupted - rerun the same command to resume" if stats.get('interrupted') else "\nDone")
+    print(f"  Submitted:     {stats['submitted']} ({stats['skipped']} skipped from checkpoint, "
+          f"{stats['duplicates']} duplicate ids)")
+    print(f"  Succeeded:     {stats['succeeded']}")
+    print(f"  Failed:        {stats['failed']} (failure rate {stats['failure_rate']:.1%}, {stats['retries']} retries, "
+          f"{stats['requeued']} requeued)")
+    print(f"  Elapsed:       {stats['elapsed_seconds']} s")
+    print(f"  Throughput:    {stats['notes_per_minute']} notes/min")
+    print(f"  Note latency:  p50 {stats['p50_seconds']} s, p95 {stats['p95_seconds']} s")
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(stats, f, indent=2)
+    return 130 if stats.get('interrupted') else 0
+
 # Test the function
 if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='SOAP note from the medical endpoint; batch mode with --input')
+    parser.add_argument('--input', help='JSONL file or directory of transcripts (.jsonl, .json, .txt)')
+    parser.add_argument('--output', default='soap_notes.jsonl', help='results JSONL, also the resume checkpoint')
+    parser.add_argument('--backends', help='backend chain (default: BATCH_BACKENDS)')
+    parser.add_argument('--concurrency', type=int, default=None, help='worker threads (default: BATCH_CONCURRENCY)')
+    parser.add_argument('--retries', type=int, default=None, help='extra attempts per transcript (default: BATCH_RETRIES)')
+    parser.add_argument('--limit', type=int, help='stop after this many new transcripts')
+    parser.add_argument('--progress-seconds', type=float, default=10, help='seconds between progress lines')
+    parser.add_argument('--report', help='also write the final stats as JSON here')
+    args = parser.parse_args()
+
+    tracing.configure()
+
+    if args.input:
+        exit_code = run_batch(args)
+        tracing.shutdown()
+        sys.exit(exit_code)
+
     test_data = """Patient: nails weak, women, 25 years old
 Doctor: Have you noticed any other symptoms accompanying your weak nails?
 Patient: 2 weeks nails breaking, started after nail treatment"""
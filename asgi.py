@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+ASGI entry point for the Medical Chatbot
+Serves the model-bound routes asynchronously and hands everything else to the Flask app
+
+Run with: uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+
+import llm_gateway
+import metrics
+import tracing
+import web_chatbot
+
+def sse_response(generator, background=None):
+    """Build a streaming text/event-stream response"""
+    return StreamingResponse(
+        generator,
+        media_type='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        },
+        background=background
+    )
+
+async def acquire_turn(conversation_id):
+    """Conversation lock acquired off the event loop, or None if another turn kept it too long"""
+    turn_lock = web_chatbot.conversation_store.lock(conversation_id)
+    try:
+        return await asyncio.to_thread(turn_lock.acquire)
+    except web_chatbot.ConversationBusy:
+        return None
+
+async def chat(request):
+    tracing.start_trace(request.headers.get('x-request-id'))
+    data = await request.json()
+    user_message = data.get('message', '').strip()
+
+    if not user_message:
+        return JSONResponse({'response': 'Please enter a message.'})
+
+    conversation_id = web_chatbot.resolve_conversation_id(data.get('conversation_id'))
+    turn_lock = await acquire_turn(conversation_id)
+    if turn_lock is None:
+        return JSONResponse(web_chatbot.conversation_busy(conversation_id), status_code=409)
+
+    try:
+        conversation_id, conversation = web_chatbot.start_chat_turn(user_message, conversation_id)
+
+        if not conversation['data_collection_complete']:
+            # STAGE 1: Data Collection with OpenAI, awaited without holding a worker, until the interview is ready
+            ai_response = web_chatbot.local_interview_reply(conversation) or \
+                await llm_gateway.acollect_patient_data(web_chatbot.conversation_transcript(conversation), conversation_id)
+            return JSONResponse(web_chatbot.finish_chat_turn(conversation, ai_response))
+    finally:
+        turn_lock.release()
+
+    return JSONResponse(web_chatbot.closed_chat_turn(conversation_id))
+
+async def chat_stream(request):
+    tracing.start_trace(request.headers.get('x-request-id'))
+    data = await request.json()
+    user_message = data.get('message', '').strip()
+
+    if not user_message:
+        return JSONResponse({'response': 'Please enter a message.'})
+
+    conversation_id = web_chatbot.resolve_conversation_id(data.get('conversation_id'))
+    turn_lock = await acquire_turn(conversation_id)
+    if turn_lock is None:
+        return JSONResponse(web_chatbot.conversation_busy(conversation_id), status_code=409)
+    try:
+        conversation_id, conversation = web_chatbot.start_chat_turn(user_message, conversation_id)
+    except Exception:
+        turn_lock.release()
+        raise
+
+    async def generate():
+        try:
+            yield web_chatbot.sse_event('start', {'conversation_id': conversation_id})
+
+            if conversation['data_collection_complete']:
+                yield web_chatbot.sse_event('done', web_chatbot.closed_chat_turn(conversation_id))
+                return
+
+            tokens = []
+            local_reply = web_chatbot.local_interview_reply(conversation)
+            if local_reply:
+                tokens.append(local_reply)
+                yield web_chatbot.sse_event('token', {'token': local_reply})
+            else:
+                async for token in llm_gateway.astream_patient_data(web_chatbot.conversation_transcript(conversation), conversation_id):
+                    tokens.append(token)
+                    yield web_chatbot.sse_event('token', {'token': token})
+
+            yield web_chatbot.sse_event('done', web_chatbot.finish_chat_turn(conversation, "".join(tokens).strip()))
+        finally:
+            turn_lock.release()
+
+    # The background task also releases the lock if the stream is never consumed
+    return sse_response(generate(), background=BackgroundTask(turn_lock.release))
+
+async def analyze(request):
+    tracing.start_trace(request.headers.get('x-request-id'))
+    data = await request.json()
+    # Same job queue as the Flask route; the SOAP note is generated by its worker pool. Storing a
+    # finished draft (or an inline job) waits for the conversation lock, so keep it off the event loop
+    body, status = await asyncio.to_thread(web_chatbot.queue_analysis, data)
+    return JSONResponse(body, status_code=status)
+
+async def analyze_stream(request):
+    tracing.start_trace(request.headers.get('x-request-id'))
+    data = await request.json()
+    conversation, patient_data, error = web_chatbot.prepare_analysis(data.get('conversation_id'), bool(data.get('force')))
+    if error:
+        return JSONResponse({'error': error[0]}, status_code=error[1])
+
+    async def generate():
+        yield web_chatbot.sse_event('start', {'conversation_id': conversation['id']})
+
+        tokens = []
+        # Only a finished draft; waiting on one in flight would block the event loop
+        draft = web_chatbot.take_soap_draft(conversation['id'], patient_data, timeout=0)
+        if draft:
+            tokens.append(draft)
+            yield web_chatbot.sse_event('token', {'token': draft})
+        else:
+            async for token in llm_gateway.astream_medical_model(patient_data):
+                tokens.append(token)
+                yield web_chatbot.sse_event('token', {'token': token})
+
+        analysis = "".join(tokens).strip() or "SOAP note generation failed"
+        # complete_analysis may wait for the conversation lock, so keep it off the event loop
+        response = await asyncio.to_thread(web_chatbot.complete_analysis, conversation, analysis)
+        yield web_chatbot.sse_event('done', {'response': response})
+
+    return sse_response(generate())
+
+def timed(route, handler):
+    """Record route latency in http_request_duration_seconds, streamed bodies included"""
+    async def endpoint(request):
+        started = time.perf_counter()
+        response = await handler(request)
+        observe = lambda: metrics.observe_request('asgi', route, request.method, response.status_code, started)
+
+        if isinstance(response, StreamingResponse):
+            body = response.body_iterator
+
+            async def timed_body():
+                try:
+                    async for chunk in body:
+                        yield chunk
+                finally:
+                    observe()
+
+            response.body_iterator = timed_body()
+        else:
+            observe()
+        return response
+
+    return endpoint
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    await llm_gateway.close_http_sessions()
+
+app = Starlette(
+    routes=[
+        Route('/chat', timed('/chat', chat), methods=['POST']),
+        Route('/chat/stream', timed('/chat/stream', chat_stream), methods=['POST']),
+        Route('/analyze', timed('/analyze', analyze), methods=['POST']),
+        Route('/analyze/stream', timed('/analyze/stream', analyze_stream), methods=['POST']),
+        # Pages, conversation CRUD and static files stay on Flask
+        Mount('/', WSGIMiddleware(web_chatbot.app)),
+    ],
+    lifespan=lifespan,
+)
+
+if __name__ == "__main__":
+    import uvicorn
+
+    port = int(os.environ.get('PORT', 5000))
+    uvicorn.run(app, host='0.0.0.0', port=port)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Micro-batching scheduler for the SageMaker/TGI predictor
+Concurrent chat turns wait a few milliseconds to be collected, then go to the
+endpoint together and each caller gets its own result back
+"""
+
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# batch: one predict() call with a list of inputs per group of identical parameters
+# parallel: one predict() call per request, at most max_concurrency in flight
+BATCH_MODES = ('batch', 'parallel')
+
+_STOP = object()
+
+class MicroBatchScheduler:
+    """Collects predictor payloads for up to window_ms and dispatches them together"""
+
+    def __init__(self, predictor, window_ms=10, max_batch_size=8, max_concurrency=4, mode='batch'):
+        if mode not in BATCH_MODES:
+            raise ValueError(f"Unknown batch mode: {mode}")
+        self.predictor = predictor
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self.mode = mode
+        self._queue = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='predict')
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'batches': 0, 'predict_calls': 0, 'errors': 0, 'largest_batch': 0}
+        self._collector = threading.Thread(target=self._collect, name='batch-collector', daemon=True)
+        self._collector.start()
+
+    def submit(self, payload):
+        """Queue a TGI payload; returns a Future resolving to the predictor response"""
+        future = Future()
+        self._queue.put((payload, future))
+        return future
+
+    def predict(self, payload, timeout=None):
+        """Drop-in replacement for predictor.predict"""
+        return self.submit(payload).result(timeout)
+
+    def queue_depth(self):
+        """Requests waiting to be collected into a batch"""
+        return self._queue.qsize()
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._collector.join()
+        self._executor.shutdown(wait=True)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['mean_batch_size'] = round(stats['requests'] / stats['batches'], 2) if stats['batches'] else 0.0
+        stats['window_ms'] = self.window * 1000
+        stats['max_batch_size'] = self.max_batch_size
+        stats['mode'] = self.mode
+        return stats
+
+    def _collect(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.window
+            stopping = False
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            with self._lock:
+                self._stats['requests'] += len(batch)
+                self._stats['batches'] += 1
+                self._stats['largest_batch'] = max(self._stats['largest_batch'], len(batch))
+
+            if self.mode == 'batch':
+                for group in group_by_parameters(batch):
+                    self._executor.submit(self._dispatch_batch, group)
+            else:
+                for request in batch:
+                    self._executor.submit(self._dispatch_one, request)
+
+            if stopping:
+                return
+
+    def _dispatch_one(self, request):
+        payload, future = request
+        self._count('predict_calls')
+        try:
+            future.set_result(self.predictor.predict(payload))
+        except Exception as e:
+            self._count('errors')
+            future.set_exception(e)
+
+    def _dispatch_batch(self, group):
+        if len(group) == 1:
+            self._dispatch_one(group[0])
+            return
+
+        payload = dict(group[0][0])
+        payload['inputs'] = [request_payload['inputs'] for request_payload, _ in group]
+        self._count('predict_calls')
+        try:
+            responses = self.predictor.predict(payload)
+            if not isinstance(responses, list) or len(responses) != len(group):
+                raise ValueError(f"Expected {len(group)} batched responses, got {responses!r}")
+        except Exception as e:
+            self._count('errors')
+            for _, future in group:
+                future.set_exception(e)
+            return
+
+        # Hand each caller the same shape a single predict() returns
+        for (_, future), response in zip(group, responses):
+            future.set_result(response if isinstance(response, list) else [response])
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+def group_by_parameters(batch):
+    """Split a batch so each predict() call shares one set of generation parameters"""
+    groups = {}
+    for request in batch:
+        key = json.dumps(request[0].get('parameters', {}), sort_keys=True)
+        groups.setdefault(key, []).append(request)
+    return list(groups.values())
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Batch SOAP note generation for archives of recorded interview transcripts
+Transcripts are streamed from JSONL files or a directory, sent to the
+configured model backends by a bounded pool of worker threads, and each
+result is appended to an output JSONL file as soon as it is ready. The
+output file is also the checkpoint: a rerun with the same output skips
+every transcript that already has a note, so a crashed or interrupted run
+resumes where it stopped and failed transcripts are tried again.
+
+Transcripts that still fail after their retries are requeued once the
+source is exhausted, after the circuit breakers' reset timeout, so a
+backend outage of a minute does not fail every transcript sent during it.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import tracing
+from analyze_medical_fixed import SOAP_INSTRUCTION, SOAP_MAX_TOKENS, SOAP_TEMPERATURE
+from model_backends import create_router
+from transcript import Transcript
+
+# Backend chain for batch runs; the dedicated completions endpoint by default
+BATCH_BACKENDS = os.getenv('BATCH_BACKENDS', 'hf_endpoint')
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', '4'))
+# Extra attempts per transcript after a failed call, with exponential backoff
+BATCH_RETRIES = int(os.getenv('BATCH_RETRIES', '2'))
+BATCH_RETRY_BACKOFF = float(os.getenv('BATCH_RETRY_BACKOFF', '2'))
+# Passes over the transcripts that failed, at the end of the run once the breakers have reset
+BATCH_REQUEUE_ROUNDS = int(os.getenv('BATCH_REQUEUE_ROUNDS', '1'))
+
+ID_FIELDS = ('id', 'request_id', 'conversation_id')
+TEXT_FIELDS = ('transcript', 'body', 'text', 'conversation')
+
+class TranscriptError(ValueError):
+    """A source record without a usable transcript"""
+
+def transcript_text(record):
+    """Transcript of a record as 'Patient:' / 'Doctor:' lines
+
+    Records carry either plain text (transcript, body, text or conversation)
+    or a messages list as exported from the conversation store. The SOAP
+    note is always written from the full transcript, as in the web app;
+    only interview prompts are summarised.
+    """
+    messages = record.get('messages')
+    if isinstance(messages, list) and messages:
+        return Transcript(messages).text
+    for field in TEXT_FIELDS:
+        if isinstance(record.get(field), str) and record[field].strip():
+            return record[field].strip()
+    raise TranscriptError(f"no transcript: expected messages or one of {', '.join(TEXT_FIELDS)}")
+
+def record_id(record, fallback):
+    for field in ID_FIELDS:
+        if record.get(field) not in (None, ''):
+            return str(record[field])
+    return fallback
+
+def iter_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            source = f"{os.path.basename(path)}:{number}"
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield source, None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield source, None, "record is not a JSON object"
+                continue
+            yield record_id(record, source), record, None
+
+def iter_source(path):
+    """(id, record, error) for every transcript in a JSONL file or a directory
+
+    Directories are read in name order: .jsonl files line by line, .json
+    files as one record (or a list of records) and .txt files as one plain
+    transcript named after the file.
+    """
+    if not os.path.isdir(path):
+        yield from iter_jsonl(path)
+        return
+    for name in sorted(os.listdir(path)):
+        file_path = os.path.join(path, name)
+        stem, extension = os.path.splitext(name)
+        if extension == '.jsonl':
+            yield from iter_jsonl(file_path)
+        elif extension == '.json':
+            try:
+                with open(file_path, encoding='utf-8') as f:
+                    data = json.load(f)
+            except ValueError as e:
+                yield name, None, f"invalid JSON: {e}"
+                continue
+            records = data if isinstance(data, list) else [data]
+            for index, record in enumerate(records):
+                fallback = stem if len(records) == 1 else f"{stem}:{index}"
+                if isinstance(record, dict):
+                    yield record_id(record, fallback), record, None
+                else:
+                    yield fallback, None, "record is not a JSON object"
+        elif extension == '.txt':
+            with open(file_path, encoding='utf-8') as f:
+                yield stem, {'transcript': f.read()}, None
+
+def load_checkpoint(output_path):
+    """Ids that already have a note in output_path; repairs a line cut off by a crash"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, 'rb+') as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            if result.get('status') == 'succeeded':
+                done.add(result['id'])
+        # A partial last line would otherwise swallow the first result of this run
+        if f.tell():
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+    return done
+
+class BatchRunner:
+    """Generates SOAP notes for a stream of transcripts and appends them to a JSONL file"""
+
+    def __init__(self, output_path, router=None, concurrency=BATCH_CONCURRENCY, retries=BATCH_RETRIES,
+                 retry_backoff=BATCH_RETRY_BACKOFF, requeue_rounds=BATCH_REQUEUE_ROUNDS, fsync_every=50):
+        self.output_path = output_path
+        self.router = router or create_router(BATCH_BACKENDS)
+        self.concurrency = max(1, concurrency)
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.requeue_rounds = requeue_rounds
+        self.fsync_every = fsync_every
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._latencies = []
+        self._stats = {'submitted': 0, 'succeeded': 0, 'failed': 0, 'skipped': 0, 'duplicates': 0, 'retries': 0,
+                       'requeued': 0}
+        self._started = None
+        self._last_failure = None
+
+    def generate(self, record):
+        """(note, backend, attempts) for one record; raises after the last failed attempt"""
+        text = transcript_text(record)
+        messages = [
+            {'role': 'system', 'content': SOAP_INSTRUCTION},
+            {'role': 'user', 'content': text}
+        ]
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                completion = self.router.complete(messages, max_tokens=SOAP_MAX_TOKENS, temperature=SOAP_TEMPERATURE)
+                return completion.text, completion.backend, attempt
+            except Exception:
+                if attempt > self.retries or self._stop.is_set():
+                    raise
+                with self._write_lock:
+                    self._stats['retries'] += 1
+                # Short waits for a blip; an open breaker is waited out by the requeue at the end of the run
+                self._stop.wait(self.retry_backoff * 2 ** (attempt - 1))
+
+    def breaker_reset(self):
+        """Seconds until every breaker opened by a failure so far lets a trial call through"""
+        if self._last_failure is None:
+            return 0.0
+        reset = max(health.breaker.reset_timeout for health in self.router.health.values())
+        return max(0.0, self._last_failure + reset - time.monotonic())
+
+    def process(self, conversation_id, record):
+        """Result for one record; a failure carries 'retry' while requeueing it could help"""
+        started = time.perf_counter()
+        with tracing.span('batch_soap', conversation_id=conversation_id):
+            try:
+                note, backend, attempts = self.generate(record)
+            except TranscriptError as e:
+                return {'id': conversation_id, 'status': 'failed', 'error': str(e)}
+            except Exception as e:
+                tracing.warning('batch_soap_failed', conversation_id=conversation_id, error=str(e))
+                with self._write_lock:
+                    self._last_failure = time.monotonic()
+                return {'id': conversation_id, 'status': 'failed', 'error': str(e), 'retry': record}
+        return {
+            'id': conversation_id,
+            'status': 'succeeded',
+            'soap_note': note,
+            'backend': backend,
+            'attempts': attempts,
+            'seconds': round(time.perf_counter() - started, 3)
+        }
+
+    def write(self, output, result):
+        with self._write_lock:
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+            self._stats[result['status']] += 1
+            if result['status'] == 'succeeded':
+                self._latencies.append(result['seconds'])
+            if self.fsync_every and sum(self._stats[key] for key in ('succeeded', 'failed')) % self.fsync_every == 0:
+                os.fsync(output.fileno())
+
+    def run(self, source, limit=None, progress=None, progress_seconds=10):
+        """Process every transcript in source not yet in the output file, and return stats()"""
+        done = load_checkpoint(self.output_path)
+        seen = set()
+        self._started = time.perf_counter()
+        last_progress = self._started
+        pending = set()
+        # (id, record) of failures to try again once the source is exhausted
+        deferred = []
+        requeue = self.requeue_rounds > 0
+
+        with open(self.output_path, 'a', encoding='utf-8') as output, \
+                ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='batch-soap') as pool:
+
+            def collect(return_when):
+                nonlocal pending, last_progress
+                finished, pending = wait(pending, return_when=return_when)
+                for future in finished:
+                    result = future.result()
+                    record = result.pop('retry', None)
+                    if record is not None and requeue:
+                        deferred.append((result['id'], record))
+                    else:
+                        self.write(output, result)
+                if progress and time.perf_counter() - last_progress >= progress_seconds:
+                    progress(self.stats())
+                    last_progress = time.perf_counter()
+
+            def submit(conversation_id, record):
+                # Keep the source streaming: never more than two transcripts per worker in flight
+                while len(pending) >= self.concurrency * 2:
+                    collect(FIRST_COMPLETED)
+                pending.add(pool.submit(self.process, conversation_id, record))
+
+            try:
+                for conversation_id, record, error in source:
+                    if conversation_id in done:
+                        self._stats['skipped'] += 1
+                        continue
+                    if conversation_id in seen:
+                        self._stats['duplicates'] += 1
+                        continue
+                    if limit is not None and self._stats['submitted'] >= limit:
+                        break
+                    seen.add(conversation_id)
+                    self._stats['submitted'] += 1
+                    if error is not None:
+                        self.write(output, {'id': conversation_id, 'status': 'failed', 'error': error})
+                        continue
+                    submit(conversation_id, record)
+                while pending:
+                    collect(FIRST_COMPLETED)
+
+                for round_number in range(self.requeue_rounds):
+                    if not deferred:
+                        break
+                    # Failures after the retries usually mean an outage: wait until the breakers allow a trial
+                    self._stop.wait(self.breaker_reset())
+                    requeue = round_number + 1 < self.requeue_rounds
+                    retrying, deferred[:] = list(deferred), []
+                    with self._write_lock:
+                        self._stats['requeued'] += len(retrying)
+                    tracing.info('batch_soap_requeue', transcripts=len(retrying), round=round_number + 1)
+                    for conversation_id, record in retrying:
+                        submit(conversation_id, record)
+                    while pending:
+                        collect(FIRST_COMPLETED)
+            except KeyboardInterrupt:
+                # Finished notes are already on disk; the rest are picked up by the next run
+                self._stop.set()
+                for future in pending:
+                    future.cancel()
+                self._stats['interrupted'] = True
+            finally:
+                output.flush()
+                os.fsync(output.fileno())
+        return self.stats()
+
+    def stats(self):
+        with self._write_lock:
+            stats = dict(self._stats)
+            latencies = sorted(self._latencies)
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        finished = stats['succeeded'] + stats['failed']
+        stats.update({
+            'elapsed_seconds': round(elapsed, 1),
+            'notes_per_minute': round(stats['succeeded'] / elapsed * 60, 1) if elapsed else 0.0,
+            'failure_rate': round(stats['failed'] / finished, 4) if finished else 0.0,
+            'p50_seconds': latencies[len(latencies) // 2] if latencies else None,
+            'p95_seconds': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else None,
+            'backends': self.router.stats()['backends']
+        })
+        return stats
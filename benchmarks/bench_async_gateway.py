@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Load benchmark: sync gunicorn (app:app) vs. async uvicorn (asgi:app)
+Both servers talk to the local fake LLM server, so no API credits are spent
+
+Run from the repository root:
+    python benchmarks/bench_async_gateway.py --concurrency 200 --turns 3 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import aiohttp
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def start_process(args, env=None):
+    return subprocess.Popen(
+        args, cwd=REPO_ROOT, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+async def wait_until_up(url, timeout=30):
+    deadline = time.time() + timeout
+    async with aiohttp.ClientSession() as http:
+        while time.time() < deadline:
+            try:
+                async with http.get(url) as response:
+                    if response.status < 500:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not come up")
+
+async def run_interview(http, base_url, turns, latencies, errors):
+    conversation_id = None
+    for turn in range(turns):
+        started = time.perf_counter()
+        try:
+            async with http.post(f"{base_url}/chat", json={
+                'message': f"I have had stomach pain for {turn + 2} days",
+                'conversation_id': conversation_id
+            }) as response:
+                data = await response.json()
+                if response.status != 200:
+                    errors.append(response.status)
+                    return
+                conversation_id = data.get('conversation_id')
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            errors.append(type(e).__name__)
+            return
+        latencies.append(time.perf_counter() - started)
+
+async def drive_load(base_url, concurrency, turns):
+    latencies = []
+    errors = []
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=300)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as http:
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            run_interview(http, base_url, turns, latencies, errors)
+            for _ in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'elapsed_s': round(elapsed, 3),
+        'requests_per_s': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+    }
+
+async def benchmark_server(name, command, port, env, concurrency, turns):
+    process = start_process(command, env=env)
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        await wait_until_up(f"{base_url}/app")
+        result = await drive_load(base_url, concurrency, turns)
+        result['server'] = name
+        return result
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+async def main_async(args):
+    fake = start_process([
+        sys.executable, 'benchmarks/fake_llm_server.py',
+        '--port', str(args.fake_port), '--latency', str(args.latency)
+    ])
+    try:
+        await wait_until_up(f"http://127.0.0.1:{args.fake_port}/stats")
+
+        env = dict(os.environ)
+        env['OPENAI_API_BASE'] = f"http://127.0.0.1:{args.fake_port}/v1"
+        env['OPENAI_API_KEY'] = 'sk-fake'
+
+        results = [
+            await benchmark_server(
+                f"gunicorn sync x{args.workers}",
+                ['gunicorn', 'app:app', '-w', str(args.workers), '-b', f"127.0.0.1:{args.port}", '--timeout', '300'],
+                args.port, env, args.concurrency, args.turns
+            ),
+            await benchmark_server(
+                "uvicorn asgi x1",
+                [sys.executable, '-m', 'uvicorn', 'asgi:app', '--port', str(args.port + 1), '--log-level', 'warning'],
+                args.port + 1, env, args.concurrency, args.turns
+            ),
+        ]
+    finally:
+        fake.terminate()
+        fake.wait(timeout=10)
+
+    print(f"{'server':<22}{'req':>7}{'err':>6}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for result in results:
+        print(f"{result['server']:<22}{result['requests']:>7}{result['errors']:>6}"
+              f"{result['requests_per_s']:>10}{result['p50_ms']:>10}{result['p99_ms']:>10}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'config': vars(args), 'results': results}, f, indent=2)
+
+def main():
+    parser = argparse.ArgumentParser(description='Sync vs async gateway load benchmark')
+    parser.add_argument('--concurrency', type=int, default=100, help='simultaneous interviews')
+    parser.add_argument('--turns', type=int, default=3, help='messages per interview')
+    parser.add_argument('--latency', type=float, default=0.5, help='fake model latency in seconds')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn sync workers')
+    parser.add_argument('--port', type=int, default=8910)
+    parser.add_argument('--fake-port', type=int, default=8900)
+    parser.add_argument('--output', help='write results as JSON to this path')
+    asyncio.run(main_async(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
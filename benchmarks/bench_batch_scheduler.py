@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Micro-batching throughput harness with a fake SageMaker/TGI predictor
+The fake endpoint serves a fixed number of invocations at once, and each call
+costs a fixed overhead plus a smaller per-input cost, like a GPU decoding a
+batch. Sweeps batch window and max batch size against direct predict() calls.
+
+Run from the repository root:
+    python benchmarks/bench_batch_scheduler.py --clients 32 --requests 20
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_scheduler import MicroBatchScheduler
+from simple_medical_chat import build_medical_prompt
+
+class FakePredictor:
+    """Stands in for HuggingFacePredictor on an endpoint with limited capacity"""
+
+    def __init__(self, slots=2, call_ms=40.0, per_input_ms=4.0):
+        # FIFO like the endpoint's request queue, so waiting callers are served in order
+        self.slots = ThreadPoolExecutor(max_workers=slots)
+        self.call_ms = call_ms
+        self.per_input_ms = per_input_ms
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def predict(self, payload):
+        inputs = payload['inputs']
+        batched = isinstance(inputs, list)
+        count = len(inputs) if batched else 1
+        with self._lock:
+            self.calls += 1
+        self.slots.submit(time.sleep, (self.call_ms + self.per_input_ms * count) / 1000).result()
+        if batched:
+            return [[{'generated_text': 'What brings you in today?'}] for _ in inputs]
+        return [{'generated_text': 'What brings you in today?'}]
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def run(predict, clients, requests_per_client):
+    payload = build_medical_prompt([{'role': 'user', 'content': 'I have had a headache for 3 days'}])
+    latencies = []
+    lock = threading.Lock()
+
+    def client():
+        local = []
+        for _ in range(requests_per_client):
+            started = time.perf_counter()
+            predict(payload)
+            local.append((time.perf_counter() - started) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p95_ms': round(percentile(latencies, 95), 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-batching scheduler benchmark')
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=20, help='requests per client')
+    parser.add_argument('--slots', type=int, default=2, help='concurrent invocations the fake endpoint serves')
+    parser.add_argument('--call-ms', type=float, default=40.0)
+    parser.add_argument('--per-input-ms', type=float, default=4.0)
+    parser.add_argument('--mode', choices=['batch', 'parallel'], default='batch')
+    parser.add_argument('--windows', default='1,5,10,20', help='comma-separated batch windows in ms')
+    parser.add_argument('--batch-sizes', default='4,8,16', help='comma-separated max batch sizes')
+    args = parser.parse_args()
+
+    def fake():
+        return FakePredictor(args.slots, args.call_ms, args.per_input_ms)
+
+    print(f"{args.clients} clients x {args.requests} requests, endpoint: {args.slots} slots, "
+          f"{args.call_ms} ms/call + {args.per_input_ms} ms/input, mode: {args.mode}")
+    print(f"{'config':<28}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'calls':>8}{'batch':>8}")
+
+    predictor = fake()
+    result = run(predictor.predict, args.clients, args.requests)
+    print(f"{'direct predict()':<28}{result['throughput_rps']:>10}{result['p50_ms']:>10}"
+          f"{result['p95_ms']:>10}{predictor.calls:>8}{1.0:>8}")
+
+    for batch_size in [int(value) for value in args.batch_sizes.split(',')]:
+        for window in [float(value) for value in args.windows.split(',')]:
+            predictor = fake()
+            scheduler = MicroBatchScheduler(
+                predictor, window_ms=window, max_batch_size=batch_size,
+                max_concurrency=args.slots, mode=args.mode
+            )
+            try:
+                result = run(scheduler.predict, args.clients, args.requests)
+                stats = scheduler.stats()
+            finally:
+                scheduler.close()
+            label = f"window {window:g} ms, max {batch_size}"
+            print(f"{label:<28}{result['throughput_rps']:>10}{result['p50_ms']:>10}"
+                  f"{result['p95_ms']:>10}{predictor.calls:>8}{stats['mean_batch_size']:>8}")
+
+if __name__ == "__main__":
+    main()
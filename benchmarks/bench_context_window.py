@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Interview prompt size with and without context windowing
+Replays synthetic long interviews through build_interview_messages, once
+with an unlimited budget (the whole transcript every turn) and once per
+backend budget, and reports estimated prompt tokens per turn, the total
+over the interview (what each turn is billed and waits for), how often
+the summary changed, and prompt build time.
+
+Run from the repository root:
+    python benchmarks/bench_context_window.py
+    python benchmarks/bench_context_window.py --turns 200 --budgets 2000,3000,6000 --layout messages
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+ANSWERS = [
+    "I have had a sharp pain in my lower right abdomen since {n} days ago, it gets worse when I walk.",
+    "It is about {s}/10 most of the time, worse at night, and I felt nauseous this morning.",
+    "I am a {a} year old female, I take ibuprofen sometimes but it does not help much.",
+    "No fever that I noticed, but I vomited twice yesterday after eating.",
+    "My mother had gallstones. I have never had surgery. I drink coffee every day.",
+    "The pain started in the middle and moved to the right side over the last {n} hours.",
+    "I also get headaches in the afternoon and feel dizzy when I stand up quickly.",
+    "I sleep badly because of the pain, maybe four hours a night this week.",
+]
+QUESTIONS = [
+    "Can you describe exactly where the pain is and whether it spreads anywhere?",
+    "How would you rate the pain on a scale of 1 to 10, and does it change during the day?",
+    "Have you had any fever, chills, nausea or vomiting?",
+    "What medications have you taken for it, and did they help?",
+    "Do you have any medical conditions or previous surgeries I should know about?",
+    "Does eating, moving or lying down change the pain?",
+    "Have you noticed any other symptoms, such as headaches or dizziness?",
+    "How is this affecting your sleep and daily activities?",
+]
+
+def synthetic_interview(turns, seed=0):
+    rng = random.Random(seed)
+    messages = []
+    for turn in range(turns):
+        answer = rng.choice(ANSWERS).format(n=rng.randint(1, 9), s=rng.randint(3, 9), a=rng.randint(18, 80))
+        messages.append({'role': 'user', 'content': answer})
+        messages.append({'role': 'assistant', 'content': QUESTIONS[turn % len(QUESTIONS)]})
+    return messages
+
+def prompt_tokens(messages):
+    from message_log import estimate_tokens
+    return sum(estimate_tokens(msg['content']) + 4 for msg in messages)
+
+def replay(web_chatbot, interview, budget, layout):
+    """Per-turn prompt tokens, summary changes and build time for one budget"""
+    from transcript import Transcript
+
+    transcript = Transcript()
+    tokens = []
+    build_seconds = 0.0
+    summaries = set()
+    for index in range(0, len(interview), 2):
+        transcript.append(interview[index]['role'], interview[index]['content'])
+        started = time.perf_counter()
+        messages = web_chatbot.build_interview_messages(transcript, layout=layout, budget=budget)
+        build_seconds += time.perf_counter() - started
+        tokens.append(prompt_tokens(messages))
+        summary, _ = transcript.window(budget - web_chatbot.INTERVIEW_PROMPT_TOKENS)
+        summaries.add(summary)
+        transcript.append(interview[index + 1]['role'], interview[index + 1]['content'])
+    return {
+        'budget': budget,
+        'total_tokens': sum(tokens),
+        'max_tokens': max(tokens),
+        'last_tokens': tokens[-1],
+        'tokens_by_turn': tokens,
+        'summary_versions': len(summaries - {None}),
+        'build_us_per_turn': round(build_seconds / len(tokens) * 1e6, 1),
+        'summary': summary
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Context window prompt size benchmark')
+    parser.add_argument('--turns', type=int, default=100, help='patient answers per interview')
+    parser.add_argument('--budgets', default='1500,3000,6000', help='comma-separated prompt token budgets')
+    parser.add_argument('--layout', choices=['inline', 'messages'], default='inline')
+    parser.add_argument('--json', action='store_true', help='print the full results as JSON')
+    args = parser.parse_args()
+
+    os.environ.setdefault('MODEL_BACKENDS', 'mock')
+    os.environ.setdefault('LOG_LEVEL', 'ERROR')
+    import web_chatbot
+
+    interview = synthetic_interview(args.turns)
+    full = replay(web_chatbot, interview, 10 ** 9, args.layout)
+    results = [full] + [replay(web_chatbot, interview, int(b), args.layout) for b in args.budgets.split(',')]
+
+    print(f"{args.turns}-turn synthetic interview, {args.layout} layout, estimated prompt tokens")
+    for result in results:
+        label = 'full transcript' if result is full else f"budget {result['budget']}"
+        reduction = 1 - result['total_tokens'] / full['total_tokens']
+        print(f"  {label:>16}: total {result['total_tokens']:>7}, max {result['max_tokens']:>5}, "
+              f"last turn {result['last_tokens']:>5}, reduction {reduction:6.1%}, "
+              f"summary versions {result['summary_versions']:>2}, build {result['build_us_per_turn']} us/turn")
+    if len(results) > 1 and results[1]['summary']:
+        print(f"\nSummary at the last turn (budget {results[1]['budget']}):\n{results[1]['summary']}")
+    if args.json:
+        print(json.dumps([{k: v for k, v in r.items() if k != 'summary'} for r in results]))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
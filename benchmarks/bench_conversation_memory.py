@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Memory use of the in-memory conversation store over a simulated day
+Creates conversations with interview-sized messages and a SOAP note,
+revisiting a few older ones as clinicians do, and samples process RSS as
+it goes. Each configuration runs in a fresh process so their RSS does not
+mix. Unbounded RSS grows with every conversation; with a memory limit or
+idle timeout it levels off once eviction to the archive starts.
+
+Run from the repository root:
+    python benchmarks/bench_conversation_memory.py
+    python benchmarks/bench_conversation_memory.py --conversations 20000 --limit-mb 32
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def rss_mb():
+    """Current resident set size; falls back to the peak where /proc is missing"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def simulate(args):
+    from conversation_store import InMemoryConversationStore
+
+    store = InMemoryConversationStore(memory_limit_mb=args.limit_mb, idle_seconds=0,
+                                      archive_dir=args.archive_dir)
+    rng = random.Random(7)
+    answer = "The pain started two days ago, it is worse in the morning and I took ibuprofen. " * 3
+    soap = "SUBJECTIVE: ... OBJECTIVE: ... ASSESSMENT: ... PLAN: ... " * 40
+    samples = []
+    revisit_seconds = []
+    started = time.perf_counter()
+
+    for n in range(args.conversations):
+        conversation_id = f"conversation-{n}"
+        store.create(conversation_id)
+        for turn in range(args.turns):
+            store.append_message(conversation_id, 'user', f"{n}.{turn} {answer}")
+            store.append_message(conversation_id, 'assistant', f"Question {turn}: how long has this been going on?")
+        store.append_message(conversation_id, 'assistant', soap)
+        store.update(conversation_id, data_collection_complete=True)
+
+        # Clinicians reopen a handful of earlier conversations; these may come back from the archive
+        if n and n % 10 == 0:
+            revisit = f"conversation-{rng.randrange(n)}"
+            revisit_started = time.perf_counter()
+            store.get(revisit)
+            revisit_seconds.append(time.perf_counter() - revisit_started)
+
+        if (n + 1) % max(1, args.conversations // args.samples) == 0:
+            samples.append([n + 1, round(rss_mb(), 1)])
+
+    report = store.memory_report(top=0)
+    revisit_seconds.sort()
+    return {
+        'limit_mb': args.limit_mb,
+        'elapsed_seconds': round(time.perf_counter() - started, 2),
+        'rss_mb': samples,
+        'resident_conversations': report['resident_conversations'],
+        'archived_conversations': report['archived_conversations'],
+        'resident_mb': round(report['resident_bytes'] / 1024 / 1024, 1),
+        'evictions': report['evictions'],
+        'rehydrations': report['rehydrations'],
+        'archive_mb': round(report['archive']['file_bytes'] / 1024 / 1024, 1) if report['archive'] else 0,
+        'revisit_p50_ms': round(revisit_seconds[len(revisit_seconds) // 2] * 1000, 3) if revisit_seconds else None
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='In-memory conversation store RSS benchmark')
+    parser.add_argument('--conversations', type=int, default=10000)
+    parser.add_argument('--turns', type=int, default=8, help='patient answers per conversation')
+    parser.add_argument('--limit-mb', type=float, default=16, help='memory limit for the bounded run')
+    parser.add_argument('--samples', type=int, default=10, help='RSS samples per run')
+    parser.add_argument('--archive-dir', default=None)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(simulate(args)))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = []
+        for limit in (0, args.limit_mb):
+            command = [sys.executable, os.path.abspath(__file__), '--child',
+                       '--conversations', str(args.conversations), '--turns', str(args.turns),
+                       '--limit-mb', str(limit), '--samples', str(args.samples),
+                       '--archive-dir', args.archive_dir or tmp]
+            output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+    for result in results:
+        label = f"limit {result['limit_mb']} MB" if result['limit_mb'] else 'unbounded'
+        print(f"{label}: {result['elapsed_seconds']} s, resident {result['resident_conversations']} "
+              f"({result['resident_mb']} MB), archived {result['archived_conversations']} "
+              f"({result['archive_mb']} MB on disk), rehydrations {result['rehydrations']}, "
+              f"revisit p50 {result['revisit_p50_ms']} ms")
+        print('  RSS MB by conversations: ' + ', '.join(f"{n}:{rss}" for n, rss in result['rss_mb']))
+    print(json.dumps(results))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
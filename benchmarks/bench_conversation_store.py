@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Conversation store benchmark: list/get/append latency with 100k conversations
+Compares the legacy dict + full sort, the in-memory store and the SQLite store
+
+Run from the repository root:
+    python benchmarks/bench_conversation_store.py --conversations 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversation_store import InMemoryConversationStore, SQLiteConversationStore, now_iso, summarize
+
+class LegacyDictStore:
+    """The original module-level dict with a full sort on every listing"""
+
+    def __init__(self):
+        self.db = {}
+
+    def create(self, conversation_id):
+        timestamp = now_iso()
+        self.db[conversation_id] = {
+            'id': conversation_id, 'title': 'New Patient', 'messages': [],
+            'data_collection_complete': False, 'created_at': timestamp, 'updated_at': timestamp
+        }
+
+    def get(self, conversation_id):
+        return self.db[conversation_id]
+
+    def list(self, limit=50):
+        conv_list = [summarize(conv) for conv in self.db.values()]
+        conv_list.sort(key=lambda x: x['updated_at'], reverse=True)
+        return conv_list
+
+    def append_message(self, conversation_id, role, content):
+        self.db[conversation_id]['messages'].append({'role': role, 'content': content})
+
+def time_ops(fn, args_list):
+    started = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - started) / len(args_list) * 1e6
+
+def populate(store, ids, messages_per_conversation):
+    started = time.perf_counter()
+    for conversation_id in ids:
+        store.create(conversation_id)
+        for turn in range(messages_per_conversation):
+            role = 'user' if turn % 2 == 0 else 'assistant'
+            store.append_message(conversation_id, role, f"message {turn} for {conversation_id[:8]}")
+    return time.perf_counter() - started
+
+def run(name, store, ids, args):
+    populate_s = populate(store, ids, args.messages)
+    sample = [(random.choice(ids),) for _ in range(args.ops)]
+    appends = [(conv_id, 'user', 'follow-up answer') for (conv_id,) in sample]
+
+    return {
+        'backend': name,
+        'populate_s': round(populate_s, 2),
+        'list_us': round(time_ops(lambda: store.list(limit=50), [()] * max(1, args.ops // 100)), 1),
+        'get_us': round(time_ops(store.get, sample), 1),
+        'append_us': round(time_ops(store.append_message, appends), 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Conversation store benchmark')
+    parser.add_argument('--conversations', type=int, default=100000)
+    parser.add_argument('--messages', type=int, default=4, help='messages per conversation')
+    parser.add_argument('--ops', type=int, default=2000, help='operations timed per measurement')
+    args = parser.parse_args()
+
+    random.seed(0)
+    ids = [str(uuid.uuid4()) for _ in range(args.conversations)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [
+            run('legacy dict + sort', LegacyDictStore(), ids, args),
+            run('memory', InMemoryConversationStore(), ids, args),
+            run('sqlite (WAL)', SQLiteConversationStore(os.path.join(tmp, 'bench.db')), ids, args),
+        ]
+
+    print(f"{args.conversations} conversations x {args.messages} messages")
+    print(f"{'backend':<20}{'populate s':>12}{'list us':>12}{'get us':>10}{'append us':>12}")
+    for result in results:
+        print(f"{result['backend']:<20}{result['populate_s']:>12}{result['list_us']:>12}"
+              f"{result['get_us']:>10}{result['append_us']:>12}")
+
+if __name__ == "__main__":
+    main()
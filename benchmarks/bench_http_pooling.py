@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+HTTP connection pooling benchmark against a local HTTPS stub
+Compares bare requests.post (new TCP + TLS handshake every call) with the
+pooled keep-alive session from http_client
+
+Needs the openssl command line tool to create a throwaway certificate.
+Run from the repository root:
+    python benchmarks/bench_http_pooling.py --requests 300
+"""
+
+import argparse
+import json
+import os
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_client
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers like the HF completions endpoint, keeping connections open"""
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; avoid Nagle/delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        body = json.dumps({'choices': [{'text': 'S: stub SOAP note'}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def make_certificate(directory):
+    cert = os.path.join(directory, 'cert.pem')
+    key = os.path.join(directory, 'key.pem')
+    subprocess.run([
+        'openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes',
+        '-keyout', key, '-out', cert, '-days', '1',
+        '-subj', '/CN=localhost', '-addext', 'subjectAltName=DNS:localhost,IP:127.0.0.1'
+    ], check=True, capture_output=True)
+    return cert, key
+
+def start_stub(cert, key):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def measure(post, url, cert, count):
+    payload = {'prompt': 'Patient: headache for 3 days', 'max_tokens': 400}
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        response = post(url, json=payload, verify=cert)
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return {
+        'mean_ms': round(sum(latencies) / len(latencies), 2),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='HTTP pooling benchmark')
+    parser.add_argument('--requests', type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cert, key = make_certificate(tmp)
+        server = start_stub(cert, key)
+        url = f"https://127.0.0.1:{server.server_address[1]}/v1/completions"
+
+        try:
+            results = {
+                'requests.post (no pooling)': measure(requests.post, url, cert, args.requests),
+                'http_client (pooled)': measure(http_client.post, url, cert, args.requests),
+            }
+        finally:
+            server.shutdown()
+
+    print(f"{args.requests} sequential POSTs to a local HTTPS stub")
+    print(f"{'client':<30}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, result in results.items():
+        print(f"{name:<30}{result['mean_ms']:>10}{result['p50_ms']:>10}{result['p99_ms']:>10}")
+
+if __name__ == "__main__":
+    main()
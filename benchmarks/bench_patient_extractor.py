@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Patient data extraction benchmark and consistency check
+Times the original create_patient_summary parser and the compiled extractor
+on large synthetic transcripts, and checks that incremental updates agree
+with a full pass. The two parsers no longer agree on demographics and
+location: the compiled one matches whole words and needs context for an age.
+
+Run from the repository root:
+    python benchmarks/bench_patient_extractor.py --messages 2000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from patient_extractor import PatientDataExtractor, extract_patient_data
+
+VOCABULARY = [
+    "i", "have", "a", "the", "my", "is", "it", "and", "since", "really", "bad", "mild",
+    "pain", "ache", "hurts", "fever", "nausea", "vomiting", "cough", "headache", "dizzy",
+    "day", "days", "hours", "week", "monthly", "years", "ago", "started", "began", "today",
+    "yesterday", "monday", "abdomen", "stomach", "chest", "head", "back", "leg", "arm",
+    "left", "right", "side", "female", "male", "woman", "man", "painting", "backache",
+    "Headache", "LEFT", "Woman", "old", "about", "after", "eating", "at", "night",
+]
+
+def legacy_extract(conversation_history):
+    """The original create_patient_summary parsing loop, verbatim"""
+    patient_data = {
+        "demographics": {"age": None, "sex": None},
+        "chief_complaints": [],
+        "symptoms": {},
+        "timeline": [],
+        "severity": {},
+        "location": {},
+        "other_info": []
+    }
+
+    for i, msg in enumerate(conversation_history):
+        if msg["role"] == "user":
+            content = msg["content"].strip()
+            content_lower = content.lower()
+
+            if any(sex in content_lower for sex in ["male", "female", "man", "woman"]):
+                if "male" in content_lower:
+                    patient_data["demographics"]["sex"] = "male"
+                elif "female" in content_lower:
+                    patient_data["demographics"]["sex"] = "female"
+
+            import re
+            age_match = re.search(r'\b(\d{1,3})\b', content)
+            if age_match and not patient_data["demographics"]["age"]:
+                potential_age = int(age_match.group(1))
+                if 1 <= potential_age <= 120:
+                    patient_data["demographics"]["age"] = potential_age
+
+            symptom_keywords = ["pain", "ache", "hurt", "fever", "nausea", "vomit", "cough", "headache", "dizzy"]
+            for keyword in symptom_keywords:
+                if keyword in content_lower and content not in patient_data["chief_complaints"]:
+                    patient_data["chief_complaints"].append(content)
+                    break
+
+            time_keywords = ["day", "hour", "week", "month", "year", "ago", "started", "began", "today", "yesterday"]
+            if any(keyword in content_lower for keyword in time_keywords):
+                if content not in patient_data["timeline"]:
+                    patient_data["timeline"].append(content)
+
+            severity_match = re.search(r'\b(\d{1,2})/10\b', content)
+            if severity_match:
+                severity_score = severity_match.group(1)
+                patient_data["severity"]["pain"] = f"{severity_score}/10"
+
+            body_parts = ["abdomen", "stomach", "chest", "head", "back", "leg", "arm", "left", "right", "side"]
+            for part in body_parts:
+                if part in content_lower:
+                    patient_data["location"][part] = content
+                    break
+
+    return patient_data
+
+def synthetic_message(rng):
+    words = rng.choices(VOCABULARY, k=rng.randint(3, 25))
+    if rng.random() < 0.3:
+        words.insert(rng.randrange(len(words) + 1), str(rng.randint(0, 150)))
+    if rng.random() < 0.2:
+        words.insert(rng.randrange(len(words) + 1), f"{rng.randint(0, 12)}/10")
+    if rng.random() < 0.1:
+        # Exact repeats exercise the dedup path
+        return "I have pain in my stomach since yesterday"
+    return " ".join(words)
+
+def synthetic_transcript(rng, messages):
+    return [
+        {'role': 'user' if i % 2 == 0 else 'assistant', 'content': synthetic_message(rng)}
+        for i in range(messages)
+    ]
+
+def check_incremental(rng, transcripts, messages):
+    for _ in range(transcripts):
+        history = synthetic_transcript(rng, rng.randint(1, messages))
+        expected = extract_patient_data(history)
+
+        # Incremental updates must land on the same result as a full pass
+        extractor = PatientDataExtractor()
+        for end in range(1, len(history) + 1):
+            extractor.update(history[:end])
+        assert extractor.patient_data == expected
+
+def main():
+    parser = argparse.ArgumentParser(description='Patient data extractor benchmark')
+    parser.add_argument('--messages', type=int, default=2000, help='messages per synthetic transcript')
+    parser.add_argument('--check-transcripts', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    check_incremental(rng, args.check_transcripts, 60)
+    print(f"consistency: {args.check_transcripts} random transcripts give the same data incrementally")
+
+    history = synthetic_transcript(rng, args.messages)
+
+    started = time.perf_counter()
+    legacy_extract(history)
+    legacy_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    extract_patient_data(history)
+    compiled_ms = (time.perf_counter() - started) * 1000
+
+    # Per-turn cost over an interview: full re-parse each turn vs. incremental update
+    turns = min(args.messages, 400)
+    started = time.perf_counter()
+    for end in range(1, turns + 1):
+        legacy_extract(history[:end])
+    legacy_turns_ms = (time.perf_counter() - started) * 1000
+
+    extractor = PatientDataExtractor()
+    started = time.perf_counter()
+    for end in range(1, turns + 1):
+        extractor.update(history[:end])
+    incremental_turns_ms = (time.perf_counter() - started) * 1000
+
+    print(f"single pass over {args.messages} messages: legacy {legacy_ms:.1f} ms, compiled {compiled_ms:.1f} ms")
+    print(f"{turns} turns re-summarised every turn: legacy {legacy_turns_ms:.1f} ms, "
+          f"incremental {incremental_turns_ms:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Model calls saved by the local question planner
+Replays scripted interviews through the web app's /chat with the mock
+backend (MOCK_LATENCY stands in for a network round trip), once with the
+planner and once without, each in a fresh process. Reports model calls per
+interview, the share of questions the model still asks, and turn latency.
+Interviews end when the readiness check says so (INTERVIEW_AUTO_COMPLETE=1).
+
+Run from the repository root:
+    python benchmarks/bench_question_planner.py
+    python benchmarks/bench_question_planner.py --interviews 200 --latency 0.8
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Each interview draws one opening and then answers until the readiness check ends it
+OPENINGS = [
+    "I have a bad headache",
+    "My stomach hurts a lot",
+    "I have had a cough and a fever",
+    "I feel dizzy when I stand up",
+    "I just don't feel right lately",
+    "There is a sharp pain in my lower back",
+]
+ANSWERS = [
+    "It started {n} days ago and is getting worse",
+    "About {s}/10 most of the time",
+    "Mostly on the right side of my {p}",
+    "I am {a}, female",
+    "I am a {a} year old man",
+    "Nothing really helps",
+    "Since yesterday morning",
+    "Maybe a {s}/10 at night",
+]
+
+def script(rng, max_answers):
+    answers = [rng.choice(OPENINGS)]
+    pool = ANSWERS[:]
+    rng.shuffle(pool)
+    for template in pool[:max_answers - 1]:
+        answers.append(template.format(n=rng.randint(1, 9), s=rng.randint(3, 9), a=rng.randint(18, 80),
+                                       p=rng.choice(('head', 'chest', 'stomach', 'back'))))
+    return answers
+
+def replay(args):
+    os.environ.update({
+        'MODEL_BACKENDS': 'mock',
+        'MOCK_LATENCY': str(args.latency),
+        'QUESTION_PLANNER': '1' if args.planner else '0',
+        'INTERVIEW_AUTO_COMPLETE': '1',
+        'RESPONSE_CACHE': '0',
+        'ANALYSIS_WORKERS': '1',
+        'LOG_LEVEL': 'ERROR'
+    })
+    import web_chatbot
+
+    client = web_chatbot.app.test_client()
+    rng = random.Random(args.seed)
+    turn_seconds = []
+    completed = 0
+    for _ in range(args.interviews):
+        conversation_id = None
+        for answer in script(rng, args.max_answers):
+            started = time.perf_counter()
+            reply = client.post('/chat', json={'message': answer, 'conversation_id': conversation_id}).get_json()
+            turn_seconds.append(time.perf_counter() - started)
+            conversation_id = reply['conversation_id']
+            if reply.get('interview_complete'):
+                completed += 1
+                break
+
+    backends = web_chatbot.model_router.stats()['backends']
+    planner = web_chatbot.question_planner.stats() if web_chatbot.question_planner else None
+    turn_seconds.sort()
+    return {
+        'planner': args.planner,
+        'interviews': args.interviews,
+        'completed': completed,
+        'turns': len(turn_seconds),
+        # SOAP jobs run on the same router; count interview questions only
+        'model_questions': planner['model_questions'] if planner else backends['mock']['calls'],
+        'planned_questions': planner['planned_questions'] if planner else 0,
+        'turn_p50_ms': round(turn_seconds[len(turn_seconds) // 2] * 1000, 2),
+        'turn_p95_ms': round(turn_seconds[int(len(turn_seconds) * 0.95)] * 1000, 2),
+        'latency_saved_seconds': planner['latency_saved_seconds'] if planner else 0.0,
+        'planner_us_per_question': planner['planner_us_per_question'] if planner else None
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Question planner benchmark')
+    parser.add_argument('--interviews', type=int, default=100)
+    parser.add_argument('--max-answers', type=int, default=8, help='answers per scripted interview')
+    parser.add_argument('--latency', type=float, default=0.3, help='mock model latency in seconds')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--planner', type=int, default=1, help=argparse.SUPPRESS)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(replay(args)))
+        return 0
+
+    results = []
+    for planner in (0, 1):
+        command = [sys.executable, os.path.abspath(__file__), '--child', '--planner', str(planner),
+                   '--interviews', str(args.interviews), '--max-answers', str(args.max_answers),
+                   '--latency', str(args.latency), '--seed', str(args.seed)]
+        output = subprocess.run(command, check=True, capture_output=True, text=True, cwd=ROOT).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    for result in results:
+        questions = result['model_questions'] + result['planned_questions']
+        rate = result['model_questions'] / questions if questions else 0.0
+        print(f"{'planner' if result['planner'] else 'model only':>10}: {result['turns']} turns, "
+              f"{result['model_questions'] / result['interviews']:.2f} model calls/interview, "
+              f"model call rate {rate:.0%}, turn p50 {result['turn_p50_ms']} ms, p95 {result['turn_p95_ms']} ms, "
+              f"saved {result['latency_saved_seconds']} s"
+              + (f", {result['planner_us_per_question']} us/planned question" if result['planner'] else ''))
+    print(json.dumps(results))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Cold start: import time and time to first response
+Starts each app in fresh processes, as a serverless platform does for every
+new instance, with FAST_STARTUP=0 (everything warmed at import) and
+FAST_STARTUP=1 (backend imports and clients deferred to first use). Reports:
+- import time of the app module
+- the first page view (template rendering)
+- the first /chat turn that needs a model call, served by
+  benchmarks/fake_llm_server.py through the OpenAI backend
+- time to first response, from process launch to the first /chat reply
+- a `python -X importtime` breakdown by top-level package
+
+--save writes the medians as JSON. --baseline compares a run with a saved
+one and exits with status 1 when a fast-startup number grew by more than
+--tolerance, so CI can catch a new eager import.
+
+Run from the repository root:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --save startup.json
+    python benchmarks/bench_startup.py --baseline startup.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {'app': 'app', 'simple_chat': 'simple_medical_chat'}
+
+# No symptom the question planner can name, so the first turn goes to the model
+FIRST_MESSAGE = "I just don't feel right lately"
+
+# Numbers checked against the baseline, all in milliseconds
+GATED = ('import_ms', 'first_page_ms', 'first_chat_ms', 'time_to_first_response_ms')
+
+def child(target):
+    """Import target, serve one page and one chat turn; print the timings as JSON"""
+    started = time.perf_counter()
+    module = __import__(TARGETS[target])
+    imported = time.perf_counter()
+    client = module.app.test_client()
+    page = client.get('/')
+    paged = time.perf_counter()
+    reply = client.post('/chat', json={'message': FIRST_MESSAGE})
+    chatted = time.perf_counter()
+    if page.status_code != 200 or reply.status_code != 200:
+        raise SystemExit(f"{target}: / returned {page.status_code}, /chat returned {reply.status_code}")
+    print(json.dumps({
+        'import_ms': (imported - started) * 1000,
+        'first_page_ms': (paged - imported) * 1000,
+        'first_chat_ms': (chatted - paged) * 1000,
+        'finished_at': time.time(),
+        'openai_imported': 'openai' in sys.modules
+    }))
+
+def child_env(target, fast, fake_port):
+    env = dict(os.environ)
+    env.update({
+        'FAST_STARTUP': '1' if fast else '0',
+        'MODEL_BACKENDS': 'openai',
+        'MEDICAL_BACKENDS': 'openai',
+        'OPENAI_API_BASE': f"http://127.0.0.1:{fake_port}/v1",
+        'OPENAI_API_KEY': env.get('OPENAI_API_KEY', 'bench'),
+        'RESPONSE_CACHE': '0',
+        'LOG_LEVEL': 'ERROR',
+        'PYTHONDONTWRITEBYTECODE': '1'
+    })
+    env.pop('PYTHONPATH', None)
+    return env
+
+def run_once(target, fast, fake_port):
+    """Timings of one fresh process"""
+    launched = time.time()
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', target],
+        cwd=REPO_ROOT, env=child_env(target, fast, fake_port), capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result['time_to_first_response_ms'] = (result.pop('finished_at') - launched) * 1000
+    return result
+
+def import_breakdown(target, fast, fake_port, top):
+    """Self time of each top-level package while importing target, slowest first"""
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {TARGETS[target]}"],
+        cwd=REPO_ROOT, env=child_env(target, fast, fake_port), capture_output=True, text=True, check=True
+    ).stderr
+    packages = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        packages[name.strip().split('.')[0]] += int(self_us)
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+    return [(name, round(us / 1000, 1)) for name, us in ranked[:top]]
+
+def wait_until_up(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+def benchmark(args):
+    fake = subprocess.Popen(
+        [sys.executable, 'benchmarks/fake_llm_server.py', '--port', str(args.fake_port), '--latency', '0'],
+        cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    results = {}
+    try:
+        wait_until_up(f"http://127.0.0.1:{args.fake_port}/stats")
+        for target in args.targets:
+            for fast in (False, True):
+                runs = [run_once(target, fast, args.fake_port) for _ in range(args.runs)]
+                results[f"{target} fast={int(fast)}"] = {
+                    **{key: round(statistics.median(run[key] for run in runs), 1) for key in GATED},
+                    'openai_imported_at_first_chat': runs[0]['openai_imported'],
+                    'imports': import_breakdown(target, fast, args.fake_port, args.top)
+                }
+    finally:
+        fake.terminate()
+        fake.wait()
+    return results
+
+def print_results(results, runs):
+    print(f"Medians of {runs} fresh processes (ms)")
+    print(f"  {'':<20}{'import':>10}{'first page':>12}{'first chat':>12}{'to first response':>19}")
+    for name, result in results.items():
+        print(f"  {name:<20}{result['import_ms']:>10}{result['first_page_ms']:>12}"
+              f"{result['first_chat_ms']:>12}{result['time_to_first_response_ms']:>19}")
+    for name, result in results.items():
+        print(f"\n{name}: slowest packages at import (self ms)")
+        print("  " + ", ".join(f"{package} {ms}" for package, ms in result['imports']))
+
+def check_regressions(results, baseline_path, tolerance):
+    """Fast-startup numbers more than tolerance above the baseline"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = []
+    for name, result in results.items():
+        if not name.endswith('fast=1') or name not in baseline:
+            continue
+        for key in GATED:
+            before, after = baseline[name][key], result[key]
+            if before and after > before * (1 + tolerance):
+                regressions.append(f"{name} {key}: {before} -> {after} ms ({(after - before) / before:+.0%})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold start benchmark')
+    parser.add_argument('--targets', default=','.join(TARGETS), help=f"comma-separated: {', '.join(TARGETS)}")
+    parser.add_argument('--runs', type=int, default=5, help='fresh processes per target and mode')
+    parser.add_argument('--top', type=int, default=8, help='packages in the import breakdown')
+    parser.add_argument('--fake-port', type=int, default=8910)
+    parser.add_argument('--save', help='write the results as JSON for a later --baseline')
+    parser.add_argument('--baseline', help='earlier --save output to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed growth over the baseline (0.25 = 25%%)')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, REPO_ROOT)
+        child(args.child)
+        return 0
+
+    args.targets = [name.strip() for name in args.targets.split(',') if name.strip()]
+    unknown = set(args.targets) - set(TARGETS)
+    if unknown:
+        parser.error(f"unknown targets: {', '.join(sorted(unknown))}")
+
+    results = benchmark(args)
+    print_results(results, args.runs)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.save}")
+
+    if args.baseline:
+        regressions = check_regressions(results, args.baseline, args.tolerance)
+        if regressions:
+            print(f"\nCold start regressions (more than {args.tolerance:.0%} over {args.baseline}):")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"\nNo fast-startup number more than {args.tolerance:.0%} over {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Logging overhead on the request thread for one interview turn
+Compares the old print() of the full transcript and response with the tracing
+layer at INFO (debug gated off) and at DEBUG (queued, formatted off-thread)
+
+Run from the repository root:
+    python benchmarks/bench_tracing.py --turns 50 --iterations 2000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tracing
+
+PATIENT_LINE = "The pain is in my lower right abdomen, it started about {n} days ago and gets worse after eating."
+DOCTOR_LINE = "Thank you. On a scale of 0 to 10, how would you rate the pain right now ({n})?"
+
+def build_transcript(turns):
+    lines = []
+    for n in range(turns):
+        lines.append(f"Patient: {PATIENT_LINE.format(n=n)}")
+        lines.append(f"Doctor: {DOCTOR_LINE.format(n=n)}")
+    return "\n".join(lines)
+
+def legacy_turn(transcript, response, out):
+    print(f"DEBUG - Total messages in conversation: {transcript.count(chr(10)) + 1}", file=out)
+    print(f"DEBUG - Full conversation:\n{transcript}", file=out)
+    print(f"DEBUG - OpenAI SOAP response: {response}", file=out)
+    out.flush()
+
+def traced_turn(turns, transcript, response):
+    with tracing.span('prompt_build', kind='interview'):
+        tracing.debug('interview_prompt', turns=turns, transcript=transcript)
+    with tracing.span('model_call', backend='openai'):
+        pass
+    tracing.debug('soap_response', backend='openai', response=response)
+
+def measure(fn, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description='Tracing overhead benchmark')
+    parser.add_argument('--turns', type=int, default=50)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    transcript = build_transcript(args.turns)
+    response = "S: " + PATIENT_LINE.format(n=0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # A real file stands in for a container's stdout log driver
+        with open(os.path.join(tmp, 'stdout.log'), 'w') as out:
+            legacy = measure(lambda: legacy_turn(transcript, response, out), args.iterations)
+
+        with open(os.path.join(tmp, 'trace.log'), 'w') as stream:
+            tracing.configure(level=logging.INFO, stream=stream)
+            gated = measure(lambda: traced_turn(args.turns, transcript, response), args.iterations)
+
+            tracing.logger.setLevel(logging.DEBUG)
+            enabled = measure(lambda: traced_turn(args.turns, transcript, response), args.iterations)
+            tracing.shutdown()
+
+    print(f"{args.turns}-turn transcript ({len(transcript)} chars), {args.iterations} turns")
+    print(f"{'logging':<34}{'us per turn (request thread)':>30}")
+    print(f"{'print() DEBUG lines':<34}{legacy:>30.2f}")
+    print(f"{'tracing, LOG_LEVEL=INFO':<34}{gated:>30.2f}")
+    print(f"{'tracing, LOG_LEVEL=DEBUG (queued)':<34}{enabled:>30.2f}")
+
+if __name__ == "__main__":
+    main()
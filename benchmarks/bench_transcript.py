@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Transcript rendering micro-benchmark over 50-turn interviews
+Compares re-serialising the full history every turn with the incremental TranscriptCache
+
+Run from the repository root:
+    python benchmarks/bench_transcript.py --turns 50 --conversations 200
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transcript import TranscriptCache
+
+PATIENT_LINE = "The pain is in my lower right abdomen, it started about {n} days ago and gets worse after eating."
+DOCTOR_LINE = "Thank you. On a scale of 0 to 10, how would you rate the pain right now, and does anything relieve it ({n})?"
+
+def legacy_interview_text(messages):
+    conversation_text = ""
+    for msg in messages:
+        role = "Patient" if msg["role"] == "user" else "Doctor"
+        conversation_text += f"{role}: {msg['content']}\n"
+    return conversation_text
+
+def legacy_soap_text(messages):
+    return "\n".join([
+        f"{'Patient' if msg['role'] == 'user' else 'Doctor'}: {msg['content']}"
+        for msg in messages
+    ])
+
+def run_legacy(turns):
+    messages = []
+    for n in range(turns):
+        messages.append({'role': 'user', 'content': PATIENT_LINE.format(n=n)})
+        legacy_interview_text(messages)
+        messages.append({'role': 'assistant', 'content': DOCTOR_LINE.format(n=n)})
+    return legacy_soap_text(messages)
+
+def run_incremental(cache, conversation_id, turns):
+    messages = []
+    for n in range(turns):
+        messages.append({'role': 'user', 'content': PATIENT_LINE.format(n=n)})
+        cache.sync(conversation_id, messages).text
+        messages.append({'role': 'assistant', 'content': DOCTOR_LINE.format(n=n)})
+    return cache.sync(conversation_id, messages).text
+
+def main():
+    parser = argparse.ArgumentParser(description='Transcript rendering micro-benchmark')
+    parser.add_argument('--turns', type=int, default=50)
+    parser.add_argument('--conversations', type=int, default=200)
+    args = parser.parse_args()
+
+    # Both paths must render the same SOAP input
+    assert run_legacy(args.turns) == run_incremental(TranscriptCache(), 'check', args.turns)
+
+    started = time.perf_counter()
+    for _ in range(args.conversations):
+        run_legacy(args.turns)
+    legacy_us = (time.perf_counter() - started) / args.conversations * 1e6
+
+    cache = TranscriptCache()
+    started = time.perf_counter()
+    for i in range(args.conversations):
+        run_incremental(cache, i, args.turns)
+    incremental_us = (time.perf_counter() - started) / args.conversations * 1e6
+
+    print(f"{args.turns}-turn interview, interview prompt every turn + one SOAP render")
+    print(f"{'legacy re-serialise':<24}{legacy_us:>10.1f} us/conversation")
+    print(f"{'incremental transcript':<24}{incremental_us:>10.1f} us/conversation")
+    print(f"{'speedup':<24}{legacy_us / incremental_us:>10.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Fake LLM server for offline benchmarks
+Speaks just enough of the OpenAI, TGI and Hugging Face inference APIs for the app's model calls
+
+Run with: python benchmarks/fake_llm_server.py --port 8900 --latency 0.5
+Point the app at it with OPENAI_API_BASE=http://127.0.0.1:8900/v1
+(HF_ENDPOINT_URL=http://127.0.0.1:8900/v1/completions for the TGI-style endpoint)
+--error-rate makes that share of requests fail, to exercise fallbacks and error paths
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from aiohttp import web
+
+INTERVIEW_REPLY = "How long have you been experiencing these symptoms, and have they changed over time?"
+
+SOAP_REPLY = """S: Patient reports the symptoms described in the conversation.
+O: Physical examination not documented.
+A: Presentation consistent with the reported complaint; further evaluation needed.
+P: Recommend follow-up with primary care physician and symptom monitoring."""
+
+def pick_reply(max_tokens):
+    """Short question for interview-sized requests, SOAP note otherwise"""
+    return INTERVIEW_REPLY if (max_tokens or 0) <= 100 else SOAP_REPLY
+
+def split_tokens(text):
+    """Split text into word-sized tokens that join back to the original"""
+    words = text.split(' ')
+    return [word + ' ' for word in words[:-1]] + words[-1:]
+
+def usage_for(prompt_text, reply):
+    prompt_tokens = max(1, len(prompt_text) // 4)
+    completion_tokens = max(1, len(reply) // 4)
+    return {
+        'prompt_tokens': prompt_tokens,
+        'completion_tokens': completion_tokens,
+        'total_tokens': prompt_tokens + completion_tokens
+    }
+
+class FakeLLM:
+    def __init__(self, latency=0.5, token_delay=0.0, error_rate=0.0, error_status=500, seed=None):
+        self.latency = latency
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.requests_served = 0
+        self.errors_served = 0
+
+    async def failure(self):
+        """Error response for error_rate of requests, after the usual latency"""
+        if not self.error_rate or self.random.random() >= self.error_rate:
+            return None
+        self.errors_served += 1
+        await asyncio.sleep(self.latency)
+        return web.json_response(
+            {'error': {'message': 'Injected failure from the fake LLM server', 'type': 'server_error'}},
+            status=self.error_status
+        )
+
+    async def chat_completions(self, request):
+        body = await request.json()
+        self.requests_served += 1
+        failure = await self.failure()
+        if failure is not None:
+            return failure
+        reply = pick_reply(body.get('max_tokens'))
+        prompt_text = "".join(msg.get('content', '') for msg in body.get('messages', []))
+
+        if body.get('stream'):
+            return await self._stream_chat(request, body, reply)
+
+        await asyncio.sleep(self.latency + self.token_delay * len(split_tokens(reply)))
+        return web.json_response({
+            'id': 'chatcmpl-fake',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'fake'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': reply},
+                'finish_reason': 'stop'
+            }],
+            'usage': usage_for(prompt_text, reply)
+        })
+
+    async def _stream_chat(self, request, body, reply):
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await response.prepare(request)
+        await asyncio.sleep(self.latency)
+
+        for token in split_tokens(reply):
+            chunk = {
+                'id': 'chatcmpl-fake',
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': body.get('model', 'fake'),
+                'choices': [{'index': 0, 'delta': {'content': token}, 'finish_reason': None}]
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def completions(self, request):
+        body = await request.json()
+        self.requests_served += 1
+        failure = await self.failure()
+        if failure is not None:
+            return failure
+        reply = pick_reply(body.get('max_tokens'))
+        await asyncio.sleep(self.latency + self.token_delay * len(split_tokens(reply)))
+        return web.json_response({
+            'id': 'cmpl-fake',
+            'object': 'text_completion',
+            'created': int(time.time()),
+            'choices': [{'index': 0, 'text': reply, 'finish_reason': 'stop'}],
+            'usage': usage_for(body.get('prompt', ''), reply)
+        })
+
+    async def generate(self, request):
+        """TGI /generate and HF inference API (/models/<name>)"""
+        body = await request.json()
+        self.requests_served += 1
+        failure = await self.failure()
+        if failure is not None:
+            return failure
+        parameters = body.get('parameters', {})
+        reply = pick_reply(parameters.get('max_new_tokens'))
+        await asyncio.sleep(self.latency + self.token_delay * len(split_tokens(reply)))
+
+        if isinstance(body.get('inputs'), list):
+            return web.json_response([{'generated_text': reply} for _ in body['inputs']])
+        return web.json_response([{'generated_text': reply}])
+
+    async def stats(self, request):
+        return web.json_response({'requests_served': self.requests_served, 'errors_served': self.errors_served})
+
+def create_app(latency=0.5, token_delay=0.0, error_rate=0.0, error_status=500, seed=None):
+    fake = FakeLLM(latency=latency, token_delay=token_delay, error_rate=error_rate,
+                   error_status=error_status, seed=seed)
+    app = web.Application()
+    app.router.add_post('/v1/chat/completions', fake.chat_completions)
+    app.router.add_post('/v1/completions', fake.completions)
+    app.router.add_post('/generate', fake.generate)
+    app.router.add_post('/models/{name:.*}', fake.generate)
+    app.router.add_get('/stats', fake.stats)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake OpenAI/TGI-compatible LLM server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', type=float, default=0.5,
+                        help='seconds before the first token')
+    parser.add_argument('--token-delay', type=float, default=0.0,
+                        help='seconds between streamed tokens')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='share of requests answered with --error-status')
+    parser.add_argument('--error-status', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=None, help='seed for repeatable error injection')
+    args = parser.parse_args()
+
+    web.run_app(
+        create_app(latency=args.latency, token_delay=args.token_delay, error_rate=args.error_rate,
+                   error_status=args.error_status, seed=args.seed),
+        host=args.host, port=args.port, print=None
+    )
+
+if __name__ == "__main__":
+    main()
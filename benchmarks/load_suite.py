@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Offline load test for both Flask apps against the fake LLM server
+Starts benchmarks/fake_llm_server.py and each app under gunicorn, drives
+scripted multi-turn interviews through web_chatbot's /chat and /analyze
+(queued SOAP job, polled until done) and simple_medical_chat's /chat, and
+reports throughput, p50/p95/p99 latency per route, errors, server memory
+growth and CPU per request. No API credits or GPUs are involved.
+
+Results are written as JSON (benchmarks/results/ by default) with the git
+commit and settings, so runs can be compared across releases:
+
+Run from the repository root:
+    python benchmarks/load_suite.py
+    python benchmarks/load_suite.py --interviews 200 --concurrency 50 --latency 0.3 --error-rate 0.02
+    python benchmarks/load_suite.py --compare benchmarks/results/<earlier run>.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import aiohttp
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, 'benchmarks', 'results')
+
+PATIENT_ANSWERS = [
+    "I have had a sharp pain in my lower right abdomen since 2 days ago",
+    "It is about 7/10, worse when I walk, and I felt nauseous this morning",
+    "I am a 34 year old female and I took ibuprofen but it did not help",
+    "No fever, but I vomited once yesterday after eating",
+    "My mother had gallstones and I have never had surgery",
+    "The pain started around my belly button and moved to the right side",
+]
+
+# Replies that are HTTP 200 but carry a model failure
+APP_ERROR_MARKERS = ("Error with OpenAI", "Error generating SOAP note", "I'm having difficulty")
+
+SCENARIOS = ('web_chatbot', 'simple_chat')
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def start_process(args, env=None):
+    return subprocess.Popen(
+        args, cwd=REPO_ROOT, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+def stop_process(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+async def wait_until_up(url, timeout=30):
+    deadline = time.time() + timeout
+    async with aiohttp.ClientSession() as http:
+        while time.time() < deadline:
+            try:
+                async with http.get(url) as response:
+                    if response.status < 500:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not come up")
+
+def process_tree(pid):
+    """pid and all its descendants (gunicorn master and workers), from /proc"""
+    pids = [pid]
+    for current in pids:
+        try:
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as children:
+                    pids.extend(int(child) for child in children.read().split())
+        except OSError:
+            continue
+    return pids
+
+def resource_sample(pid):
+    """(RSS MB, CPU seconds) summed over a process tree; (None, None) without /proc"""
+    rss_kb = 0
+    ticks = 0
+    found = False
+    for current in process_tree(pid):
+        try:
+            with open(f"/proc/{current}/status") as status:
+                for line in status:
+                    if line.startswith('VmRSS:'):
+                        rss_kb += int(line.split()[1])
+            with open(f"/proc/{current}/stat") as stat:
+                fields = stat.read().rsplit(')', 1)[1].split()
+            # utime and stime are fields 14 and 15 of stat, 12 and 13 after the command name
+            ticks += int(fields[11]) + int(fields[12])
+            found = True
+        except (OSError, IndexError, ValueError):
+            continue
+    if not found:
+        return None, None
+    return rss_kb / 1024, ticks / os.sysconf('SC_CLK_TCK')
+
+class Recorder:
+    """Latencies and failures per route, plus RSS samples of the server under test"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.app_errors = {}
+        self.rss_samples = []
+
+    def record(self, route, seconds, error=None, app_error=False):
+        if error is not None:
+            self.errors.setdefault(route, []).append(str(error))
+            return
+        self.latencies.setdefault(route, []).append(seconds)
+        if app_error:
+            self.app_errors[route] = self.app_errors.get(route, 0) + 1
+
+    def routes(self):
+        summary = {}
+        for route in sorted(set(self.latencies) | set(self.errors)):
+            values = self.latencies.get(route, [])
+            summary[route] = {
+                'requests': len(values) + len(self.errors.get(route, [])),
+                'errors': len(self.errors.get(route, [])),
+                'app_errors': self.app_errors.get(route, 0),
+                'p50_ms': round(percentile(values, 50) * 1000, 1),
+                'p95_ms': round(percentile(values, 95) * 1000, 1),
+                'p99_ms': round(percentile(values, 99) * 1000, 1),
+                'mean_ms': round(sum(values) / len(values) * 1000, 1) if values else 0.0
+            }
+        return summary
+
+async def timed_request(http, recorder, route, method, url, **kwargs):
+    """JSON body of a request, or None after recording the failure"""
+    started = time.perf_counter()
+    try:
+        async with http.request(method, url, **kwargs) as response:
+            data = await response.json(content_type=None)
+            if response.status >= 400:
+                recorder.record(route, 0, error=response.status)
+                return None
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        recorder.record(route, 0, error=type(e).__name__)
+        return None
+    reply = json.dumps(data)
+    recorder.record(route, time.perf_counter() - started,
+                    app_error=any(marker in reply for marker in APP_ERROR_MARKERS))
+    return data
+
+async def web_chatbot_interview(http, base_url, recorder, turns, poll_interval):
+    conversation_id = None
+    job = None
+    for turn in range(turns):
+        data = await timed_request(http, recorder, 'POST /chat', 'POST', f"{base_url}/chat", json={
+            'message': PATIENT_ANSWERS[turn % len(PATIENT_ANSWERS)],
+            'conversation_id': conversation_id
+        })
+        if data is None:
+            return
+        conversation_id = data.get('conversation_id')
+        # The readiness check may end the interview early and queue the SOAP job itself
+        if data.get('interview_complete'):
+            job = data.get('analysis')
+            break
+
+    # SOAP note: 202 with a job, then poll until it finishes; soap_total is what the clinician waits
+    started = time.perf_counter()
+    # A serverless deployment leaves the note to /analyze, which answers with the finished job
+    if job is None or job.get('status') == 'deferred':
+        # force: scripted answers may not fill every slot the readiness check wants
+        job = await timed_request(http, recorder, 'POST /analyze', 'POST', f"{base_url}/analyze",
+                                  json={'conversation_id': conversation_id, 'force': True})
+        if job is None:
+            return
+    while job.get('status') not in ('succeeded', 'failed', None):
+        await asyncio.sleep(poll_interval)
+        job = await timed_request(http, recorder, 'GET /jobs/<id>', 'GET', f"{base_url}{job['status_url']}")
+        if job is None:
+            return
+    if job.get('status') == 'failed':
+        recorder.record('SOAP job (submit to done)', 0, error='job_failed')
+    else:
+        result = json.dumps(job.get('result') or job)
+        recorder.record('SOAP job (submit to done)', time.perf_counter() - started,
+                        app_error=any(marker in result for marker in APP_ERROR_MARKERS))
+
+async def simple_chat_interview(http, base_url, recorder, turns, poll_interval):
+    conversation_id = None
+    for turn in range(turns):
+        data = await timed_request(http, recorder, 'POST /chat', 'POST', f"{base_url}/chat", json={
+            'message': PATIENT_ANSWERS[turn % len(PATIENT_ANSWERS)],
+            'conversation_id': conversation_id
+        })
+        if data is None:
+            return
+        conversation_id = data.get('conversation_id')
+
+INTERVIEWS = {'web_chatbot': web_chatbot_interview, 'simple_chat': simple_chat_interview}
+
+async def sample_memory(pid, recorder, stop, interval=0.2):
+    while not stop.is_set():
+        rss, _ = resource_sample(pid)
+        if rss is not None:
+            recorder.rss_samples.append(rss)
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+async def drive(name, base_url, pid, args):
+    interview = INTERVIEWS[name]
+    recorder = Recorder()
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    timeout = aiohttp.ClientTimeout(total=600)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as http:
+        # Warm-up interviews load lazy imports and fill pools before the baseline is taken
+        for _ in range(args.warmup):
+            await interview(http, base_url, Recorder(), args.turns, args.poll_interval)
+        rss_before, cpu_before = resource_sample(pid)
+
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_memory(pid, recorder, stop))
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def one_interview():
+            async with semaphore:
+                await interview(http, base_url, recorder, args.turns, args.poll_interval)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[one_interview() for _ in range(args.interviews)])
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await sampler
+        rss_after, cpu_after = resource_sample(pid)
+
+    routes = recorder.routes()
+    # Job polls are client overhead, not work the user asked for
+    work = sum(stats['requests'] for route, stats in routes.items() if route.startswith('POST'))
+    result = {
+        'interviews': args.interviews,
+        'elapsed_s': round(elapsed, 3),
+        'requests': work,
+        'requests_per_s': round(work / elapsed, 2) if elapsed else 0.0,
+        'interviews_per_s': round(args.interviews / elapsed, 2) if elapsed else 0.0,
+        'routes': routes
+    }
+    if rss_before is not None and rss_after is not None:
+        result['server'] = {
+            'rss_start_mb': round(rss_before, 1),
+            'rss_end_mb': round(rss_after, 1),
+            'rss_peak_mb': round(max(recorder.rss_samples + [rss_after]), 1),
+            'rss_growth_mb': round(rss_after - rss_before, 1),
+            'rss_growth_kb_per_request': round((rss_after - rss_before) * 1024 / work, 2) if work else 0.0,
+            'cpu_s': round(cpu_after - cpu_before, 2),
+            'cpu_ms_per_request': round((cpu_after - cpu_before) * 1000 / work, 2) if work else 0.0
+        }
+    return result
+
+def scenario_command(name, args, port):
+    module = 'web_chatbot:app' if name == 'web_chatbot' else 'simple_medical_chat:app'
+    return ['gunicorn', module, '-w', str(args.workers), '-k', 'gthread', '--threads', str(args.threads),
+            '-b', f"127.0.0.1:{port}", '--timeout', '300']
+
+def scenario_env(name, args, state_dir):
+    fake = f"http://127.0.0.1:{args.fake_port}"
+    env = dict(os.environ)
+    env.update({
+        'OPENAI_API_BASE': f"{fake}/v1",
+        'OPENAI_API_KEY': 'sk-fake',
+        'HUGGINGFACE_API_KEY': 'hf-fake',
+        'MODEL_BACKENDS': 'openai',
+        'MEDICAL_BACKENDS': 'hf_endpoint',
+        'HF_ENDPOINT_URL': f"{fake}/v1/completions",
+        'RESPONSE_CACHE': '1' if args.cache else '0',
+        'LOG_LEVEL': 'WARNING'
+    })
+    if args.workers > 1:
+        # Job polls can land on any worker, so conversations and jobs must be shared
+        env['CONVERSATION_STORE'] = f"sqlite:///{os.path.join(state_dir, f'{name}-conversations.db')}"
+        env['ANALYSIS_QUEUE'] = f"sqlite:///{os.path.join(state_dir, f'{name}-jobs.db')}"
+    return env
+
+async def fake_stats(args):
+    async with aiohttp.ClientSession() as http:
+        async with http.get(f"http://127.0.0.1:{args.fake_port}/stats") as response:
+            return await response.json()
+
+async def run_suite(args):
+    fake = start_process([
+        sys.executable, 'benchmarks/fake_llm_server.py', '--port', str(args.fake_port),
+        '--latency', str(args.latency), '--token-delay', str(args.token_delay),
+        '--error-rate', str(args.error_rate), '--seed', '7'
+    ])
+    results = {}
+    try:
+        await wait_until_up(f"http://127.0.0.1:{args.fake_port}/stats")
+        with tempfile.TemporaryDirectory() as state_dir:
+            for offset, name in enumerate(args.scenarios):
+                port = args.port + offset
+                before = await fake_stats(args)
+                server = start_process(scenario_command(name, args, port), env=scenario_env(name, args, state_dir))
+                try:
+                    base_url = f"http://127.0.0.1:{port}"
+                    await wait_until_up(f"{base_url}/health")
+                    results[name] = await drive(name, base_url, server.pid, args)
+                finally:
+                    stop_process(server)
+                after = await fake_stats(args)
+                results[name]['model_calls'] = after['requests_served'] - before['requests_served']
+                results[name]['injected_errors'] = after['errors_served'] - before['errors_served']
+    finally:
+        stop_process(fake)
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def print_results(results):
+    for name, result in results.items():
+        print(f"\n{name}: {result['interviews']} interviews in {result['elapsed_s']} s, "
+              f"{result['requests_per_s']} req/s, {result['model_calls']} model calls "
+              f"({result['injected_errors']} injected errors)")
+        print(f"  {'route':<28}{'req':>6}{'err':>5}{'app err':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+        for route, stats in result['routes'].items():
+            print(f"  {route:<28}{stats['requests']:>6}{stats['errors']:>5}{stats['app_errors']:>9}"
+                  f"{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}")
+        server = result.get('server')
+        if server:
+            print(f"  server RSS {server['rss_start_mb']} -> {server['rss_end_mb']} MB "
+                  f"(peak {server['rss_peak_mb']}, {server['rss_growth_kb_per_request']} KB/request), "
+                  f"CPU {server['cpu_ms_per_request']} ms/request")
+
+def compare(results, baseline_path):
+    """Percentage change of the headline numbers against an earlier results file"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {os.path.basename(baseline_path)} (commit {baseline['meta']['git_commit']}):")
+    for name, result in results.items():
+        old = baseline['results'].get(name)
+        if not old:
+            continue
+        pairs = [('req/s', old['requests_per_s'], result['requests_per_s'])]
+        for route, stats in result['routes'].items():
+            if route in old['routes']:
+                pairs.append((f"{route} p95", old['routes'][route]['p95_ms'], stats['p95_ms']))
+        if old.get('server') and result.get('server'):
+            pairs.append(('CPU ms/request', old['server']['cpu_ms_per_request'], result['server']['cpu_ms_per_request']))
+            pairs.append(('RSS growth MB', old['server']['rss_growth_mb'], result['server']['rss_growth_mb']))
+        print(f"  {name}")
+        for label, before, after in pairs:
+            change = f"{(after - before) / before:+.1%}" if before else 'n/a'
+            print(f"    {label:<36}{before:>10} -> {after:<10} {change}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline load test against the fake LLM server')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help=f"comma-separated: {', '.join(SCENARIOS)}")
+    parser.add_argument('--interviews', type=int, default=100, help='interviews per scenario')
+    parser.add_argument('--turns', type=int, default=4, help='patient messages per interview (at least 2)')
+    parser.add_argument('--concurrency', type=int, default=20, help='interviews in flight at once')
+    parser.add_argument('--warmup', type=int, default=2, help='interviews before measuring')
+    parser.add_argument('--latency', type=float, default=0.2, help='fake model seconds to first token')
+    parser.add_argument('--token-delay', type=float, default=0.0, help='fake model seconds between tokens')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of model calls that fail')
+    parser.add_argument('--cache', action='store_true', help='leave the response cache on')
+    parser.add_argument('--workers', type=int, default=1, help='gunicorn workers (more than 1 uses SQLite state)')
+    parser.add_argument('--threads', type=int, default=32, help='gunicorn threads per worker')
+    parser.add_argument('--poll-interval', type=float, default=0.1, help='seconds between job status polls')
+    parser.add_argument('--port', type=int, default=8920)
+    parser.add_argument('--fake-port', type=int, default=8900)
+    parser.add_argument('--output', help='results JSON path (default: benchmarks/results/load-<commit>-<time>.json)')
+    parser.add_argument('--compare', help='earlier results JSON to compare against')
+    args = parser.parse_args()
+    args.scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    if args.turns < 2:
+        parser.error('--turns must be at least 2 for SOAP generation')
+
+    results = asyncio.run(run_suite(args))
+    print_results(results)
+
+    started = datetime.now(timezone.utc)
+    commit = git_commit()
+    output = args.output or os.path.join(RESULTS_DIR, f"load-{commit}-{started:%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'meta': {
+                'git_commit': commit,
+                'timestamp': started.isoformat(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+                'config': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')}
+            },
+            'results': results
+        }, f, indent=2)
+    print(f"\nResults written to {os.path.relpath(output)}")
+
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Concurrent chat turns against shared conversations
+Threads (and, with --processes, worker processes sharing a SQLite store)
+send messages to the same few conversations at once through the Flask app
+and the mock model backend. Afterwards every conversation is checked:
+patient and assistant messages must alternate, no accepted message may be
+lost, and each reply must be the one the mock backend gives for that turn.
+--unsafe turns the conversation lock off to show what it prevents.
+
+Run from the repository root:
+    python benchmarks/stress_conversation_turns.py --threads 16 --messages 20
+    python benchmarks/stress_conversation_turns.py --threads 16 --messages 20 --unsafe
+    python benchmarks/stress_conversation_turns.py --store sqlite --processes 4 --threads 8
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+class NoLock:
+    """Stand-in for ConversationLock with --unsafe"""
+
+    def acquire(self):
+        return self
+
+    def release(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+def configure_environment(args, store_url):
+    os.environ.update({
+        'MODEL_BACKENDS': 'mock',
+        'MOCK_LATENCY': str(args.latency),
+        'CONVERSATION_STORE': store_url,
+        'RESPONSE_CACHE': '0',
+        # Every turn goes to the mock; a readiness-ended interview would append its SOAP note
+        'INTERVIEW_AUTO_COMPLETE': '0',
+        'QUESTION_PLANNER': '0',
+        'LOG_LEVEL': 'ERROR'
+    })
+
+def run_worker(args, store_url, conversation_ids, worker_index, results):
+    """Send args.threads x args.messages messages from one process"""
+    configure_environment(args, store_url)
+    import web_chatbot
+
+    if args.unsafe:
+        web_chatbot.conversation_store.lock = lambda conversation_id, timeout=None: NoLock()
+
+    codes = Counter()
+    latencies = []
+    sent = Counter()
+    lock = threading.Lock()
+
+    def client_thread(thread_index):
+        client = web_chatbot.app.test_client()
+        for n in range(args.messages):
+            conversation_id = conversation_ids[(thread_index + n) % len(conversation_ids)]
+            body = {'message': f"answer {worker_index}.{thread_index}.{n}", 'conversation_id': conversation_id}
+            started = time.perf_counter()
+            # Alternate the blocking and streaming routes; both take the same lock
+            if n % 2:
+                response = client.post('/chat/stream', json=body)
+                response.get_data()
+                response.close()
+            else:
+                response = client.post('/chat', json=body)
+            elapsed = time.perf_counter() - started
+            with lock:
+                codes[response.status_code] += 1
+                latencies.append(elapsed)
+                if response.status_code == 200:
+                    sent[conversation_id] += 1
+
+    threads = [threading.Thread(target=client_thread, args=(n,)) for n in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    results.put((dict(codes), latencies, dict(sent)))
+
+def check_conversations(store, conversation_ids, sent):
+    """Alternation, lost-message and reply-order violations"""
+    from model_backends import MOCK_QUESTIONS
+
+    problems = Counter()
+    for conversation_id in conversation_ids:
+        messages = store.get(conversation_id)['messages']
+        roles = [msg['role'] for msg in messages]
+        problems['out_of_order'] += sum(1 for a, b in zip(roles, roles[1:]) if a == b)
+        problems['lost_messages'] += sent.get(conversation_id, 0) - roles.count('user')
+
+        # The mock asks question k after the k-th patient answer it can see
+        answers = 0
+        for msg in messages:
+            if msg['role'] == 'user':
+                answers += 1
+            elif msg['content'] != MOCK_QUESTIONS[min(max(answers - 1, 0), len(MOCK_QUESTIONS) - 1)]:
+                problems['wrong_replies'] += 1
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent conversation stress test')
+    parser.add_argument('--store', choices=['memory', 'sqlite'], default='memory')
+    parser.add_argument('--processes', type=int, default=1, help='worker processes (sqlite only)')
+    parser.add_argument('--threads', type=int, default=16, help='client threads per process')
+    parser.add_argument('--messages', type=int, default=20, help='messages per thread')
+    parser.add_argument('--conversations', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.005, help='mock model latency in seconds')
+    parser.add_argument('--unsafe', action='store_true', help='disable the conversation lock')
+    args = parser.parse_args()
+
+    if args.store == 'memory' and args.processes > 1:
+        parser.error('--processes needs --store sqlite; in-memory stores are per process')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store_url = 'memory' if args.store == 'memory' else f"sqlite:///{os.path.join(tmp, 'conversations.db')}"
+        conversation_ids = [str(uuid.uuid4()) for _ in range(args.conversations)]
+        started = time.perf_counter()
+
+        if args.store == 'memory':
+            results = multiprocessing.Queue()
+            configure_environment(args, store_url)
+            import web_chatbot
+            for conversation_id in conversation_ids:
+                web_chatbot.conversation_store.create(conversation_id)
+            run_worker(args, store_url, conversation_ids, 0, results)
+            outcomes = [results.get()]
+            store = web_chatbot.conversation_store
+        else:
+            from conversation_store import create_store
+            store = create_store(store_url)
+            for conversation_id in conversation_ids:
+                store.create(conversation_id)
+            context = multiprocessing.get_context('spawn')
+            results = context.Queue()
+            workers = [
+                context.Process(target=run_worker, args=(args, store_url, conversation_ids, n, results))
+                for n in range(args.processes)
+            ]
+            for worker in workers:
+                worker.start()
+            outcomes = [results.get() for _ in workers]
+            for worker in workers:
+                worker.join()
+
+        elapsed = time.perf_counter() - started
+        codes, latencies, sent = Counter(), [], Counter()
+        for worker_codes, worker_latencies, worker_sent in outcomes:
+            codes.update(worker_codes)
+            latencies.extend(worker_latencies)
+            sent.update(worker_sent)
+        problems = check_conversations(store, conversation_ids, sent)
+
+    total = sum(codes.values())
+    latencies.sort()
+    print(f"{args.store} store, {args.processes} process(es) x {args.threads} threads x {args.messages} messages, "
+          f"{args.conversations} conversations, lock {'OFF' if args.unsafe else 'on'}")
+    print(f"requests {total}, ok {codes.get(200, 0)}, busy (409) {codes.get(409, 0)}, "
+          f"other {total - codes.get(200, 0) - codes.get(409, 0)}")
+    print(f"throughput {total / elapsed:.1f} req/s, latency p50 {statistics.median(latencies) * 1000:.1f} ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms")
+    print(f"out-of-order turns {problems['out_of_order']}, lost messages {problems['lost_messages']}, "
+          f"wrong replies {problems['wrong_replies']}")
+    return 1 if any(problems.values()) and not args.unsafe else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
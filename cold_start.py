@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Cold start settings for serverless deployments
+On Vercel every scaled-out instance imports the app before its first
+response. FAST_STARTUP=1 leaves backend imports (openai, requests, boto3)
+and client construction to the first call that needs them and skips the
+.env lookup, since the platform provides the environment. Long-running
+servers keep the default and warm everything at import instead.
+
+Serverless instances are also frozen between requests, so no work may
+outlive a response: SERVERLESS=1 (set automatically on Vercel) makes SOAP
+generation run inside the /analyze request instead of on worker threads.
+
+Templates are rendered from modules precompiled by Jinja when
+templates/compiled/ matches the current templates, which saves compiling
+them on an instance's first page view:
+    python cold_start.py
+"""
+
+import hashlib
+import json
+import os
+
+import tracing
+
+# Defer backend imports and clients to first use (serverless); 0 warms them at import
+FAST_STARTUP = os.getenv('FAST_STARTUP', '0').lower() in ('1', 'true', 'yes')
+
+# Running as a serverless function; Vercel sets VERCEL=1 on every instance
+SERVERLESS = os.getenv('SERVERLESS', '1' if os.getenv('VERCEL') else '0').lower() in ('1', 'true', 'yes')
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DIR = os.path.join(ROOT, 'templates')
+COMPILED_TEMPLATE_DIR = os.path.join(TEMPLATE_DIR, 'compiled')
+MANIFEST = 'manifest.json'
+# Jinja's generated code imports names it may not use; linters skip these files
+GENERATED_HEADER = "# Generated by python cold_start.py from templates/*.html; do not edit or lint\n"
+
+def load_env():
+    """Load .env unless running in fast startup mode"""
+    if FAST_STARTUP:
+        return
+    from dotenv import load_dotenv
+    load_dotenv()
+
+def warm(router):
+    """Build the router's clients now unless they are deferred to first use"""
+    if not FAST_STARTUP:
+        router.warm()
+
+def template_hashes(template_dir=TEMPLATE_DIR):
+    """Template name -> sha1 of its source"""
+    hashes = {}
+    for name in sorted(os.listdir(template_dir)):
+        if name.endswith('.html'):
+            with open(os.path.join(template_dir, name), 'rb') as f:
+                hashes[name] = hashlib.sha1(f.read()).hexdigest()
+    return hashes
+
+def compile_templates(app, target=COMPILED_TEMPLATE_DIR):
+    """Compile app's templates to Python modules in target, with a manifest of their sources"""
+    import jinja2
+
+    os.makedirs(target, exist_ok=True)
+    for name in os.listdir(target):
+        if name.startswith('tmpl_') and name.endswith('.py'):
+            os.remove(os.path.join(target, name))
+    # Flask's environment, so autoescaping matches what render_template would compile
+    app.jinja_env.compile_templates(target, extensions=['html'], zip=None, ignore_errors=False)
+    for name in os.listdir(target):
+        if name.startswith('tmpl_') and name.endswith('.py'):
+            path = os.path.join(target, name)
+            with open(path) as f:
+                source = f.read()
+            with open(path, 'w') as f:
+                f.write(GENERATED_HEADER + source)
+    manifest = {'jinja2': jinja2.__version__, 'templates': template_hashes()}
+    with open(os.path.join(target, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return manifest
+
+def use_compiled_templates(app, source=COMPILED_TEMPLATE_DIR):
+    """Render app's templates from precompiled modules when they match the sources
+
+    Returns whether they are used; stale or missing modules leave Jinja
+    compiling the templates as before.
+    """
+    try:
+        with open(os.path.join(source, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    import jinja2
+    if manifest.get('jinja2') != jinja2.__version__ or manifest.get('templates') != template_hashes():
+        tracing.warning('compiled_templates_stale', hint='run python cold_start.py')
+        return False
+    app.jinja_env.loader = jinja2.ChoiceLoader([jinja2.ModuleLoader(source), app.jinja_env.loader])
+    return True
+
+if __name__ == "__main__":
+    from flask import Flask
+
+    manifest = compile_templates(Flask(__name__, root_path=ROOT))
+    print(f"Compiled {len(manifest['templates'])} templates to {os.path.relpath(COMPILED_TEMPLATE_DIR)}")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Compressed on-disk archive for conversations evicted from memory
+Each conversation is written as one JSON line in its own gzip member,
+appended to a per-process file, so the file is ordinary gzip JSON lines
+(zcat works) and a single conversation can be read back by offset. Space
+left by rehydrated or deleted entries is reclaimed by compaction.
+"""
+
+import gzip
+import json
+import os
+import tempfile
+import threading
+
+# Compact once this many bytes are dead and they outweigh the live entries
+COMPACT_MIN_GARBAGE_BYTES = 1024 * 1024
+
+class ConversationArchive:
+    """Append-only gzip JSON lines file with an in-memory offset index"""
+
+    def __init__(self, directory=None, prefix='conversations', compresslevel=6):
+        self.directory = directory or tempfile.gettempdir()
+        self.prefix = prefix
+        self.compresslevel = compresslevel
+        # conversation_id -> (offset, compressed length, uncompressed length)
+        self._index = {}
+        self._file = None
+        self._pid = None
+        self._end = 0
+        self._garbage = 0
+        self._lock = threading.Lock()
+        self._stats = {'archived': 0, 'restored': 0, 'compactions': 0}
+
+    @property
+    def path(self):
+        # One file per process: the in-memory store it backs is per process too
+        return os.path.join(self.directory, f"{self.prefix}-archive-{os.getpid()}.jsonl.gz")
+
+    def __contains__(self, conversation_id):
+        return conversation_id in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def put(self, conversation):
+        """Archive a conversation dict, replacing any earlier copy"""
+        raw = (json.dumps(conversation, ensure_ascii=False) + "\n").encode('utf-8')
+        member = gzip.compress(raw, compresslevel=self.compresslevel)
+        with self._lock:
+            handle = self._handle()
+            previous = self._index.get(conversation['id'])
+            if previous is not None:
+                self._garbage += previous[1]
+            handle.seek(self._end)
+            handle.write(member)
+            self._index[conversation['id']] = (self._end, len(member), len(raw))
+            self._end += len(member)
+            self._stats['archived'] += 1
+
+    def take(self, conversation_id):
+        """Remove a conversation from the archive and return it, or None"""
+        with self._lock:
+            entry = self._index.pop(conversation_id, None)
+            if entry is None:
+                return None
+            handle = self._handle()
+            handle.seek(entry[0])
+            member = handle.read(entry[1])
+            self._garbage += entry[1]
+            self._stats['restored'] += 1
+            self._maybe_compact()
+        return json.loads(gzip.decompress(member))
+
+    def discard(self, conversation_id):
+        with self._lock:
+            entry = self._index.pop(conversation_id, None)
+            if entry is not None:
+                self._garbage += entry[1]
+                self._maybe_compact()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            live = sum(entry[1] for entry in self._index.values())
+            raw = sum(entry[2] for entry in self._index.values())
+            stats.update({
+                'conversations': len(self._index),
+                'file_bytes': self._end,
+                'live_bytes': live,
+                'garbage_bytes': self._garbage,
+                'compression_ratio': round(raw / live, 2) if live else 0.0,
+                'path': self.path
+            })
+        return stats
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                os.remove(self.path)
+
+    def _handle(self):
+        # (Re)created on first use and after a fork; entries from before the fork stay unreadable
+        if self._file is None or self._pid != os.getpid():
+            os.makedirs(self.directory, exist_ok=True)
+            self._pid = os.getpid()
+            self._file = open(self.path, 'w+b')
+            self._index = {}
+            self._end = 0
+            self._garbage = 0
+        return self._file
+
+    def _maybe_compact(self):
+        live = self._end - self._garbage
+        if self._garbage < COMPACT_MIN_GARBAGE_BYTES or self._garbage < live:
+            return
+        # Copy live members into a fresh file and swap it in; offsets are rebuilt as we go
+        source = self._file
+        temp_path = self.path + '.compact'
+        index = {}
+        end = 0
+        with open(temp_path, 'wb') as target:
+            for conversation_id, (offset, length, raw_length) in sorted(self._index.items(), key=lambda item: item[1][0]):
+                source.seek(offset)
+                target.write(source.read(length))
+                index[conversation_id] = (end, length, raw_length)
+                end += length
+        source.close()
+        os.replace(temp_path, self.path)
+        self._file = open(self.path, 'r+b')
+        self._index = index
+        self._end = end
+        self._garbage = 0
+        self._stats['compactions'] += 1
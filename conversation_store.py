@@ -0,0 +1,826 @@
+#!/usr/bin/env python3
+"""
+Conversation storage backends
+In-memory for development, SQLite (WAL mode) for persistence and sharing across workers
+"""
+
+import base64
+import binascii
+import bisect
+import heapq
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+from conversation_archive import ConversationArchive
+from message_log import MessageLog
+
+DEFAULT_LIST_LIMIT = 50
+MAX_LIST_LIMIT = 500
+DEFAULT_MESSAGE_LIMIT = 100
+MAX_MESSAGE_LIMIT = 1000
+
+# Seconds a request waits for another turn on the same conversation before giving up
+LOCK_TIMEOUT = float(os.getenv('CONVERSATION_LOCK_TIMEOUT', '30'))
+# SQLite lock leases expire after this long, so a crashed worker cannot block a conversation
+LOCK_TTL = float(os.getenv('CONVERSATION_LOCK_TTL', '120'))
+
+# In-memory store bounds (0 disables each); conversations over them move to a gzip archive on disk
+MEMORY_LIMIT_MB = float(os.getenv('CONVERSATION_MEMORY_LIMIT_MB', '0'))
+IDLE_SECONDS = float(os.getenv('CONVERSATION_IDLE_SECONDS', '0'))
+ARCHIVE_DIR = os.getenv('CONVERSATION_ARCHIVE_DIR', '')
+# Approximate CPython cost of a stored Message (object, list slot, str header) and of an
+# empty conversation, on top of the characters of their text
+MESSAGE_OVERHEAD_BYTES = 105
+CONVERSATION_OVERHEAD_BYTES = 900
+
+class ConversationBusy(Exception):
+    """Raised when a conversation lock cannot be acquired within the timeout"""
+
+class ConversationLock:
+    """Exclusive hold on one conversation; release() is safe to call more than once"""
+
+    def __init__(self, acquire, release, conversation_id, timeout):
+        self._acquire = acquire
+        self._release = release
+        self.conversation_id = conversation_id
+        self.timeout = timeout
+        self._held = False
+        self._guard = threading.Lock()
+
+    def acquire(self):
+        if not self._acquire(self.conversation_id, self.timeout):
+            raise ConversationBusy(self.conversation_id)
+        self._held = True
+        return self
+
+    def release(self):
+        with self._guard:
+            if not self._held:
+                return
+            self._held = False
+        self._release(self.conversation_id)
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+class LocalLocks:
+    """Per-key locks for one process, dropped again once nobody holds or waits for them"""
+
+    def __init__(self):
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key, timeout):
+        with self._lock:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        if entry[0].acquire(timeout=timeout):
+            return True
+        self._drop(key)
+        return False
+
+    def release(self, key):
+        self._locks[key][0].release()
+        self._drop(key)
+
+    def _drop(self, key):
+        with self._lock:
+            entry = self._locks[key]
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
+def now_iso():
+    return datetime.now().isoformat()
+
+def conversation_version(status):
+    """Opaque version string; changes whenever messages, title or flags change"""
+    return f"{status['message_count']}-{status['updated_at']}"
+
+def encode_cursor(summary):
+    """Opaque keyset cursor pointing just past a list entry"""
+    raw = f"{summary['updated_at']}|{summary['id']}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """(updated_at, id) from encode_cursor output; raises ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+    except (binascii.Error, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    updated_at, separator, conversation_id = raw.partition('|')
+    if not separator or not conversation_id:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return updated_at, conversation_id
+
+def message_bytes(content):
+    return MESSAGE_OVERHEAD_BYTES + len(content)
+
+def conversation_bytes(conversation):
+    """Approximate memory held by a resident conversation, from its MessageLog counters"""
+    messages = conversation['messages']
+    return (CONVERSATION_OVERHEAD_BYTES + len(conversation['title'])
+            + len(messages) * MESSAGE_OVERHEAD_BYTES + messages.chars)
+
+def summarize(conversation):
+    """Sidebar entry for a conversation"""
+    return {
+        'id': conversation['id'],
+        'title': conversation['title'],
+        'created_at': conversation['created_at'],
+        'updated_at': conversation['updated_at']
+    }
+
+class ConversationStore:
+    """Interface shared by all storage backends
+
+    Conversations are plain dicts with the keys the API has always returned:
+    id, title, messages, data_collection_complete, created_at, updated_at,
+    plus model_ready, set once the interview model said READY_FOR_ANALYSIS.
+    Messages are only ever appended (or cleared by a reset). Each one gets a
+    per-conversation seq that keeps increasing across resets; last_seq is the
+    newest, so clients can ask for everything after the last seq they saw.
+    """
+
+    def create(self, conversation_id, title='New Patient'):
+        raise NotImplementedError
+
+    def get(self, conversation_id, after=0):
+        """Return a snapshot of the conversation, or None if it does not exist
+
+        With after=n only messages from index n onwards are included;
+        message_count and user_message_count always cover all of them.
+        """
+        raise NotImplementedError
+
+    def status(self, conversation_id):
+        """Counts and flags without the messages, or None if it does not exist"""
+        raise NotImplementedError
+
+    def messages(self, conversation_id, after_seq=0, limit=DEFAULT_MESSAGE_LIMIT):
+        """Page of messages with seq > after_seq, or None if the conversation does not exist
+
+        Returns messages (each with seq, role, content), last_seq,
+        message_count and has_more.
+        """
+        raise NotImplementedError
+
+    def exists(self, conversation_id):
+        raise NotImplementedError
+
+    def list(self, limit=DEFAULT_LIST_LIMIT, before=None):
+        """Return summaries ordered by updated_at descending
+
+        before is an (updated_at, id) cursor from a previous page.
+        """
+        raise NotImplementedError
+
+    def append_message(self, conversation_id, role, content):
+        """Append a message and return its seq"""
+        raise NotImplementedError
+
+    def update(self, conversation_id, **fields):
+        """Set title, data_collection_complete and/or model_ready and touch updated_at"""
+        raise NotImplementedError
+
+    def clear_messages(self, conversation_id):
+        raise NotImplementedError
+
+    def delete(self, conversation_id):
+        """Delete a conversation, returning False if it did not exist"""
+        raise NotImplementedError
+
+    def on_evict(self, callback):
+        """Call callback(conversation_id) whenever a conversation leaves memory (evicted or deleted)
+
+        Lets per-conversation caches drop what the store no longer holds.
+        Stores that keep nothing resident never call it.
+        """
+
+    def count(self, open_only=False):
+        """Number of conversations; open_only counts those still collecting data"""
+        raise NotImplementedError
+
+    def lock(self, conversation_id, timeout=LOCK_TIMEOUT):
+        """ConversationLock serialising chat turns and analysis writes on one conversation
+
+        Use it as a context manager; ConversationBusy is raised if another
+        holder keeps it for longer than timeout seconds.
+        """
+        raise NotImplementedError
+
+    def memory_report(self, top=10):
+        """Memory held by conversations in this process, with the top largest"""
+        raise NotImplementedError
+
+class InMemoryConversationStore(ConversationStore):
+    """Process-local store with a sorted index on updated_at
+
+    With a memory limit or an idle timeout, the least recently used
+    conversations are moved to a compressed archive on disk and read back
+    the next time their messages are needed. Archived conversations keep a
+    small stub in memory, so listing, counting and status checks never
+    touch the archive.
+    """
+
+    def __init__(self, memory_limit_mb=MEMORY_LIMIT_MB, idle_seconds=IDLE_SECONDS,
+                 archive_dir=ARCHIVE_DIR, archive_prefix='conversations'):
+        self._conversations = {}
+        # Archived conversations: summary, flags and counts only
+        self._stubs = {}
+        # Sorted (updated_at, id) keys; newest conversations sit at the end
+        self._index = []
+        # Resident ids, least recently used first, mapped to their last access time
+        self._recency = OrderedDict()
+        self._sizes = {}
+        self._resident_bytes = 0
+        self.memory_limit = int(memory_limit_mb * 1024 * 1024)
+        self.idle_seconds = idle_seconds
+        self._archive = None
+        if self.memory_limit or self.idle_seconds:
+            self._archive = ConversationArchive(archive_dir or None, archive_prefix)
+        self._stats = {'evictions': 0, 'rehydrations': 0}
+        self._evict_callbacks = []
+        self._lock = threading.RLock()
+        self._turn_locks = LocalLocks()
+
+    def on_evict(self, callback):
+        self._evict_callbacks.append(callback)
+
+    def _evicted(self, conversation_id):
+        for callback in self._evict_callbacks:
+            callback(conversation_id)
+
+    def _touch(self, conversation):
+        old_key = (conversation['updated_at'], conversation['id'])
+        position = bisect.bisect_left(self._index, old_key)
+        if position < len(self._index) and self._index[position] == old_key:
+            del self._index[position]
+        conversation['updated_at'] = now_iso()
+        bisect.insort(self._index, (conversation['updated_at'], conversation['id']))
+
+    def _resident(self, conversation_id):
+        """The live conversation dict, rehydrated from the archive if needed, or None"""
+        conversation = self._conversations.get(conversation_id)
+        if conversation is None:
+            if conversation_id not in self._stubs:
+                return None
+            conversation = self._rehydrate(conversation_id)
+            if conversation is None:
+                return None
+        self._recency[conversation_id] = time.monotonic()
+        self._recency.move_to_end(conversation_id)
+        return conversation
+
+    def _resize(self, conversation_id, delta):
+        self._sizes[conversation_id] += delta
+        self._resident_bytes += delta
+
+    def _enforce_limits(self):
+        """Archive idle conversations, then least recently used ones until under the limit"""
+        if self._archive is None:
+            return
+        now = time.monotonic()
+        while self._recency:
+            conversation_id, last_used = next(iter(self._recency.items()))
+            over_limit = self.memory_limit and self._resident_bytes > self.memory_limit and len(self._recency) > 1
+            idle = self.idle_seconds and now - last_used > self.idle_seconds
+            if not (over_limit or idle):
+                break
+            self._evict(conversation_id)
+
+    def _evict(self, conversation_id):
+        conversation = self._conversations.pop(conversation_id)
+        messages = conversation['messages']
+        self._archive.put(dict(conversation, messages=messages.to_dicts()))
+        self._stubs[conversation_id] = dict(
+            summarize(conversation),
+            data_collection_complete=conversation['data_collection_complete'],
+            last_seq=conversation['last_seq'],
+            message_count=len(messages),
+            user_message_count=messages.user_count
+        )
+        del self._recency[conversation_id]
+        self._resident_bytes -= self._sizes.pop(conversation_id)
+        self._stats['evictions'] += 1
+        self._evicted(conversation_id)
+
+    def _rehydrate(self, conversation_id):
+        stub = self._stubs.pop(conversation_id)
+        conversation = self._archive.take(conversation_id)
+        if conversation is None:
+            # Archive entry lost, e.g. written by the parent before a fork; drop the stub with it
+            self._remove_index_key(stub['updated_at'], conversation_id)
+            return None
+        conversation['messages'] = MessageLog(conversation['messages'])
+        self._conversations[conversation_id] = conversation
+        self._sizes[conversation_id] = conversation_bytes(conversation)
+        self._resident_bytes += self._sizes[conversation_id]
+        self._stats['rehydrations'] += 1
+        return conversation
+
+    def _remove_index_key(self, updated_at, conversation_id):
+        key = (updated_at, conversation_id)
+        position = bisect.bisect_left(self._index, key)
+        if position < len(self._index) and self._index[position] == key:
+            del self._index[position]
+
+    def create(self, conversation_id, title='New Patient'):
+        timestamp = now_iso()
+        conversation = {
+            'id': conversation_id,
+            'title': title,
+            'messages': MessageLog(),
+            'last_seq': 0,
+            'data_collection_complete': False,
+            'model_ready': False,
+            'created_at': timestamp,
+            'updated_at': timestamp
+        }
+        with self._lock:
+            self._conversations[conversation_id] = conversation
+            bisect.insort(self._index, (timestamp, conversation_id))
+            self._sizes[conversation_id] = 0
+            self._resize(conversation_id, conversation_bytes(conversation))
+            self._recency[conversation_id] = time.monotonic()
+            self._enforce_limits()
+        return dict(conversation, messages=[])
+
+    def get(self, conversation_id, after=0):
+        with self._lock:
+            conversation = self._resident(conversation_id)
+            if conversation is None:
+                return None
+            messages = conversation['messages']
+            snapshot = dict(conversation, messages=messages.to_dicts(after), message_count=len(messages),
+                            user_message_count=messages.user_count)
+            self._enforce_limits()
+            return snapshot
+
+    def status(self, conversation_id):
+        with self._lock:
+            stub = self._stubs.get(conversation_id)
+            if stub is not None:
+                return dict(stub)
+            conversation = self._conversations.get(conversation_id)
+            if conversation is None:
+                return None
+            messages = conversation['messages']
+            return {
+                'id': conversation['id'],
+                'title': conversation['title'],
+                'data_collection_complete': conversation['data_collection_complete'],
+                'message_count': len(messages),
+                'user_message_count': messages.user_count,
+                'last_seq': conversation['last_seq'],
+                'created_at': conversation['created_at'],
+                'updated_at': conversation['updated_at']
+            }
+
+    def messages(self, conversation_id, after_seq=0, limit=DEFAULT_MESSAGE_LIMIT):
+        limit = max(1, min(limit, MAX_MESSAGE_LIMIT))
+        with self._lock:
+            conversation = self._resident(conversation_id)
+            if conversation is None:
+                return None
+            messages = conversation['messages']
+            # Current messages hold seqs first_seq..last_seq with no gaps
+            first_seq = conversation['last_seq'] - len(messages) + 1
+            start = max(0, after_seq - first_seq + 1)
+            page = [
+                {'role': msg.role, 'content': msg.content, 'seq': first_seq + index}
+                for index, msg in enumerate(messages[start:start + limit], start)
+            ]
+            self._enforce_limits()
+            return {
+                'messages': page,
+                'last_seq': conversation['last_seq'],
+                'message_count': len(messages),
+                'has_more': start + limit < len(messages)
+            }
+
+    def exists(self, conversation_id):
+        # Under the lock: an id moving between resident and archived is briefly in neither
+        with self._lock:
+            return conversation_id in self._conversations or conversation_id in self._stubs
+
+    def list(self, limit=DEFAULT_LIST_LIMIT, before=None):
+        limit = max(1, min(limit, MAX_LIST_LIMIT))
+        with self._lock:
+            end = bisect.bisect_left(self._index, tuple(before)) if before else len(self._index)
+            keys = self._index[max(0, end - limit):end]
+            return [
+                summarize(self._conversations.get(conv_id) or self._stubs[conv_id])
+                for _, conv_id in reversed(keys)
+            ]
+
+    def _writable(self, conversation_id):
+        conversation = self._resident(conversation_id)
+        if conversation is None:
+            raise KeyError(conversation_id)
+        return conversation
+
+    def append_message(self, conversation_id, role, content):
+        with self._lock:
+            conversation = self._writable(conversation_id)
+            conversation['messages'].append(role, content)
+            conversation['last_seq'] += 1
+            self._touch(conversation)
+            self._resize(conversation_id, message_bytes(content))
+            self._enforce_limits()
+            return conversation['last_seq']
+
+    def update(self, conversation_id, **fields):
+        with self._lock:
+            conversation = self._writable(conversation_id)
+            for key in ('title', 'data_collection_complete', 'model_ready'):
+                if key in fields:
+                    conversation[key] = fields[key]
+            self._touch(conversation)
+            self._resize(conversation_id, conversation_bytes(conversation) - self._sizes[conversation_id])
+            self._enforce_limits()
+
+    def clear_messages(self, conversation_id):
+        with self._lock:
+            conversation = self._writable(conversation_id)
+            conversation['messages'].clear()
+            self._touch(conversation)
+            self._resize(conversation_id, conversation_bytes(conversation) - self._sizes[conversation_id])
+
+    def delete(self, conversation_id):
+        with self._lock:
+            conversation = self._conversations.pop(conversation_id, None)
+            if conversation is not None:
+                del self._recency[conversation_id]
+                self._resident_bytes -= self._sizes.pop(conversation_id)
+            else:
+                conversation = self._stubs.pop(conversation_id, None)
+                if conversation is None:
+                    return False
+                self._archive.discard(conversation_id)
+            self._remove_index_key(conversation['updated_at'], conversation_id)
+            self._evicted(conversation_id)
+            return True
+
+    def count(self, open_only=False):
+        with self._lock:
+            if open_only:
+                return sum(
+                    1 for conversations in (self._conversations, self._stubs)
+                    for c in conversations.values() if not c['data_collection_complete']
+                )
+            return len(self._conversations) + len(self._stubs)
+
+    def lock(self, conversation_id, timeout=LOCK_TIMEOUT):
+        return ConversationLock(self._turn_locks.acquire, self._turn_locks.release, conversation_id, timeout)
+
+    def memory_report(self, top=10):
+        with self._lock:
+            now = time.monotonic()
+            resident = len(self._conversations)
+            report = {
+                'store': 'memory',
+                'resident_conversations': resident,
+                'archived_conversations': len(self._stubs),
+                'resident_bytes': self._resident_bytes,
+                'average_conversation_bytes': self._resident_bytes // resident if resident else 0,
+                'memory_limit_bytes': self.memory_limit,
+                'idle_seconds': self.idle_seconds,
+                'evictions': self._stats['evictions'],
+                'rehydrations': self._stats['rehydrations'],
+                'largest': [
+                    {
+                        'id': conversation_id,
+                        'messages': len(self._conversations[conversation_id]['messages']),
+                        'estimated_tokens': self._conversations[conversation_id]['messages'].tokens,
+                        'approx_bytes': size,
+                        'idle_seconds': round(now - self._recency[conversation_id], 1)
+                    }
+                    for conversation_id, size in heapq.nlargest(top, self._sizes.items(), key=lambda item: item[1])
+                ]
+            }
+        report['archive'] = self._archive.stats() if self._archive is not None else None
+        return report
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    data_collection_complete INTEGER NOT NULL DEFAULT 0,
+    last_seq INTEGER NOT NULL DEFAULT 0,
+    model_ready INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_conversations_updated_at
+    ON conversations (updated_at, id);
+CREATE TABLE IF NOT EXISTS messages (
+    conversation_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    PRIMARY KEY (conversation_id, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS conversation_locks (
+    conversation_id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+class SQLiteConversationStore(ConversationStore):
+    """SQLite-backed store; safe to share between gunicorn workers on one host"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        # Threads in this process queue on a local lock; only the holder polls the shared lease
+        self._turn_locks = LocalLocks()
+        self._instance = uuid.uuid4().hex[:8]
+        connection = self._connection()
+        connection.executescript(SQLITE_SCHEMA)
+        self._migrate(connection)
+
+    def _connection(self):
+        # sqlite3 connections must not be shared between threads
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _migrate(self, connection):
+        """Add last_seq and model_ready to databases created before they existed"""
+        columns = {row['name'] for row in connection.execute("PRAGMA table_info(conversations)")}
+        if 'last_seq' not in columns:
+            with self._transaction() as connection:
+                connection.execute("ALTER TABLE conversations ADD COLUMN last_seq INTEGER NOT NULL DEFAULT 0")
+                connection.execute(
+                    "UPDATE conversations SET last_seq = "
+                    "(SELECT COALESCE(MAX(seq), 0) FROM messages WHERE conversation_id = conversations.id)"
+                )
+        if 'model_ready' not in columns:
+            with self._transaction() as connection:
+                connection.execute("ALTER TABLE conversations ADD COLUMN model_ready INTEGER NOT NULL DEFAULT 0")
+
+    @contextmanager
+    def _transaction(self):
+        """IMMEDIATE transaction so concurrent writers queue instead of failing mid-way"""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def create(self, conversation_id, title='New Patient'):
+        timestamp = now_iso()
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT INTO conversations (id, title, data_collection_complete, created_at, updated_at) "
+                "VALUES (?, ?, 0, ?, ?)",
+                (conversation_id, title, timestamp, timestamp)
+            )
+        return {
+            'id': conversation_id,
+            'title': title,
+            'messages': [],
+            'last_seq': 0,
+            'data_collection_complete': False,
+            'model_ready': False,
+            'created_at': timestamp,
+            'updated_at': timestamp
+        }
+
+    def get(self, conversation_id, after=0):
+        connection = self._connection()
+        # One read transaction so the row and its messages are a consistent snapshot
+        connection.execute("BEGIN")
+        try:
+            row = connection.execute(
+                "SELECT * FROM conversations WHERE id = ?", (conversation_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            messages = connection.execute(
+                "SELECT role, content FROM messages WHERE conversation_id = ? ORDER BY seq LIMIT -1 OFFSET ?",
+                (conversation_id, after)
+            ).fetchall()
+            message_count, user_message_count = connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(role = 'user'), 0) FROM messages WHERE conversation_id = ?",
+                (conversation_id,)
+            ).fetchone()
+        finally:
+            connection.execute("COMMIT")
+        return {
+            'id': row['id'],
+            'title': row['title'],
+            'messages': [{'role': m['role'], 'content': m['content']} for m in messages],
+            'message_count': message_count,
+            'user_message_count': user_message_count,
+            'last_seq': row['last_seq'],
+            'data_collection_complete': bool(row['data_collection_complete']),
+            'model_ready': bool(row['model_ready']),
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at']
+        }
+
+    def status(self, conversation_id):
+        row = self._connection().execute(
+            "SELECT id, title, data_collection_complete, last_seq, created_at, updated_at, "
+            "(SELECT COUNT(*) FROM messages WHERE conversation_id = c.id) AS message_count, "
+            "(SELECT COUNT(*) FROM messages WHERE conversation_id = c.id AND role = 'user') AS user_message_count "
+            "FROM conversations c WHERE id = ?",
+            (conversation_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        status = dict(row)
+        status['data_collection_complete'] = bool(status['data_collection_complete'])
+        return status
+
+    def messages(self, conversation_id, after_seq=0, limit=DEFAULT_MESSAGE_LIMIT):
+        limit = max(1, min(limit, MAX_MESSAGE_LIMIT))
+        connection = self._connection()
+        connection.execute("BEGIN")
+        try:
+            row = connection.execute(
+                "SELECT last_seq, (SELECT COUNT(*) FROM messages WHERE conversation_id = c.id) AS message_count "
+                "FROM conversations c WHERE id = ?",
+                (conversation_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            # Range scan on the (conversation_id, seq) primary key; one extra row tells us has_more
+            rows = connection.execute(
+                "SELECT seq, role, content FROM messages WHERE conversation_id = ? AND seq > ? "
+                "ORDER BY seq LIMIT ?",
+                (conversation_id, after_seq, limit + 1)
+            ).fetchall()
+        finally:
+            connection.execute("COMMIT")
+        return {
+            'messages': [dict(m) for m in rows[:limit]],
+            'last_seq': row['last_seq'],
+            'message_count': row['message_count'],
+            'has_more': len(rows) > limit
+        }
+
+    def exists(self, conversation_id):
+        return self._connection().execute(
+            "SELECT 1 FROM conversations WHERE id = ?", (conversation_id,)
+        ).fetchone() is not None
+
+    def list(self, limit=DEFAULT_LIST_LIMIT, before=None):
+        limit = max(1, min(limit, MAX_LIST_LIMIT))
+        if before:
+            rows = self._connection().execute(
+                "SELECT id, title, created_at, updated_at FROM conversations "
+                "WHERE (updated_at, id) < (?, ?) ORDER BY updated_at DESC, id DESC LIMIT ?",
+                (before[0], before[1], limit)
+            ).fetchall()
+        else:
+            rows = self._connection().execute(
+                "SELECT id, title, created_at, updated_at FROM conversations "
+                "ORDER BY updated_at DESC, id DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def append_message(self, conversation_id, role, content):
+        with self._transaction() as connection:
+            self._touch(connection, conversation_id)
+            connection.execute(
+                "UPDATE conversations SET last_seq = last_seq + 1 WHERE id = ?", (conversation_id,)
+            )
+            seq = connection.execute(
+                "SELECT last_seq FROM conversations WHERE id = ?", (conversation_id,)
+            ).fetchone()[0]
+            connection.execute(
+                "INSERT INTO messages (conversation_id, seq, role, content) VALUES (?, ?, ?, ?)",
+                (conversation_id, seq, role, content)
+            )
+            return seq
+
+    def update(self, conversation_id, **fields):
+        with self._transaction() as connection:
+            self._touch(connection, conversation_id)
+            if 'title' in fields:
+                connection.execute(
+                    "UPDATE conversations SET title = ? WHERE id = ?",
+                    (fields['title'], conversation_id)
+                )
+            if 'data_collection_complete' in fields:
+                connection.execute(
+                    "UPDATE conversations SET data_collection_complete = ? WHERE id = ?",
+                    (int(bool(fields['data_collection_complete'])), conversation_id)
+                )
+            if 'model_ready' in fields:
+                connection.execute(
+                    "UPDATE conversations SET model_ready = ? WHERE id = ?",
+                    (int(bool(fields['model_ready'])), conversation_id)
+                )
+
+    def clear_messages(self, conversation_id):
+        with self._transaction() as connection:
+            self._touch(connection, conversation_id)
+            connection.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
+
+    def delete(self, conversation_id):
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
+            cursor = connection.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
+            return cursor.rowcount > 0
+
+    def _touch(self, connection, conversation_id):
+        cursor = connection.execute(
+            "UPDATE conversations SET updated_at = ? WHERE id = ?", (now_iso(), conversation_id)
+        )
+        if cursor.rowcount == 0:
+            raise KeyError(conversation_id)
+
+    def count(self, open_only=False):
+        if open_only:
+            return self._connection().execute(
+                "SELECT COUNT(*) FROM conversations WHERE data_collection_complete = 0"
+            ).fetchone()[0]
+        return self._connection().execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
+
+    def lock(self, conversation_id, timeout=LOCK_TIMEOUT):
+        return ConversationLock(self._acquire_lease, self._release_lease, conversation_id, timeout)
+
+    def memory_report(self, top=10):
+        # Nothing is held in process memory; report the database size instead
+        size = sum(
+            os.path.getsize(self.path + suffix)
+            for suffix in ('', '-wal') if os.path.exists(self.path + suffix)
+        )
+        return {'store': 'sqlite', 'resident_conversations': 0, 'database_bytes': size}
+
+    def _lease_owner(self):
+        # Includes the pid so workers forked from one preloaded store get distinct owners
+        return f"{os.getpid()}-{self._instance}"
+
+    def _acquire_lease(self, conversation_id, timeout):
+        deadline = time.monotonic() + timeout
+        if not self._turn_locks.acquire(conversation_id, timeout):
+            return False
+        delay = 0.005
+        while True:
+            now = time.time()
+            with self._transaction() as connection:
+                connection.execute(
+                    "DELETE FROM conversation_locks WHERE conversation_id = ? AND expires_at < ?",
+                    (conversation_id, now)
+                )
+                cursor = connection.execute(
+                    "INSERT OR IGNORE INTO conversation_locks (conversation_id, owner, expires_at) VALUES (?, ?, ?)",
+                    (conversation_id, self._lease_owner(), now + LOCK_TTL)
+                )
+            if cursor.rowcount == 1:
+                return True
+            # Held by another worker process: back off and retry until the deadline
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._turn_locks.release(conversation_id)
+                return False
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.05)
+
+    def _release_lease(self, conversation_id):
+        try:
+            with self._transaction() as connection:
+                connection.execute(
+                    "DELETE FROM conversation_locks WHERE conversation_id = ? AND owner = ?",
+                    (conversation_id, self._lease_owner())
+                )
+        finally:
+            self._turn_locks.release(conversation_id)
+
+def create_store(url=None):
+    """Build a store from a URL such as 'memory' or 'sqlite:///data/conversations.db'"""
+    url = url or os.getenv('CONVERSATION_STORE', 'memory')
+
+    if url == 'memory':
+        return InMemoryConversationStore()
+    if url.startswith('sqlite:///'):
+        return SQLiteConversationStore(url[len('sqlite:///'):])
+    if url.startswith('sqlite:'):
+        return SQLiteConversationStore(url[len('sqlite:'):])
+
+    raise ValueError(f"Unsupported CONVERSATION_STORE: {url}")
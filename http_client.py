@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP client for model backends
+One pooled keep-alive session per process, with timeouts and retry-with-backoff
+on 429/503 (rate limits and Hugging Face endpoint cold starts)
+"""
+
+import os
+import threading
+
+# Connections kept open per host, and distinct host pools cached
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '20'))
+HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '10'))
+
+# Per-host overrides, e.g. "api.openai.com=50,en32b8h73rhx94n0.us-east-1.aws.endpoints.huggingface.cloud=8"
+HTTP_POOL_SIZES = os.getenv('HTTP_POOL_SIZES', '')
+
+# Seconds to connect and to wait for a response
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '60'))
+
+# Retries on 429/503 and connection failures, sleeping backoff * 2^n between attempts
+HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '3'))
+HTTP_BACKOFF_FACTOR = float(os.getenv('HTTP_BACKOFF_FACTOR', '0.5'))
+
+RETRY_STATUSES = (429, 503)
+
+_session = None
+_session_lock = threading.Lock()
+
+def parse_pool_sizes(spec):
+    """Parse "host=size,host=size" into a dict"""
+    sizes = {}
+    for item in spec.split(','):
+        if '=' in item:
+            host, size = item.split('=', 1)
+            sizes[host.strip()] = int(size)
+    return sizes
+
+def build_retry(max_retries=None, backoff_factor=None):
+    """Retry policy: connection errors and 429/503 only
+
+    Read timeouts are not retried because the model may already be generating.
+    """
+    from urllib3.util.retry import Retry
+
+    max_retries = HTTP_MAX_RETRIES if max_retries is None else max_retries
+    return Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=0,
+        status=max_retries,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({'GET', 'POST'}),
+        backoff_factor=HTTP_BACKOFF_FACTOR if backoff_factor is None else backoff_factor,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+def build_session(pool_maxsize=None, pool_sizes=None, max_retries=None, backoff_factor=None):
+    """Create a keep-alive session with pooled adapters
+
+    requests is imported here, not at module import, so an app that has not
+    made a model call yet has not paid for it.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    retry = build_retry(max_retries, backoff_factor)
+
+    default_adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=pool_maxsize or HTTP_POOL_MAXSIZE,
+        max_retries=retry,
+    )
+    session.mount('https://', default_adapter)
+    session.mount('http://', default_adapter)
+
+    sizes = parse_pool_sizes(HTTP_POOL_SIZES) if pool_sizes is None else pool_sizes
+    for host, size in sizes.items():
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size, max_retries=retry)
+        session.mount(f'https://{host}', adapter)
+        session.mount(f'http://{host}', adapter)
+
+    return session
+
+def get_session():
+    """Process-wide pooled session"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+def post(url, **kwargs):
+    """POST through the pooled session with the default timeouts"""
+    kwargs.setdefault('timeout', (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+    return get_session().post(url, **kwargs)
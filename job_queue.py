@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Background job queue for slow model work such as SOAP note generation
+The HTTP request only enqueues a job and returns its id; a small pool of
+worker threads runs the jobs, highest priority first. A job submitted with
+the key of one that is still queued or running returns the existing job.
+In-memory for a single process, SQLite (WAL) to share one queue between
+gunicorn workers on a host, and inline for serverless functions, which
+cannot keep worker threads running after a response.
+"""
+
+import heapq
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import tracing
+
+# Lower numbers run first
+PRIORITIES = {'high': 0, 'normal': 5, 'low': 9}
+
+DEFAULT_WORKERS = int(os.getenv('ANALYSIS_WORKERS', '2'))
+DEFAULT_MAX_PENDING = int(os.getenv('ANALYSIS_MAX_PENDING', '100'))
+# Finished jobs kept for polling by the in-memory queue
+DEFAULT_RETENTION = int(os.getenv('ANALYSIS_JOB_RETENTION', '1000'))
+# SQLite jobs left running longer than this (a worker process died) are queued again
+DEFAULT_LEASE_SECONDS = float(os.getenv('ANALYSIS_JOB_LEASE', '600'))
+
+FINISHED = ('succeeded', 'failed')
+
+class QueueFull(Exception):
+    """Raised by submit() when max_pending jobs are already waiting"""
+
+def now_iso():
+    return datetime.now().isoformat()
+
+def resolve_priority(priority):
+    """Accept a PRIORITIES name or an integer"""
+    if isinstance(priority, str) and priority in PRIORITIES:
+        return PRIORITIES[priority]
+    try:
+        return int(priority)
+    except (TypeError, ValueError):
+        raise ValueError(f"Unknown priority: {priority}")
+
+class JobQueue:
+    """Interface shared by the queue backends
+
+    Jobs are plain dicts: id, key, priority, status (queued, running,
+    succeeded, failed), payload, result, error, trace_id, created_at,
+    started_at, finished_at. runner(payload) returns a JSON-serialisable
+    result or raises.
+    """
+
+    poll_interval = 0.25
+    # True when submit() runs the job before returning
+    inline = False
+
+    def __init__(self, runner, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING):
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self._changed = threading.Condition()
+        self._threads = []
+        self._pid = None
+        self._stopping = False
+        self._stats = {'submitted': 0, 'deduplicated': 0, 'rejected': 0, 'succeeded': 0, 'failed': 0}
+
+    def submit(self, payload, key=None, priority='normal'):
+        """Queue a job; returns (job, created). created is False for a deduplicated submission"""
+        raise NotImplementedError
+
+    def get(self, job_id):
+        """Snapshot of a job, or None if it is unknown (or no longer retained)"""
+        raise NotImplementedError
+
+    def counts(self):
+        """Number of jobs per status"""
+        raise NotImplementedError
+
+    def wait(self, job_id, timeout=None, status=None):
+        """Block until the job finishes (or leaves status, if given) or timeout passes
+
+        Returns the latest snapshot.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job['status'] in FINISHED or (status is not None and job['status'] != status):
+                return job
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return job
+            # Local workers notify; other processes' workers are seen on the next poll
+            with self._changed:
+                self._changed.wait(self.poll_interval if remaining is None else min(remaining, self.poll_interval))
+
+    def stats(self):
+        with self._changed:
+            stats = dict(self._stats)
+        stats.update(self.counts())
+        stats['workers'] = self.workers
+        stats['max_pending'] = self.max_pending
+        return stats
+
+    def close(self):
+        self._stopping = True
+        self._notify()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _claim(self, timeout):
+        """Mark the next queued job running and return it, or None after timeout"""
+        raise NotImplementedError
+
+    def _finish(self, job_id, status, result=None, error=None):
+        raise NotImplementedError
+
+    def _count(self, name):
+        with self._changed:
+            self._stats[name] += 1
+
+    def _notify(self):
+        with self._changed:
+            self._changed.notify_all()
+
+    def _ensure_workers(self):
+        # Started on first use, and again after a fork, since threads do not survive one
+        if self._pid == os.getpid() and self._threads:
+            return
+        with self._changed:
+            if self._pid == os.getpid() and self._threads:
+                return
+            self._pid = os.getpid()
+            self._threads = [
+                threading.Thread(target=self._work, name=f'job-worker-{n}', daemon=True)
+                for n in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def _work(self):
+        while not self._stopping:
+            job = self._claim(self.poll_interval * 4)
+            if job is None:
+                continue
+            tracing.start_trace(job['trace_id'])
+            self._run(job)
+
+    def _run(self, job):
+        """Run a claimed job and record its outcome"""
+        started = time.perf_counter()
+        try:
+            result = self.runner(job['payload'])
+        except Exception as e:
+            self._finish(job['id'], 'failed', error=str(e))
+            self._count('failed')
+            tracing.warning('job_failed', job_id=job['id'], error=str(e))
+        else:
+            self._finish(job['id'], 'succeeded', result=result)
+            self._count('succeeded')
+            tracing.info('job_finished', job_id=job['id'],
+                         duration_ms=round((time.perf_counter() - started) * 1000, 1))
+        self._notify()
+
+class InMemoryJobQueue(JobQueue):
+    """Process-local queue: a priority heap guarded by the queue's condition"""
+
+    def __init__(self, runner, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING,
+                 retention=DEFAULT_RETENTION):
+        super().__init__(runner, workers, max_pending)
+        self._jobs = {}
+        self._heap = []
+        self._active_keys = {}
+        self._finished = deque()
+        self._retention = retention
+        self._order = itertools.count()
+
+    def submit(self, payload, key=None, priority='normal'):
+        priority = resolve_priority(priority)
+        with self._changed:
+            existing = self._jobs.get(self._active_keys.get(key)) if key else None
+            if existing is not None:
+                self._stats['deduplicated'] += 1
+                return dict(existing), False
+            if len(self._heap) >= self.max_pending:
+                self._stats['rejected'] += 1
+                raise QueueFull(f"{len(self._heap)} jobs already queued")
+
+            job = new_job(payload, key, priority)
+            self._jobs[job['id']] = job
+            if key:
+                self._active_keys[key] = job['id']
+            heapq.heappush(self._heap, (priority, next(self._order), job['id']))
+            self._stats['submitted'] += 1
+            self._changed.notify_all()
+            snapshot = dict(job)
+        self._ensure_workers()
+        return snapshot, True
+
+    def get(self, job_id):
+        with self._changed:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def counts(self):
+        with self._changed:
+            counts = dict.fromkeys(('queued', 'running', 'succeeded', 'failed'), 0)
+            for job in self._jobs.values():
+                counts[job['status']] += 1
+            return counts
+
+    def _claim(self, timeout):
+        with self._changed:
+            if not self._heap and not self._stopping:
+                self._changed.wait(timeout)
+            if not self._heap or self._stopping:
+                return None
+            _, _, job_id = heapq.heappop(self._heap)
+            job = self._jobs[job_id]
+            job['status'] = 'running'
+            job['started_at'] = now_iso()
+            return dict(job)
+
+    def _finish(self, job_id, status, result=None, error=None):
+        with self._changed:
+            job = self._jobs[job_id]
+            job.update(status=status, result=result, error=error, finished_at=now_iso())
+            if job['key'] and self._active_keys.get(job['key']) == job_id:
+                del self._active_keys[job['key']]
+            self._finished.append(job_id)
+            while len(self._finished) > self._retention:
+                self._jobs.pop(self._finished.popleft(), None)
+
+class InlineJobQueue(InMemoryJobQueue):
+    """Runs each job in the thread that submits it; submit() returns it finished
+
+    For serverless functions: the platform freezes an instance once its
+    response is sent, so a worker thread would stall mid-job, and a later
+    poll may reach another instance. Finished jobs are still kept for
+    /jobs lookups, on this instance only. There is no queue to fill, so
+    max_pending does not apply.
+    """
+
+    inline = True
+
+    def __init__(self, runner, retention=DEFAULT_RETENTION):
+        super().__init__(runner, retention=retention)
+        self.workers = 0
+
+    def submit(self, payload, key=None, priority='normal'):
+        resolve_priority(priority)
+        with self._changed:
+            existing = self._jobs.get(self._active_keys.get(key)) if key else None
+            if existing is not None:
+                self._stats['deduplicated'] += 1
+                return dict(existing), False
+            job = new_job(payload, key, priority)
+            job.update(status='running', started_at=now_iso())
+            self._jobs[job['id']] = job
+            if key:
+                self._active_keys[key] = job['id']
+            self._stats['submitted'] += 1
+            snapshot = dict(job)
+        self._run(snapshot)
+        return self.get(job['id']), True
+
+    def _ensure_workers(self):
+        pass
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    key TEXT,
+    priority INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    trace_id TEXT,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_queued
+    ON jobs (status, priority, created_at);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_active_key
+    ON jobs (key) WHERE status IN ('queued', 'running');
+"""
+
+class SQLiteJobQueue(JobQueue):
+    """Queue in a SQLite table, shared by every process that opens the same file
+
+    Each process runs its own worker pool, so total concurrency is
+    processes x workers. Finished jobs stay in the table for polling.
+    """
+
+    def __init__(self, path, runner, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING,
+                 lease_seconds=DEFAULT_LEASE_SECONDS):
+        super().__init__(runner, workers, max_pending)
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self._local = threading.local()
+        self._connection().executescript(SQLITE_SCHEMA)
+
+    def _connection(self):
+        # sqlite3 connections must not be shared between threads
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        """IMMEDIATE transaction so concurrent writers queue instead of failing mid-way"""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def submit(self, payload, key=None, priority='normal'):
+        priority = resolve_priority(priority)
+        job = new_job(payload, key, priority)
+        with self._transaction() as connection:
+            if key:
+                row = connection.execute(
+                    "SELECT * FROM jobs WHERE key = ? AND status IN ('queued', 'running')", (key,)
+                ).fetchone()
+                if row is not None:
+                    self._count('deduplicated')
+                    return row_to_job(row), False
+            pending = connection.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+            if pending >= self.max_pending:
+                self._count('rejected')
+                raise QueueFull(f"{pending} jobs already queued")
+            connection.execute(
+                "INSERT INTO jobs (id, key, priority, status, payload, trace_id, created_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (job['id'], key, priority, json.dumps(payload), job['trace_id'], job['created_at'])
+            )
+        self._count('submitted')
+        self._notify()
+        self._ensure_workers()
+        return job, True
+
+    def get(self, job_id):
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row_to_job(row) if row is not None else None
+
+    def counts(self):
+        counts = dict.fromkeys(('queued', 'running', 'succeeded', 'failed'), 0)
+        rows = self._connection().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def _claim(self, timeout):
+        # Jobs whose worker died mid-run go back to the queue once their lease runs out
+        stale = (datetime.now() - timedelta(seconds=self.lease_seconds)).isoformat()
+        # Idle workers only read; the write lock is taken when there is something to claim
+        ready = self._connection().execute(
+            "SELECT 1 FROM jobs WHERE status = 'queued' OR (status = 'running' AND started_at < ?) LIMIT 1",
+            (stale,)
+        ).fetchone()
+        if ready is not None:
+            with self._transaction() as connection:
+                connection.execute(
+                    "UPDATE jobs SET status = 'queued', started_at = NULL "
+                    "WHERE status = 'running' AND started_at < ?",
+                    (stale,)
+                )
+                row = connection.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' ORDER BY priority, created_at LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    started_at = now_iso()
+                    connection.execute(
+                        "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?", (started_at, row['id'])
+                    )
+                    job = row_to_job(row)
+                    job.update(status='running', started_at=started_at)
+                    return job
+        # Nothing queued: sleep until a local submit or the next poll
+        with self._changed:
+            if not self._stopping:
+                self._changed.wait(timeout)
+        return None
+
+    def _finish(self, job_id, status, result=None, error=None):
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, now_iso(), job_id)
+            )
+
+def new_job(payload, key, priority):
+    return {
+        'id': uuid.uuid4().hex,
+        'key': key,
+        'priority': priority,
+        'status': 'queued',
+        'payload': payload,
+        'result': None,
+        'error': None,
+        'trace_id': tracing.current_trace_id(),
+        'created_at': now_iso(),
+        'started_at': None,
+        'finished_at': None
+    }
+
+def row_to_job(row):
+    job = dict(row)
+    job['payload'] = json.loads(job['payload'])
+    job['result'] = json.loads(job['result']) if job['result'] is not None else None
+    return job
+
+def create_job_queue(runner, url=None, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING,
+                     serverless=False):
+    """Build a queue from a URL such as 'memory', 'inline' or 'sqlite:///data/jobs.db'
+
+    serverless defaults to the inline queue and refuses the others, whose
+    worker threads stop with the instance after each response.
+    """
+    url = url or os.getenv('ANALYSIS_QUEUE') or ('inline' if serverless else 'memory')
+
+    if url == 'inline':
+        return InlineJobQueue(runner)
+    if serverless:
+        raise ValueError(f"ANALYSIS_QUEUE={url} runs jobs on worker threads, which a serverless "
+                         "instance freezes after each response; use ANALYSIS_QUEUE=inline")
+    if url == 'memory':
+        return InMemoryJobQueue(runner, workers, max_pending)
+    if url.startswith('sqlite:///'):
+        return SQLiteJobQueue(url[len('sqlite:///'):], runner, workers, max_pending)
+    if url.startswith('sqlite:'):
+        return SQLiteJobQueue(url[len('sqlite:'):], runner, workers, max_pending)
+
+    raise ValueError(f"Unsupported ANALYSIS_QUEUE: {url}")
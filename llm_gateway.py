@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Async LLM gateway
+Awaitable versions of every outbound model call so one event loop can keep
+many interviews in flight at once
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+
+import analyze_medical_fixed
+import tracing
+import simple_medical_chat
+import web_chatbot
+from model_backends import openai_module
+
+# Upper bound on simultaneous blocking SageMaker calls (boto3 has no async client)
+SAGEMAKER_MAX_CONCURRENCY = int(os.getenv('SAGEMAKER_MAX_CONCURRENCY', '32'))
+
+# Total timeout for a single outbound HTTP call, in seconds
+LLM_REQUEST_TIMEOUT = float(os.getenv('LLM_REQUEST_TIMEOUT', '60'))
+
+_http_sessions = {}
+_sagemaker_executor = None
+
+def get_http_session():
+    """Return the keep-alive aiohttp session bound to the running event loop"""
+    loop = asyncio.get_running_loop()
+    http_session = _http_sessions.get(loop)
+    if http_session is None or http_session.closed:
+        http_session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=LLM_REQUEST_TIMEOUT)
+        )
+        _http_sessions[loop] = http_session
+    return http_session
+
+async def close_http_sessions():
+    """Close the pooled sessions (called on ASGI shutdown)"""
+    for http_session in list(_http_sessions.values()):
+        if not http_session.closed:
+            await http_session.close()
+    _http_sessions.clear()
+
+def use_shared_openai_session():
+    """Route openai's async calls (OpenAIBackend) through the pooled session instead of one session per call"""
+    openai_module().aiosession.set(get_http_session())
+
+async def acollect_patient_data(conversation_history, conversation_id=None):
+    """Async counterpart of web_chatbot.collect_patient_data_openai"""
+    try:
+        messages = web_chatbot.build_interview_messages(conversation_history)
+        if conversation_id:
+            web_chatbot.prompt_stats.record(conversation_id, messages)
+
+        key = web_chatbot.interview_cache_key(messages)
+        cached = web_chatbot.cached_response(key)
+        if cached:
+            return cached
+
+        use_shared_openai_session()
+        completion = await web_chatbot.model_router.acomplete(
+            messages, model=web_chatbot.INTERVIEW_MODEL, **web_chatbot.INTERVIEW_PARAMS
+        )
+        web_chatbot.record_model_question(completion.latency)
+
+        if conversation_id:
+            web_chatbot.prompt_stats.record_usage(conversation_id, completion.usage)
+
+        content = completion.text
+        web_chatbot.store_response(key, content, completion.backend)
+        return content
+
+    except Exception as e:
+        tracing.warning('interview_model_error', error=str(e))
+        return f"Error with OpenAI: {str(e)}"
+
+async def astream_patient_data(conversation_history, conversation_id=None):
+    """Async counterpart of web_chatbot.stream_patient_data_openai"""
+    try:
+        messages = web_chatbot.build_interview_messages(conversation_history)
+        if conversation_id:
+            web_chatbot.prompt_stats.record(conversation_id, messages)
+
+        key = web_chatbot.interview_cache_key(messages)
+        cached = web_chatbot.cached_response(key)
+        if cached:
+            yield cached
+            return
+
+        use_shared_openai_session()
+        started = time.perf_counter()
+        tokens = []
+        served = {}
+        async for token in web_chatbot.model_router.astream(
+            messages, model=web_chatbot.INTERVIEW_MODEL, served=served, **web_chatbot.INTERVIEW_PARAMS
+        ):
+            tokens.append(token)
+            yield token
+        web_chatbot.record_model_question(time.perf_counter() - started)
+        web_chatbot.store_response(key, "".join(tokens).strip(), served.get('backend'))
+
+    except Exception as e:
+        tracing.warning('interview_model_error', error=str(e))
+        yield f"Error with OpenAI: {str(e)}"
+
+async def aanalyze_with_medical_model(patient_data):
+    """Async counterpart of web_chatbot.analyze_with_medical_model"""
+    try:
+        key = web_chatbot.soap_cache_key(patient_data)
+        cached = web_chatbot.cached_response(key)
+        if cached:
+            return cached
+
+        use_shared_openai_session()
+        completion = await web_chatbot.model_router.acomplete(
+            web_chatbot.build_soap_messages(patient_data),
+            model=web_chatbot.SOAP_MODEL, **web_chatbot.SOAP_PARAMS
+        )
+
+        content = completion.text
+
+        web_chatbot.store_response(key, content, completion.backend)
+        return content if content else "SOAP note generation failed"
+
+    except Exception as e:
+        tracing.warning('soap_model_error', error=str(e))
+        return f"Error generating SOAP note: {str(e)}"
+
+async def astream_medical_model(patient_data):
+    """Async counterpart of web_chatbot.stream_medical_model"""
+    try:
+        key = web_chatbot.soap_cache_key(patient_data)
+        cached = web_chatbot.cached_response(key)
+        if cached:
+            yield cached
+            return
+
+        use_shared_openai_session()
+        tokens = []
+        served = {}
+        async for token in web_chatbot.model_router.astream(
+            web_chatbot.build_soap_messages(patient_data),
+            model=web_chatbot.SOAP_MODEL, served=served, **web_chatbot.SOAP_PARAMS
+        ):
+            tokens.append(token)
+            yield token
+        web_chatbot.store_response(key, "".join(tokens).strip(), served.get('backend'))
+
+    except Exception as e:
+        tracing.warning('soap_model_error', error=str(e))
+        yield f"Error generating SOAP note: {str(e)}"
+
+async def aanalyze_with_medical_model_fixed(patient_data, api_key, url=None):
+    """Async counterpart of analyze_medical_fixed.analyze_with_medical_model_fixed"""
+    headers, payload = analyze_medical_fixed.build_fixed_request(patient_data, api_key)
+
+    try:
+        async with get_http_session().post(
+            url or analyze_medical_fixed.MEDICAL_ENDPOINT_URL, headers=headers, json=payload
+        ) as response:
+            if response.status == 200:
+                return analyze_medical_fixed.parse_fixed_response(await response.json())
+            return f"Unable to generate SOAP note (Status: {response.status})"
+
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+async def achat_with_medical_ai(messages):
+    """Async counterpart of simple_medical_chat.chat_with_medical_ai"""
+    global _sagemaker_executor
+
+    if not simple_medical_chat.sagemaker_predictor:
+        return simple_medical_chat.mock_medical_ai(messages)
+
+    try:
+        payload = simple_medical_chat.build_medical_prompt(messages)
+
+        if simple_medical_chat.batch_scheduler:
+            # The scheduler owns its own bounded pool; just await the fan-out future
+            response = await asyncio.wrap_future(simple_medical_chat.batch_scheduler.submit(payload))
+        else:
+            if _sagemaker_executor is None:
+                _sagemaker_executor = ThreadPoolExecutor(
+                    max_workers=SAGEMAKER_MAX_CONCURRENCY, thread_name_prefix='sagemaker'
+                )
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(
+                _sagemaker_executor, simple_medical_chat.sagemaker_predictor.predict, payload
+            )
+
+        return simple_medical_chat.parse_medical_response(response)
+
+    except Exception as e:
+        tracing.warning('medical_ai_error', error=str(e))
+        return "I'm having difficulty processing your request. Please try again."
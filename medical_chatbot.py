@@ -4,11 +4,11 @@ Basic Medical Chatbot using II-Medical-8B-1706 via Hugging Face API
 Simple command-line interface
 """
 
-import requests
-import json
 import os
 from dotenv import load_dotenv
 
+from model_backends import BackendError, HFInferenceBackend
+
 # Load environment variables
 load_dotenv()
 
@@ -18,34 +18,13 @@ MODEL_URL = "https://api-inference.huggingface.co/models/Intelligent-Internet/II
 
 def query_medical_model(prompt):
     """Send a prompt to II-Medical-8B-1706 and get response"""
-    headers = {
-        "Authorization": f"Bearer {HUGGINGFACE_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    
-    payload = {
-        "inputs": prompt,
-        "parameters": {
-            "max_new_tokens": 300,
-            "temperature": 0.1,
-            "do_sample": True,
-            "return_full_text": False
-        }
-    }
+    backend = HFInferenceBackend(MODEL_URL, HUGGINGFACE_API_KEY)
     
     try:
-        response = requests.post(MODEL_URL, headers=headers, json=payload)
-        
-        if response.status_code == 200:
-            result = response.json()
-            if isinstance(result, list) and len(result) > 0:
-                return result[0].get("generated_text", "").strip()
-            elif isinstance(result, dict):
-                return result.get("generated_text", "").strip()
-        else:
-            return f"API Error: {response.status_code} - {response.text}"
+        # Pooled keep-alive session; retries 503 while the model is loading
+        return backend.complete_prompt(prompt, max_tokens=300, temperature=0.1).text
             
-    except Exception as e:
+    except BackendError as e:
         return f"Error: {str(e)}"
 
 def main():
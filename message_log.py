@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Compact message storage with running counters
+Stored messages are slotted objects with interned roles instead of dicts,
+and each conversation's log keeps its user turn, character and estimated
+token counts up to date as messages are appended, so nothing has to rescan
+the history to count them. API responses still get plain dicts.
+"""
+
+import sys
+
+# Rough tokens per character for English chat text, as used by the fake LLM server
+CHARS_PER_TOKEN = 4
+
+_ROLES = {}
+
+def intern_role(role):
+    """Shared string for a role, so millions of messages hold one copy of 'user'"""
+    interned = _ROLES.get(role)
+    if interned is None:
+        interned = _ROLES.setdefault(role, sys.intern(role))
+    return interned
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+class Message:
+    """One chat message; supports msg['role'], msg['content'] and dict(msg)"""
+
+    __slots__ = ('role', 'content')
+
+    def __init__(self, role, content):
+        self.role = _ROLES.get(role) or intern_role(role)
+        self.content = content
+
+    def __getitem__(self, key):
+        if key == 'role':
+            return self.role
+        if key == 'content':
+            return self.content
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return ('role', 'content')
+
+    def to_dict(self):
+        return {'role': self.role, 'content': self.content}
+
+    def __eq__(self, other):
+        try:
+            return self.role == other['role'] and self.content == other['content']
+        except (KeyError, TypeError):
+            return NotImplemented
+
+    def __repr__(self):
+        return f"Message({self.role!r}, {self.content!r})"
+
+class MessageLog:
+    """Append-only list of Messages with user turn, character and token counters"""
+
+    __slots__ = ('_messages', 'user_count', 'chars', 'tokens')
+
+    def __init__(self, messages=()):
+        self._messages = []
+        self.user_count = 0
+        self.chars = 0
+        self.tokens = 0
+        for msg in messages:
+            self.append(msg['role'], msg['content'])
+
+    def append(self, role, content):
+        message = Message(role, content)
+        self._messages.append(message)
+        if message.role == 'user':
+            self.user_count += 1
+        length = len(content)
+        self.chars += length
+        self.tokens += (length + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+        return message
+
+    def clear(self):
+        self._messages = []
+        self.user_count = self.chars = self.tokens = 0
+
+    def __len__(self):
+        return len(self._messages)
+
+    def __iter__(self):
+        return iter(self._messages)
+
+    def __getitem__(self, index):
+        return self._messages[index]
+
+    def to_dicts(self, start=0, stop=None):
+        """Plain dicts for JSON responses and callers that mutate their copy"""
+        return [{'role': msg.role, 'content': msg.content} for msg in self._messages[start:stop]]
+
+    def counters(self):
+        return {'user_message_count': self.user_count, 'chars': self.chars, 'estimated_tokens': self.tokens}
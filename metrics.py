@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Prometheus-style metrics without external dependencies
+Counters, gauges and histograms with labels, rendered in the text exposition
+format at /metrics. Each update is one lock and a bisect, so it can stay on
+in production. Values are per process: scrape each gunicorn worker or sum
+them in the query.
+"""
+
+import bisect
+import threading
+import time
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+class LatencyHistogram:
+    """One histogram series: bucket counts, count and sum"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    def cumulative(self):
+        with self._lock:
+            counts = list(self.counts)
+            total, count = self.sum, self.count
+        running = 0
+        buckets = []
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            running += bucket_count
+            buckets.append((bound, running))
+        return buckets, count, total
+
+    def snapshot(self):
+        buckets, count, total = self.cumulative()
+        return {
+            'buckets': [['+Inf' if bound == float('inf') else bound, running] for bound, running in buckets],
+            'count': count,
+            'sum': round(total, 6),
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95)
+        }
+
+class _Value:
+    """Counter or gauge series"""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+class Metric:
+    """A metric family with a fixed set of label names"""
+
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def labels(self, *values, **kwargs):
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        series = self._series.get(values)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(values, self._new_series())
+        return series
+
+    def samples(self):
+        """(suffix, label values, extra label, value) tuples for rendering"""
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, values, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, values, extra)} {_format_value(value)}")
+        return lines
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def _new_series(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def samples(self):
+        return [('', values, None, series.value) for values, series in list(self._series.items())]
+
+class Gauge(Metric):
+    """Gauge; pass callback to compute the value at scrape time instead"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), registry=None, callback=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.callback = callback
+
+    def _new_series(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def dec(self, amount=1):
+        self.labels().dec(amount)
+
+    def set(self, value):
+        self.labels().set(value)
+
+    def samples(self):
+        if self.callback is not None:
+            try:
+                value = self.callback()
+            except Exception:
+                return []
+            return [('', (), None, value)] if value is not None else []
+        return [('', values, None, series.value) for values, series in list(self._series.items())]
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), registry=None, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_series(self):
+        return LatencyHistogram(self.buckets)
+
+    def observe(self, seconds):
+        self.labels().observe(seconds)
+
+    def samples(self):
+        samples = []
+        for values, series in list(self._series.items()):
+            buckets, count, total = series.cumulative()
+            for bound, running in buckets:
+                samples.append(('_bucket', values, ('le', _format_value(float(bound))), running))
+            samples.append(('_count', values, None, count))
+            samples.append(('_sum', values, None, total))
+        return samples
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        # Re-registering a name (a module imported as __main__ and again by name) replaces it
+        with self._lock:
+            self._metrics[metric.name] = metric
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self):
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', 'Request latency by route, including streamed bodies',
+    ['app', 'route', 'method', 'status']
+)
+MODEL_CALL_SECONDS = Histogram(
+    'model_call_duration_seconds', 'Model call latency by backend', ['backend']
+)
+MODEL_CALL_ERRORS = Counter(
+    'model_call_errors_total', 'Failed model calls by backend', ['backend']
+)
+MODEL_CALLS_IN_FLIGHT = Gauge(
+    'model_calls_in_flight', 'Model calls currently waiting on a backend', ['backend']
+)
+MODEL_TOKENS = Counter(
+    'model_tokens_total', 'Tokens reported in completion usage fields', ['backend', 'type']
+)
+
+def observe_request(app, route, method, status, started):
+    HTTP_REQUEST_SECONDS.labels(app, route, method, str(status)).observe(time.perf_counter() - started)
+
+def record_usage(backend, usage):
+    """Count prompt, completion and provider-cached prompt tokens from a usage dict"""
+    if not usage:
+        return
+    for kind in ('prompt_tokens', 'completion_tokens'):
+        if usage.get(kind):
+            MODEL_TOKENS.labels(backend, kind[:-len('_tokens')]).inc(usage[kind])
+    cached = (usage.get('prompt_tokens_details') or {}).get('cached_tokens')
+    if cached:
+        MODEL_TOKENS.labels(backend, 'cached_prompt').inc(cached)
+
+def instrument_flask(flask_app, app_name):
+    """Time every request by its route template and serve /metrics"""
+    from flask import Response, g, request
+
+    @flask_app.before_request
+    def start_request_timer():
+        g.metrics_started = time.perf_counter()
+
+    @flask_app.after_request
+    def observe_request_latency(response):
+        started = g.get('metrics_started')
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            method, status = request.method, response.status_code
+            # call_on_close fires after a streamed body has been fully sent
+            response.call_on_close(lambda: observe_request(app_name, route, method, status, started))
+        return response
+
+    @flask_app.route('/metrics')
+    def metrics_endpoint():
+        return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+    return flask_app
@@ -0,0 +1,668 @@
+#!/usr/bin/env python3
+"""
+Model backends behind one interface
+OpenAI, the Hugging Face inference API, the Hugging Face completions endpoint,
+SageMaker/TGI and an offline mock all take chat messages and return a
+Completion. BackendRouter picks between them by order or observed latency,
+opens a circuit breaker on a failing backend and falls back to the next one.
+"""
+
+import os
+import threading
+import time
+from collections import namedtuple
+
+import http_client
+import metrics
+import tracing
+from metrics import LatencyHistogram
+
+# Overridable so benchmarks can point them at benchmarks/fake_llm_server.py
+HF_INFERENCE_URL = os.getenv(
+    'HF_INFERENCE_URL', "https://api-inference.huggingface.co/models/Intelligent-Internet/II-Medical-8B-1706"
+)
+HF_ENDPOINT_URL = os.getenv(
+    'HF_ENDPOINT_URL', "https://en32b8h73rhx94n0.us-east-1.aws.endpoints.huggingface.cloud/v1/completions"
+)
+
+# Comma-separated fallback chain, e.g. "hf_endpoint,openai,mock"
+MODEL_BACKENDS = os.getenv('MODEL_BACKENDS', 'openai')
+
+# fallback: always try in configured order; latency: fastest healthy backend first
+MODEL_ROUTING = os.getenv('MODEL_ROUTING', 'fallback')
+
+# Per-call timeout; calls slower than MODEL_SLOW_CALL_SECONDS count as failures
+MODEL_TIMEOUT = float(os.getenv('MODEL_TIMEOUT', '60'))
+MODEL_SLOW_CALL_SECONDS = float(os.getenv('MODEL_SLOW_CALL_SECONDS', '0')) or None
+
+# Consecutive failures that open a breaker, and seconds before it lets a trial call through
+MODEL_BREAKER_FAILURES = int(os.getenv('MODEL_BREAKER_FAILURES', '3'))
+MODEL_BREAKER_RESET = float(os.getenv('MODEL_BREAKER_RESET', '30'))
+
+# Simulated per-call latency of the mock backend, for demos and load tests
+MOCK_LATENCY = float(os.getenv('MOCK_LATENCY', '0'))
+
+# Prompt token budget per backend; long interviews are windowed to fit the smallest one in a chain.
+# II-Medical-8B on TGI is served with a small max input length, OpenAI is capped for cost and latency.
+DEFAULT_CONTEXT_BUDGET = 6000
+DEFAULT_CONTEXT_BUDGETS = {'openai': 6000, 'hf_inference': 3000, 'hf_endpoint': 3000, 'sagemaker': 3000}
+
+def parse_context_budgets(spec):
+    """{'sagemaker': 2000, 'openai': 8000} from 'sagemaker=2000,openai=8000'"""
+    budgets = {}
+    for item in spec.split(','):
+        name, _, tokens = item.partition('=')
+        if name.strip() and tokens.strip():
+            budgets[name.strip()] = int(tokens)
+    return budgets
+
+MODEL_CONTEXT_BUDGETS = dict(DEFAULT_CONTEXT_BUDGETS, **parse_context_budgets(os.getenv('MODEL_CONTEXT_BUDGETS', '')))
+
+Completion = namedtuple('Completion', ['text', 'backend', 'usage', 'latency'])
+
+_openai = None
+_openai_lock = threading.Lock()
+
+def openai_module():
+    """The openai package, imported on first use and pointed at the pooled HTTP session
+
+    openai pulls in requests and aiohttp (about half of the web app's import
+    time), so serverless cold starts only pay for it when a call needs it.
+    """
+    global _openai
+    if _openai is None:
+        with _openai_lock:
+            if _openai is None:
+                with tracing.span('openai_import'):
+                    import openai
+                    # Share the keep-alive pool (and its 429/503 retries) with the other backends
+                    openai.requestssession = http_client.get_session()
+                _openai = openai
+    return _openai
+
+class BackendError(Exception):
+    """A backend failed or returned nothing usable"""
+
+    def __init__(self, backend, message, status=None):
+        super().__init__(f"{backend}: {message}")
+        self.backend = backend
+        self.status = status
+
+def render_chatml(messages):
+    """Render chat messages in the ChatML format II-Medical-8B was tuned on"""
+    turns = [f"<|im_start|>{msg['role']}\n{msg['content']}<|im_end|>" for msg in messages]
+    return "\n".join(turns) + "\n<|im_start|>assistant"
+
+def parse_generated_text(result):
+    """generated_text from a HF inference / TGI response (list or dict)"""
+    if isinstance(result, list):
+        result = result[0] if result else {}
+    if not isinstance(result, dict):
+        return ""
+    return result.get('generated_text', '').replace('<|im_end|>', '').strip()
+
+class ModelBackend:
+    """Base class: subclasses implement complete(); streaming and async fall back to it"""
+
+    name = 'backend'
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout or MODEL_TIMEOUT
+
+    @property
+    def context_budget(self):
+        """Estimated prompt tokens this backend should be sent at most"""
+        return MODEL_CONTEXT_BUDGETS.get(self.name, DEFAULT_CONTEXT_BUDGET)
+
+    def warm(self):
+        """Import and build whatever the first call would, so it does not pay for it"""
+
+    def complete(self, messages, max_tokens=300, temperature=0.1, model=None):
+        raise NotImplementedError
+
+    def stream(self, messages, max_tokens=300, temperature=0.1, model=None):
+        """Yield text chunks; backends without streaming yield the whole completion"""
+        yield self.complete(messages, max_tokens, temperature, model).text
+
+    async def acomplete(self, messages, max_tokens=300, temperature=0.1, model=None):
+        # asyncio is only imported by the async paths, which the Flask apps never run
+        import asyncio
+        return await asyncio.to_thread(self.complete, messages, max_tokens, temperature, model)
+
+    async def astream(self, messages, max_tokens=300, temperature=0.1, model=None):
+        completion = await self.acomplete(messages, max_tokens, temperature, model)
+        yield completion.text
+
+    def _completion(self, text, started, usage=None):
+        text = (text or "").strip()
+        if not text:
+            raise BackendError(self.name, "empty response")
+        return Completion(text, self.name, usage, time.perf_counter() - started)
+
+class OpenAIBackend(ModelBackend):
+    """OpenAI chat completions"""
+
+    name = 'openai'
+
+    def __init__(self, model='gpt-4o-mini', timeout=None):
+        super().__init__(timeout)
+        self.model = model
+
+    def _request(self, messages, max_tokens, temperature, model, stream=False):
+        return dict(
+            model=model or self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            request_timeout=self.timeout,
+            stream=stream
+        )
+
+    def warm(self):
+        openai_module()
+
+    def complete(self, messages, max_tokens=300, temperature=0.1, model=None):
+        started = time.perf_counter()
+        try:
+            response = openai_module().ChatCompletion.create(**self._request(messages, max_tokens, temperature, model))
+        except Exception as e:
+            raise BackendError(self.name, str(e)) from e
+        return self._completion(response.choices[0].message.content, started, response.get("usage"))
+
+    def stream(self, messages, max_tokens=300, temperature=0.1, model=None):
+        try:
+            response = openai_module().ChatCompletion.create(**self._request(messages, max_tokens, temperature, model, stream=True))
+        except Exception as e:
+            raise BackendError(self.name, str(e)) from e
+        for chunk in response:
+            if not chunk.choices:
+                continue
+            token = chunk.choices[0].get("delta", {}).get("content")
+            if token:
+                yield token
+
+    async def acomplete(self, messages, max_tokens=300, temperature=0.1, model=None):
+        started = time.perf_counter()
+        try:
+            response = await openai_module().ChatCompletion.acreate(**self._request(messages, max_tokens, temperature, model))
+        except Exception as e:
+            raise BackendError(self.name, str(e)) from e
+        return self._completion(response.choices[0].message.content, started, response.get("usage"))
+
+    async def astream(self, messages, max_tokens=300, temperature=0.1, model=None):
+        try:
+            response = await openai_module().ChatCompletion.acreate(**self._request(messages, max_tokens, temperature, model, stream=True))
+        except Exception as e:
+            raise BackendError(self.name, str(e)) from e
+        async for chunk in response:
+            if chunk.choices:
+                token = chunk.choices[0].get("delta", {}).get("content")
+                if token:
+                    yield token
+
+class HTTPBackend(ModelBackend):
+    """Shared POST/error handling for the Hugging Face backends"""
+
+    def __init__(self, url, api_key=None, timeout=None):
+        super().__init__(timeout)
+        self.url = url
+        self.api_key = api_key or os.getenv('HUGGINGFACE_API_KEY')
+
+    def warm(self):
+        http_client.get_session()
+
+    def post(self, payload):
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        try:
+            response = http_client.post(
+                self.url, headers=headers, json=payload,
+                timeout=(http_client.HTTP_CONNECT_TIMEOUT, self.timeout)
+            )
+        except Exception as e:
+            raise BackendError(self.name, str(e)) from e
+        if response.status_code != 200:
+            raise BackendError(self.name, f"API Error: {response.status_code} - {response.text}", response.status_code)
+        return response.json()
+
+class HFInferenceBackend(HTTPBackend):
+    """Hugging Face serverless inference API"""
+
+    name = 'hf_inference'
+
+    def __init__(self, url=HF_INFERENCE_URL, api_key=None, timeout=None):
+        super().__init__(url, api_key, timeout)
+
+    def complete(self, messages, max_tokens=300, temperature=0.1, model=None):
+        return self.complete_prompt(render_chatml(messages), max_tokens, temperature)
+
+    def complete_prompt(self, prompt, max_tokens=300, temperature=0.1):
+        started = time.perf_counter()
+        result = self.post({
+            "inputs": prompt,
+            "parameters": {
+                "max_new_tokens": max_tokens,
+                "temperature": temperature,
+                "do_sample": True,
+                "return_full_text": False
+            }
+        })
+        return self._completion(parse_generated_text(result), started)
+
+class HFEndpointBackend(HTTPBackend):
+    """OpenAI-compatible /v1/completions on the dedicated Hugging Face endpoint"""
+
+    name = 'hf_endpoint'
+
+    def __init__(self, url=HF_ENDPOINT_URL, api_key=None, timeout=None):
+        super().__init__(url, api_key, timeout)
+
+    def complete(self, messages, max_tokens=300, temperature=0.1, model=None):
+        return self.complete_prompt(render_chatml(messages), max_tokens, temperature)
+
+    def complete_prompt(self, prompt, max_tokens=300, temperature=0.1):
+        started = time.perf_counter()
+        result = self.post({"prompt": prompt, "max_tokens": max_tokens, "temperature": temperature})
+        choices = result.get("choices") or [{}]
+        return self._completion(choices[0].get("text", ""), started, result.get("usage"))
+
+class SageMakerBackend(ModelBackend):
+    """TGI on SageMaker, called through a predictor (or the micro-batcher's predict)"""
+
+    name = 'sagemaker'
+
+    def __init__(self, predict, timeout=None):
+        super().__init__(timeout)
+        self.predict = predict
+
+    def complete(self, messages, max_tokens=300, temperature=0.1, model=None):
+        started = time.perf_counter()
+        try:
+            response = self.predict({
+                "inputs": render_chatml(messages),
+                "parameters": {
+                    "max_new_tokens": max_tokens,
+                    "temperature": temperature,
+                    "do_sample": True
+                }
+            })
+        except Exception as e:
+            raise BackendError(self.name, str(e)) from e
+        return self._completion(parse_generated_text(response), started)
+
+MOCK_QUESTIONS = [
+    "Thank you for sharing your symptoms. Can you tell me when these symptoms first started and how severe they are on a scale of 1-10?",
+    "I see. Have you tried any treatments or medications for this condition, and do you have any relevant medical history I should know about?",
+    "Does anything make the symptoms better or worse, and have you noticed any other changes in your health?"
+]
+
+MOCK_SOAP_NOTE = """S: Patient reports symptoms as described in our conversation. Duration and severity noted as per patient's account.
+
+O: Physical examination not performed (telemedicine consultation). Vital signs not documented.
+
+A: Based on the presented symptoms and patient history, this appears to be a condition requiring further evaluation. Differential diagnosis should be considered.
+
+P: Recommend consultation with primary care physician for physical examination. Consider relevant diagnostic tests based on symptoms. Patient education provided regarding symptom monitoring."""
+
+class MockBackend(ModelBackend):
+    """Offline backend with canned answers, for tests, demos and last-resort fallback"""
+
+    name = 'mock'
+
+    def __init__(self, latency=0.0, timeout=None):
+        super().__init__(timeout)
+        self.latency = latency
+
+    def reply(self, messages):
+        if any('SOAP' in msg['content'] for msg in messages if msg['role'] == 'system'):
+            return MOCK_SOAP_NOTE
+
+        # Inline prompts carry the transcript as "Patient:" lines, chat layouts as user turns
+        answers = sum(msg['content'].count('Patient:') for msg in messages) or \
+            len([msg for msg in messages if msg['role'] == 'user'])
+        return MOCK_QUESTIONS[min(max(answers - 1, 0), len(MOCK_QUESTIONS) - 1)]
+
+    def complete(self, messages, max_tokens=300, temperature=0.1, model=None):
+        started = time.perf_counter()
+        if self.latency:
+            time.sleep(self.latency)
+        return self._completion(self.reply(messages), started)
+
+    async def acomplete(self, messages, max_tokens=300, temperature=0.1, model=None):
+        started = time.perf_counter()
+        if self.latency:
+            import asyncio
+            await asyncio.sleep(self.latency)
+        return self._completion(self.reply(messages), started)
+
+class CircuitBreaker:
+    """closed -> open after N consecutive failures -> half-open trial after reset_timeout"""
+
+    def __init__(self, failure_threshold=3, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self):
+        state = self.state
+        if state == 'closed':
+            return True
+        if state == 'half_open' and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    def abandon_trial(self):
+        """The trial call ended without a result (client gone, task cancelled); the next call may try"""
+        self.trial_in_flight = False
+
+class BackendHealth:
+    """Breaker, latency histogram and counters for one backend"""
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.histogram = LatencyHistogram()
+        self.ewma = None
+        self.calls = 0
+        self.errors = 0
+        self.slow_calls = 0
+
+class BackendRouter:
+    """Health-aware routing over an ordered list of backends"""
+
+    def __init__(self, backends, strategy='fallback', failure_threshold=3, reset_timeout=30.0,
+                 slow_call_seconds=None, ewma_alpha=0.3):
+        if not backends:
+            raise ValueError("BackendRouter needs at least one backend")
+        if strategy not in ('fallback', 'latency'):
+            raise ValueError(f"Unknown routing strategy: {strategy}")
+        self.backends = list(backends)
+        self.strategy = strategy
+        self.slow_call_seconds = slow_call_seconds
+        self.ewma_alpha = ewma_alpha
+        self.health = {backend.name: BackendHealth(failure_threshold, reset_timeout) for backend in self.backends}
+        self._lock = threading.Lock()
+
+    def candidates(self):
+        """(backend, trial) to try, in order, skipping those with an open breaker
+
+        A generator, so a half-open backend only claims its trial call when
+        the earlier backends have actually failed. trial is True for the one
+        call a half-open breaker lets through; the caller must settle it
+        with record() or abandon().
+        """
+        with self._lock:
+            ordered = list(self.backends)
+            if self.strategy == 'latency':
+                # Untried backends (no EWMA yet) go first so they get measured
+                ordered.sort(key=lambda backend: self.health[backend.name].ewma or 0.0)
+        for backend in ordered:
+            with self._lock:
+                breaker = self.health[backend.name].breaker
+                trial = breaker.state == 'half_open'
+                allowed = breaker.allow()
+            if allowed:
+                yield backend, trial
+
+    def abandon(self, backend, trial):
+        """Free the trial of a call that never recorded a result
+
+        Only the trial holder can see trial_in_flight still set: record()
+        clears it and leaves the breaker closed or freshly opened.
+        """
+        if trial:
+            with self._lock:
+                self.health[backend.name].breaker.abandon_trial()
+
+    @property
+    def primary(self):
+        """The first backend in the configured chain"""
+        return self.backends[0]
+
+    def warm(self):
+        """Build every backend's client now instead of on its first call"""
+        for backend in self.backends:
+            backend.warm()
+
+    def context_budget(self):
+        """Prompt token budget that fits every backend in the chain, since any may serve the call"""
+        return min(backend.context_budget for backend in self.backends)
+
+    def record(self, backend, latency, error=None):
+        metrics.MODEL_CALL_SECONDS.labels(backend.name).observe(latency)
+        if error is not None:
+            metrics.MODEL_CALL_ERRORS.labels(backend.name).inc()
+        with self._lock:
+            health = self.health[backend.name]
+            health.calls += 1
+            health.histogram.observe(latency)
+            health.ewma = latency if health.ewma is None else \
+                self.ewma_alpha * latency + (1 - self.ewma_alpha) * health.ewma
+
+            slow = self.slow_call_seconds and latency > self.slow_call_seconds
+            if slow:
+                health.slow_calls += 1
+            if error is not None:
+                health.errors += 1
+            if error is not None or slow:
+                health.breaker.record_failure()
+            else:
+                health.breaker.record_success()
+
+    def complete(self, messages, max_tokens=300, temperature=0.1, model=None):
+        """Completion from the first healthy backend that answers"""
+        errors = []
+        for backend, trial in self.candidates():
+            started = time.perf_counter()
+            in_flight = metrics.MODEL_CALLS_IN_FLIGHT.labels(backend.name)
+            in_flight.inc()
+            try:
+                with tracing.span('model_call', backend=backend.name, model=model) as call_span:
+                    try:
+                        completion = backend.complete(messages, max_tokens, temperature, model)
+                    except Exception as e:
+                        self.record(backend, time.perf_counter() - started, e)
+                        call_span.set(error=str(e))
+                        errors.append(str(e))
+                        continue
+                    finally:
+                        in_flight.dec()
+                self.record(backend, time.perf_counter() - started)
+            finally:
+                # Cancelled or interrupted before a result was recorded
+                self.abandon(backend, trial)
+            metrics.record_usage(backend.name, completion.usage)
+            return completion
+        raise BackendError('router', "; ".join(errors) or "all backends unavailable")
+
+    def stream(self, messages, max_tokens=300, temperature=0.1, model=None, served=None):
+        """Stream from the first backend that produces a token
+
+        Falling back is only possible before the first token has been sent.
+        served, if given, is a dict that gets the serving backend's name under
+        'backend' before the first token is yielded.
+        """
+        errors = []
+        for backend, trial in self.candidates():
+            started = time.perf_counter()
+            in_flight = metrics.MODEL_CALLS_IN_FLIGHT.labels(backend.name)
+            in_flight.inc()
+            try:
+                tokens = backend.stream(messages, max_tokens, temperature, model)
+                try:
+                    first = next(tokens)
+                except StopIteration:
+                    self.record(backend, time.perf_counter() - started, BackendError(backend.name, "empty response"))
+                    errors.append(f"{backend.name}: empty response")
+                    continue
+                except Exception as e:
+                    self.record(backend, time.perf_counter() - started, e)
+                    tracing.record_span('model_call', started, backend=backend.name, model=model,
+                                        stream=True, error=str(e))
+                    errors.append(str(e))
+                    continue
+
+                first_token_ms = round((time.perf_counter() - started) * 1000, 3)
+                if served is not None:
+                    served['backend'] = backend.name
+                yield first
+                try:
+                    for token in tokens:
+                        yield token
+                except Exception as e:
+                    self.record(backend, time.perf_counter() - started, e)
+                    tracing.record_span('model_call', started, backend=backend.name, model=model,
+                                        stream=True, first_token_ms=first_token_ms, error=str(e))
+                    raise
+                self.record(backend, time.perf_counter() - started)
+                tracing.record_span('model_call', started, backend=backend.name, model=model,
+                                    stream=True, first_token_ms=first_token_ms)
+                return
+            finally:
+                in_flight.dec()
+                # Closed by a disconnecting client (GeneratorExit) or cancelled mid-stream
+                self.abandon(backend, trial)
+        raise BackendError('router', "; ".join(errors) or "all backends unavailable")
+
+    async def acomplete(self, messages, max_tokens=300, temperature=0.1, model=None):
+        errors = []
+        for backend, trial in self.candidates():
+            started = time.perf_counter()
+            in_flight = metrics.MODEL_CALLS_IN_FLIGHT.labels(backend.name)
+            in_flight.inc()
+            try:
+                with tracing.span('model_call', backend=backend.name, model=model) as call_span:
+                    try:
+                        completion = await backend.acomplete(messages, max_tokens, temperature, model)
+                    except Exception as e:
+                        self.record(backend, time.perf_counter() - started, e)
+                        call_span.set(error=str(e))
+                        errors.append(str(e))
+                        continue
+                    finally:
+                        in_flight.dec()
+                self.record(backend, time.perf_counter() - started)
+            finally:
+                # Cancelled or interrupted before a result was recorded
+                self.abandon(backend, trial)
+            metrics.record_usage(backend.name, completion.usage)
+            return completion
+        raise BackendError('router', "; ".join(errors) or "all backends unavailable")
+
+    async def astream(self, messages, max_tokens=300, temperature=0.1, model=None, served=None):
+        errors = []
+        for backend, trial in self.candidates():
+            started = time.perf_counter()
+            in_flight = metrics.MODEL_CALLS_IN_FLIGHT.labels(backend.name)
+            in_flight.inc()
+            try:
+                tokens = backend.astream(messages, max_tokens, temperature, model)
+                try:
+                    first = await tokens.__anext__()
+                except StopAsyncIteration:
+                    self.record(backend, time.perf_counter() - started, BackendError(backend.name, "empty response"))
+                    errors.append(f"{backend.name}: empty response")
+                    continue
+                except Exception as e:
+                    self.record(backend, time.perf_counter() - started, e)
+                    tracing.record_span('model_call', started, backend=backend.name, model=model,
+                                        stream=True, error=str(e))
+                    errors.append(str(e))
+                    continue
+
+                first_token_ms = round((time.perf_counter() - started) * 1000, 3)
+                if served is not None:
+                    served['backend'] = backend.name
+                yield first
+                try:
+                    async for token in tokens:
+                        yield token
+                except Exception as e:
+                    self.record(backend, time.perf_counter() - started, e)
+                    tracing.record_span('model_call', started, backend=backend.name, model=model,
+                                        stream=True, first_token_ms=first_token_ms, error=str(e))
+                    raise
+                self.record(backend, time.perf_counter() - started)
+                tracing.record_span('model_call', started, backend=backend.name, model=model,
+                                    stream=True, first_token_ms=first_token_ms)
+                return
+            finally:
+                in_flight.dec()
+                # Closed by a disconnecting client (GeneratorExit) or cancelled mid-stream
+                self.abandon(backend, trial)
+        raise BackendError('router', "; ".join(errors) or "all backends unavailable")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'strategy': self.strategy,
+                'backends': {
+                    backend.name: {
+                        'state': self.health[backend.name].breaker.state,
+                        'calls': self.health[backend.name].calls,
+                        'errors': self.health[backend.name].errors,
+                        'slow_calls': self.health[backend.name].slow_calls,
+                        'ewma_seconds': round(self.health[backend.name].ewma, 6) if self.health[backend.name].ewma is not None else None,
+                        'latency': self.health[backend.name].histogram.snapshot()
+                    }
+                    for backend in self.backends
+                }
+            }
+
+def create_backend(name, sagemaker_predict=None):
+    """Build a backend by name; returns None for sagemaker without a predictor"""
+    if name == 'openai':
+        return OpenAIBackend()
+    if name == 'hf_inference':
+        return HFInferenceBackend()
+    if name == 'hf_endpoint':
+        return HFEndpointBackend()
+    if name == 'sagemaker':
+        return SageMakerBackend(sagemaker_predict) if sagemaker_predict else None
+    if name == 'mock':
+        return MockBackend(latency=MOCK_LATENCY)
+    raise ValueError(f"Unknown model backend: {name}")
+
+def create_router(spec=None, strategy=None, sagemaker_predict=None):
+    """Build a router from MODEL_BACKENDS / MODEL_ROUTING and the breaker settings"""
+    backends = []
+    for name in (spec or MODEL_BACKENDS).split(','):
+        name = name.strip()
+        if not name:
+            continue
+        backend = create_backend(name, sagemaker_predict)
+        if backend is None:
+            print(f"⚠️  Model backend '{name}' is not available - skipping")
+            continue
+        backends.append(backend)
+
+    return BackendRouter(
+        backends,
+        strategy=strategy or MODEL_ROUTING,
+        failure_threshold=MODEL_BREAKER_FAILURES,
+        reset_timeout=MODEL_BREAKER_RESET,
+        slow_call_seconds=MODEL_SLOW_CALL_SECONDS
+    )
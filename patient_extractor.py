@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Compiled patient data extractor
+Finds every symptom, timeline, body-part and sex term in a message with one
+precompiled scan, and updates the structured patient data incrementally as
+new patient messages arrive. Terms only count as whole words ("female" is
+not "male", "headache" is not a location), and a number is only an age when
+the message says so ("34 year old", "age 34", "I am 34") or answers a
+question about age.
+"""
+
+import re
+
+# Word -> recorded sex
+SEX_TERMS = {"male": "male", "man": "male", "female": "female", "woman": "female"}
+# Word stems; each also matches with the SUFFIXES below
+SYMPTOM_KEYWORDS = ["pain", "ache", "hurt", "fever", "nausea", "vomit", "cough", "headache", "dizzy"]
+TIME_KEYWORDS = ["day", "hour", "week", "month", "year", "ago", "started", "began", "today", "yesterday"]
+# First in list order wins; left, right and side name no body part on their own
+BODY_PARTS = ["abdomen", "stomach", "chest", "head", "back", "leg", "arm"]
+# "back" as an adverb ("sit back down", "it comes back") is not a location
+ADVERB_BACK = (r"(?:come|comes|came|coming|go|goes|going|went|sit|sat|get|got|lie|lay|bring|brought)\s+back"
+               r"|back\s+(?:down|up|to|home|then|again|and forth)")
+
+SUFFIXES = r"(?:s|d|ed|ing|ful|ish|ly)?"
+
+# Numbers followed by these are measurements or durations, never an age
+NOT_AGE = (r"(?![ -]?(?:/|%|[.,]\d|(?:seconds?|minutes?|mins?|hours?|hrs?|days?|weeks?|months?|times?"
+           r"|kg|lbs?|pounds|cm|ft|foot|feet|inches|mg)\b))")
+AGE_PATTERN = re.compile(
+    r"\b(\d{1,3})[ -]?(?:years?|yrs?)[ -]?(?:old|of age)\b"
+    r"|\b(\d{1,3}) ?(?:yo|y/o|y\.o\.)(?!\w)"
+    r"|\bage[ds]?:? ?(\d{1,3})\b"
+    r"|\bi(?:'m| am) (?:a |an )?(\d{1,3})\b" + NOT_AGE,
+    re.IGNORECASE
+)
+# An answer to "How old are you?" may be just the number
+AGE_ANSWER_PATTERN = re.compile(r"\b(\d{1,3})\b" + NOT_AGE)
+AGE_QUESTION_PATTERN = re.compile(r"\b(?:how old|your age|age)\b", re.IGNORECASE)
+SEVERITY_PATTERN = re.compile(r'\b(\d{1,2})/10\b')
+
+def _alternation(terms):
+    return "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+
+def _build_scanner():
+    """Compile one scanner over every term, with a named group per kind
+
+    Whole words only: "head" does not match "headache" and "male" does not
+    match "female". Compound aches ("backache") are symptoms, "year" in
+    "34 year old" is an age, not a timeline, and adverbial "back" is skipped.
+    """
+    return re.compile(
+        rf"\b(?:(?P<skip>{ADVERB_BACK})"
+        rf"|(?P<sex>{_alternation(SEX_TERMS)})"
+        rf"|(?P<symptom>(?:{_alternation(SYMPTOM_KEYWORDS)}){SUFFIXES}|\w+aches?)"
+        rf"|(?P<time>(?:{_alternation(TIME_KEYWORDS)}){SUFFIXES}(?![ -]?(?:old|of age)\b)|\w+days?)"
+        rf"|(?P<part>(?:{_alternation(BODY_PARTS)})s?))\b"
+    )
+
+TERM_SCANNER = _build_scanner()
+BODY_PART_ORDER = {part: position for position, part in enumerate(BODY_PARTS)}
+
+def find_terms(content_lower):
+    """(sex terms, whether a symptom is named, whether a time is named, body parts), in text order"""
+    sexes, parts = [], []
+    symptom = time = False
+    for match in TERM_SCANNER.finditer(content_lower):
+        kind = match.lastgroup
+        if kind == 'sex':
+            sexes.append(SEX_TERMS[match.group(kind)])
+        elif kind == 'symptom':
+            symptom = True
+        elif kind == 'time':
+            time = True
+        elif kind == 'part':
+            part = match.group(kind)
+            parts.append(part if part in BODY_PART_ORDER else part[:-1])
+    return sexes, symptom, time, parts
+
+def empty_patient_data():
+    return {
+        "demographics": {"age": None, "sex": None},
+        "chief_complaints": [],
+        "symptoms": {},
+        "timeline": [],
+        "severity": {},
+        "location": {},
+        "other_info": []
+    }
+
+def find_age(content, question=None):
+    """Age stated in a patient message, or None
+
+    question is the doctor's message it replies to; after one that asks
+    for the age a bare number counts too.
+    """
+    match = AGE_PATTERN.search(content)
+    if match is None and question and AGE_QUESTION_PATTERN.search(question):
+        match = AGE_ANSWER_PATTERN.search(content)
+    if match is None:
+        return None
+    age = int(next(group for group in match.groups() if group is not None))
+    return age if 1 <= age <= 120 else None
+
+class PatientDataExtractor:
+    """Incrementally maintained patient data for one conversation"""
+
+    def __init__(self):
+        self.patient_data = empty_patient_data()
+        self._complaints_seen = set()
+        self._timeline_seen = set()
+        self._consumed = 0
+        self._question = None
+
+    def update(self, messages):
+        """Feed messages not seen yet; messages must be append-only"""
+        for msg in messages[self._consumed:]:
+            if msg["role"] == "user":
+                self.add_user_message(msg["content"], self._question)
+                self._question = None
+            else:
+                self._question = msg["content"]
+        self._consumed = len(messages)
+        return self.patient_data
+
+    def add_user_message(self, content, question=None):
+        """Fold in one patient message; question is the doctor's message it answers, if known"""
+        patient_data = self.patient_data
+        content = content.strip()
+        sexes, symptom, time, parts = find_terms(content.lower())
+
+        # Demographics parsing: the first sex named in the message
+        if sexes:
+            patient_data["demographics"]["sex"] = sexes[0]
+
+        # Age parsing
+        if not patient_data["demographics"]["age"]:
+            patient_data["demographics"]["age"] = find_age(content, question)
+
+        # Symptoms parsing
+        if symptom and content not in self._complaints_seen:
+            self._complaints_seen.add(content)
+            patient_data["chief_complaints"].append(content)
+
+        # Timeline parsing
+        if time and content not in self._timeline_seen:
+            self._timeline_seen.add(content)
+            patient_data["timeline"].append(content)
+
+        # Severity parsing (0-10 scale)
+        severity_match = SEVERITY_PATTERN.search(content)
+        if severity_match:
+            patient_data["severity"]["pain"] = f"{severity_match.group(1)}/10"
+
+        # Location parsing: first body part in list order wins
+        if parts:
+            patient_data["location"][min(parts, key=BODY_PART_ORDER.get)] = content
+
+def extract_patient_data(conversation_history):
+    """Structured patient data for a full message list"""
+    return PatientDataExtractor().update(list(conversation_history))
+
+def render_patient_summary(patient_data):
+    """Human-readable summary lines for the structured patient data"""
+    summary_lines = []
+    demographics = patient_data["demographics"]
+
+    # Demographics
+    if demographics["age"] and demographics["sex"]:
+        summary_lines.append(f"PATIENT: {demographics['age']}-year-old {demographics['sex']}")
+    elif demographics["age"]:
+        summary_lines.append(f"AGE: {demographics['age']}")
+    elif demographics["sex"]:
+        summary_lines.append(f"SEX: {demographics['sex']}")
+
+    # Chief complaints
+    if patient_data["chief_complaints"]:
+        summary_lines.append(f"CHIEF COMPLAINTS: {'; '.join(patient_data['chief_complaints'])}")
+
+    # Timeline
+    if patient_data["timeline"]:
+        summary_lines.append(f"TIMELINE: {'; '.join(patient_data['timeline'])}")
+
+    # Severity
+    if patient_data["severity"]:
+        severity_info = '; '.join([f"{k}: {v}" for k, v in patient_data["severity"].items()])
+        summary_lines.append(f"SEVERITY: {severity_info}")
+
+    # Location
+    if patient_data["location"]:
+        location_info = '; '.join([f"{k}: {v}" for k, v in patient_data["location"].items()])
+        summary_lines.append(f"LOCATION: {location_info}")
+
+    return "\n".join(summary_lines) if summary_lines else "No patient information collected yet"
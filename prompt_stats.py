@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Prompt prefix reuse counters
+Measures how much of each interview prompt repeats the previous turn's prompt,
+which is the part a provider-side or local prefix cache can serve
+"""
+
+import threading
+from collections import OrderedDict
+
+def _usage_value(usage, *path):
+    value = usage
+    for key in path:
+        if not value or key not in value:
+            return 0
+        value = value[key]
+    return value or 0
+
+class PrefixReuseTracker:
+    """Per-conversation prompt prefix statistics
+
+    Each conversation's previous prompt is kept for comparison, so discard
+    should follow the store's evictions (on_evict).
+    """
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._previous = OrderedDict()
+        self._stats = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, conversation_id, messages):
+        """Compare a prompt with the conversation's previous one and update the counters"""
+        prompt = [(msg['role'], msg['content']) for msg in messages]
+        prompt_chars = sum(len(content) for _, content in prompt)
+
+        with self._lock:
+            previous = self._previous.get(conversation_id, [])
+            reused_chars = 0
+            for old, new in zip(previous, prompt):
+                if old != new:
+                    break
+                reused_chars += len(new[1])
+
+            stats = self._stats.setdefault(conversation_id, {
+                'turns': 0,
+                'prompt_chars': 0,
+                'reused_prefix_chars': 0,
+                'last_prompt_chars': 0,
+                'last_reused_prefix_chars': 0,
+                'prompt_tokens': 0,
+                'cached_prompt_tokens': 0
+            })
+            stats['turns'] += 1
+            stats['prompt_chars'] += prompt_chars
+            stats['reused_prefix_chars'] += reused_chars
+            stats['last_prompt_chars'] = prompt_chars
+            stats['last_reused_prefix_chars'] = reused_chars
+
+            self._previous[conversation_id] = prompt
+            self._previous.move_to_end(conversation_id)
+            self._stats.move_to_end(conversation_id)
+            while len(self._previous) > self.max_entries:
+                evicted, _ = self._previous.popitem(last=False)
+                self._stats.pop(evicted, None)
+
+        return reused_chars
+
+    def record_usage(self, conversation_id, usage):
+        """Add provider token counts, including prompt tokens served from its cache"""
+        with self._lock:
+            stats = self._stats.get(conversation_id)
+            if stats is None or not usage:
+                return
+            stats['prompt_tokens'] += _usage_value(usage, 'prompt_tokens')
+            stats['cached_prompt_tokens'] += _usage_value(usage, 'prompt_tokens_details', 'cached_tokens')
+
+    def stats(self, conversation_id):
+        with self._lock:
+            stats = self._stats.get(conversation_id)
+            if stats is None:
+                return None
+            result = dict(stats)
+
+        result['prefix_reuse_ratio'] = (
+            round(result['reused_prefix_chars'] / result['prompt_chars'], 4)
+            if result['prompt_chars'] else 0.0
+        )
+        return result
+
+    def discard(self, conversation_id):
+        with self._lock:
+            self._previous.pop(conversation_id, None)
+            self._stats.pop(conversation_id, None)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Local question planner for predictable interview turns
+Most interview turns only fill a slot the structured patient data is still
+missing: how long, how bad, where, age and sex. The planner asks those from
+templates in microseconds, naming the patient's own symptom, and leaves the
+model for open-ended follow-ups: while the complaint is unclear, once the
+basic slots are filled, or once a slot has been asked about and the answer
+still did not fill it.
+"""
+
+import os
+import re
+import threading
+import time
+
+import metrics
+from patient_extractor import SUFFIXES, SYMPTOM_KEYWORDS
+
+# Local questions for missing slots (0 sends every turn to the model)
+QUESTION_PLANNER = os.getenv('QUESTION_PLANNER', '1').lower() not in ('0', 'false', 'no')
+
+# Slots asked about in this order, once there is a complaint to ask about; finding the complaint is left to the model
+PLANNED_SLOTS = ('timeline', 'severity', 'location', 'demographics')
+
+TEMPLATES = {
+    'timeline': "When did the {symptom} start, and has it changed since then?",
+    'severity': "On a scale of 0 to 10, how bad is the {symptom} right now (for example 6/10)?",
+    'location': "Where exactly do you feel the {symptom}, and does it spread anywhere?"
+}
+DEMOGRAPHIC_QUESTIONS = {
+    (True, True): "To complete your record, how old are you, and what is your sex?",
+    (True, False): "To complete your record, how old are you?",
+    (False, True): "To complete your record, what is your sex?"
+}
+
+# A question about a slot, whoever asked it; a slot asked about once goes to the model after that
+ASKED_PATTERNS = {
+    'timeline': re.compile(r"\b(?:when did|how long|since when|start(?:ed)?|began)\b", re.IGNORECASE),
+    'severity': re.compile(r"\b(?:scale|rate|how (?:bad|severe|intense)|severity)\b|/10", re.IGNORECASE),
+    'location': re.compile(r"\bwhere\b", re.IGNORECASE),
+    'demographics': re.compile(r"\b(?:how old|your age|your sex|gender)\b", re.IGNORECASE)
+}
+
+# Whole words, as the extractor matches them: "painting" names no symptom
+SYMPTOM_PATTERN = re.compile(
+    r"\b(" + "|".join(sorted(SYMPTOM_KEYWORDS, key=len, reverse=True)) + r")" + SUFFIXES + r"\b", re.IGNORECASE
+)
+# Keyword stems read as nouns in a question
+SYMPTOM_NAMES = {'hurt': 'pain', 'vomit': 'vomiting', 'dizzy': 'dizziness'}
+
+# Smoothing for the model question latency used to estimate the time saved
+EWMA_ALPHA = 0.2
+
+QUESTIONS = metrics.Counter(
+    'interview_questions_total', 'Interview questions by source (planner or model)', ['source']
+)
+LATENCY_SAVED = metrics.Counter(
+    'interview_model_latency_saved_seconds_total',
+    'Estimated model latency avoided by planned questions (recent model question latency each)'
+)
+
+def symptom_name(patient_data):
+    """The patient's latest symptom in plain words, or None"""
+    for complaint in reversed(patient_data['chief_complaints']):
+        match = SYMPTOM_PATTERN.search(complaint)
+        if match:
+            term = match.group(1).lower()
+            return SYMPTOM_NAMES.get(term, term)
+    return None
+
+def asked_slots(messages):
+    """Slots the assistant has already asked about in these messages"""
+    asked = set()
+    for msg in messages:
+        if msg['role'] != 'assistant':
+            continue
+        for slot, pattern in ASKED_PATTERNS.items():
+            if slot not in asked and pattern.search(msg['content']):
+                asked.add(slot)
+    return asked
+
+class QuestionPlanner:
+    """Template questions for missing slots, with counters for the model calls they replace"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._model_ewma = None
+        self._stats = {'planned': 0, 'model': 0, 'planner_seconds': 0.0, 'latency_saved_seconds': 0.0}
+
+    def plan(self, transcript, assessment):
+        """Question for the next missing slot, or None to ask the model"""
+        started = time.perf_counter()
+        question = None
+        symptom = symptom_name(transcript.patient_data) if assessment.answers and not assessment.ready else None
+        if symptom is not None:
+            asked = asked_slots(transcript.messages)
+            for slot in PLANNED_SLOTS:
+                if slot in assessment.missing and slot not in asked:
+                    question = self.render(slot, transcript.patient_data, symptom)
+                    break
+        elapsed = time.perf_counter() - started
+
+        if question is not None:
+            QUESTIONS.labels('planner').inc()
+            with self._lock:
+                self._stats['planned'] += 1
+                self._stats['planner_seconds'] += elapsed
+                saved = self._model_ewma or 0.0
+                self._stats['latency_saved_seconds'] += saved
+            LATENCY_SAVED.inc(saved)
+        return question
+
+    def render(self, slot, patient_data, symptom):
+        # Age and sex only skip their part of the question when the extractor read them from an
+        # answer that states them, or from a reply to an age question; never from "3 days ago"
+        if slot == 'demographics':
+            demographics = patient_data['demographics']
+            return DEMOGRAPHIC_QUESTIONS[(demographics['age'] is None, demographics['sex'] is None)]
+        return TEMPLATES[slot].format(symptom=symptom)
+
+    def record_model_question(self, seconds):
+        """Latency of a question the model had to ask"""
+        QUESTIONS.labels('model').inc()
+        with self._lock:
+            self._stats['model'] += 1
+            self._model_ewma = seconds if self._model_ewma is None else \
+                EWMA_ALPHA * seconds + (1 - EWMA_ALPHA) * self._model_ewma
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            ewma = self._model_ewma
+        questions = stats['planned'] + stats['model']
+        return {
+            'planned_questions': stats['planned'],
+            'model_questions': stats['model'],
+            'model_call_rate': round(stats['model'] / questions, 4) if questions else 0.0,
+            'planner_us_per_question': round(stats['planner_seconds'] / stats['planned'] * 1e6, 1) if stats['planned'] else 0.0,
+            'model_question_seconds': round(ewma, 4) if ewma is not None else None,
+            'latency_saved_seconds': round(stats['latency_saved_seconds'], 3)
+        }
+
+def create_planner(enabled=QUESTION_PLANNER):
+    """Planner from QUESTION_PLANNER; None when disabled"""
+    return QuestionPlanner() if enabled else None
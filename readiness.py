@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Interview readiness from the structured patient data
+Decides when an interview has collected enough for a SOAP note from the
+slots the patient data extractor fills in as answers arrive (demographics,
+chief complaint, timeline, severity and location) instead of counting
+messages. The model's READY_FOR_ANALYSIS signal is accepted once the
+required slots are filled, and an interview that never fills them still
+ends after READINESS_MAX_ANSWERS patient answers.
+"""
+
+import os
+from collections import namedtuple
+
+import metrics
+
+SLOTS = ('complaint', 'timeline', 'severity', 'location', 'demographics')
+
+# Slots that must be filled before anything but the answer cap ends the interview
+READINESS_REQUIRED = tuple(
+    slot.strip() for slot in os.getenv('READINESS_REQUIRED', 'complaint,timeline').split(',') if slot.strip()
+)
+# Filled slots (of the five) that are enough on their own; fewer need the model's READY_FOR_ANALYSIS
+READINESS_MIN_SLOTS = int(os.getenv('READINESS_MIN_SLOTS', '4'))
+# Never ready before this many patient answers; always ready after the maximum
+READINESS_MIN_ANSWERS = int(os.getenv('READINESS_MIN_ANSWERS', '2'))
+READINESS_MAX_ANSWERS = int(os.getenv('READINESS_MAX_ANSWERS', '10'))
+# End the interview and queue the SOAP note as soon as it is ready; off by default, since a
+# misread answer ends the interview for good, whereas the button only offers the note
+INTERVIEW_AUTO_COMPLETE = os.getenv('INTERVIEW_AUTO_COMPLETE', '0').lower() in ('1', 'true', 'yes')
+
+unknown = set(READINESS_REQUIRED) - set(SLOTS)
+if unknown:
+    raise ValueError(f"Unknown READINESS_REQUIRED slots: {', '.join(sorted(unknown))}")
+
+READY_TOKEN = "READY_FOR_ANALYSIS"
+
+INTERVIEW_COMPLETE_MESSAGE = "Thank you, that gives me enough information for your visit summary. I'm preparing the SOAP note now."
+# Without auto-complete the note is only offered; nothing is being prepared yet
+INTERVIEW_READY_MESSAGE = ("Thank you, that gives me enough information for your visit summary. "
+                           "The SOAP note can be generated now, or tell me anything else you'd like to add.")
+
+# Asked for a missing slot when there is no model question to use
+FOLLOW_UP_QUESTIONS = {
+    'complaint': "What symptoms are bothering you the most right now?",
+    'timeline': "When did this start, and has it changed since then?",
+    'severity': "How severe is it on a scale of 0 to 10 (for example 6/10)?",
+    'location': "Where exactly in your body do you feel it?",
+    'demographics': "Could you tell me your age and sex?"
+}
+
+Readiness = namedtuple('Readiness', ['ready', 'reason', 'filled', 'missing', 'answers'])
+
+INTERVIEWS_COMPLETED = metrics.Counter(
+    'interviews_completed_total', 'Interviews ended by the readiness check, by reason', ['reason']
+)
+MODEL_CALLS_SKIPPED = metrics.Counter(
+    'interview_model_calls_skipped_total', 'Interview turns answered without a model call'
+)
+
+def filled_slots(patient_data):
+    """Slot name -> whether the extracted patient data covers it
+
+    The extractor only fills a slot from whole-word matches, and the age
+    only from an answer that states one, so "I have a headache" fills no
+    location and "It started 3 days ago" no age.
+    """
+    demographics = patient_data['demographics']
+    return {
+        'complaint': bool(patient_data['chief_complaints']),
+        'timeline': bool(patient_data['timeline']),
+        'severity': bool(patient_data['severity']),
+        'location': bool(patient_data['location']),
+        'demographics': demographics['age'] is not None and demographics['sex'] is not None
+    }
+
+def assess(patient_data, answers, model_ready=False):
+    """Readiness of an interview with this patient data after this many patient answers
+
+    reason is 'slots' (enough slots filled), 'model' (the model said
+    READY_FOR_ANALYSIS and the required slots are filled), 'max_answers'
+    or None while the interview should go on.
+    """
+    filled = filled_slots(patient_data)
+    have = tuple(slot for slot in SLOTS if filled[slot])
+    missing = tuple(slot for slot in SLOTS if not filled[slot])
+
+    reason = None
+    if answers >= READINESS_MAX_ANSWERS:
+        reason = 'max_answers'
+    elif answers >= READINESS_MIN_ANSWERS and all(filled[slot] for slot in READINESS_REQUIRED):
+        if len(have) >= READINESS_MIN_SLOTS:
+            reason = 'slots'
+        elif model_ready:
+            reason = 'model'
+    return Readiness(reason is not None, reason, have, missing, answers)
+
+def strip_ready_token(reply):
+    """(reply without READY_FOR_ANALYSIS, whether the model said it)"""
+    if READY_TOKEN not in reply:
+        return reply, False
+    return reply.replace(READY_TOKEN, '').strip(' \t\n.:-"\''), True
+
+def follow_up_question(assessment):
+    """Question for a missing slot, most important first
+
+    Moves on to the next missing slot each answer, so an answer the
+    extractor cannot read does not get the same question again.
+    """
+    if not assessment.missing:
+        return FOLLOW_UP_QUESTIONS['complaint']
+    return FOLLOW_UP_QUESTIONS[assessment.missing[max(assessment.answers - 1, 0) % len(assessment.missing)]]
+
+def describe(assessment):
+    """JSON-friendly readiness for API responses"""
+    return {
+        'ready': assessment.ready,
+        'reason': assessment.reason,
+        'filled': list(assessment.filled),
+        'missing': list(assessment.missing),
+        'answers': assessment.answers
+    }
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Content-addressed model response cache
+LRU + TTL in memory, with an optional SQLite tier on disk shared by all workers
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+def normalize_transcript(text):
+    """Canonical form of a transcript: NFC, collapsed whitespace, no blank lines"""
+    text = unicodedata.normalize('NFC', text)
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+def cache_key(model, template_version, params, payload):
+    """Hash of everything that determines a completion"""
+    material = json.dumps({
+        'model': model,
+        'template': template_version,
+        'params': params,
+        'payload': payload
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+class DiskCacheTier:
+    """SQLite key/value table used as the second cache tier"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key, ttl):
+        row = self._connection().execute(
+            "SELECT value, created_at FROM response_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if ttl and time.time() - row[1] > ttl:
+            self._connection().execute("DELETE FROM response_cache WHERE key = ?", (key,))
+            return None
+        return row[0], row[1]
+
+    def set(self, key, value, created_at):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO response_cache (key, value, created_at) VALUES (?, ?, ?)",
+            (key, value, created_at)
+        )
+
+    def clear(self):
+        self._connection().execute("DELETE FROM response_cache")
+
+class ResponseCache:
+    """LRU/TTL cache of model responses keyed by cache_key()"""
+
+    def __init__(self, max_entries=1024, ttl_seconds=3600, disk_path=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk = DiskCacheTier(disk_path) if disk_path else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'expirations': 0
+        }
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                    del self._entries[key]
+                    self._stats['expirations'] += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    self._stats['memory_hits'] += 1
+                    return value
+
+        if self.disk is not None:
+            entry = self.disk.get(key, self.ttl_seconds)
+            if entry is not None:
+                with self._lock:
+                    self._store_in_memory(key, entry[0], entry[1])
+                    self._stats['hits'] += 1
+                    self._stats['disk_hits'] += 1
+                return entry[0]
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def set(self, key, value):
+        created_at = time.time()
+        with self._lock:
+            self._store_in_memory(key, value, created_at)
+            self._stats['stores'] += 1
+        if self.disk is not None:
+            self.disk.set(key, value, created_at)
+
+    def _store_in_memory(self, key, value, created_at):
+        self._entries[key] = (value, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['disk_tier'] = self.disk is not None
+        return stats
+
+def create_response_cache():
+    """Build the cache from RESPONSE_CACHE_* environment variables, or None if disabled"""
+    if os.getenv('RESPONSE_CACHE', '1').lower() in ('0', 'false', 'off'):
+        return None
+    return ResponseCache(
+        max_entries=int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '1024')),
+        ttl_seconds=float(os.getenv('RESPONSE_CACHE_TTL', '3600')),
+        disk_path=os.getenv('RESPONSE_CACHE_PATH') or None
+    )
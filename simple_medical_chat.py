@@ -4,39 +4,86 @@ Simple Medical Chatbot Backend for II-Medical-8B on SageMaker
 Clean, minimal implementation
 """
 
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, request, jsonify
 from flask_cors import CORS
 import json
+import os
 import uuid
-from datetime import datetime
+from importlib.util import find_spec
 
-# Import AWS dependencies only when needed
-sagemaker_predictor = None
+import cold_start
+import metrics
+import readiness
+import tracing
+from batch_scheduler import MicroBatchScheduler
+from model_backends import BackendError, DEFAULT_CONTEXT_BUDGETS, create_router, render_chatml
+from conversation_store import InMemoryConversationStore
+from question_planner import create_planner
+from transcript import TranscriptCache, as_transcript
+
+# Micro-batching of concurrent predictor calls (window 0 disables it)
+SAGEMAKER_BATCH_WINDOW_MS = float(os.getenv('SAGEMAKER_BATCH_WINDOW_MS', '0'))
+SAGEMAKER_MAX_BATCH_SIZE = int(os.getenv('SAGEMAKER_MAX_BATCH_SIZE', '8'))
+SAGEMAKER_BATCH_MODE = os.getenv('SAGEMAKER_BATCH_MODE', 'parallel')
+SAGEMAKER_MAX_CONCURRENCY = int(os.getenv('SAGEMAKER_MAX_CONCURRENCY', '32'))
+
+# Fallback chain behind the SageMaker endpoint, e.g. "sagemaker,openai,mock"
+MEDICAL_BACKENDS = os.getenv('MEDICAL_BACKENDS', 'sagemaker')
+
+MEDICAL_PARAMS = {"max_tokens": 200, "temperature": 0.1}
 
-try:
-    import boto3
-    import sagemaker
-    AWS_AVAILABLE = True
-except ImportError:
-    AWS_AVAILABLE = False
+# Estimated tokens of the prompt around the conversation; the backend budget minus this is the window
+MEDICAL_PROMPT_TOKENS = 150
+
+# AWS dependencies are imported by initialize_sagemaker, the only code that needs them
+AWS_AVAILABLE = find_spec('boto3') is not None and find_spec('sagemaker') is not None
+if not AWS_AVAILABLE:
     print("⚠️  AWS dependencies not installed - SageMaker features disabled")
 
 app = Flask(__name__)
 CORS(app)
 
+# Structured JSON logs via a background thread; LOG_LEVEL=DEBUG adds per-stage spans
+tracing.configure()
+
+# Prometheus-style /metrics
+metrics.instrument_flask(app, 'simple_medical_chat')
+
 # Global variables
-conversations = {}
+# Bounded by CONVERSATION_MEMORY_LIMIT_MB / CONVERSATION_IDLE_SECONDS like the main app's store
+conversations = InMemoryConversationStore(archive_prefix='simple-chat-conversations')
+transcripts = TranscriptCache()
+conversations.on_evict(transcripts.discard)
+# Slot-filling questions asked locally instead of by the model (QUESTION_PLANNER=0 disables)
+question_planner = create_planner()
 sagemaker_predictor = None
+batch_scheduler = None
+medical_router = None
+
+# A chain without SageMaker (e.g. MEDICAL_BACKENDS=hf_endpoint,openai) needs no predictor
+if 'sagemaker' not in [name.strip() for name in MEDICAL_BACKENDS.split(',')]:
+    medical_router = create_router(MEDICAL_BACKENDS)
+    cold_start.warm(medical_router)
+
+metrics.Gauge('simple_chat_conversations', 'Conversations, resident or archived',
+              callback=lambda: conversations.count())
+metrics.Gauge('simple_chat_conversation_bytes', 'Approximate memory held by resident conversations',
+              callback=lambda: conversations.memory_report(top=0)['resident_bytes'])
+metrics.Gauge('sagemaker_batch_queue_depth', 'Predictor requests waiting for a micro-batch',
+              callback=lambda: batch_scheduler.queue_depth() if batch_scheduler else None)
 
 def initialize_sagemaker():
     """Initialize SageMaker predictor for II-Medical-8B model"""
-    global sagemaker_predictor
+    global sagemaker_predictor, batch_scheduler, medical_router
     
     if not AWS_AVAILABLE:
         print("❌ AWS dependencies not available")
         return False
     
     try:
+        import boto3
+        import sagemaker
+
         # Get SageMaker execution role
         try:
             role = sagemaker.get_execution_role()
@@ -54,6 +101,20 @@ def initialize_sagemaker():
         )
         
         print(f"✅ SageMaker predictor initialized with endpoint: {endpoint_name}")
+
+        if SAGEMAKER_BATCH_WINDOW_MS > 0:
+            batch_scheduler = MicroBatchScheduler(
+                sagemaker_predictor,
+                window_ms=SAGEMAKER_BATCH_WINDOW_MS,
+                max_batch_size=SAGEMAKER_MAX_BATCH_SIZE,
+                max_concurrency=SAGEMAKER_MAX_CONCURRENCY,
+                mode=SAGEMAKER_BATCH_MODE
+            )
+            print(f"✅ Micro-batching enabled: {SAGEMAKER_BATCH_WINDOW_MS} ms window, "
+                  f"up to {SAGEMAKER_MAX_BATCH_SIZE} requests ({SAGEMAKER_BATCH_MODE})")
+
+        medical_router = create_router(MEDICAL_BACKENDS, sagemaker_predict=predict_medical)
+        cold_start.warm(medical_router)
         return True
         
     except Exception as e:
@@ -61,14 +122,17 @@ def initialize_sagemaker():
         print("💡 Make sure you've deployed the model and updated the endpoint_name")
         return False
 
+def interview_readiness(transcript):
+    """Readiness check over the transcript's structured patient data"""
+    return readiness.assess(transcript.patient_data, transcript.user_count)
+
 def mock_medical_ai(messages):
     """Mock medical AI for testing without SageMaker"""
-    user_count = len([msg for msg in messages if msg['role'] == 'user'])
+    assessment = interview_readiness(as_transcript(messages))
     
-    if user_count == 1:
-        return "Thank you for sharing your symptoms. Can you tell me when these symptoms first started and how severe they are on a scale of 1-10?"
-    elif user_count == 2:
-        return "I see. Have you tried any treatments or medications for this condition, and do you have any relevant medical history I should know about?"
+    if not assessment.ready:
+        # Ask for whatever the patient data is still missing
+        return readiness.follow_up_question(assessment)
     else:
         # Generate mock SOAP note
         return """S: Patient reports symptoms as described in our conversation. Duration and severity noted as per patient's account.
@@ -79,78 +143,105 @@ A: Based on the presented symptoms and patient history, this appears to be a con
 
 P: Recommend consultation with primary care physician for physical examination. Consider relevant diagnostic tests based on symptoms. Patient education provided regarding symptom monitoring."""
 
-def chat_with_medical_ai(messages):
-    """Send conversation to II-Medical-8B model via SageMaker"""
+def build_medical_messages(messages):
+    """Chat messages for the next interview question or the SOAP note"""
+    # The readiness check decides whether to keep asking or write the SOAP note
+    transcript = as_transcript(messages)
+    assessment = interview_readiness(transcript)
     
-    # Use mock AI if SageMaker is not available
-    if not sagemaker_predictor:
-        return mock_medical_ai(messages)
+    # Format conversation from the incrementally rendered transcript, windowed to the backend budget
+    budget = medical_router.context_budget() if medical_router else DEFAULT_CONTEXT_BUDGETS['sagemaker']
+    summary, start = transcript.window(budget - MEDICAL_PROMPT_TOKENS)
+    if summary is None:
+        conversation = transcript.text
+    else:
+        conversation = f"{summary}\n\nMOST RECENT EXCHANGES:\n{transcript.text_from(start)}"
     
-    try:
-        # Count user messages to determine if we should ask questions or give SOAP note
-        user_count = len([msg for msg in messages if msg['role'] == 'user'])
-        
-        # Format conversation
-        conversation = "\n".join([
-            f"{'Patient' if msg['role'] == 'user' else 'Doctor'}: {msg['content']}"
-            for msg in messages
-        ])
-        
-        if user_count <= 2:
-            # Ask medical questions
-            prompt = f"""<|im_start|>system
-You are a medical doctor interviewing a patient. Ask ONE focused medical question to understand their condition better. Be professional and direct.<|im_end|>
-<|im_start|>user
-Current conversation:
+    if not assessment.ready:
+        # Ask medical questions
+        return [
+            {"role": "system", "content": "You are a medical doctor interviewing a patient. Ask ONE focused medical question to understand their condition better. Be professional and direct."},
+            {"role": "user", "content": f"""Current conversation:
 {conversation}
 
-What medical question should you ask next?<|im_end|>
-<|im_start|>assistant"""
-        else:
-            # Generate SOAP note
-            prompt = f"""<|im_start|>system  
-You are a medical doctor. Create a SOAP note based on the patient information. Use this format:
+What medical question should you ask next?"""}
+        ]
+    
+    # Generate SOAP note
+    return [
+        {"role": "system", "content": """You are a medical doctor. Create a SOAP note based on the patient information. Use this format:
 
 S: [Patient's subjective complaints]
 O: [Objective findings - write "Not documented" if missing]
 A: [Your medical assessment]  
-P: [Treatment plan and recommendations]<|im_end|>
-<|im_start|>user
-Patient conversation:
+P: [Treatment plan and recommendations]"""},
+        {"role": "user", "content": f"""Patient conversation:
 {conversation}
 
-Create a SOAP note:<|im_end|>
-<|im_start|>assistant"""
+Create a SOAP note:"""}
+    ]
 
-        # Send to SageMaker
-        response = sagemaker_predictor.predict({
-            "inputs": prompt,
-            "parameters": {
-                "max_new_tokens": 200,
-                "temperature": 0.1,
-                "do_sample": True
-            }
-        })
-        
-        # Extract response
-        if isinstance(response, list) and len(response) > 0:
-            content = response[0].get('generated_text', '').strip()
-        else:
-            content = response.get('generated_text', '').strip()
-        
-        # Clean response
-        content = content.replace('<|im_end|>', '').strip()
+def build_medical_prompt(messages):
+    """Build the TGI request for the next interview question or the SOAP note"""
+    return {
+        "inputs": render_chatml(build_medical_messages(messages)),
+        "parameters": {
+            "max_new_tokens": MEDICAL_PARAMS["max_tokens"],
+            "temperature": MEDICAL_PARAMS["temperature"],
+            "do_sample": True
+        }
+    }
+
+def parse_medical_response(response):
+    """Extract and clean the generated text from a TGI response"""
+    # Extract response
+    if isinstance(response, list) and len(response) > 0:
+        content = response[0].get('generated_text', '').strip()
+    else:
+        content = response.get('generated_text', '').strip()
+    
+    # Clean response
+    content = content.replace('<|im_end|>', '').strip()
+    
+    return content if content else "Could you please provide more details about your symptoms?"
+
+def predict_medical(payload):
+    """Send one TGI payload, through the micro-batcher when it is enabled"""
+    if batch_scheduler:
+        return batch_scheduler.predict(payload)
+    return sagemaker_predictor.predict(payload)
+
+def chat_with_medical_ai(messages):
+    """Send conversation to II-Medical-8B model via SageMaker"""
+    
+    # Use mock AI if neither SageMaker nor another backend chain is available
+    if not medical_router:
+        return mock_medical_ai(messages)
+    
+    transcript = as_transcript(messages)
+    assessment = interview_readiness(transcript)
+    
+    # Predictable slot-filling questions need no model call
+    planned = question_planner.plan(transcript, assessment) if question_planner else None
+    if planned:
+        return planned
+    
+    try:
+        # SageMaker first, then any fallbacks configured in MEDICAL_BACKENDS
+        completion = medical_router.complete(build_medical_messages(messages), **MEDICAL_PARAMS)
+        if question_planner and not assessment.ready:
+            question_planner.record_model_question(completion.latency)
         
-        return content if content else "Could you please provide more details about your symptoms?"
+        # The patient never sees the model's readiness signal
+        reply, _ = readiness.strip_ready_token(completion.text)
+        return reply or readiness.follow_up_question(assessment)
         
-    except Exception as e:
-        print(f"Error with medical AI: {str(e)}")
+    except BackendError as e:
+        tracing.warning('medical_ai_error', error=str(e))
         return f"I'm having difficulty processing your request. Please try again."
 
-@app.route('/')
-def home():
-    """Simple chat interface"""
-    return render_template_string('''
+# Compiled by Jinja on the first page view instead of on every one
+HOME_PAGE = '''
 <!DOCTYPE html>
 <html>
 <head>
@@ -235,7 +326,21 @@ def home():
     </script>
 </body>
 </html>
-    ''')
+'''
+home_template = None
+
+@app.route('/')
+def home():
+    """Simple chat interface"""
+    global home_template
+    if home_template is None:
+        home_template = app.jinja_env.from_string(HOME_PAGE)
+    return home_template.render()
+
+@app.before_request
+def begin_trace():
+    """One trace id per request, taken from X-Request-ID when the proxy sets it"""
+    tracing.start_trace(request.headers.get('X-Request-ID'))
 
 @app.route('/chat', methods=['POST'])
 def chat():
@@ -248,24 +353,19 @@ def chat():
         return jsonify({'error': 'Message is required'}), 400
     
     # Create new conversation if needed
-    if not conversation_id or conversation_id not in conversations:
+    if not conversation_id or not conversations.exists(conversation_id):
         conversation_id = str(uuid.uuid4())
-        conversations[conversation_id] = {
-            'id': conversation_id,
-            'messages': [],
-            'created_at': datetime.now().isoformat()
-        }
+        conversations.create(conversation_id)
     
-    conversation = conversations[conversation_id]
-    
-    # Add user message
-    conversation['messages'].append({'role': 'user', 'content': message})
+    # Add user message; an archived conversation is read back here
+    conversations.append_message(conversation_id, 'user', message)
+    conversation = conversations.get(conversation_id)
     
     # Get AI response
-    ai_response = chat_with_medical_ai(conversation['messages'])
+    ai_response = chat_with_medical_ai(transcripts.sync(conversation_id, conversation['messages']))
     
     # Add AI response  
-    conversation['messages'].append({'role': 'assistant', 'content': ai_response})
+    conversations.append_message(conversation_id, 'assistant', ai_response)
     
     return jsonify({
         'response': ai_response,
@@ -276,13 +376,31 @@ def chat():
 def health():
     """Health check endpoint"""
     status = "SageMaker Ready" if sagemaker_predictor else "SageMaker Not Connected"
-    return jsonify({'status': status})
+    health_info = {'status': status}
+    if batch_scheduler:
+        health_info['batching'] = batch_scheduler.stats()
+    if medical_router:
+        health_info['backends'] = medical_router.stats()
+    return jsonify(health_info)
+
+@app.route('/memory/stats')
+def memory_stats():
+    """Resident and archived conversations, with the largest ones"""
+    return jsonify(conversations.memory_report(top=request.args.get('top', 10, type=int)))
+
+@app.route('/planner/stats')
+def planner_stats():
+    """Planned vs model interview questions and the model latency saved"""
+    if question_planner is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, 'stats': question_planner.stats()})
 
 if __name__ == '__main__':
     print("🚀 Starting Medical AI Chatbot...")
     print("📋 Features:")
     print("   - II-Medical-8B model via Amazon SageMaker")
-    print("   - Doctor asks 2 questions, then provides SOAP note")
+    print("   - Doctor asks about complaint, timeline, severity, location, age and sex,")
+    print(f"     then writes the SOAP note once enough is known (at most {readiness.READINESS_MAX_ANSWERS} answers)")
     print("   - Simple web interface at http://localhost:5000")
     
     # Initialize SageMaker (optional - can work without it for testing)
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Speculative SOAP drafting
+While an interview is still running, draft the SOAP note in the background
+a few seconds after the latest patient answer. If the clinician asks for the
+note and the transcript has not changed since, the draft is returned
+instead of making a fresh model call. Every draft that is never used is a
+wasted call, so drafting is opt-in and capped per conversation. Drafts
+and budgets of interviews that go quiet expire after SPECULATIVE_DRAFT_TTL.
+"""
+
+import hashlib
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import tracing
+
+# Opt-in: every draft is a full SOAP model call
+SPECULATIVE_SOAP = os.getenv('SPECULATIVE_SOAP', '0') == '1'
+# Quiet period after the last answer before a draft starts
+SPECULATIVE_DEBOUNCE_SECONDS = float(os.getenv('SPECULATIVE_DEBOUNCE_SECONDS', '3'))
+# Drafts started per conversation; later answers are not drafted once it is spent
+SPECULATIVE_MAX_DRAFTS = int(os.getenv('SPECULATIVE_MAX_DRAFTS', '3'))
+# Drafts generating at once across all conversations; due drafts are skipped beyond it
+SPECULATIVE_MAX_IN_FLIGHT = int(os.getenv('SPECULATIVE_MAX_IN_FLIGHT', '2'))
+# Seconds after its last draft started that a conversation's draft and budget are forgotten
+SPECULATIVE_DRAFT_TTL = float(os.getenv('SPECULATIVE_DRAFT_TTL', '3600'))
+
+def transcript_key(patient_data):
+    return hashlib.sha256(patient_data.encode('utf-8')).hexdigest()
+
+class SpeculativeDrafter:
+    """Debounced background drafts keyed by a hash of the transcript they were made from"""
+
+    def __init__(self, generate, debounce_seconds=SPECULATIVE_DEBOUNCE_SECONDS,
+                 max_drafts=SPECULATIVE_MAX_DRAFTS, max_in_flight=SPECULATIVE_MAX_IN_FLIGHT,
+                 ttl=SPECULATIVE_DRAFT_TTL):
+        self.generate = generate
+        self.ttl = ttl
+        self.debounce = debounce_seconds
+        self.max_drafts = max_drafts
+        self.max_in_flight = max(1, max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix='soap-draft')
+        self._changed = threading.Condition()
+        # conversation_id -> (due, key, patient_data) waiting out the debounce
+        self._pending = {}
+        self._deadlines = []
+        self._order = itertools.count()
+        # conversation_id -> {'key', 'future', 'used', 'discarded'}
+        self._drafts = {}
+        # conversation_id -> [drafts started, when the last one started]
+        self._spent = {}
+        self._next_expiry = time.monotonic() + ttl
+        self._in_flight = 0
+        self._thread = None
+        self._pid = None
+        self._stats = dict.fromkeys((
+            'scheduled', 'debounced', 'started', 'completed', 'errors', 'hits', 'misses',
+            'wasted', 'cancelled', 'skipped_budget', 'skipped_busy', 'expired'
+        ), 0)
+
+    def schedule(self, conversation_id, patient_data, now=False):
+        """Draft this transcript once it has been quiet for debounce_seconds
+
+        now starts the draft straight away, for a transcript that will not
+        change any more, such as an interview that has just ended.
+        """
+        key = transcript_key(patient_data)
+        with self._changed:
+            self._expire()
+            draft = self._drafts.get(conversation_id)
+            if draft is not None and draft['key'] == key:
+                return
+            if self._spent.get(conversation_id, (0, 0))[0] >= self.max_drafts:
+                self._stats['skipped_budget'] += 1
+                return
+            if conversation_id in self._pending:
+                self._stats['debounced'] += 1
+            self._stats['scheduled'] += 1
+            if now:
+                self._pending.pop(conversation_id, None)
+                self._start(conversation_id, key, patient_data)
+                return
+            due = time.monotonic() + self.debounce
+            self._pending[conversation_id] = (due, key, patient_data)
+            heapq.heappush(self._deadlines, (due, next(self._order), conversation_id))
+            self._changed.notify()
+        self._ensure_thread()
+
+    def take(self, conversation_id, patient_data, timeout=60):
+        """The draft for exactly this transcript, or None
+
+        A draft that is still generating is waited for up to timeout seconds;
+        with timeout=0 it is left in place for a caller that can wait. A draft
+        of an older transcript is discarded.
+        """
+        key = transcript_key(patient_data)
+        with self._changed:
+            if self._pending.pop(conversation_id, None) is not None:
+                self._stats['cancelled'] += 1
+            draft = self._drafts.get(conversation_id)
+            if draft is not None and draft['key'] != key:
+                del self._drafts[conversation_id]
+                self._discard(draft)
+                draft = None
+            if draft is None:
+                self._stats['misses'] += 1
+                return None
+            if not timeout and not draft['future'].done():
+                return None
+            del self._drafts[conversation_id]
+            draft['used'] = True
+
+        try:
+            text = draft['future'].result(timeout=timeout)
+        except TimeoutError:
+            text = None
+        except Exception:
+            text = None
+
+        with self._changed:
+            if text:
+                self._stats['hits'] += 1
+                # The note is made; this conversation will not be drafted again
+                self._spent.pop(conversation_id, None)
+            else:
+                self._stats['misses'] += 1
+                if not draft['future'].done():
+                    draft['used'] = False
+                    self._discard(draft)
+        return text or None
+
+    def discard(self, conversation_id):
+        """Forget pending and finished drafts, e.g. on reset or delete"""
+        with self._changed:
+            if self._pending.pop(conversation_id, None) is not None:
+                self._stats['cancelled'] += 1
+            draft = self._drafts.pop(conversation_id, None)
+            if draft is not None:
+                self._discard(draft)
+            self._spent.pop(conversation_id, None)
+
+    def stats(self):
+        with self._changed:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._pending)
+            stats['in_flight'] = self._in_flight
+            stats['held'] = len(self._drafts)
+            stats['budgets'] = len(self._spent)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        stats['waste_rate'] = round(stats['wasted'] / stats['completed'], 3) if stats['completed'] else 0.0
+        stats['debounce_seconds'] = self.debounce
+        stats['max_drafts'] = self.max_drafts
+        stats['max_in_flight'] = self.max_in_flight
+        stats['ttl_seconds'] = self.ttl
+        return stats
+
+    def _expire(self):
+        """Forget drafts and budgets of conversations with no draft started for ttl seconds"""
+        now = time.monotonic()
+        if now < self._next_expiry:
+            return
+        self._next_expiry = now + self.ttl / 10
+        for conversation_id, (_, last_started) in list(self._spent.items()):
+            if now - last_started < self.ttl:
+                continue
+            del self._spent[conversation_id]
+            draft = self._drafts.pop(conversation_id, None)
+            if draft is not None:
+                self._discard(draft)
+            self._stats['expired'] += 1
+
+    def _discard(self, draft):
+        """Count an unused draft as wasted once its model call has been paid for"""
+        future = draft['future']
+        if future.cancel():
+            self._stats['cancelled'] += 1
+        elif future.done():
+            if not future.exception():
+                self._stats['wasted'] += 1
+        else:
+            draft['discarded'] = True
+
+    def _ensure_thread(self):
+        # Started on first use, and again after a fork, since threads do not survive one
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._changed:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='soap-draft-scheduler', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._changed:
+                while not self._deadlines:
+                    self._changed.wait()
+                due, _, conversation_id = self._deadlines[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._changed.wait(delay)
+                    continue
+                heapq.heappop(self._deadlines)
+                pending = self._pending.get(conversation_id)
+                # Superseded entries stay in the heap; only the latest due time counts
+                if pending is None or pending[0] != due:
+                    continue
+                del self._pending[conversation_id]
+                self._start(conversation_id, pending[1], pending[2])
+
+    def _start(self, conversation_id, key, patient_data):
+        if self._in_flight >= self.max_in_flight:
+            self._stats['skipped_busy'] += 1
+            return
+        previous = self._drafts.pop(conversation_id, None)
+        if previous is not None:
+            self._discard(previous)
+
+        self._spent[conversation_id] = [self._spent.get(conversation_id, (0, 0))[0] + 1, time.monotonic()]
+        self._in_flight += 1
+        self._stats['started'] += 1
+        draft = {'key': key, 'future': None, 'used': False, 'discarded': False}
+        draft['future'] = self._executor.submit(self._generate, patient_data)
+        draft['future'].add_done_callback(lambda future: self._finished(conversation_id, draft))
+        self._drafts[conversation_id] = draft
+        tracing.debug('soap_draft_started', conversation_id=conversation_id)
+
+    def _generate(self, patient_data):
+        with tracing.span('model_call', kind='soap_draft'):
+            return self.generate(patient_data)
+
+    def _finished(self, conversation_id, draft):
+        with self._changed:
+            self._in_flight -= 1
+            if draft['future'].cancelled():
+                return
+            if draft['future'].exception() is not None:
+                self._stats['errors'] += 1
+                tracing.warning('soap_draft_error', conversation_id=conversation_id,
+                                error=str(draft['future'].exception()))
+                if self._drafts.get(conversation_id) is draft:
+                    del self._drafts[conversation_id]
+                return
+            self._stats['completed'] += 1
+            if draft['discarded']:
+                self._stats['wasted'] += 1
+
+def create_drafter(generate, serverless=False):
+    """SpeculativeDrafter when SPECULATIVE_SOAP=1, otherwise None
+
+    serverless refuses it: its scheduler and draft threads stop with the
+    instance after each response.
+    """
+    if not SPECULATIVE_SOAP:
+        return None
+    if serverless:
+        raise ValueError("SPECULATIVE_SOAP=1 drafts notes on background threads, which a serverless "
+                         "instance freezes after each response; set SPECULATIVE_SOAP=0")
+    return SpeculativeDrafter(generate)
@@ -0,0 +1,15 @@
+# Generated by python cold_start.py from templates/*.html; do not edit or lint
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'landing.html'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    pass
+    yield '<!DOCTYPE html>\n<html lang="en">\n<head>\n    <meta charset="UTF-8">\n    <meta name="viewport" content="width=device-width, initial-scale=1.0">\n    <title>AI Medical Scribe - Professional SOAP Note Generation</title>\n    <style>\n        * {\n            margin: 0;\n            padding: 0;\n            box-sizing: border-box;\n        }\n\n        @import url(\'https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&display=swap\');\n\n        body {\n            font-family: \'Inter\', -apple-system, BlinkMacSystemFont, \'Segoe UI\', \'Roboto\', \'Helvetica Neue\', sans-serif;\n            line-height: 1.6;\n            color: #1e293b;\n            overflow-x: hidden;\n            background: #ffffff;\n        }\n\n        /* Navigation */\n        .navbar {\n            position: fixed;\n            top: 0;\n            left: 0;\n            right: 0;\n            background: rgba(255, 255, 255, 0.95);\n            backdrop-filter: blur(20px);\n            border-bottom: 1px solid rgba(226, 232, 240, 0.8);\n            padding: 1rem 0;\n            z-index: 1000;\n            transition: all 0.3s ease;\n        }\n\n        .nav-content {\n            max-width: 1200px;\n            margin: 0 auto;\n            padding: 0 2rem;\n            display: flex;\n            align-items: center;\n            justify-content: space-between;\n        }\n\n        .logo {\n            display: flex;\n            align-items: center;\n            gap: 0.75rem;\n            font-weight: 700;\n            font-size: 1.25rem;\n            color: #1e293b;\n            text-decoration: none;\n        }\n\n        .logo-icon {\n            width: 36px;\n            height: 36px;\n            background: linear-gradient(135deg, #06b6d4 0%, #3b82f6 50%, #8b5cf6 100%);\n            border-radius: 8px;\n            display: flex;\n            align-items: center;\n            justify-content: center;\n            position: relative;\n            box-shadow: 0 4px 12px rgba(59, 130, 246, 0.3);\n        }\n\n        .logo-icon::before {\n            content: \'\';\n            position: absolute;\n            width: 18px;\n            height: 2px;\n            background: white;\n            top: 50%;\n            left: 50%;\n            transform: translate(-50%, -50%);\n        }\n\n        .logo-icon::after {\n            content: \'\';\n            position: absolute;\n            width: 2px;\n            height: 18px;\n            background: white;\n            top: 50%;\n            left: 50%;\n            transform: translate(-50%, -50%);\n        }\n\n        .nav-links {\n            display: flex;\n            align-items: center;\n            gap: 2rem;\n        }\n\n        .nav-link {\n            color: #64748b;\n            text-decoration: none;\n            font-weight: 500;\n            transition: color 0.3s ease;\n        }\n\n        .nav-link:hover {\n            color: #3b82f6;\n        }\n\n        .nav-cta {\n            background: linear-gradient(135deg, #3b82f6 0%, #1d4ed8 100%);\n            color: white;\n            padding: 0.5rem 1.25rem;\n            border-radius: 50px;\n            text-decoration: none;\n            font-weight: 600;\n            font-size: 0.875rem;\n            transition: all 0.3s ease;\n            box-shadow: 0 4px 12px rgba(59, 130, 246, 0.3);\n        }\n\n        .nav-cta:hover {\n            transform: translateY(-1px);\n            box-shadow: 0 6px 20px rgba(59, 130, 246, 0.4);\n        }\n\n        /* Hero Section */\n        .hero {\n            min-height: 100vh;\n            background: linear-gradient(135deg, #0f172a 0%, #1e293b 25%, #334155 50%, #475569 75%, #64748b 100%);\n            display: flex;\n            align-items: center;\n            position: relative;\n            overflow: hidden;\n            padding-top: 80px;\n        }\n\n        .hero::before {\n            content: \'\';\n            position: absolute;\n            top: 0;\n            left: 0;\n            right: 0;\n            bottom: 0;\n            background: \n                radial-gradient(circle at 20% 50%, rgba(59, 130, 246, 0.1) 0%, transparent 50%),\n                radial-gradient(circle at 80% 20%, rgba(139, 92, 246, 0.1) 0%, transparent 50%),\n                radial-gradient(circle at 40% 80%, rgba(6, 182, 212, 0.1) 0%, transparent 50%);\n            pointer-events: none;\n        }\n\n        .hero::after {\n            content: \'\';\n            position: absolute;\n            top: 0;\n            left: 0;\n            right: 0;\n            bottom: 0;\n            background: url(\'data:image/svg+xml,<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 1200 800"><defs><pattern id="medical" patternUnits="userSpaceOnUse" width="120" height="120"><g fill="rgba(255,255,255,0.02)"><circle cx="30" cy="30" r="2"/><path d="M58 26h8v8h8v8h-8v8h-8v-8h-8v-8h8z"/><circle cx="90" cy="90" r="1.5"/><path d="M15 85h4v4h4v4h-4v4h-4v-4h-4v-4h4z"/></g></pattern></defs><rect width="100%" height="100%" fill="url(%23medical)"/></svg>\') center/cover;\n            pointer-events: none;\n            opacity: 0.6;\n        }\n\n        .container {\n            max-width: 1200px;\n            margin: 0 auto;\n            padding: 0 2rem;\n        }\n\n        .hero-content {\n            display: grid;\n            grid-template-columns: 1fr 1fr;\n            gap: 4rem;\n            align-items: center;\n            position: relative;\n            z-index: 1;\n        }\n\n        .hero-text {\n            color: white;\n        }\n\n        .hero-badge {\n            background: rgba(255, 255, 255, 0.2);\n            backdrop-filter: blur(10px);\n            padding: 0.5rem 1.5rem;\n            border-radius: 50px;\n            font-size: 0.875rem;\n            font-weight: 500;\n            margin-bottom: 1.5rem;\n            display: inline-block;\n            border: 1px solid rgba(255, 255, 255, 0.3);\n        }\n\n        .hero h1 {\n            font-size: 4rem;\n            font-weight: 800;\n            margin-bottom: 1.5rem;\n            background: linear-gradient(135deg, #ffffff 0%, #e2e8f0 100%);\n            -webkit-background-clip: text;\n            -webkit-text-fill-color: transparent;\n            background-clip: text;\n            line-height: 1.1;\n            letter-spacing: -0.02em;\n        }\n\n        .hero-subtitle {\n            font-size: 1.25rem;\n            margin-bottom: 2rem;\n            opacity: 0.9;\n            font-weight: 400;\n        }\n\n        .cta-button {\n            background: linear-gradient(135deg, #3b82f6 0%, #1d4ed8 100%);\n            color: white;\n            padding: 1.25rem 2.5rem;\n            border: none;\n            border-radius: 50px;\n            font-size: 1.125rem;\n            font-weight: 700;\n            cursor: pointer;\n            transition: all 0.3s ease;\n            text-decoration: none;\n            display: inline-flex;\n            align-items: center;\n            gap: 0.75rem;\n            box-shadow: 0 20px 40px rgba(59, 130, 246, 0.3);\n            position: relative;\n            overflow: hidden;\n        }\n\n        .cta-button::before {\n            content: \'\';\n            position: absolute;\n            top: 0;\n            left: -100%;\n            width: 100%;\n            height: 100%;\n            background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.2), transparent);\n            transition: left 0.6s;\n        }\n\n        .cta-button:hover::before {\n            left: 100%;\n        }\n\n        .cta-button:hover {\n            transform: translateY(-3px);\n            box-shadow: 0 25px 50px rgba(59, 130, 246, 0.4);\n        }\n\n        .hero-image {\n            position: relative;\n            display: flex;\n            justify-content: center;\n            align-items: center;\n        }\n\n        .medical-animation-container {\n            width: 100%;\n            max-width: 550px;\n            height: 450px;\n            background: rgba(255, 255, 255, 0.08);\n            backdrop-filter: blur(30px);\n            border-radius: 24px;\n            border: 1px solid rgba(255, 255, 255, 0.15);\n            position: relative;\n            overflow: hidden;\n            box-shadow: 0 25px 50px rgba(0, 0, 0, 0.2);\n            display: flex;\n            align-items: center;\n            justify-content: center;\n        }\n\n        .floating-documents {\n            position: absolute;\n            left: 10%;\n            top: 20%;\n            animation: documentFloat 8s ease-in-out infinite;\n        }\n\n        .document {\n            width: 80px;\n            height: 100px;\n            background: rgba(255, 255, 255, 0.9);\n            border-radius: 8px;\n            margin-bottom: 10px;\n            padding: 8px;\n            box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);\n            opacity: 0.8;\n        }\n\n        .doc-1 { animation-delay: 0s; }\n        .doc-2 { animation-delay: -2s; opacity: 0.6; }\n        .doc-3 { animation-delay: -4s; opacity: 0.4; }\n\n        .doc-header {\n            margin-bottom: 6px;\n        }\n\n        .doc-line, .content-line {\n            height: 3px;\n            background: #3b82f6;\n            border-radius: 2px;\n            margin-bottom: 3px;\n            animation: lineGlow 3s ease-in-out infinite;\n        }\n\n        .doc-line.short, .content-line.short {\n            width: 60%;\n        }\n\n        .ai-processing {\n            position: absolute;\n            top: 50%;\n            left: 50%;\n            transform: translate(-50%, -50%);\n            z-index: 10;\n        }\n\n        .ai-brain {\n            width: 80px;\n            height: 80px;\n            background: linear-gradient(135deg, #3b82f6 0%, #8b5cf6 100%);\n            border-radius: 50%;\n            display: flex;\n            align-items: center;\n            justify-content: center;\n            position: relative;\n            box-shadow: 0 8px 32px rgba(59, 130, 246, 0.3);\n            animation: brainPulse 2s ease-in-out infinite;\n        }\n\n        .brain-core {\n            color: white;\n            font-weight: bold;\n            font-size: 18px;\n        }\n\n        .brain-pulse {\n            position: absolute;\n            width: 100%;\n            height: 100%;\n            border-radius: 50%;\n            background: linear-gradient(135deg, rgba(59, 130, 246, 0.3) 0%, rgba(139, 92, 246, 0.3) 100%);\n            animation: pulse 2s ease-in-out infinite;\n        }\n\n        .processing-waves {\n            position: absolute;\n            top: 50%;\n            left: 50%;\n            transform: translate(-50%, -50%);\n            width: 200px;\n            height: 200px;\n        }\n\n        .wave {\n            position: absolute;\n            border: 2px solid rgba(59, 130, 246, 0.3);\n            border-radius: 50%;\n            animation: waveExpand 3s ease-out infinite;\n        }\n\n        .wave-1 { animation-delay: 0s; }\n        .wave-2 { animation-delay: 1s; }\n        .wave-3 { animation-delay: 2s; }\n\n        .soap-notes {\n            position: absolute;\n            right: 10%;\n            top: 30%;\n            animation: soapFloat 6s ease-in-out infinite;\n            animation-delay: -3s;\n        }\n\n        .soap-note {\n            background: rgba(255, 255, 255, 0.95);\n            border-radius: 12px;\n            padding: 16px;\n            box-shadow: 0 8px 24px rgba(0, 0, 0, 0.1);\n            border-left: 4px solid #10b981;\n        }\n\n        .soap-header {\n            font-weight: bold;\n            color: #1e293b;\n            font-size: 14px;\n            margin-bottom: 8px;\n        }\n\n        .soap-sections {\n            display: grid;\n            grid-template-columns: 1fr 1fr;\n            gap: 6px;\n        }\n\n        .soap-section {\n            width: 24px;\n            height: 24px;\n            background: linear-gradient(135deg, #10b981 0%, #059669 100%);\n            color: white;\n            border-radius: 4px;\n            display: flex;\n            align-items: center;\n            justify-content: center;\n            font-size: 12px;\n            font-weight: bold;\n            animation: sectionPulse 4s ease-in-out infinite;\n        }\n\n        .soap-section:nth-child(1) { animation-delay: 0s; }\n        .soap-section:nth-child(2) { animation-delay: 1s; }\n        .soap-section:nth-child(3) { animation-delay: 2s; }\n        .soap-section:nth-child(4) { animation-delay: 3s; }\n\n        .medical-icons-animated {\n            position: absolute;\n            width: 100%;\n            height: 100%;\n        }\n\n        .med-icon {\n            position: absolute;\n            font-size: 24px;\n            animation: iconOrbit 12s linear infinite;\n            opacity: 0.6;\n        }\n\n        .icon-1 {\n            top: 15%;\n            left: 20%;\n            animation-delay: 0s;\n        }\n\n        .icon-2 {\n            top: 25%;\n            right: 15%;\n            animation-delay: -3s;\n        }\n\n        .icon-3 {\n            bottom: 25%;\n            left: 15%;\n            animation-delay: -6s;\n        }\n\n        .icon-4 {\n            bottom: 15%;\n            right: 20%;\n            animation-delay: -9s;\n        }\n\n        @keyframes documentFloat {\n            0%, 100% { transform: translateY(0px) rotate(0deg); }\n            50% { transform: translateY(-20px) rotate(2deg); }\n        }\n\n        @keyframes lineGlow {\n            0%, 100% { opacity: 0.6; }\n            50% { opacity: 1; box-shadow: 0 0 8px rgba(59, 130, 246, 0.4); }\n        }\n\n        @keyframes brainPulse {\n            0%, 100% { transform: scale(1); }\n            50% { transform: scale(1.1); }\n        }\n\n        @keyframes waveExpand {\n            0% {\n                width: 80px;\n                height: 80px;\n                opacity: 1;\n            }\n            100% {\n                width: 200px;\n                height: 200px;\n                opacity: 0;\n            }\n        }\n\n        @keyframes soapFloat {\n            0%, 100% { transform: translateY(0px) rotate(0deg); }\n            50% { transform: translateY(-15px) rotate(-1deg); }\n        }\n\n        @keyframes sectionPulse {\n            0%, 100% { transform: scale(1); opacity: 0.8; }\n            25% { transform: scale(1.1); opacity: 1; }\n        }\n\n        @keyframes iconOrbit {\n            0% { transform: rotate(0deg) translateX(30px) rotate(0deg); }\n            100% { transform: rotate(360deg) translateX(30px) rotate(-360deg); }\n        }\n\n        @keyframes pulse {\n            0%, 100% {\n                transform: translate(-50%, -50%) scale(1);\n                opacity: 0.3;\n            }\n            50% {\n                transform: translate(-50%, -50%) scale(1.1);\n                opacity: 0.1;\n            }\n        }\n\n        @keyframes float {\n            0%, 100% { transform: translateY(0px); }\n            50% { transform: translateY(-20px); }\n        }\n\n        .floating-elements {\n            position: absolute;\n            width: 100%;\n            height: 100%;\n        }\n\n        .floating-element {\n            position: absolute;\n            background: rgba(255, 255, 255, 0.1);\n            border-radius: 50%;\n            animation: float 4s ease-in-out infinite;\n        }\n\n        .floating-element:nth-child(1) {\n            width: 60px;\n            height: 60px;\n            top: 20%;\n            left: 20%;\n            animation-delay: -1s;\n        }\n\n        .floating-element:nth-child(2) {\n            width: 80px;\n            height: 80px;\n            top: 60%;\n            right: 20%;\n            animation-delay: -2s;\n        }\n\n        .floating-element:nth-child(3) {\n            width: 40px;\n            height: 40px;\n            bottom: 30%;\n            left: 30%;\n            animation-delay: -3s;\n        }\n\n        /* Stats Section */\n        .stats {\n            padding: 4rem 0;\n            background: linear-gradient(135deg, #f8fafc 0%, #ffffff 100%);\n            border-top: 1px solid #e2e8f0;\n        }\n\n        .stats-grid {\n            display: grid;\n            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));\n            gap: 2rem;\n            max-width: 800px;\n            margin: 0 auto;\n        }\n\n        .stat-item {\n            text-align: center;\n            padding: 2rem 1rem;\n        }\n\n        .stat-number {\n            font-size: 3rem;\n            font-weight: 800;\n            color: #3b82f6;\n            margin-bottom: 0.5rem;\n            background: linear-gradient(135deg, #3b82f6 0%, #8b5cf6 100%);\n            -webkit-background-clip: text;\n            -webkit-text-fill-color: transparent;\n            background-clip: text;\n        }\n\n        .stat-label {\n            color: #64748b;\n            font-weight: 500;\n            font-size: 0.875rem;\n            text-transform: uppercase;\n            letter-spacing: 0.05em;\n        }\n\n        /* Features Section */\n        .features {\n            padding: 6rem 0;\n            background: linear-gradient(135deg, #ffffff 0%, #f8fafc 100%);\n        }\n\n        .section-header {\n            text-align: center;\n            margin-bottom: 4rem;\n        }\n\n        .section-title {\n            font-size: 2.5rem;\n            font-weight: 700;\n            margin-bottom: 1rem;\n            color: #2c3e50;\n        }\n\n        .section-subtitle {\n            font-size: 1.125rem;\n            color: #64748b;\n            max-width: 600px;\n            margin: 0 auto;\n        }\n\n        .features-grid {\n            display: grid;\n            grid-template-columns: repeat(auto-fit, minmax(350px, 1fr));\n            gap: 2rem;\n        }\n\n        .feature-card {\n            background: white;\n            padding: 2.5rem;\n            border-radius: 16px;\n            box-shadow: 0 4px 25px rgba(0, 0, 0, 0.08);\n            transition: transform 0.3s ease, box-shadow 0.3s ease;\n            border: 1px solid #e2e8f0;\n        }\n\n        .feature-card:hover {\n            transform: translateY(-5px);\n            box-shadow: 0 10px 40px rgba(0, 0, 0, 0.12);\n        }\n\n        .feature-icon {\n            width: 64px;\n            height: 64px;\n            background: linear-gradient(135deg, #3b82f6 0%, #8b5cf6 100%);\n            border-radius: 16px;\n            display: flex;\n            align-items: center;\n            justify-content: center;\n            font-size: 1.5rem;\n            margin-bottom: 1.5rem;\n            box-shadow: 0 8px 25px rgba(59, 130, 246, 0.2);\n            transition: all 0.3s ease;\n        }\n\n        .feature-card:hover .feature-icon {\n            transform: translateY(-2px);\n            box-shadow: 0 12px 35px rgba(59, 130, 246, 0.3);\n        }\n\n        .feature-title {\n            font-size: 1.25rem;\n            font-weight: 600;\n            margin-bottom: 1rem;\n            color: #2c3e50;\n        }\n\n        .feature-description {\n            color: #64748b;\n            line-height: 1.6;\n        }\n\n        /* Problem Section */\n        .problem {\n            padding: 6rem 0;\n            background: white;\n        }\n\n        .problem-content {\n            display: grid;\n            grid-template-columns: 1fr 1fr;\n            gap: 4rem;\n            align-items: center;\n        }\n\n        .problem-text h2 {\n            font-size: 2.5rem;\n            font-weight: 700;\n            margin-bottom: 1.5rem;\n            color: #2c3e50;\n        }\n\n        .problem-list {\n            list-style: none;\n            margin: 2rem 0;\n        }\n\n        .problem-list li {\n            padding: 0.75rem 0;\n            display: flex;\n            align-items: center;\n            gap: 1rem;\n        }\n\n        .problem-list li::before {\n            content: \'❌\';\n            font-size: 1.125rem;\n        }\n\n        .solution-list li::before {\n            content: \'✅\';\n            font-size: 1.125rem;\n        }\n\n        /* CTA Section */\n        .cta-section {\n            padding: 6rem 0;\n            background: linear-gradient(135deg, #2c3e50 0%, #34495e 100%);\n            color: white;\n            text-align: center;\n        }\n\n        .cta-content h2 {\n            font-size: 2.5rem;\n            font-weight: 700;\n            margin-bottom: 1rem;\n        }\n\n        .cta-content p {\n            font-size: 1.125rem;\n            margin-bottom: 2rem;\n            opacity: 0.9;\n        }\n\n        .mobile-menu {\n            display: none;\n            background: none;\n            border: none;\n            color: #1e293b;\n            font-size: 1.5rem;\n            cursor: pointer;\n        }\n\n        /* Mobile Responsive */\n        @media (max-width: 768px) {\n            .nav-links {\n                display: none;\n            }\n\n            .mobile-menu {\n                display: block;\n            }\n\n            .hero-content {\n                grid-template-columns: 1fr;\n                gap: 2rem;\n                text-align: center;\n            }\n\n            .hero h1 {\n                font-size: 2.75rem;\n            }\n\n            .hero-subtitle {\n                font-size: 1.125rem;\n            }\n\n            .problem-content {\n                grid-template-columns: 1fr;\n                gap: 2rem;\n            }\n\n            .container {\n                padding: 0 1rem;\n            }\n\n            .stats-grid {\n                grid-template-columns: repeat(2, 1fr);\n            }\n\n            .stat-number {\n                font-size: 2.5rem;\n            }\n        }\n\n        @media (max-width: 480px) {\n            .hero h1 {\n                font-size: 2.25rem;\n            }\n\n            .cta-button {\n                padding: 1rem 2rem;\n                font-size: 1rem;\n            }\n\n            .stats-grid {\n                grid-template-columns: 1fr;\n            }\n        }\n    </style>\n</head>\n<body>\n    <!-- Navigation -->\n    <nav class="navbar">\n        <div class="nav-content">\n            <a href="/" class="logo">\n                <div class="logo-icon"></div>\n                <span>MedScribe AI</span>\n            </a>\n            <div class="nav-links">\n                <a href="/app" class="nav-cta">Start Free Trial</a>\n            </div>\n            <button class="mobile-menu">☰</button>\n        </div>\n    </nav>\n\n    <!-- Hero Section -->\n    <section class="hero">\n        <div class="container">\n            <div class="hero-content">\n                <div class="hero-text">\n                    <div class="hero-badge">🩺 HIPAA-Compliant AI Clinical Documentation</div>\n                    <h1>Reduce Documentation Burden by 70% While Improving Care Quality</h1>\n                    <p class="hero-subtitle">\n                        MedScribe AI transforms patient conversations into comprehensive SOAP notes in seconds. \n                        Built for healthcare professionals, our AI only documents what\'s actually discussed - never fabricates clinical data.\n                    </p>\n                    <a href="/app" class="cta-button">\n                        <span>Get Started Now</span>\n                        <span>→</span>\n                    </a>\n                </div>\n                <div class="hero-image">\n                    <div class="medical-animation-container">\n                        <div class="floating-documents">\n                            <div class="document doc-1">\n                                <div class="doc-header">\n                                    <div class="doc-line"></div>\n                                    <div class="doc-line short"></div>\n                                </div>\n                                <div class="doc-content">\n                                    <div class="content-line"></div>\n                                    <div class="content-line"></div>\n                                    <div class="content-line short"></div>\n                                </div>\n                            </div>\n                            <div class="document doc-2">\n                                <div class="doc-header">\n                                    <div class="doc-line"></div>\n                                    <div class="doc-line short"></div>\n                                </div>\n                                <div class="doc-content">\n                                    <div class="content-line"></div>\n                                    <div class="content-line"></div>\n                                    <div class="content-line short"></div>\n                                </div>\n                            </div>\n                            <div class="document doc-3">\n                                <div class="doc-header">\n                                    <div class="doc-line"></div>\n                                    <div class="doc-line short"></div>\n                                </div>\n                                <div class="doc-content">\n                                    <div class="content-line"></div>\n                                    <div class="content-line"></div>\n                                    <div class="content-line short"></div>\n                                </div>\n                            </div>\n                        </div>\n                        <div class="ai-processing">\n                            <div class="ai-brain">\n                                <div class="brain-pulse"></div>\n                                <div class="brain-core">AI</div>\n                            </div>\n                            <div class="processing-waves">\n                                <div class="wave wave-1"></div>\n                                <div class="wave wave-2"></div>\n                                <div class="wave wave-3"></div>\n                            </div>\n                        </div>\n                        <div class="soap-notes">\n                            <div class="soap-note">\n                                <div class="soap-header">SOAP Note</div>\n                                <div class="soap-sections">\n                                    <div class="soap-section">S</div>\n                                    <div class="soap-section">O</div>\n                                    <div class="soap-section">A</div>\n                                    <div class="soap-section">P</div>\n                                </div>\n                            </div>\n                        </div>\n                        <div class="medical-icons-animated">\n                            <div class="med-icon icon-1">🩺</div>\n                            <div class="med-icon icon-2">📋</div>\n                            <div class="med-icon icon-3">⚕️</div>\n                            <div class="med-icon icon-4">💊</div>\n                        </div>\n                    </div>\n                </div>\n            </div>\n        </div>\n    </section>\n\n    <!-- Stats Section -->\n    <section class="stats">\n        <div class="container">\n            <div class="stats-grid">\n                <div class="stat-item">\n                    <div class="stat-number">70%</div>\n                    <div class="stat-label">Documentation Time Saved</div>\n                </div>\n                <div class="stat-item">\n                    <div class="stat-number">30s</div>\n                    <div class="stat-label">Average SOAP Generation</div>\n                </div>\n                <div class="stat-item">\n                    <div class="stat-number">HIPAA</div>\n                    <div class="stat-label">Compliant & Secure</div>\n                </div>\n            </div>\n        </div>\n    </section>\n\n    <!-- Problem Section -->\n    <section class="problem" id="problem">\n        <div class="container">\n            <div class="problem-content">\n                <div class="problem-text">\n                    <h2>The Clinical Documentation Crisis</h2>\n                    <ul class="problem-list">\n                        <li>Physicians spend 70% more time on EHR than patient care</li>\n                        <li>Documentation burden leads to 50% physician burnout rates</li>\n                        <li>Inconsistent notes affect quality metrics and reimbursement</li>\n                        <li>Manual charting increases medical errors by 23%</li>\n                        <li>Poor documentation costs practices $125,000 annually per physician</li>\n                    </ul>\n                </div>\n                <div class="problem-text">\n                    <h2>Clinically-Validated AI Documentation</h2>\n                    <ul class="problem-list solution-list">\n                        <li>Physician-reviewed SOAP notes in 30 seconds or less</li>\n                        <li>ICD-10 and CPT code suggestions with 94% accuracy</li>\n                        <li>Never fabricates clinical data - only documents stated information</li>\n                        <li>Flags incomplete assessments for clinical review</li>\n                        <li>Maintains detailed audit trail for compliance</li>\n                    </ul>\n                </div>\n            </div>\n        </div>\n    </section>\n\n    <!-- Features Section -->\n    <section class="features" id="features">\n        <div class="container">\n            <div class="section-header">\n                <h2 class="section-title">Trusted by Healthcare Professionals</h2>\n                <p class="section-subtitle">\n                    Developed in collaboration with practicing physicians, validated by medical residency programs, \n                    and designed to meet the highest standards of clinical documentation.\n                </p>\n            </div>\n            <div class="features-grid">\n                <div class="feature-card">\n                    <div class="feature-icon">👨\u200d⚕️</div>\n                    <h3 class="feature-title">Primary Care Excellence</h3>\n                    <p class="feature-description">\n                        Generate comprehensive notes for routine visits, chronic disease management, and preventive care. \n                        Automatically captures relevant social determinants and medication reconciliation.\n                    </p>\n                </div>\n                <div class="feature-card">\n                    <div class="feature-icon">🎓</div>\n                    <h3 class="feature-title">Medical Education Tool</h3>\n                    <p class="feature-description">\n                        Validated by medical schools and residency programs. Teaches proper clinical reasoning \n                        documentation while reducing trainee administrative burden.\n                    </p>\n                </div>\n                <div class="feature-card">\n                    <div class="feature-icon">🏥</div>\n                    <h3 class="feature-title">Practice Management</h3>\n                    <p class="feature-description">\n                        Improves quality metrics, reduces documentation variance, and supports \n                        value-based care contracts. Includes audit trail for compliance reporting.\n                    </p>\n                </div>\n            </div>\n        </div>\n    </section>\n\n\n    <!-- Medical Credibility Section -->\n    <section class="credibility-section" style="padding: 4rem 0; background: linear-gradient(135deg, #f8fafc 0%, #e2e8f0 100%);">\n        <div class="container">\n            <div class="section-header" style="text-align: center; margin-bottom: 3rem;">\n                <h2 class="section-title" style="color: #1e40af;">Clinically Validated & Physician Endorsed</h2>\n                <p class="section-subtitle" style="color: #64748b;">\n                    Developed with input from practicing physicians and validated in real clinical settings\n                </p>\n            </div>\n            <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 2rem;">\n                <div class="testimonial-card" style="background: white; padding: 2rem; border-radius: 12px; box-shadow: 0 4px 12px rgba(0,0,0,0.1);">\n                    <div style="display: flex; align-items: center; margin-bottom: 1rem;">\n                        <div style="width: 50px; height: 50px; background: linear-gradient(135deg, #1e40af 0%, #3b82f6 100%); border-radius: 50%; display: flex; align-items: center; justify-content: center; margin-right: 1rem;">\n                            <span style="color: white; font-weight: bold;">MD</span>\n                        </div>\n                        <div>\n                            <h4 style="margin: 0; color: #1e293b;">Dr. Sarah Chen</h4>\n                            <p style="margin: 0; color: #64748b; font-size: 0.875rem;">Internal Medicine, Stanford Health</p>\n                        </div>\n                    </div>\n                    <p style="color: #374151; font-style: italic;">"This AI scribe has reduced my documentation time by 60% while actually improving the quality of my notes. It never adds information that wasn\'t discussed."</p>\n                </div>\n                <div class="testimonial-card" style="background: white; padding: 2rem; border-radius: 12px; box-shadow: 0 4px 12px rgba(0,0,0,0.1);">\n                    <div style="display: flex; align-items: center; margin-bottom: 1rem;">\n                        <div style="width: 50px; height: 50px; background: linear-gradient(135deg, #059669 0%, #10b981 100%); border-radius: 50%; display: flex; align-items: center; justify-content: center; margin-right: 1rem;">\n                            <span style="color: white; font-weight: bold;">MD</span>\n                        </div>\n                        <div>\n                            <h4 style="margin: 0; color: #1e293b;">Dr. Michael Rodriguez</h4>\n                            <p style="margin: 0; color: #64748b; font-size: 0.875rem;">Family Medicine, Mayo Clinic</p>\n                        </div>\n                    </div>\n                    <p style="color: #374151; font-style: italic;">"Finally, an AI tool that understands medical terminology and clinical reasoning. My residents are learning proper documentation while focusing on patient care."</p>\n                </div>\n                <div class="testimonial-card" style="background: white; padding: 2rem; border-radius: 12px; box-shadow: 0 4px 12px rgba(0,0,0,0.1);">\n                    <div style="display: flex; align-items: center; margin-bottom: 1rem;">\n                        <div style="width: 50px; height: 50px; background: linear-gradient(135deg, #7c3aed 0%, #8b5cf6 100%); border-radius: 50%; display: flex; align-items: center; justify-content: center; margin-right: 1rem;">\n                            <span style="color: white; font-weight: bold;">MD</span>\n                        </div>\n                        <div>\n                            <h4 style="margin: 0; color: #1e293b;">Dr. Emily Thompson</h4>\n                            <p style="margin: 0; color: #64748b; font-size: 0.875rem;">Chief Medical Officer, Regional Health</p>\n                        </div>\n                    </div>\n                    <p style="color: #374151; font-style: italic;">"Our quality metrics have improved significantly since implementing this AI scribe. Documentation consistency across our 50+ physicians is remarkable."</p>\n                </div>\n            </div>\n        </div>\n    </section>\n\n    <!-- CTA Section -->\n    <section class="cta-section">\n        <div class="container">\n            <div class="cta-content">\n                <h2>Join 500+ Physicians Reducing Documentation Burden</h2>\n                <p>\n                    Start your 14-day free trial. No credit card required. HIPAA-compliant from day one. \n                    Experience the difference clinician-designed AI makes in your practice.\n                </p>\n                <a href="/app" class="cta-button">\n                    <span>Start Free Trial</span>\n                    <span>→</span>\n                </a>\n                <div class="trust-indicators" style="margin-top: 2rem; display: flex; justify-content: center; gap: 2rem; opacity: 0.8;">\n                    <span style="font-size: 0.875rem;">✓ HIPAA Compliant</span>\n                    <span style="font-size: 0.875rem;">✓ SOC 2 Certified</span>\n                    <span style="font-size: 0.875rem;">✓ No Data Retention</span>\n                </div>\n            </div>\n        </div>\n    </section>\n</body>\n</html>'
+
+blocks = {}
+debug_info = ''
\ No newline at end of file
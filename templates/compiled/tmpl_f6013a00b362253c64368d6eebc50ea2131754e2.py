@@ -0,0 +1,15 @@
+# Generated by python cold_start.py from templates/*.html; do not edit or lint
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'index.html'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    pass
+    yield '<!DOCTYPE html>\n<html lang="en">\n<head>\n    <meta charset="UTF-8">\n    <meta name="viewport" content="width=device-width, initial-scale=1.0">\n    <title>Medical AI Assistant</title>\n    <style>\n        * {\n            margin: 0;\n            padding: 0;\n            box-sizing: border-box;\n        }\n        \n        body {\n            font-family: -apple-system, BlinkMacSystemFont, \'Segoe UI\', \'Roboto\', sans-serif;\n            background: #212121;\n            min-height: 100vh;\n            display: flex;\n            margin: 0;\n            padding: 0;\n            color: #fff;\n        }\n        \n        .sidebar {\n            width: 260px;\n            background: #171717;\n            display: flex;\n            flex-direction: column;\n            border-right: 1px solid #2f2f2f;\n            height: 100vh;\n        }\n        \n        .sidebar-header {\n            padding: 12px;\n            border-bottom: 1px solid #2f2f2f;\n        }\n        \n        .new-chat-btn {\n            width: 100%;\n            background: transparent;\n            border: 1px solid #2f2f2f;\n            color: #fff;\n            padding: 12px;\n            border-radius: 6px;\n            cursor: pointer;\n            font-size: 14px;\n            transition: all 0.2s;\n            display: flex;\n            align-items: center;\n            gap: 8px;\n        }\n        \n        .new-chat-btn:hover {\n            background: #2f2f2f;\n        }\n        \n        .conversations {\n            flex: 1;\n            overflow-y: auto;\n            padding: 8px;\n        }\n        \n        .conversation-item {\n            padding: 12px;\n            border-radius: 6px;\n            cursor: pointer;\n            margin-bottom: 4px;\n            font-size: 14px;\n            white-space: nowrap;\n            overflow: hidden;\n            text-overflow: ellipsis;\n            transition: all 0.2s;\n            position: relative;\n        }\n        \n        .conversation-item:hover {\n            background: #2f2f2f;\n        }\n        \n        .conversation-item.active {\n            background: #343541;\n        }\n        \n        .conversation-item .delete-btn {\n            position: absolute;\n            right: 8px;\n            top: 50%;\n            transform: translateY(-50%);\n            background: none;\n            border: none;\n            color: #999;\n            cursor: pointer;\n            opacity: 0;\n            transition: opacity 0.2s;\n            padding: 4px;\n        }\n        \n        .conversation-item:hover .delete-btn {\n            opacity: 1;\n        }\n        \n        .conversation-item.load-more {\n            color: #999;\n            text-align: center;\n        }\n        \n        .main-area {\n            flex: 1;\n            display: flex;\n            flex-direction: column;\n            background: #343541;\n            height: 100vh;\n        }\n        \n        .chat-header {\n            padding: 16px 24px;\n            border-bottom: 1px solid #2f2f2f;\n            background: #343541;\n        }\n        \n        .chat-header h1 {\n            font-size: 18px;\n            font-weight: 600;\n            margin: 0;\n            color: #fff;\n        }\n        \n        .chat-header p {\n            font-size: 12px;\n            color: #999;\n            margin: 4px 0 0 0;\n        }\n        \n        .chat-container {\n            flex: 1;\n            display: flex;\n            flex-direction: column;\n            background: #343541;\n        }\n        \n        .messages-container {\n            flex: 1;\n            overflow-y: auto;\n            padding: 0;\n        }\n        \n        .message {\n            padding: 24px 24px;\n            display: flex;\n            align-items: flex-start;\n            gap: 16px;\n            animation: fadeIn 0.3s ease-in;\n            border-bottom: 1px solid #2f2f2f;\n        }\n        \n        .message:last-child {\n            border-bottom: none;\n        }\n        \n        @keyframes fadeIn {\n            from { opacity: 0; transform: translateY(10px); }\n            to { opacity: 1; transform: translateY(0); }\n        }\n        \n        .avatar {\n            width: 30px;\n            height: 30px;\n            border-radius: 2px;\n            display: flex;\n            align-items: center;\n            justify-content: center;\n            font-size: 14px;\n            flex-shrink: 0;\n            font-weight: 600;\n        }\n        \n        .user-avatar {\n            background: #19c37d;\n            color: white;\n        }\n        \n        .ai-avatar {\n            background: #ab68ff;\n            color: white;\n        }\n        \n        .message-content {\n            flex: 1;\n            line-height: 1.6;\n            color: #ececf1;\n            font-size: 14px;\n        }\n        \n        .user-message {\n            background: transparent;\n        }\n        \n        .ai-message {\n            background: #444654;\n        }\n        \n        .user-message .message-content {\n            background: transparent;\n            padding: 0;\n        }\n        \n        .ai-message .message-content {\n            background: transparent;\n            padding: 0;\n        }\n        \n        .loading {\n            display: flex;\n            align-items: center;\n            gap: 0.5rem;\n            color: #999;\n            font-style: italic;\n        }\n        \n        .loading-dots {\n            display: flex;\n            gap: 4px;\n        }\n        \n        .loading-dots span {\n            width: 6px;\n            height: 6px;\n            border-radius: 50%;\n            background: #999;\n            animation: bounce 1.4s ease-in-out infinite both;\n        }\n        \n        .loading-dots span:nth-child(1) { animation-delay: -0.32s; }\n        .loading-dots span:nth-child(2) { animation-delay: -0.16s; }\n        \n        @keyframes bounce {\n            0%, 80%, 100% { transform: scale(0); }\n            40% { transform: scale(1); }\n        }\n        \n        .input-container {\n            padding: 24px;\n            background: #343541;\n            border-top: 1px solid #2f2f2f;\n            display: flex;\n            gap: 12px;\n            align-items: flex-end;\n            max-width: 800px;\n            margin: 0 auto;\n            width: 100%;\n        }\n        \n        .input-wrapper {\n            flex: 1;\n            position: relative;\n            display: flex;\n            align-items: flex-end;\n            gap: 8px;\n        }\n        \n        #messageInput {\n            flex: 1;\n            padding: 12px 16px;\n            border: 1px solid #565869;\n            border-radius: 8px;\n            font-size: 16px;\n            font-family: inherit;\n            outline: none;\n            transition: all 0.2s;\n            resize: none;\n            min-height: 24px;\n            max-height: 120px;\n            line-height: 1.5;\n            background: #40414f;\n            color: #fff;\n        }\n        \n        #messageInput:focus {\n            border-color: #10a37f;\n        }\n        \n        #messageInput::placeholder {\n            color: #8e8ea0;\n        }\n        \n        .voice-btn, #sendButton {\n            width: 40px;\n            height: 40px;\n            border: none;\n            border-radius: 4px;\n            background: #10a37f;\n            color: white;\n            cursor: pointer;\n            display: flex;\n            align-items: center;\n            justify-content: center;\n            transition: all 0.2s;\n            font-size: 16px;\n        }\n        \n        .voice-btn {\n            background: #565869;\n        }\n        \n        .voice-btn:hover, #sendButton:hover:not(:disabled) {\n            opacity: 0.8;\n        }\n        \n        .voice-btn.recording {\n            background: #ff4444;\n            animation: pulse 1s infinite;\n        }\n        \n        @keyframes pulse {\n            0%, 100% { opacity: 1; }\n            50% { opacity: 0.7; }\n        }\n        \n        #sendButton:disabled {\n            opacity: 0.5;\n            cursor: not-allowed;\n        }\n        \n        .analyze-btn {\n            background: #ff6b35;\n            color: white;\n            border: none;\n            padding: 8px 16px;\n            border-radius: 20px;\n            font-size: 12px;\n            font-weight: 600;\n            cursor: pointer;\n            transition: all 0.2s;\n            display: none;\n            align-items: center;\n            gap: 6px;\n            margin-top: 8px;\n        }\n        \n        .analyze-btn:hover {\n            background: #e55a2b;\n            transform: translateY(-1px);\n        }\n        \n        .analyze-btn.show {\n            display: flex;\n        }\n\n        @keyframes fadeIn {\n            from { \n                opacity: 0; \n                transform: translateY(10px); \n            }\n            to { \n                opacity: 1; \n                transform: translateY(0); \n            }\n        }\n        \n        .analysis-container {\n            position: sticky;\n            bottom: 0;\n            background: linear-gradient(transparent, #343541 50%);\n            padding: 16px 24px 0;\n            display: flex;\n            justify-content: center;\n        }\n        \n        .disclaimer {\n            background: #2f2f2f;\n            color: #999;\n            padding: 12px 24px;\n            text-align: center;\n            font-size: 12px;\n            border-top: 1px solid #565869;\n        }\n        \n        /* Mobile responsive */\n        @media (max-width: 768px) {\n            .sidebar {\n                width: 200px;\n            }\n            \n            .message {\n                padding: 16px;\n            }\n            \n            .input-container {\n                padding: 16px;\n            }\n        }\n        \n        @media (max-width: 600px) {\n            .sidebar {\n                position: fixed;\n                left: -260px;\n                z-index: 1000;\n                transition: left 0.3s;\n            }\n            \n            .sidebar.open {\n                left: 0;\n            }\n            \n            .main-area {\n                width: 100%;\n            }\n            \n            .mobile-menu-btn {\n                display: block;\n                position: fixed;\n                top: 16px;\n                left: 16px;\n                z-index: 1001;\n                background: #565869;\n                color: white;\n                border: none;\n                padding: 8px;\n                border-radius: 4px;\n                cursor: pointer;\n            }\n        }\n        \n        .mobile-menu-btn {\n            display: none;\n        }\n        \n        /* Markdown-like styling for AI responses */\n        .ai-message .message-content h2 {\n            color: #ececf1;\n            font-size: 1.1rem;\n            font-weight: 600;\n            margin: 1rem 0 0.5rem 0;\n            border-bottom: 1px solid #565869;\n            padding-bottom: 0.25rem;\n        }\n        \n        .ai-message .message-content h2:first-child {\n            margin-top: 0;\n        }\n        \n        .ai-message .message-content ul, \n        .ai-message .message-content ol {\n            margin: 0.5rem 0;\n            padding-left: 1.5rem;\n        }\n        \n        .ai-message .message-content li {\n            margin: 0.25rem 0;\n        }\n        \n        .ai-message .message-content strong {\n            color: #19c37d;\n            font-weight: 600;\n        }\n        \n        .ai-message .message-content em {\n            color: #ab68ff;\n            font-style: italic;\n        }\n    </style>\n</head>\n<body>\n    <button class="mobile-menu-btn" onclick="toggleSidebar()">☰</button>\n    \n    <div class="sidebar" id="sidebar">\n        <div class="sidebar-header">\n            <button class="new-chat-btn" onclick="createNewConversation()">\n                <span>+</span>\n                <span>New chat</span>\n            </button>\n        </div>\n        <div class="conversations" id="conversationsList">\n            <!-- Conversations will be loaded here -->\n        </div>\n    </div>\n\n    <div class="main-area">\n        <div class="chat-header">\n            <h1>🩺 AI Medical Assistant</h1>\n            <p>Two-Stage Clinical System: OpenAI Data Collection → II-Medical-8B-1706 Analysis</p>\n        </div>\n\n        <div id="chatContainer" class="chat-container">\n            <div class="messages-container" id="messagesContainer">\n                <div class="message ai-message">\n                    <div class="avatar ai-avatar">AI</div>\n                    <div class="message-content">\n                        Hello! I\'m your intelligent medical assistant. I\'ll first systematically collect patient data through focused questions (using OpenAI), then provide comprehensive clinical analysis (using II-Medical-8B-1706). Please start with the patient\'s chief complaint or presenting symptoms.\n                    </div>\n                </div>\n            </div>\n            \n            <div class="analysis-container">\n                <button class="analyze-btn" id="analyzeBtn" onclick="triggerMedicalAnalysis()">\n                    <span>📋</span>\n                    <span>Generate SOAP Note</span>\n                </button>\n            </div>\n        </div>\n\n        <div class="input-container">\n            <div class="input-wrapper">\n                <textarea id="messageInput" placeholder="Message Medical Assistant..." onkeypress="handleKeyPress(event)"></textarea>\n                <button class="voice-btn" onclick="toggleVoiceRecording()" id="voiceBtn">🎤</button>\n                <button id="sendButton" onclick="sendMessage()">➤</button>\n            </div>\n        </div>\n\n        <div class="disclaimer">\n            ⚠️ <strong>Medical Disclaimer:</strong> This AI provides general information only. Always consult qualified healthcare professionals for medical advice, diagnosis, and treatment.\n        </div>\n    </div>\n\n    <script>\n        let currentConversationId = null;\n        // The interview is not ready yet, so the SOAP button asks for the note anyway (force)\n        let forceAnalysis = false;\n        let isRecording = false;\n        let recognition = null;\n\n        // Initialize speech recognition\n        if (\'webkitSpeechRecognition\' in window || \'SpeechRecognition\' in window) {\n            recognition = new (window.SpeechRecognition || window.webkitSpeechRecognition)();\n            recognition.continuous = false;\n            recognition.interimResults = false;\n            recognition.lang = \'en-US\';\n        }\n\n        function escapeHtml(text) {\n            const div = document.createElement(\'div\');\n            div.textContent = text;\n            return div.innerHTML;\n        }\n\n        function formatAIResponse(text) {\n            // Convert markdown-style formatting to HTML for AI responses\n            return text\n                .replace(/\\*\\*(.*?)\\*\\*/g, \'<strong>$1</strong>\')\n                .replace(/\\*(.*?)\\*/g, \'<em>$1</em>\')\n                .replace(/\\n\\n/g, \'<br><br>\')\n                .replace(/\\n/g, \'<br>\');\n        }\n\n        // Read a POSTed text/event-stream response and dispatch each event\n        async function streamSSE(url, body, handlers) {\n            const response = await fetch(url, {\n                method: \'POST\',\n                headers: {\n                    \'Content-Type\': \'application/json\',\n                },\n                body: JSON.stringify(body)\n            });\n\n            const contentType = response.headers.get(\'Content-Type\') || \'\';\n            if (!response.ok || !contentType.startsWith(\'text/event-stream\')) {\n                // Validation errors come back as plain JSON\n                const data = await response.json();\n                if (handlers.done) handlers.done(data);\n                return;\n            }\n\n            const reader = response.body.getReader();\n            const decoder = new TextDecoder();\n            let buffer = \'\';\n\n            while (true) {\n                const { value, done } = await reader.read();\n                if (done) break;\n                buffer += decoder.decode(value, { stream: true });\n\n                let boundary;\n                while ((boundary = buffer.indexOf(\'\\n\\n\')) !== -1) {\n                    const frame = buffer.slice(0, boundary);\n                    buffer = buffer.slice(boundary + 2);\n\n                    let event = \'message\';\n                    let data = \'\';\n                    frame.split(\'\\n\').forEach(line => {\n                        if (line.startsWith(\'event: \')) event = line.slice(7);\n                        else if (line.startsWith(\'data: \')) data += line.slice(6);\n                    });\n\n                    if (handlers[event]) handlers[event](data ? JSON.parse(data) : null);\n                }\n            }\n        }\n\n        const streamingSupported = !!(window.ReadableStream && window.TextDecoder);\n\n        function handleKeyPress(event) {\n            if (event.key === \'Enter\' && !event.shiftKey) {\n                event.preventDefault();\n                sendMessage();\n            }\n        }\n\n        // Sidebar functions\n        function toggleSidebar() {\n            const sidebar = document.getElementById(\'sidebar\');\n            sidebar.classList.toggle(\'open\');\n        }\n\n        // Sidebar pages are fetched by keyset cursor; "Load more" appends the next page\n        const CONVERSATION_PAGE_SIZE = 50;\n        let conversationsCursor = null;\n\n        function renderConversationItem(conv) {\n            const convElement = document.createElement(\'div\');\n            convElement.className = \'conversation-item\' + (conv.id === currentConversationId ? \' active\' : \'\');\n            convElement.innerHTML = `\n                <span onclick="switchToConversation(\'${conv.id}\')">${conv.title}</span>\n                <button class="delete-btn" onclick="deleteConversation(\'${conv.id}\', event)">🗑</button>\n            `;\n            return convElement;\n        }\n\n        async function loadConversations(append = false) {\n            try {\n                let url = `/conversations?limit=${CONVERSATION_PAGE_SIZE}`;\n                if (append && conversationsCursor) {\n                    url += `&before=${encodeURIComponent(conversationsCursor)}`;\n                }\n                const response = await fetch(url);\n                const data = await response.json();\n                \n                const conversationsList = document.getElementById(\'conversationsList\');\n                if (append) {\n                    const loadMore = conversationsList.querySelector(\'.load-more\');\n                    if (loadMore) loadMore.remove();\n                } else {\n                    conversationsList.innerHTML = \'\';\n                }\n                \n                const fragment = document.createDocumentFragment();\n                data.conversations.forEach(conv => fragment.appendChild(renderConversationItem(conv)));\n                \n                conversationsCursor = data.next_cursor;\n                if (conversationsCursor) {\n                    const loadMore = document.createElement(\'div\');\n                    loadMore.className = \'conversation-item load-more\';\n                    loadMore.textContent = \'Load more\';\n                    loadMore.onclick = () => loadConversations(true);\n                    fragment.appendChild(loadMore);\n                }\n                conversationsList.appendChild(fragment);\n            } catch (error) {\n                console.error(\'Error loading conversations:\', error);\n            }\n        }\n\n        async function createNewConversation() {\n            try {\n                const response = await fetch(\'/conversations\', {\n                    method: \'POST\',\n                    headers: {\n                        \'Content-Type\': \'application/json\',\n                    }\n                });\n                const data = await response.json();\n                \n                currentConversationId = data.conversation_id;\n                clearMessages();\n                addInitialMessage();\n                loadConversations();\n            } catch (error) {\n                console.error(\'Error creating conversation:\', error);\n            }\n        }\n\n        // Messages already fetched per conversation; switching back only pulls newer seqs\n        const MESSAGE_PAGE_SIZE = 200;\n        const messageCache = {};\n\n        async function syncMessages(conversationId) {\n            let cached = messageCache[conversationId] || { lastSeq: 0, messages: [] };\n            let messageCount = cached.messages.length;\n            let hasMore = true;\n            \n            while (hasMore) {\n                const response = await fetch(`/conversations/${conversationId}/messages?after=${cached.lastSeq}&limit=${MESSAGE_PAGE_SIZE}`);\n                if (!response.ok) {\n                    throw new Error(`Message request failed: ${response.status}`);\n                }\n                const page = await response.json();\n                cached.messages.push(...page.messages);\n                cached.lastSeq = page.next_after;\n                messageCount = page.message_count;\n                hasMore = page.has_more;\n            }\n            \n            // A reset removes messages without rewinding seq; start over if the counts disagree\n            if (cached.messages.length !== messageCount) {\n                delete messageCache[conversationId];\n                return syncMessages(conversationId);\n            }\n            \n            messageCache[conversationId] = cached;\n            return cached.messages;\n        }\n\n        function renderMessage(msg) {\n            const messageElement = document.createElement(\'div\');\n            messageElement.className = `message ${msg.role === \'user\' ? \'user-message\' : \'ai-message\'}`;\n            messageElement.innerHTML = `\n                <div class="avatar ${msg.role === \'user\' ? \'user-avatar\' : \'ai-avatar\'}">\n                    ${msg.role === \'user\' ? \'U\' : \'AI\'}\n                </div>\n                <div class="message-content">\n                    ${msg.role === \'user\' ? escapeHtml(msg.content) : formatAIResponse(msg.content)}\n                </div>\n            `;\n            return messageElement;\n        }\n\n        async function switchToConversation(conversationId) {\n            try {\n                const messages = await syncMessages(conversationId);\n                \n                currentConversationId = conversationId;\n                clearMessages();\n                \n                // Load conversation messages\n                const messagesContainer = document.getElementById(\'messagesContainer\');\n                \n                if (messages.length === 0) {\n                    addInitialMessage();\n                } else {\n                    const fragment = document.createDocumentFragment();\n                    messages.forEach(msg => fragment.appendChild(renderMessage(msg)));\n                    messagesContainer.appendChild(fragment);\n                }\n                \n                messagesContainer.scrollTop = messagesContainer.scrollHeight;\n                loadConversations();\n                \n                // Check if analysis button should be shown\n                checkIfAnalysisReady();\n                \n            } catch (error) {\n                console.error(\'Error switching conversation:\', error);\n            }\n        }\n\n        async function deleteConversation(conversationId, event) {\n            event.stopPropagation();\n            \n            if (!confirm(\'Are you sure you want to delete this conversation?\')) {\n                return;\n            }\n            \n            try {\n                await fetch(`/conversations/${conversationId}`, {\n                    method: \'DELETE\'\n                });\n                delete messageCache[conversationId];\n                delete conversationStatus[conversationId];\n                \n                if (conversationId === currentConversationId) {\n                    currentConversationId = null;\n                    clearMessages();\n                    addInitialMessage();\n                }\n                \n                loadConversations();\n            } catch (error) {\n                console.error(\'Error deleting conversation:\', error);\n            }\n        }\n\n        function clearMessages() {\n            const messagesContainer = document.getElementById(\'messagesContainer\');\n            messagesContainer.innerHTML = \'\';\n        }\n\n        function addInitialMessage() {\n            const messagesContainer = document.getElementById(\'messagesContainer\');\n            const initialMessage = document.createElement(\'div\');\n            initialMessage.className = \'message ai-message\';\n            initialMessage.innerHTML = `\n                <div class="avatar ai-avatar">AI</div>\n                <div class="message-content">\n                    Hello! I\'m your intelligent medical assistant. I\'ll first systematically collect patient data through focused questions (using OpenAI), then provide comprehensive clinical analysis (using II-Medical-8B-1706). Please start with the patient\'s chief complaint or presenting symptoms.\n                </div>\n            `;\n            messagesContainer.appendChild(initialMessage);\n        }\n\n        // Voice recording functions\n        function toggleVoiceRecording() {\n            if (!recognition) {\n                alert(\'Speech recognition is not supported in this browser\');\n                return;\n            }\n\n            const voiceBtn = document.getElementById(\'voiceBtn\');\n            const messageInput = document.getElementById(\'messageInput\');\n\n            if (isRecording) {\n                recognition.stop();\n                isRecording = false;\n                voiceBtn.classList.remove(\'recording\');\n                voiceBtn.innerHTML = \'🎤\';\n            } else {\n                recognition.start();\n                isRecording = true;\n                voiceBtn.classList.add(\'recording\');\n                voiceBtn.innerHTML = \'⏹\';\n            }\n        }\n\n        // Speech recognition event handlers\n        if (recognition) {\n            recognition.onresult = function(event) {\n                const transcript = event.results[0][0].transcript;\n                const messageInput = document.getElementById(\'messageInput\');\n                messageInput.value += transcript;\n                messageInput.focus();\n            };\n\n            recognition.onend = function() {\n                isRecording = false;\n                const voiceBtn = document.getElementById(\'voiceBtn\');\n                voiceBtn.classList.remove(\'recording\');\n                voiceBtn.innerHTML = \'🎤\';\n            };\n\n            recognition.onerror = function(event) {\n                console.error(\'Speech recognition error:\', event.error);\n                isRecording = false;\n                const voiceBtn = document.getElementById(\'voiceBtn\');\n                voiceBtn.classList.remove(\'recording\');\n                voiceBtn.innerHTML = \'🎤\';\n            };\n        }\n\n        // Analysis button management\n        // Last status per conversation, revalidated with its ETag so an unchanged\n        // conversation costs a bodiless 304 instead of the whole transcript\n        const conversationStatus = {};\n\n        async function fetchConversationStatus(conversationId) {\n            const cached = conversationStatus[conversationId];\n            const headers = cached ? { \'If-None-Match\': cached.etag } : {};\n            const response = await fetch(`/conversations/${conversationId}/status`, { headers, cache: \'no-store\' });\n            if (response.status === 304 && cached) {\n                return cached.status;\n            }\n            if (!response.ok) {\n                throw new Error(`Status request failed: ${response.status}`);\n            }\n            const status = await response.json();\n            conversationStatus[conversationId] = { etag: response.headers.get(\'ETag\'), status };\n            return status;\n        }\n\n        function analyzeButtonLabel() {\n            return forceAnalysis\n                ? \'<span>📋</span><span>Generate SOAP Note Anyway</span>\'\n                : \'<span>📋</span><span>Generate SOAP Note</span>\';\n        }\n\n        // forceable: not ready, but past the minimum answers a note can still be forced\n        function offerAnalysis(ready, forceable) {\n            forceAnalysis = !ready && !!forceable;\n            const analyzeBtn = document.getElementById(\'analyzeBtn\');\n            if (!analyzeBtn.disabled) {\n                analyzeBtn.innerHTML = analyzeButtonLabel();\n            }\n            return ready || forceAnalysis;\n        }\n\n        async function checkIfAnalysisReady() {\n            if (!currentConversationId) {\n                document.getElementById(\'analyzeBtn\').classList.remove(\'show\');\n                return;\n            }\n            \n            try {\n                const status = await fetchConversationStatus(currentConversationId);\n                const analyzeBtn = document.getElementById(\'analyzeBtn\');\n                \n                // Ready once the readiness check passes and no SOAP note exists yet\n                if (offerAnalysis(status.analysis_ready, status.analysis_forceable)) {\n                    analyzeBtn.classList.add(\'show\');\n                } else {\n                    analyzeBtn.classList.remove(\'show\');\n                }\n            } catch (error) {\n                console.error(\'Error checking analysis ready status:\', error);\n                document.getElementById(\'analyzeBtn\').classList.remove(\'show\');\n            }\n        }\n\n        // Poll a queued SOAP job until it finishes; backs off to one request every 2s\n        async function waitForJob(statusUrl) {\n            let delay = 500;\n            while (true) {\n                await new Promise(resolve => setTimeout(resolve, delay));\n                const response = await fetch(statusUrl, { cache: \'no-store\' });\n                const job = await response.json();\n                if (!response.ok) {\n                    return { error: job.error || \'SOAP note job not found\' };\n                }\n                if (job.status === \'succeeded\') {\n                    return job.result;\n                }\n                if (job.status === \'failed\') {\n                    return { error: job.error || \'SOAP note generation failed\' };\n                }\n                delay = Math.min(delay * 2, 2000);\n            }\n        }\n\n        // statusUrl: wait for a SOAP job that is already queued instead of requesting one\n        async function triggerMedicalAnalysis(statusUrl) {\n            if (!currentConversationId) {\n                alert(\'No active conversation to analyze\');\n                return;\n            }\n\n            const analyzeBtn = document.getElementById(\'analyzeBtn\');\n            const messagesContainer = document.getElementById(\'messagesContainer\');\n            \n            // Disable button and show loading\n            analyzeBtn.disabled = true;\n            analyzeBtn.innerHTML = \'<span>⏳</span><span>Generating SOAP...</span>\';\n\n            // Add loading message\n            const loadingMessage = document.createElement(\'div\');\n            loadingMessage.className = \'message ai-message loading\';\n            loadingMessage.innerHTML = `\n                <div class="avatar ai-avatar">AI</div>\n                <div class="message-content">\n                    <div class="loading">\n                        Generating structured SOAP note...\n                        <div class="loading-dots">\n                            <span></span>\n                            <span></span>\n                            <span></span>\n                        </div>\n                    </div>\n                </div>\n            `;\n            messagesContainer.appendChild(loadingMessage);\n            messagesContainer.scrollTop = messagesContainer.scrollHeight;\n\n            try {\n                // Add analysis response, filled in as tokens arrive\n                const analysisMessage = document.createElement(\'div\');\n                analysisMessage.className = \'message ai-message\';\n                analysisMessage.innerHTML = `\n                    <div class="avatar ai-avatar">AI</div>\n                    <div class="message-content"></div>\n                `;\n                const analysisContent = analysisMessage.querySelector(\'.message-content\');\n                let streamedText = \'\';\n\n                const showAnalysis = () => {\n                    if (loadingMessage.parentNode) {\n                        messagesContainer.replaceChild(analysisMessage, loadingMessage);\n                    }\n                };\n\n                if (statusUrl) {\n                    const data = await waitForJob(statusUrl);\n                    showAnalysis();\n                    analysisContent.innerHTML = formatAIResponse(data.response || data.error || \'\');\n                } else if (streamingSupported) {\n                    await streamSSE(\'/analyze/stream\', { conversation_id: currentConversationId, force: forceAnalysis }, {\n                        token: data => {\n                            showAnalysis();\n                            streamedText += data.token;\n                            analysisContent.innerHTML = formatAIResponse(streamedText);\n                            messagesContainer.scrollTop = messagesContainer.scrollHeight;\n                        },\n                        done: data => {\n                            showAnalysis();\n                            analysisContent.innerHTML = formatAIResponse(data.response || data.error || \'\');\n                        }\n                    });\n                } else {\n                    const response = await fetch(\'/analyze\', {\n                        method: \'POST\',\n                        headers: {\n                            \'Content-Type\': \'application/json\',\n                        },\n                        body: JSON.stringify({ \n                            conversation_id: currentConversationId,\n                            force: forceAnalysis\n                        })\n                    });\n\n                    let data = await response.json();\n                    // Serverless deployments answer with the finished job\n                    if (data.job_id && data.status !== \'succeeded\' && data.status !== \'failed\') {\n                        data = await waitForJob(data.status_url);\n                    }\n                    showAnalysis();\n                    analysisContent.innerHTML = formatAIResponse(data.response || data.error || \'\');\n                }\n\n                // Hide the analyze button\n                analyzeBtn.classList.remove(\'show\');\n\n                // Reload conversations to update status\n                loadConversations();\n\n            } catch (error) {\n                // Remove loading message\n                if (loadingMessage.parentNode) {\n                    messagesContainer.removeChild(loadingMessage);\n                }\n                \n                // Add error message\n                const errorMessage = document.createElement(\'div\');\n                errorMessage.className = \'message ai-message\';\n                errorMessage.innerHTML = `\n                    <div class="avatar ai-avatar">AI</div>\n                    <div class="message-content">Error generating SOAP note. Please try again.</div>\n                `;\n                messagesContainer.appendChild(errorMessage);\n            }\n\n            // Re-enable button\n            analyzeBtn.disabled = false;\n            analyzeBtn.innerHTML = analyzeButtonLabel();\n            \n            messagesContainer.scrollTop = messagesContainer.scrollHeight;\n        }\n\n        // Load conversations on page load\n        document.addEventListener(\'DOMContentLoaded\', function() {\n            loadConversations();\n        });\n\n        async function sendMessage() {\n            const messageInput = document.getElementById(\'messageInput\');\n            const messagesContainer = document.getElementById(\'messagesContainer\');\n            const sendButton = document.getElementById(\'sendButton\');\n            \n            const message = messageInput.value.trim();\n            if (!message) return;\n\n            // Add user message to chat\n            const userMessage = document.createElement(\'div\');\n            userMessage.className = \'message user-message\';\n            userMessage.innerHTML = `\n                <div class="avatar user-avatar">U</div>\n                <div class="message-content">${escapeHtml(message)}</div>\n            `;\n            messagesContainer.appendChild(userMessage);\n\n            // Clear input and disable button\n            messageInput.value = \'\';\n            sendButton.disabled = true;\n            sendButton.innerHTML = \'⏳\';\n\n            // Add loading message\n            const loadingMessage = document.createElement(\'div\');\n            loadingMessage.className = \'message ai-message loading\';\n            loadingMessage.innerHTML = `\n                <div class="avatar ai-avatar">AI</div>\n                <div class="message-content">\n                    <div class="loading">\n                        Medical AI is analyzing your message...\n                        <div class="loading-dots">\n                            <span></span>\n                            <span></span>\n                            <span></span>\n                        </div>\n                    </div>\n                </div>\n            `;\n            messagesContainer.appendChild(loadingMessage);\n\n            // Scroll to bottom\n            messagesContainer.scrollTop = messagesContainer.scrollHeight;\n\n            // Status URL of a SOAP job the server queued when it ended the interview,\n            // or requestAnalysis when it left the note to /analyze (serverless)\n            let queuedAnalysis = null;\n            let requestAnalysis = false;\n\n            try {\n                // AI response element, filled in as tokens arrive\n                const aiMessage = document.createElement(\'div\');\n                aiMessage.className = \'message ai-message\';\n                aiMessage.innerHTML = `\n                    <div class="avatar ai-avatar">AI</div>\n                    <div class="message-content"></div>\n                `;\n                const aiContent = aiMessage.querySelector(\'.message-content\');\n                let streamedText = \'\';\n\n                const showReply = () => {\n                    if (loadingMessage.parentNode) {\n                        messagesContainer.replaceChild(aiMessage, loadingMessage);\n                    }\n                };\n\n                const handleReply = data => {\n                    // Update current conversation ID if we got a new one\n                    if (data.conversation_id && !currentConversationId) {\n                        currentConversationId = data.conversation_id;\n                        loadConversations();\n                    }\n\n                    showReply();\n                    if (data.error && !data.response) {\n                        // e.g. 409 while another turn holds the conversation; the message was not recorded\n                        aiContent.innerHTML = formatAIResponse(data.error);\n                        return;\n                    }\n                    aiContent.innerHTML = formatAIResponse(data.response || \'\');\n\n                    // Show/hide SOAP generation button based on response\n                    const analyzeBtn = document.getElementById(\'analyzeBtn\');\n                    if (offerAnalysis(data.show_soap_button, data.analysis_forceable)) {\n                        analyzeBtn.style.display = \'flex\';\n                        analyzeBtn.style.animation = \'fadeIn 0.3s ease-in\';\n                    } else if (!data.readiness || !data.readiness.ready) {\n                        analyzeBtn.style.display = \'none\';\n                    }\n\n                    if (data.interview_complete && data.analysis && data.analysis.status_url) {\n                        queuedAnalysis = data.analysis.status_url;\n                    } else if (data.interview_complete && data.analysis && data.analysis.status === \'deferred\') {\n                        // Serverless: the note is generated by a request of its own\n                        requestAnalysis = true;\n                    }\n                };\n\n                const body = {\n                    message: message,\n                    conversation_id: currentConversationId\n                };\n\n                if (streamingSupported) {\n                    await streamSSE(\'/chat/stream\', body, {\n                        start: data => {\n                            if (data.conversation_id && !currentConversationId) {\n                                currentConversationId = data.conversation_id;\n                                loadConversations();\n                            }\n                        },\n                        token: data => {\n                            showReply();\n                            streamedText += data.token;\n                            aiContent.innerHTML = formatAIResponse(streamedText);\n                            messagesContainer.scrollTop = messagesContainer.scrollHeight;\n                        },\n                        done: handleReply\n                    });\n                } else {\n                    const response = await fetch(\'/chat\', {\n                        method: \'POST\',\n                        headers: {\n                            \'Content-Type\': \'application/json\',\n                        },\n                        body: JSON.stringify(body)\n                    });\n\n                    handleReply(await response.json());\n                }\n\n            } catch (error) {\n                // Remove loading message\n                if (loadingMessage.parentNode) {\n                    messagesContainer.removeChild(loadingMessage);\n                }\n                \n                // Add error message\n                const errorMessage = document.createElement(\'div\');\n                errorMessage.className = \'message ai-message\';\n                errorMessage.innerHTML = `\n                    <div class="avatar ai-avatar">AI</div>\n                    <div class="message-content">Sorry, I encountered an error. Please try again.</div>\n                `;\n                messagesContainer.appendChild(errorMessage);\n            }\n\n            // Re-enable button\n            sendButton.disabled = false;\n            sendButton.innerHTML = \'➤\';\n            \n            // Scroll to bottom\n            messagesContainer.scrollTop = messagesContainer.scrollHeight;\n            \n            // Focus input\n            messageInput.focus();\n            \n            if (queuedAnalysis) {\n                await triggerMedicalAnalysis(queuedAnalysis);\n            } else if (requestAnalysis) {\n                await triggerMedicalAnalysis();\n            }\n\n            // Check if analysis button should be shown\n            checkIfAnalysisReady();\n        }\n\n        async function resetConversation() {\n            try {\n                const response = await fetch(\'/reset\', {\n                    method: \'POST\',\n                    headers: {\n                        \'Content-Type\': \'application/json\',\n                    }\n                });\n\n                if (response.ok) {\n                    currentConversationId = null;\n                    clearMessages();\n                    addInitialMessage();\n                    loadConversations();\n                }\n            } catch (error) {\n                console.error(\'Error resetting conversation:\', error);\n            }\n        }\n    </script>\n</body>\n</html>'
+
+blocks = {}
+debug_info = ''
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""
+Shared test setup: the apps run against the offline mock backend with
+caching and background features off, so tests need no keys or network
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Read at import by the app modules, so set before any test imports them
+os.environ.update({
+    'MODEL_BACKENDS': 'mock',
+    'MEDICAL_BACKENDS': 'mock',
+    'MOCK_LATENCY': '0',
+    'RESPONSE_CACHE': '0',
+    'QUESTION_PLANNER': '0',
+    'INTERVIEW_AUTO_COMPLETE': '0',
+    'SPECULATIVE_SOAP': '0',
+    'LOG_LEVEL': 'ERROR'
+})
+
+import pytest
+
+# One patient's answers in a chest pain interview, cycled for longer ones
+INTERVIEW_ANSWERS = [
+    "I have had chest pain since yesterday",
+    "It is about 6/10 and worse when I breathe in",
+    "I am a 45 year old male",
+    "No fever, I took ibuprofen",
+]
+
+@pytest.fixture
+def web_chatbot():
+    """The Flask app module, imported once the environment above is set"""
+    import web_chatbot
+    return web_chatbot
+
+@pytest.fixture
+def run_interview(web_chatbot):
+    """run_interview(answers=INTERVIEW_ANSWERS, until_complete=False) -> (test client, last /chat body)
+
+    until_complete keeps cycling the answers until the reply ends the
+    interview or READINESS_MAX_ANSWERS is reached.
+    """
+    import readiness
+
+    def run(answers=INTERVIEW_ANSWERS, until_complete=False):
+        client = web_chatbot.app.test_client()
+        conversation_id = None
+        for n in range(readiness.READINESS_MAX_ANSWERS if until_complete else len(answers)):
+            response = client.post('/chat', json={'message': answers[n % len(answers)], 'conversation_id': conversation_id})
+            assert response.status_code == 200, response.get_json()
+            body = response.get_json()
+            conversation_id = body['conversation_id']
+            if until_complete and body.get('interview_complete'):
+                break
+        return client, body
+    return run
@@ -0,0 +1,64 @@
+"""
+Batch SOAP runs: notes are written from the full transcript, and
+transcripts that fail during a backend outage are requeued once the
+circuit breaker lets calls through again
+"""
+
+import json
+import time
+
+from batch_soap import BatchRunner, transcript_text
+from model_backends import BackendError, BackendRouter, Completion, ModelBackend
+
+class Outage(ModelBackend):
+    """Fails for the first seconds after it is created"""
+
+    name = 'outage'
+
+    def __init__(self, seconds):
+        super().__init__()
+        self.until = time.monotonic() + seconds
+        self.calls = 0
+
+    def complete(self, messages, max_tokens=300, temperature=0.1, model=None):
+        self.calls += 1
+        if time.monotonic() < self.until:
+            raise BackendError(self.name, "503 service unavailable")
+        return Completion("SUBJECTIVE: ...", self.name, None, 0.0)
+
+RECORDS = [(f"t{n}", {'transcript': f"Patient: my chest hurts ({n})"}, None) for n in range(4)]
+
+def run(tmp_path, outage, requeue_rounds):
+    router = BackendRouter([outage], failure_threshold=1, reset_timeout=0.2)
+    runner = BatchRunner(str(tmp_path / 'notes.jsonl'), router=router, concurrency=1, retries=0,
+                         retry_backoff=0, requeue_rounds=requeue_rounds, fsync_every=0)
+    stats = runner.run(iter(RECORDS))
+    with open(tmp_path / 'notes.jsonl') as f:
+        return stats, [json.loads(line) for line in f]
+
+def test_failures_are_requeued_after_the_breaker_resets(tmp_path):
+    stats, results = run(tmp_path, Outage(0.1), requeue_rounds=1)
+    assert stats['succeeded'] == 4 and stats['failed'] == 0 and stats['requeued'] == 4
+    assert sorted(result['id'] for result in results) == ['t0', 't1', 't2', 't3']
+    assert all(result['status'] == 'succeeded' and 'retry' not in result for result in results)
+
+def test_without_requeue_the_outage_fails_the_batch(tmp_path):
+    outage = Outage(0.1)
+    stats, results = run(tmp_path, outage, requeue_rounds=0)
+    assert stats['failed'] == 4 and stats['requeued'] == 0
+    assert all(result['status'] == 'failed' for result in results)
+    # The open breaker spared the backend all but the first call
+    assert outage.calls == 1
+
+def test_last_round_failures_are_written(tmp_path):
+    stats, results = run(tmp_path, Outage(60), requeue_rounds=1)
+    assert stats['failed'] == 4 and stats['requeued'] == 4 and len(results) == 4
+
+def test_long_transcripts_are_sent_whole():
+    messages = []
+    for n in range(200):
+        messages.append({'role': 'user', 'content': f"Answer {n}: the pain in my chest is still there " * 5})
+        messages.append({'role': 'assistant', 'content': f"Question {n}: anything else?"})
+    text = transcript_text({'messages': messages})
+    assert "Answer 0:" in text and "Answer 199:" in text
+    assert "EARLIER IN THIS INTERVIEW" not in text
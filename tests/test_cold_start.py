@@ -0,0 +1,33 @@
+"""
+Precompiled templates: the checked-in modules match the templates and the
+pinned Jinja2, and render what Jinja would compile itself
+"""
+
+import os
+
+from flask import Flask
+
+import cold_start
+
+def app():
+    return Flask(__name__, root_path=cold_start.ROOT)
+
+def test_compiled_templates_are_current():
+    # Fails after editing a template or upgrading Jinja2: run python cold_start.py
+    assert cold_start.use_compiled_templates(app())
+
+def test_compiled_templates_render_the_same():
+    compiled = app()
+    assert cold_start.use_compiled_templates(compiled)
+    for name in cold_start.template_hashes():
+        with compiled.app_context():
+            from_modules = compiled.jinja_env.get_template(name).render()
+        plain = app()
+        with plain.app_context():
+            assert plain.jinja_env.get_template(name).render() == from_modules
+
+def test_compiled_modules_are_marked_generated():
+    for name in os.listdir(cold_start.COMPILED_TEMPLATE_DIR):
+        if name.endswith('.py'):
+            with open(os.path.join(cold_start.COMPILED_TEMPLATE_DIR, name)) as f:
+                assert f.readline() == cold_start.GENERATED_HEADER
@@ -0,0 +1,33 @@
+"""
+Memory limits: a conversation the in-memory store archives or deletes also
+leaves the per-conversation transcript and prompt caches
+"""
+
+from conversation_store import InMemoryConversationStore
+from prompt_stats import PrefixReuseTracker
+from transcript import TranscriptCache
+
+def test_evicted_conversations_leave_the_caches(tmp_path):
+    store = InMemoryConversationStore(memory_limit_mb=0.002, idle_seconds=0, archive_dir=str(tmp_path))
+    transcripts, prompts = TranscriptCache(), PrefixReuseTracker()
+    store.on_evict(transcripts.discard)
+    store.on_evict(prompts.discard)
+
+    for conversation_id in ('a', 'b'):
+        store.create(conversation_id)
+        store.append_message(conversation_id, 'user', "my chest hurts " * 100)
+        messages = store.get(conversation_id)['messages']
+        transcripts.sync(conversation_id, messages)
+        prompts.record(conversation_id, messages)
+
+    assert store.memory_report()['evictions'] == 1
+    assert set(transcripts._transcripts) == {'b'} and prompts.stats('a') is None
+    # Rehydrated on access, and cached again from there
+    assert len(transcripts.sync('a', store.get('a')['messages'])) == 1
+
+    store.delete('b')
+    assert 'b' not in transcripts._transcripts and prompts.stats('b') is None
+
+def test_web_app_caches_follow_the_store(web_chatbot):
+    callbacks = web_chatbot.conversation_store._evict_callbacks
+    assert web_chatbot.transcripts.discard in callbacks and web_chatbot.prompt_stats.discard in callbacks
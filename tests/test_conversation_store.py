@@ -0,0 +1,121 @@
+"""
+Concurrent chat turns against both conversation stores: turns on one
+conversation must stay in order and none may be lost, within one process
+(threads through the Flask app) and across worker processes sharing SQLite
+"""
+
+import multiprocessing
+import threading
+import uuid
+
+import pytest
+
+from conversation_store import ConversationBusy, InMemoryConversationStore, SQLiteConversationStore
+from model_backends import MOCK_QUESTIONS
+
+THREADS = 8
+MESSAGES = 6
+CONVERSATIONS = 3
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        return InMemoryConversationStore()
+    return SQLiteConversationStore(str(tmp_path / 'conversations.db'))
+
+@pytest.fixture
+def web_app(store, web_chatbot, monkeypatch):
+    monkeypatch.setattr(web_chatbot, 'conversation_store', store)
+    return web_chatbot.app
+
+def assert_turns_in_order(messages, sent):
+    roles = [msg['role'] for msg in messages]
+    assert all(a != b for a, b in zip(roles, roles[1:])), roles
+    assert roles.count('user') == sent
+    # The mock asks question k after the k-th patient answer it can see, so an
+    # interleaved turn shows up as a reply that does not match its position
+    answers = 0
+    for msg in messages:
+        if msg['role'] == 'user':
+            answers += 1
+        else:
+            assert msg['content'] == MOCK_QUESTIONS[min(max(answers - 1, 0), len(MOCK_QUESTIONS) - 1)]
+
+def test_concurrent_turns_stay_in_order(store, web_app):
+    conversation_ids = [str(uuid.uuid4()) for _ in range(CONVERSATIONS)]
+    for conversation_id in conversation_ids:
+        store.create(conversation_id)
+    sent = {conversation_id: 0 for conversation_id in conversation_ids}
+    codes = []
+    lock = threading.Lock()
+
+    def client_thread(thread_index):
+        client = web_app.test_client()
+        for n in range(MESSAGES):
+            conversation_id = conversation_ids[(thread_index + n) % CONVERSATIONS]
+            body = {'message': f"answer {thread_index}.{n}", 'conversation_id': conversation_id}
+            # The blocking and streaming routes take the same lock
+            if n % 2:
+                response = client.post('/chat/stream', json=body)
+                response.get_data()
+                response.close()
+            else:
+                response = client.post('/chat', json=body)
+            with lock:
+                codes.append(response.status_code)
+                if response.status_code == 200:
+                    sent[conversation_id] += 1
+
+    threads = [threading.Thread(target=client_thread, args=(n,)) for n in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert codes.count(200) == THREADS * MESSAGES, codes
+    for conversation_id in conversation_ids:
+        assert_turns_in_order(store.get(conversation_id)['messages'], sent[conversation_id])
+
+def test_lock_times_out_while_held(store):
+    conversation_id = str(uuid.uuid4())
+    store.create(conversation_id)
+    with store.lock(conversation_id):
+        with pytest.raises(ConversationBusy):
+            store.lock(conversation_id, timeout=0.05).acquire()
+    # Released again: the next holder gets it straight away
+    with store.lock(conversation_id, timeout=0.05):
+        pass
+
+def append_turns(path, conversation_ids, worker, turns):
+    """One worker process: question after each answer, under the conversation lock"""
+    store = SQLiteConversationStore(path)
+    for n in range(turns):
+        conversation_id = conversation_ids[n % len(conversation_ids)]
+        with store.lock(conversation_id):
+            store.append_message(conversation_id, 'user', f"answer {worker}.{n}")
+            store.append_message(conversation_id, 'assistant', f"question {worker}.{n}")
+
+def test_sqlite_turns_stay_paired_across_processes(tmp_path):
+    path = str(tmp_path / 'conversations.db')
+    store = SQLiteConversationStore(path)
+    conversation_ids = [str(uuid.uuid4()) for _ in range(2)]
+    for conversation_id in conversation_ids:
+        store.create(conversation_id)
+
+    context = multiprocessing.get_context('spawn')
+    workers = [context.Process(target=append_turns, args=(path, conversation_ids, n, 20)) for n in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    total = 0
+    for conversation_id in conversation_ids:
+        messages = store.get(conversation_id)['messages']
+        total += len(messages)
+        # Each answer is followed by the question written in the same locked turn
+        for answer, question in zip(messages[::2], messages[1::2]):
+            assert answer['role'] == 'user' and question['role'] == 'assistant'
+            assert answer['content'].replace('answer', 'question') == question['content']
+    assert total == 3 * 20 * 2
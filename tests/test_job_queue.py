@@ -0,0 +1,103 @@
+"""
+SOAP job queues: a bounded worker pool runs jobs highest priority first,
+a key already queued or running returns the existing job, a full queue
+refuses new jobs, and SQLite hands a dead worker's job to another process
+"""
+
+import threading
+
+import pytest
+
+from job_queue import InMemoryJobQueue, QueueFull, SQLiteJobQueue
+
+class GatedRunner:
+    """Records payloads in run order; each job waits until the gate opens"""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.started = threading.Event()
+        self.ran = []
+
+    def __call__(self, payload):
+        self.started.set()
+        self.gate.wait(10)
+        if payload.get('fail'):
+            raise ValueError("model unavailable")
+        self.ran.append(payload['n'])
+        return {'response': f"note {payload['n']}"}
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_queue(request, tmp_path):
+    queues = []
+
+    def make(runner, **options):
+        if request.param == 'memory':
+            queue = InMemoryJobQueue(runner, **options)
+        else:
+            queue = SQLiteJobQueue(str(tmp_path / 'jobs.db'), runner, **options)
+        queues.append((queue, runner))
+        return queue
+    yield make
+    for queue, runner in queues:
+        runner.gate.set()
+        queue.close()
+
+def test_jobs_run_by_priority(make_queue):
+    runner = GatedRunner()
+    queue = make_queue(runner, workers=1)
+    first, _ = queue.submit({'n': 0})
+    assert runner.started.wait(5)
+    # Queued behind the running job, in the opposite order to their priorities
+    jobs = [queue.submit({'n': n}, priority=priority)[0] for n, priority in ((1, 'low'), (2, 'normal'), (3, 'high'))]
+    runner.gate.set()
+    assert [queue.wait(job['id'], timeout=5)['status'] for job in [first] + jobs] == ['succeeded'] * 4
+    assert runner.ran == [0, 3, 2, 1]
+    assert queue.get(first['id'])['result'] == {'response': "note 0"}
+
+def test_active_key_returns_the_existing_job(make_queue):
+    runner = GatedRunner()
+    queue = make_queue(runner, workers=1)
+    job, created = queue.submit({'n': 1}, key='soap:a')
+    again, created_again = queue.submit({'n': 2}, key='soap:a')
+    assert created and not created_again and again['id'] == job['id']
+
+    runner.gate.set()
+    queue.wait(job['id'], timeout=5)
+    # Finished, so the key is free for a new note
+    assert queue.submit({'n': 3}, key='soap:a')[1]
+    assert queue.stats()['deduplicated'] == 1
+
+def test_full_queue_refuses_jobs(make_queue):
+    runner = GatedRunner()
+    queue = make_queue(runner, workers=1, max_pending=1)
+    queue.submit({'n': 1})
+    assert runner.started.wait(5)
+    queue.submit({'n': 2})
+    with pytest.raises(QueueFull):
+        queue.submit({'n': 3})
+    assert queue.stats()['rejected'] == 1
+
+def test_failures_are_recorded(make_queue):
+    runner = GatedRunner()
+    runner.gate.set()
+    queue = make_queue(runner)
+    job = queue.wait(queue.submit({'n': 1, 'fail': True})[0]['id'], timeout=5)
+    assert job['status'] == 'failed' and job['error'] == "model unavailable"
+
+def test_sqlite_requeues_a_dead_workers_job(tmp_path, monkeypatch):
+    path = str(tmp_path / 'jobs.db')
+    dead = SQLiteJobQueue(path, None)
+    monkeypatch.setattr(dead, '_ensure_workers', lambda: None)
+    job, _ = dead.submit({'n': 1})
+    # Claimed by a worker that then died with its process
+    assert dead._claim(0)['id'] == job['id']
+
+    runner = GatedRunner()
+    runner.gate.set()
+    live = SQLiteJobQueue(path, runner, workers=1, lease_seconds=0)
+    live._ensure_workers()
+    try:
+        assert live.wait(job['id'], timeout=5)['status'] == 'succeeded'
+    finally:
+        live.close()
+    assert runner.ran == [1]
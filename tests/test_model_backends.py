@@ -0,0 +1,93 @@
+"""
+Circuit breaker trials in BackendRouter: a half-open backend's trial call
+must be settled however the call ends, or the backend is skipped for good
+"""
+
+import asyncio
+
+import pytest
+
+from model_backends import BackendError, BackendRouter, Completion, ModelBackend
+
+class ScriptedBackend(ModelBackend):
+    """Fails while failing is set, otherwise streams a few tokens"""
+
+    name = 'scripted'
+
+    def __init__(self):
+        super().__init__()
+        self.failing = False
+
+    def complete(self, messages, max_tokens=300, temperature=0.1, model=None):
+        if self.failing:
+            raise BackendError(self.name, "down")
+        return Completion("fine", self.name, None, 0.0)
+
+    def stream(self, messages, max_tokens=300, temperature=0.1, model=None):
+        if self.failing:
+            raise BackendError(self.name, "down")
+        for token in ("one ", "two ", "three"):
+            yield token
+
+    async def acomplete(self, messages, max_tokens=300, temperature=0.1, model=None):
+        await asyncio.sleep(10)
+        return self.complete(messages, max_tokens, temperature, model)
+
+@pytest.fixture
+def half_open():
+    """Router whose only backend has just become half-open"""
+    backend = ScriptedBackend()
+    router = BackendRouter([backend], failure_threshold=1, reset_timeout=0.0)
+    backend.failing = True
+    with pytest.raises(BackendError):
+        router.complete([])
+    backend.failing = False
+    breaker = router.health[backend.name].breaker
+    assert breaker.state == 'half_open' and not breaker.trial_in_flight
+    return router, breaker
+
+def test_closed_trial_stream_frees_the_trial(half_open):
+    router, breaker = half_open
+    tokens = router.stream([])
+    assert next(tokens) == "one "
+    assert breaker.trial_in_flight
+    # The client disconnects: Flask closes the generator mid-stream
+    tokens.close()
+    assert breaker.state == 'half_open' and not breaker.trial_in_flight
+    # The next call makes the trial and closes the breaker
+    assert "".join(router.stream([])) == "one two three"
+    assert breaker.state == 'closed'
+
+def test_cancelled_trial_call_frees_the_trial(half_open):
+    router, breaker = half_open
+
+    async def cancel_trial():
+        task = asyncio.ensure_future(router.acomplete([]))
+        await asyncio.sleep(0.01)
+        assert breaker.trial_in_flight
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_trial())
+    assert not breaker.trial_in_flight
+    assert router.complete([]).text == "fine"
+    assert breaker.state == 'closed'
+
+def test_failed_trial_reopens_the_breaker(half_open):
+    router, breaker = half_open
+    router.backends[0].failing = True
+    router.health['scripted'].breaker.reset_timeout = 60
+    with pytest.raises(BackendError):
+        list(router.stream([]))
+    assert breaker.state == 'open' and not breaker.trial_in_flight
+
+def test_only_one_trial_at_a_time(half_open):
+    router, breaker = half_open
+    tokens = router.stream([])
+    next(tokens)
+    # While the trial streams, other calls find no backend to try
+    with pytest.raises(BackendError, match="all backends unavailable"):
+        router.complete([])
+    assert "".join(tokens) == "two three"
+    assert breaker.state == 'closed'
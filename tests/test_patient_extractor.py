@@ -0,0 +1,303 @@
+"""
+The compiled patient data extractor on interview transcripts: what it
+reads from realistic answers, parity with the original create_patient_summary
+parser apart from the documented differences, and incremental updates
+agreeing with a full pass
+"""
+
+import random
+import re
+
+import pytest
+
+from patient_extractor import PatientDataExtractor, extract_patient_data, render_patient_summary
+from transcript import RollingSummary
+
+def legacy_extract(conversation_history):
+    """The original create_patient_summary parsing loop, verbatim; the parity baseline"""
+    patient_data = {
+        "demographics": {"age": None, "sex": None},
+        "chief_complaints": [],
+        "symptoms": {},
+        "timeline": [],
+        "severity": {},
+        "location": {},
+        "other_info": []
+    }
+
+    for i, msg in enumerate(conversation_history):
+        if msg["role"] == "user":
+            content = msg["content"].strip()
+            content_lower = content.lower()
+
+            if any(sex in content_lower for sex in ["male", "female", "man", "woman"]):
+                if "male" in content_lower:
+                    patient_data["demographics"]["sex"] = "male"
+                elif "female" in content_lower:
+                    patient_data["demographics"]["sex"] = "female"
+
+            age_match = re.search(r'\b(\d{1,3})\b', content)
+            if age_match and not patient_data["demographics"]["age"]:
+                potential_age = int(age_match.group(1))
+                if 1 <= potential_age <= 120:
+                    patient_data["demographics"]["age"] = potential_age
+
+            symptom_keywords = ["pain", "ache", "hurt", "fever", "nausea", "vomit", "cough", "headache", "dizzy"]
+            for keyword in symptom_keywords:
+                if keyword in content_lower and content not in patient_data["chief_complaints"]:
+                    patient_data["chief_complaints"].append(content)
+                    break
+
+            time_keywords = ["day", "hour", "week", "month", "year", "ago", "started", "began", "today", "yesterday"]
+            if any(keyword in content_lower for keyword in time_keywords):
+                if content not in patient_data["timeline"]:
+                    patient_data["timeline"].append(content)
+
+            severity_match = re.search(r'\b(\d{1,2})/10\b', content)
+            if severity_match:
+                severity_score = severity_match.group(1)
+                patient_data["severity"]["pain"] = f"{severity_score}/10"
+
+            body_parts = ["abdomen", "stomach", "chest", "head", "back", "leg", "arm", "left", "right", "side"]
+            for part in body_parts:
+                if part in content_lower:
+                    patient_data["location"][part] = content
+                    break
+
+    return patient_data
+
+def interview(*turns):
+    """Messages alternating assistant question and patient answer, patient first"""
+    return [{'role': 'user' if n % 2 == 0 else 'assistant', 'content': text} for n, text in enumerate(turns)]
+
+INTERVIEWS = [
+    interview(
+        "I have had a sharp pain in my lower right abdomen since 2 days ago",
+        "How severe is the pain on a scale of 0 to 10?",
+        "It is about 7/10, worse when I walk, and I felt nauseous this morning",
+        "Could you tell me your age and sex?",
+        "I am a 34 year old female and I took ibuprofen but it did not help",
+        "Have you had any vomiting or fever?",
+        "No fever, but I vomited once yesterday after eating",
+    ),
+    interview(
+        "My chest hurts when I breathe in",
+        "When did this start?",
+        "Yesterday evening, after I went for a run",
+        "How bad is it from 0 to 10?",
+        "Maybe 5/10, it gets worse lying down",
+        "How old are you?",
+        "I'm 58, male",
+    ),
+    interview(
+        "I've had a cough and a fever for a week",
+        "Is the cough dry or are you bringing anything up?",
+        "Mostly dry, some yellow mucus in the morning",
+        "Any shortness of breath?",
+        "A little when I climb stairs. I am a 71 year old woman",
+    ),
+    interview(
+        "I feel dizzy when I stand up",
+        "How long has this been happening?",
+        "About three weeks, it started after my blood pressure medication changed",
+        "Have you fainted at all?",
+        "No, but I have to sit back down. The dizziness is 4/10",
+    ),
+    interview(
+        "Back pain",
+        "Where exactly in your back?",
+        "Lower back, more on the left side, it hurts when I bend",
+        "When did it begin?",
+        "It began 10 days ago after lifting boxes at work",
+        "Does it spread anywhere?",
+        "Down my left leg sometimes",
+    ),
+    interview(
+        "I just don't feel right lately",
+        "Can you describe what you are feeling?",
+        "Tired all the time and my stomach is upset after meals",
+        "How long has this been going on?",
+        "A couple of months",
+    ),
+]
+
+VOCABULARY = [
+    "i", "have", "a", "the", "my", "is", "it", "and", "since", "really", "bad", "mild",
+    "pain", "ache", "hurts", "fever", "nausea", "vomiting", "cough", "headache", "dizzy",
+    "day", "days", "hours", "week", "monthly", "years", "ago", "started", "began", "today",
+    "yesterday", "monday", "abdomen", "stomach", "chest", "head", "back", "leg", "arm",
+    "left", "right", "side", "female", "male", "woman", "man", "painting", "backache",
+    "Headache", "LEFT", "Woman", "old", "about", "after", "eating", "at", "night",
+]
+
+def synthetic_message(rng):
+    words = rng.choices(VOCABULARY, k=rng.randint(3, 25))
+    if rng.random() < 0.3:
+        words.insert(rng.randrange(len(words) + 1), str(rng.randint(0, 150)))
+    if rng.random() < 0.2:
+        words.insert(rng.randrange(len(words) + 1), f"{rng.randint(0, 12)}/10")
+    if rng.random() < 0.1:
+        # Exact repeats exercise the dedup path
+        return "I have pain in my stomach since yesterday"
+    return " ".join(words)
+
+def incremental(history):
+    """Patient data after feeding the transcript one message at a time"""
+    extractor = PatientDataExtractor()
+    for end in range(1, len(history) + 1):
+        extractor.update(history[:end])
+    return extractor.patient_data
+
+# (age, sex, chief complaints, timeline entries, severity, location keys) for each interview
+EXPECTED = [
+    (34, 'female', 2, 2, '7/10', ['abdomen']),
+    (58, 'male', 1, 1, '5/10', ['chest']),
+    (71, 'female', 1, 1, None, []),
+    (None, None, 1, 1, '4/10', []),
+    (None, None, 2, 1, None, ['back', 'leg']),
+    (None, None, 0, 1, None, ['stomach']),
+]
+
+@pytest.mark.parametrize('history, expected', list(zip(INTERVIEWS, EXPECTED)))
+def test_interview_extraction(history, expected):
+    data = extract_patient_data(history)
+    age, sex, complaints, timeline, severity, location = expected
+    assert data['demographics'] == {'age': age, 'sex': sex}
+    assert len(data['chief_complaints']) == complaints
+    assert len(data['timeline']) == timeline
+    assert data['severity'].get('pain') == severity
+    assert list(data['location']) == location
+
+@pytest.mark.parametrize('history', INTERVIEWS)
+def test_incremental_matches_full_pass(history):
+    assert incremental(history) == extract_patient_data(history)
+
+@pytest.mark.parametrize('answer, age, sex', [
+    # Numbers that are not an age
+    ("It started 3 days ago", None, None),
+    ("I am 5 days into this, about 7/10", None, None),
+    ("I took 2 tablets 3 times a day", None, None),
+    # "female" contains "male", "woman" contains "man", "human" too
+    ("I am female", None, 'female'),
+    ("I'm a woman", None, 'female'),
+    ("I work in human resources", None, None),
+    # Stated ages
+    ("I am a 34 year old female", 34, 'female'),
+    ("34-year-old man", 34, 'male'),
+    ("I'm 58, male", 58, 'male'),
+    ("Age: 62", 62, None),
+    ("45yo, aged 45", 45, None),
+    ("I'm 130", None, None),
+])
+def test_demographics_need_context(answer, age, sex):
+    assert extract_patient_data(interview(answer))['demographics'] == {'age': age, 'sex': sex}
+
+def test_bare_number_answers_an_age_question():
+    history = interview("My chest hurts", "How old are you?", "34")
+    assert extract_patient_data(history)['demographics']['age'] == 34
+    # The same number after another question is not an age
+    history = interview("My chest hurts", "How many times did you vomit?", "34")
+    assert extract_patient_data(history)['demographics']['age'] is None
+
+def test_reported_headache_summary():
+    history = interview("I have a headache", "When did it start?", "It started 3 days ago",
+                        "Could you tell me your age and sex?", "I am female")
+    data = extract_patient_data(history)
+    assert data['location'] == {}
+    assert render_patient_summary(data) == (
+        "SEX: female\n"
+        "CHIEF COMPLAINTS: I have a headache\n"
+        "TIMELINE: It started 3 days ago"
+    )
+
+def test_rolling_summary_keeps_the_reported_facts():
+    # The summary replaces these turns in long interview prompts
+    summary = RollingSummary()
+    summary.extend(interview("I have a headache", "When did it start?", "It started 3 days ago",
+                             "How old are you, and what is your sex?", "I am female"), 500)
+    assert "SEX: female" in summary.text
+    assert "year-old" not in summary.text and "LOCATION" not in summary.text
+    # The question travels with the answer, as the extractor needs it for a bare age
+    summary.extend([{'role': 'assistant', 'content': "And how old are you?"}, {'role': 'user', 'content': "52"}], 500)
+    assert "PATIENT: 52-year-old female" in summary.text
+
+@pytest.mark.parametrize('answer, location', [
+    ("I have a headache", []),
+    ("It hurts on my left side", []),
+    ("The right one", []),
+    ("My head hurts", ['head']),
+    ("Both arms and my legs", ['leg']),
+    ("Backache since Monday", []),
+    ("I have to sit back down", []),
+    ("It comes back when I bend", []),
+    ("Lower back, more on the left side", ['back']),
+])
+def test_location_needs_a_body_part(answer, location):
+    assert list(extract_patient_data(interview(answer))['location']) == location
+
+def test_words_not_substrings():
+    data = extract_patient_data(interview("I was painting my 34 year old house"))
+    assert data['chief_complaints'] == [] and data['timeline'] == []
+    data = extract_patient_data(interview("Backache and vomiting since yesterday"))
+    assert len(data['chief_complaints']) == 1 and len(data['timeline']) == 1
+
+def test_random_transcripts_incremental():
+    rng = random.Random(7)
+    for _ in range(300):
+        history = [
+            {'role': 'user' if n % 2 == 0 else 'assistant', 'content': synthetic_message(rng)}
+            for n in range(rng.randint(1, 40))
+        ]
+        assert incremental(history) == extract_patient_data(history), history
+
+# Words both parsers read the same way: no numbers, and no term that contains
+# or is contained in another ("headache"/"head", "female"/"male", "painting")
+PARITY_VOCABULARY = [
+    "i", "have", "a", "the", "my", "is", "it", "and", "since", "really", "bad", "mild",
+    "pain", "ache", "hurts", "fever", "nausea", "vomiting", "cough", "dizzy", "Chest",
+    "days", "hours", "weeks", "ago", "started", "began", "today", "yesterday",
+    "abdomen", "stomach", "chest", "head", "leg", "arm", "male", "about", "after", "at", "night",
+]
+
+def test_parity_with_the_original_parser():
+    rng = random.Random(11)
+    for _ in range(300):
+        history = [
+            {'role': 'user' if n % 2 == 0 else 'assistant',
+             'content': " ".join(rng.choices(PARITY_VOCABULARY, k=rng.randint(3, 15)))
+                        if rng.random() > 0.1 else "I have pain in my stomach since yesterday"}
+            for n in range(rng.randint(1, 40))
+        ]
+        expected = legacy_extract(history)
+        assert extract_patient_data(history) == expected, history
+        assert render_patient_summary(extract_patient_data(history)) == render_patient_summary(expected)
+
+# Where the compiled extractor deliberately departs from the original parser, and so
+# create_patient_summary output changes: (answer, field, original value, compiled value)
+DIFFERENCES = [
+    ("It started 3 days ago", 'age', 3, None),
+    ("About 6/10", 'age', 6, None),
+    ("I am female", 'sex', 'male', 'female'),
+    ("I'm a woman", 'sex', None, 'female'),
+    ("I have a headache", 'location', ['head'], []),
+    ("It hurts on my left side", 'location', ['left'], []),
+    ("I have to sit back down", 'location', ['back'], []),
+    ("I was painting the fence", 'complaints', 1, 0),
+    ("I am a 34 year old man", 'timeline', 1, 0),
+]
+
+def field(patient_data, name):
+    if name in ('age', 'sex'):
+        return patient_data['demographics'][name]
+    if name == 'location':
+        return list(patient_data['location'])
+    return len(patient_data['chief_complaints' if name == 'complaints' else 'timeline'])
+
+@pytest.mark.parametrize('answer, name, original, compiled', DIFFERENCES)
+def test_documented_differences(answer, name, original, compiled):
+    assert field(legacy_extract(interview(answer)), name) == original
+    assert field(extract_patient_data(interview(answer)), name) == compiled
+
+def test_assistant_messages_are_ignored():
+    history = [{'role': 'assistant', 'content': "Is the pain in your chest, 8/10, since yesterday?"}]
+    assert render_patient_summary(extract_patient_data(history)) == "No patient information collected yet"
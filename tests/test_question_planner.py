@@ -0,0 +1,54 @@
+"""
+Local question planner: the demographics question asks for whatever the
+patient has not actually stated, so a number from a duration never stands
+in for the age
+"""
+
+import pytest
+
+import readiness
+from question_planner import DEMOGRAPHIC_QUESTIONS, QuestionPlanner, symptom_name
+from transcript import Transcript
+
+@pytest.fixture(autouse=True)
+def every_slot_needed(monkeypatch):
+    # Otherwise four filled slots make the interview ready and the planner stands aside
+    monkeypatch.setattr(readiness, 'READINESS_MIN_SLOTS', len(readiness.SLOTS))
+
+def plan(*turns):
+    """Planned question after alternating patient answers and doctor questions"""
+    transcript = Transcript([
+        {'role': 'user' if n % 2 == 0 else 'assistant', 'content': text} for n, text in enumerate(turns)
+    ])
+    assessment = readiness.assess(transcript.patient_data, transcript.user_count)
+    return QuestionPlanner().plan(transcript, assessment)
+
+# Timeline, severity and location answered, so demographics is the next planned slot
+ANSWERED = (
+    "My head hurts",
+    "When did the pain start, and has it changed since then?",
+    "It started 3 days ago",
+    "On a scale of 0 to 10, how bad is the pain right now (for example 6/10)?",
+    "About 6/10",
+    "Where exactly do you feel the pain, and does it spread anywhere?",
+)
+
+def test_duration_is_not_taken_for_the_age():
+    assert plan(*ANSWERED, "All over my head") == DEMOGRAPHIC_QUESTIONS[(True, True)]
+
+def test_volunteered_sex_is_not_asked_again():
+    assert plan(*ANSWERED, "Mostly the back of my head. I am female") == DEMOGRAPHIC_QUESTIONS[(True, False)]
+
+def test_stated_age_is_not_asked_again():
+    assert plan(*ANSWERED, "Behind my eyes in my head, I'm 58") == DEMOGRAPHIC_QUESTIONS[(False, True)]
+
+def test_demographics_asked_once():
+    # An answer the extractor cannot read goes to the model instead of the same question again
+    assert plan(*ANSWERED, "All over my head", DEMOGRAPHIC_QUESTIONS[(True, True)], "Prefer not to say") is None
+
+def test_symptom_names_are_whole_words():
+    patient_data = {'chief_complaints': ["I was painting when my back started to hurt"]}
+    assert symptom_name(patient_data) == 'pain'
+    patient_data = {'chief_complaints': ["Painful cough at night"]}
+    assert symptom_name(patient_data) == 'pain'
+    assert symptom_name({'chief_complaints': ["I feel dizzy"]}) == 'dizziness'
@@ -0,0 +1,93 @@
+"""
+Interview readiness from the extracted slots: answers that only look like
+an age, a sex or a body part must not fill a slot, since a ready interview
+offers (or, with auto-complete, writes) the SOAP note
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import readiness
+from patient_extractor import extract_patient_data
+
+def assess(*turns):
+    """Readiness after patient answers, each to a generic follow-up question"""
+    history = []
+    for answer in turns:
+        history.append({'role': 'user', 'content': answer})
+        history.append({'role': 'assistant', 'content': "Can you tell me more?"})
+    return readiness.assess(extract_patient_data(history), len(turns))
+
+@pytest.mark.parametrize('answer, slot', [
+    ("I have a headache", 'location'),
+    ("It hurts on the left side", 'location'),
+    ("It started 3 days ago", 'demographics'),
+    ("I am female", 'demographics'),
+    ("I am 5 days into this", 'demographics'),
+    ("I was painting the fence", 'complaint'),
+    ("I am a 34 year old man", 'timeline'),
+])
+def test_answer_does_not_fill(answer, slot):
+    assert slot not in assess(answer).filled
+
+def test_reported_false_positive_is_not_ready():
+    # Used to read as a 3-year-old male with a head location: four slots, ready
+    assessment = assess("I have a headache", "It started 3 days ago", "I am female")
+    assert assessment.filled == ('complaint', 'timeline')
+    assert not assessment.ready
+
+def test_complete_interview_is_ready():
+    assessment = assess("I have chest pain since yesterday", "About 7/10", "I am a 45 year old man")
+    assert assessment.ready and assessment.reason == 'slots'
+    assert assessment.missing == ()
+
+def test_age_answer_to_an_age_question_fills_demographics():
+    history = [
+        {'role': 'user', 'content': "My chest hurts since this morning"},
+        {'role': 'assistant', 'content': "How old are you, and what is your sex?"},
+        {'role': 'user', 'content': "52, female"},
+    ]
+    assert 'demographics' in readiness.assess(extract_patient_data(history), 2).filled
+
+def test_auto_complete_is_off_by_default():
+    env = {key: value for key, value in os.environ.items() if key != 'INTERVIEW_AUTO_COMPLETE'}
+    output = subprocess.run(
+        [sys.executable, '-c', "import readiness; print(readiness.INTERVIEW_AUTO_COMPLETE)"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == 'False'
+
+def analyze(web_chatbot, client, conversation_id, force=False):
+    """Finished SOAP job requested from /analyze, as the button does"""
+    response = client.post('/analyze', json={'conversation_id': conversation_id, 'force': force})
+    assert response.status_code in (200, 202), response.get_json()
+    return web_chatbot.analysis_jobs.wait(response.get_json()['job_id'], timeout=10)
+
+def test_ready_interview_offers_the_note_and_goes_on(web_chatbot, run_interview):
+    client, body = run_interview(["I have chest pain since yesterday", "About 7/10", "I am a 45 year old man"])
+    assert body['readiness']['ready'] and body['show_soap_button']
+    assert not body['interview_complete'] and 'analysis' not in body
+    assert analyze(web_chatbot, client, body['conversation_id'])['status'] == 'succeeded'
+
+def test_model_ready_verdict_holds_for_status_and_analyze(web_chatbot, run_interview, monkeypatch):
+    monkeypatch.setattr(web_chatbot, 'collect_patient_data_openai', lambda transcript, conversation_id=None: readiness.READY_TOKEN)
+    # Three slots: ready only on the model's word
+    client, body = run_interview(["I have had a cough since yesterday", "About 7/10"])
+    assert body['readiness']['reason'] == 'model' and body['show_soap_button']
+    # Auto-complete is off, so the reply only offers the note
+    assert body['response'] == readiness.INTERVIEW_READY_MESSAGE
+
+    status = client.get(f"/conversations/{body['conversation_id']}/status").get_json()
+    assert status['analysis_ready'] and status['readiness']['reason'] == 'model'
+    assert analyze(web_chatbot, client, body['conversation_id'])['status'] == 'succeeded'
+
+def test_unready_interview_can_be_forced(web_chatbot, run_interview):
+    # A bare "6" is no severity the extractor reads, so the slots never fill
+    client, body = run_interview(["I have chest pain since yesterday", "6"])
+    assert not body['show_soap_button'] and body['analysis_forceable']
+    assert client.post('/analyze', json={'conversation_id': body['conversation_id']}).status_code == 400
+    assert analyze(web_chatbot, client, body['conversation_id'], force=True)['status'] == 'succeeded'
@@ -0,0 +1,60 @@
+"""
+The response cache only keeps answers from the primary backend, so a
+fallback's reply is never served for the primary model's key
+"""
+
+import pytest
+
+from model_backends import BackendError, BackendRouter, MockBackend, ModelBackend
+from response_cache import ResponseCache
+
+class FlakyPrimary(ModelBackend):
+    """Stands in for OpenAI; fails while failing is set"""
+
+    name = 'openai'
+
+    def __init__(self):
+        super().__init__()
+        self.failing = True
+
+    def complete(self, messages, max_tokens=300, temperature=0.1, model=None):
+        if self.failing:
+            raise BackendError(self.name, "invalid api key")
+        return MockBackend().complete(messages, max_tokens, temperature, model)._replace(backend=self.name)
+
+@pytest.fixture
+def app(web_chatbot, monkeypatch):
+    primary = FlakyPrimary()
+    monkeypatch.setattr(web_chatbot, 'model_router', BackendRouter([primary, MockBackend()], failure_threshold=100))
+    monkeypatch.setattr(web_chatbot, 'response_cache', ResponseCache())
+    return web_chatbot, primary
+
+PATIENT_DATA = "Patient: My chest hurts\nDoctor: When did it start?\nPatient: Two days ago, about 6/10"
+
+def test_fallback_soap_note_is_not_cached(app):
+    web_chatbot, primary = app
+    key = web_chatbot.soap_cache_key(PATIENT_DATA)
+    assert web_chatbot.analyze_with_medical_model(PATIENT_DATA)
+    assert web_chatbot.cached_response(key) is None
+
+    primary.failing = False
+    note = web_chatbot.analyze_with_medical_model(PATIENT_DATA)
+    assert web_chatbot.cached_response(key) == note
+
+def test_fallback_stream_is_not_cached(app):
+    web_chatbot, primary = app
+    history = [{'role': 'user', 'content': "My chest hurts"}]
+    messages = web_chatbot.build_interview_messages(history)
+    key = web_chatbot.interview_cache_key(messages)
+    assert "".join(web_chatbot.stream_patient_data_openai(history))
+    assert web_chatbot.cached_response(key) is None
+
+    primary.failing = False
+    question = "".join(web_chatbot.stream_patient_data_openai(history))
+    assert web_chatbot.cached_response(key) == question
+
+def test_keys_name_the_primary_backend(app, monkeypatch):
+    web_chatbot, primary = app
+    key = web_chatbot.soap_cache_key(PATIENT_DATA)
+    monkeypatch.setattr(web_chatbot, 'model_router', BackendRouter([MockBackend()]))
+    assert web_chatbot.soap_cache_key(PATIENT_DATA) != key
@@ -0,0 +1,59 @@
+"""
+SOAP generation on serverless instances, which freeze once a response is
+sent: the inline queue runs the job inside the request, and the other
+queues, whose worker threads would stall, are refused
+"""
+
+import pytest
+
+import readiness
+from job_queue import InlineJobQueue, create_job_queue
+
+@pytest.fixture
+def web_app(web_chatbot, monkeypatch):
+    monkeypatch.setattr(web_chatbot, 'analysis_jobs', InlineJobQueue(web_chatbot.run_analysis_job))
+    return web_chatbot
+
+def test_inline_queue_returns_the_finished_job():
+    queue = InlineJobQueue(lambda payload: {'response': payload['n'] * 2})
+    job, created = queue.submit({'n': 21}, key='soap:1')
+    assert created and job['status'] == 'succeeded' and job['result'] == {'response': 42}
+    assert queue.get(job['id'])['status'] == 'succeeded'
+    # Nothing stays active, so the same key runs again
+    assert queue.submit({'n': 1}, key='soap:1')[1]
+    assert queue.stats()['workers'] == 0 and not queue._threads
+
+def test_inline_queue_records_failures():
+    def fail(payload):
+        raise ValueError("no transcript")
+    job, _ = InlineJobQueue(fail).submit({})
+    assert job['status'] == 'failed' and job['error'] == "no transcript"
+
+def test_serverless_refuses_worker_queues(tmp_path):
+    assert create_job_queue(lambda payload: None, serverless=True).inline
+    for url in ('memory', f"sqlite:///{tmp_path / 'jobs.db'}"):
+        with pytest.raises(ValueError, match="ANALYSIS_QUEUE=inline"):
+            create_job_queue(lambda payload: None, url=url, serverless=True)
+    assert not create_job_queue(lambda payload: None, url='memory').inline
+
+def test_analyze_answers_with_the_note(web_app, run_interview):
+    client, body = run_interview()
+    conversation_id = body['conversation_id']
+
+    response = client.post('/analyze', json={'conversation_id': conversation_id, 'force': True})
+    body = response.get_json()
+    assert response.status_code == 200, body
+    assert body['status'] == 'succeeded' and body['result']['response']
+    assert web_app.conversation_store.status(conversation_id)['data_collection_complete']
+
+def test_auto_complete_leaves_the_note_to_analyze(web_app, run_interview, monkeypatch):
+    monkeypatch.setattr(readiness, 'INTERVIEW_AUTO_COMPLETE', True)
+    client, body = run_interview(until_complete=True)
+    conversation_id = body['conversation_id']
+    assert body['interview_complete']
+    # Generating it here would wait on the conversation lock this turn holds
+    assert body['analysis']['status'] == 'deferred'
+    assert not web_app.conversation_store.status(conversation_id)['data_collection_complete']
+
+    response = client.post('/analyze', json={'conversation_id': conversation_id})
+    assert response.status_code == 200 and response.get_json()['status'] == 'succeeded'
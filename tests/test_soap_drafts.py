@@ -0,0 +1,90 @@
+"""
+Speculative SOAP drafts: answers in quick succession make one draft, only a
+draft of the exact transcript is used, the per-conversation budget caps the
+model calls, an interview the readiness check ends is drafted straight away
+for its queued job, and budgets do not outlive the conversation's drafts
+"""
+
+import time
+
+import pytest
+
+import readiness
+from soap_drafts import SpeculativeDrafter
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+def test_quick_answers_make_one_draft():
+    calls = []
+    drafter = SpeculativeDrafter(lambda patient_data: calls.append(patient_data) or f"note for {patient_data}",
+                                 debounce_seconds=0.05)
+    for turns in ("answer 1", "answer 1 2", "answer 1 2 3"):
+        drafter.schedule('a', turns)
+    wait_for(lambda: drafter.stats()['completed'] == 1)
+    # Only the transcript that stayed quiet for the debounce is drafted
+    assert calls == ["answer 1 2 3"] and drafter.stats()['debounced'] == 2
+    assert drafter.take('a', "answer 1 2 3") == "note for answer 1 2 3"
+    assert drafter.stats()['hits'] == 1
+
+def test_draft_of_an_older_transcript_is_not_used():
+    drafter = SpeculativeDrafter(lambda patient_data: "note", debounce_seconds=0)
+    drafter.schedule('a', "answer 1", now=True)
+    wait_for(lambda: drafter.stats()['completed'] == 1)
+    assert drafter.take('a', "answer 1 and another") is None
+    stats = drafter.stats()
+    assert stats['misses'] == 1 and stats['wasted'] == 1 and stats['held'] == 0
+
+def test_budget_caps_drafts_per_conversation():
+    drafter = SpeculativeDrafter(lambda patient_data: "note", max_drafts=2)
+    for n in range(4):
+        drafter.schedule('a', f"transcript {n}", now=True)
+        wait_for(lambda: drafter.stats()['in_flight'] == 0)
+    stats = drafter.stats()
+    assert stats['started'] == 2 and stats['skipped_budget'] == 2
+    # Another conversation has a budget of its own
+    drafter.schedule('b', "transcript", now=True)
+    assert drafter.stats()['started'] == 3
+
+def test_auto_completed_interview_uses_a_draft(web_chatbot, run_interview, monkeypatch):
+    # A long debounce: only a draft started without one can be used
+    drafter = SpeculativeDrafter(web_chatbot.draft_soap_note, debounce_seconds=60)
+    monkeypatch.setattr(web_chatbot, 'soap_drafter', drafter)
+    monkeypatch.setattr(readiness, 'INTERVIEW_AUTO_COMPLETE', True)
+    _, body = run_interview(until_complete=True)
+    assert body['interview_complete'] and body['analysis']['job_id']
+
+    job = web_chatbot.analysis_jobs.wait(body['analysis']['job_id'], timeout=10)
+    assert job['status'] == 'succeeded', job
+    stats = drafter.stats()
+    assert stats['started'] == 1 and stats['hits'] == 1 and stats['wasted'] == 0
+    # Used, so nothing is held for the conversation any more
+    assert stats['held'] == 0 and stats['budgets'] == 0
+
+def test_used_draft_frees_the_budget():
+    drafter = SpeculativeDrafter(lambda patient_data: f"note for {patient_data}", max_drafts=1)
+    drafter.schedule('a', "transcript", now=True)
+    assert drafter.take('a', "transcript") == "note for transcript"
+    assert drafter.stats()['budgets'] == 0
+
+def test_idle_conversations_expire():
+    drafter = SpeculativeDrafter(lambda patient_data: "note", max_drafts=1, ttl=0.05)
+    drafter.schedule('idle', "transcript", now=True)
+    wait_for(lambda: drafter.stats()['completed'] == 1)
+    assert drafter.stats()['budgets'] == 1 and drafter.stats()['held'] == 1
+
+    time.sleep(0.1)
+    drafter.schedule('active', "other transcript", now=True)
+    stats = drafter.stats()
+    assert stats['expired'] == 1 and stats['wasted'] == 1
+    assert stats['budgets'] == 1 and drafter.take('idle', "transcript", timeout=0) is None
+
+def test_serverless_refuses_drafts(monkeypatch):
+    import soap_drafts
+    monkeypatch.setattr(soap_drafts, 'SPECULATIVE_SOAP', True)
+    with pytest.raises(ValueError, match="SPECULATIVE_SOAP=0"):
+        soap_drafts.create_drafter(lambda patient_data: "note", serverless=True)
+    assert soap_drafts.create_drafter(lambda patient_data: "note") is not None
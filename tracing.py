@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Structured tracing and logging
+Events and timed spans are written as JSON lines by a background listener
+thread. Request threads only check the level and enqueue the record;
+formatting, redaction and I/O happen off the hot path. Fields that can carry
+patient information are redacted before anything is written.
+"""
+
+import atexit
+import contextvars
+import hashlib
+import hmac
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import secrets
+import sys
+import time
+import uuid
+
+# DEBUG shows spans and transcript-level events; INFO and above is the production default
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+
+# hash: replace PHI fields with length + short digest; drop: omit them; none: log verbatim (local only)
+LOG_REDACTION = os.getenv('LOG_REDACTION', 'hash')
+
+# Secret the digests are keyed with, so short values (an age, a sex) cannot be looked up from a table
+# of hashes. Set it per deployment to match digests across workers and restarts; a random key otherwise
+LOG_REDACTION_KEY = (os.getenv('LOG_REDACTION_KEY') or secrets.token_hex(32)).encode('utf-8')
+
+# Field names treated as PHI, plus any extra names from LOG_REDACT_FIELDS
+PHI_FIELDS = frozenset(
+    ['transcript', 'message', 'response', 'prompt', 'patient_data', 'content', 'messages'] +
+    [name.strip() for name in os.getenv('LOG_REDACT_FIELDS', '').split(',') if name.strip()]
+)
+
+# Optional log file; stderr otherwise
+LOG_FILE = os.getenv('LOG_FILE') or None
+
+logger = logging.getLogger('medical_scribe')
+
+_trace_id = contextvars.ContextVar('trace_id', default=None)
+_current_span = contextvars.ContextVar('current_span', default=None)
+_listener = None
+_records = None
+_span_ids = itertools.count(1)
+
+def redact(name, value, mode=None):
+    """Redacted form of a field value, or the value itself if the field is not PHI"""
+    mode = mode or LOG_REDACTION
+    if name not in PHI_FIELDS or mode == 'none' or value is None:
+        return value
+    if mode == 'drop':
+        return None
+    text = value if isinstance(value, str) else json.dumps(value, default=str, ensure_ascii=False)
+    digest = hmac.new(LOG_REDACTION_KEY, text.encode('utf-8'), hashlib.sha256).hexdigest()[:8]
+    return f"<redacted {len(text)} chars #{digest}>"
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; lazy (callable) fields are evaluated here, in the listener thread"""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 6),
+            'level': record.levelname,
+            'event': record.getMessage()
+        }
+        for name, value in getattr(record, 'fields', {}).items():
+            if callable(value):
+                value = value()
+            value = redact(name, value)
+            if value is not None or name not in PHI_FIELDS:
+                entry[name] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener instead of the caller"""
+
+    def prepare(self, record):
+        return record
+
+class EventQueueListener(logging.handlers.QueueListener):
+    """Turns the (created, level, event, fields) tuples log_event enqueues into LogRecords
+
+    Building a LogRecord (caller lookup, thread and process info) is most of
+    the cost of a logging call, so it is done here rather than in the request.
+    """
+
+    def prepare(self, item):
+        if isinstance(item, logging.LogRecord):
+            return item
+        created, level, event, fields = item
+        record = logger.makeRecord(logger.name, level, '', 0, event, None, None, extra={'fields': fields})
+        record.created = created
+        return record
+
+def configure(level=None, stream=None):
+    """Install the queue handler and start the listener thread (idempotent)"""
+    global _listener, _records
+    logger.setLevel(level or LOG_LEVEL)
+    if _listener is not None:
+        return logger
+
+    if LOG_FILE and stream is None:
+        target = logging.FileHandler(LOG_FILE)
+    else:
+        target = logging.StreamHandler(stream or sys.stderr)
+    target.setFormatter(JsonFormatter())
+
+    _records = queue.SimpleQueue()
+    logger.addHandler(DeferredQueueHandler(_records))
+    logger.propagate = False
+
+    _listener = EventQueueListener(_records, target, respect_handler_level=False)
+    _listener.start()
+    atexit.register(shutdown)
+    return logger
+
+def shutdown():
+    """Flush queued records and stop the listener"""
+    global _listener, _records
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        _records = None
+        for handler in list(logger.handlers):
+            if isinstance(handler, DeferredQueueHandler):
+                logger.removeHandler(handler)
+
+def enabled(level=logging.DEBUG):
+    return logger.isEnabledFor(level)
+
+def start_trace(trace_id=None):
+    """Begin a new trace for the current request"""
+    trace_id = trace_id or uuid.uuid4().hex[:16]
+    _trace_id.set(trace_id)
+    _current_span.set(None)
+    return trace_id
+
+def current_trace_id():
+    return _trace_id.get()
+
+def log_event(level, event, **fields):
+    """Structured event; nothing is built unless the level is enabled
+
+    Pass a callable for any field that is expensive to compute; it is only
+    called in the listener thread when the record is written.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    fields['trace_id'] = _trace_id.get()
+    if _records is not None:
+        _records.put((time.time(), level, event, fields))
+    else:
+        logger.log(level, event, extra={'fields': fields})
+
+def debug(event, **fields):
+    log_event(logging.DEBUG, event, **fields)
+
+def info(event, **fields):
+    log_event(logging.INFO, event, **fields)
+
+def warning(event, **fields):
+    log_event(logging.WARNING, event, **fields)
+
+class Span:
+    """Timed section of a request, logged at DEBUG when it ends"""
+
+    __slots__ = ('name', 'fields', 'span_id', 'parent_id', 'started', '_token')
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+        self.span_id = f"{next(_span_ids):x}"
+        self.parent_id = None
+        self.started = None
+        self._token = None
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def __enter__(self):
+        parent = _current_span.get()
+        self.parent_id = parent.span_id if parent else None
+        self._token = _current_span.set(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = round((time.perf_counter() - self.started) * 1000, 3)
+        _current_span.reset(self._token)
+        if exc is not None:
+            self.fields['error'] = f"{exc_type.__name__}: {exc}"
+        log_event(
+            logging.DEBUG, 'span', span=self.name, span_id=self.span_id,
+            parent_id=self.parent_id, duration_ms=duration_ms, **self.fields
+        )
+        return False
+
+class _NoopSpan:
+    """Returned by span() when DEBUG is off, so disabled tracing costs one level check"""
+
+    __slots__ = ()
+
+    def set(self, **fields):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+NOOP_SPAN = _NoopSpan()
+
+def record_span(name, started, **fields):
+    """Log a span measured by hand from a perf_counter() start, e.g. across a stream's yields"""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    parent = _current_span.get()
+    log_event(
+        logging.DEBUG, 'span', span=name, span_id=f"{next(_span_ids):x}",
+        parent_id=parent.span_id if parent else None,
+        duration_ms=round((time.perf_counter() - started) * 1000, 3), **fields
+    )
+
+def span(name, **fields):
+    """Context manager timing one stage: prompt_build, model_call, parse, storage"""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return NOOP_SPAN
+    return Span(name, fields)
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Incremental transcript buffers
+Keeps the rendered forms of a conversation up to date as messages are appended,
+so the interview and SOAP stages never re-serialise the whole history. Long
+transcripts can be windowed to a token budget: recent turns stay verbatim and
+older ones are folded into a rolling summary.
+"""
+
+import bisect
+import os
+import threading
+from collections import OrderedDict
+
+from message_log import CHARS_PER_TOKEN, estimate_tokens
+from patient_extractor import PatientDataExtractor, render_patient_summary
+
+ROLE_LABELS = {'user': 'Patient', 'assistant': 'Doctor'}
+
+# Messages a windowed prompt always keeps verbatim, however tight the budget
+CONTEXT_MIN_RECENT_MESSAGES = int(os.getenv('CONTEXT_MIN_RECENT_MESSAGES', '6'))
+# Share of the budget recent turns get each time the window moves; the rest absorbs
+# the next turns, so the summary (and the prompt prefix) stays put between moves
+CONTEXT_RECENT_SHARE = float(os.getenv('CONTEXT_RECENT_SHARE', '0.5'))
+# Share of the budget the rolling summary may use before it is cut short
+CONTEXT_SUMMARY_SHARE = 0.25
+# Entries kept per summary section (earliest complaints, latest questions) and characters of each
+SUMMARY_ITEMS = 8
+SUMMARY_ITEM_CHARS = 120
+
+def shorten(text, limit=SUMMARY_ITEM_CHARS):
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+def speaker(role):
+    return ROLE_LABELS.get(role, 'Doctor')
+
+class Transcript:
+    """Append-only transcript with cached rendered forms"""
+
+    def __init__(self, messages=()):
+        self._messages = []
+        self._lines = []
+        self._text = ""
+        self._rendered = 0
+        self._extractor = None
+        # Running sums of estimated tokens per rendered line, for windowing
+        self._token_sums = [0]
+        self._summary = None
+        # Patient turns so far, kept up to date instead of rescanning the messages
+        self.user_count = 0
+        # Store seq of the first message, when known; changes only on a reset
+        self.first_seq = None
+        for msg in messages:
+            self.append(msg['role'], msg['content'])
+
+    def __len__(self):
+        return len(self._messages)
+
+    def __iter__(self):
+        return iter(self._messages)
+
+    def append(self, role, content):
+        self._messages.append({'role': role, 'content': content})
+        if role == 'user':
+            self.user_count += 1
+        line = f"{speaker(role)}: {content}"
+        self._lines.append(line)
+        self._token_sums.append(self._token_sums[-1] + estimate_tokens(line) + 1)
+
+    @property
+    def messages(self):
+        """Chat-style message list; shared, so callers must not mutate it"""
+        return self._messages
+
+    @property
+    def text(self):
+        """'Patient: ...' / 'Doctor: ...' lines joined by newlines
+
+        Only lines appended since the last call are rendered.
+        """
+        if self._rendered < len(self._lines):
+            new_text = "\n".join(self._lines[self._rendered:])
+            self._text = f"{self._text}\n{new_text}" if self._text else new_text
+            self._rendered = len(self._lines)
+        return self._text
+
+    def tokens(self, start=0):
+        """Estimated tokens of the rendered lines from message start onwards"""
+        return self._token_sums[-1] - self._token_sums[start]
+
+    def text_from(self, start):
+        """Rendered lines from message start onwards"""
+        return self.text if start == 0 else "\n".join(self._lines[start:])
+
+    def window(self, budget):
+        """(summary, start) for a prompt of about budget tokens
+
+        messages[start:] go into the prompt verbatim and summary stands in for
+        everything before them; while the whole transcript fits, summary is
+        None and start is 0. The cut only ever moves forward, and by enough
+        to leave room for several more turns, so consecutive prompts share
+        the same summary instead of changing it every turn.
+        """
+        summary = self._summary
+        if summary is None:
+            if self.tokens() <= budget:
+                return None, 0
+            summary = self._summary = RollingSummary()
+        if summary.tokens + self.tokens(summary.start) > budget:
+            # Smallest start that leaves the recent turns within their share of the budget
+            target = self._token_sums[-1] - budget * CONTEXT_RECENT_SHARE
+            start = bisect.bisect_left(self._token_sums, target, summary.start)
+            start = min(start, max(summary.start, len(self) - CONTEXT_MIN_RECENT_MESSAGES))
+            # Keep the question that a leading answer replies to
+            if summary.start < start < len(self) and self._messages[start]['role'] == 'user':
+                start -= 1
+            summary.extend(self._messages[summary.start:start], int(budget * CONTEXT_SUMMARY_SHARE))
+            summary.start = start
+        return summary.text, summary.start
+
+    @property
+    def patient_data(self):
+        """Structured patient data, extended with messages added since the last call"""
+        if self._extractor is None:
+            self._extractor = PatientDataExtractor()
+        return self._extractor.update(self._messages)
+
+class RollingSummary:
+    """Condensed stand-in for the turns that fell out of a transcript window
+
+    Patient answers go through the same structured extractor as the patient
+    summary; the doctor's questions are kept, shortened, so the model knows
+    what it has already asked.
+    """
+
+    def __init__(self):
+        self.start = 0
+        self.text = ""
+        self.tokens = 0
+        self._extractor = PatientDataExtractor()
+        self._questions = []
+        self._last_question = None
+        self._answers = 0
+
+    def extend(self, messages, max_tokens):
+        for msg in messages:
+            if msg['role'] == 'user':
+                self._answers += 1
+                self._extractor.add_user_message(msg['content'], self._last_question)
+                self._last_question = None
+            else:
+                self._last_question = msg['content']
+                self._questions.append(shorten(msg['content']))
+        del self._questions[:-SUMMARY_ITEMS]
+
+        # The patient summary with each list cut to its first entries, which hold the presenting
+        # complaint; fewer entries per list while it is over max_tokens, then a hard cut
+        max_chars = max_tokens * CHARS_PER_TOKEN
+        for items in (SUMMARY_ITEMS, 4, 2, 1):
+            text = self._render(items)
+            if len(text) <= max_chars:
+                break
+        else:
+            text = text[:max_chars - 3] + "..."
+        self.text = text
+        self.tokens = estimate_tokens(text)
+
+    def _render(self, items):
+        patient_data = self._extractor.patient_data
+        condensed = dict(
+            patient_data,
+            chief_complaints=[shorten(item) for item in patient_data['chief_complaints'][:items]],
+            timeline=[shorten(item) for item in patient_data['timeline'][:items]],
+            location={part: shorten(item) for part, item in patient_data['location'].items()}
+        )
+        lines = [
+            f"EARLIER IN THIS INTERVIEW ({self._answers} patient answers, summarised):",
+            render_patient_summary(condensed)
+        ]
+        if self._questions:
+            lines.append("RECENTLY ASKED BEFORE THAT: " + " | ".join(self._questions[-items:]))
+        return "\n".join(lines)
+
+def as_transcript(conversation_history):
+    """Accept either a Transcript or a plain list of message dicts"""
+    if isinstance(conversation_history, Transcript):
+        return conversation_history
+    return Transcript(conversation_history)
+
+class TranscriptCache:
+    """Per-conversation transcripts, synced from stored message lists
+
+    Register discard with the store's on_evict so archived conversations
+    leave the cache too; max_entries caps it for stores that never evict.
+    """
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._transcripts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def sync(self, conversation_id, messages, first_seq=None):
+        """Return the transcript for a conversation, appending any new messages
+
+        Messages are append-only, so a cached transcript is extended with the
+        tail it has not seen. A shorter list means the conversation was reset;
+        so does a different first_seq (the seq of messages[0]), which also
+        catches a reset made by another worker process.
+        """
+        with self._lock:
+            transcript = self._transcripts.get(conversation_id)
+            if transcript is None or len(transcript) > len(messages) or \
+                    (first_seq is not None and transcript.first_seq not in (None, first_seq)):
+                transcript = Transcript()
+                self._transcripts[conversation_id] = transcript
+            if first_seq is not None:
+                transcript.first_seq = first_seq
+            self._transcripts.move_to_end(conversation_id)
+
+            for msg in messages[len(transcript):]:
+                transcript.append(msg['role'], msg['content'])
+
+            while len(self._transcripts) > self.max_entries:
+                self._transcripts.popitem(last=False)
+
+            return transcript
+
+    def discard(self, conversation_id):
+        with self._lock:
+            self._transcripts.pop(conversation_id, None)
@@ -4,25 +4,80 @@ Basic Web Medical Chatbot using II-Medical-8B-1706 via Hugging Face API
 Simple HTML interface with Flask
 """
 
-from flask import Flask, render_template, request, jsonify, session
-import requests
+from flask import Flask, render_template, request, jsonify, session, Response, stream_with_context
 import json
-import openai
 import uuid
 import os
-from datetime import datetime
-from dotenv import load_dotenv
+import time
 
-# Load environment variables
-load_dotenv()
+import cold_start
+import metrics
+import readiness
+import tracing
+from conversation_store import (
+    create_store, conversation_version, encode_cursor, decode_cursor, ConversationBusy,
+    InMemoryConversationStore, DEFAULT_LIST_LIMIT, DEFAULT_MESSAGE_LIMIT, MAX_LIST_LIMIT
+)
+from transcript import TranscriptCache, as_transcript
+from message_log import estimate_tokens
+from patient_extractor import render_patient_summary
+from prompt_stats import PrefixReuseTracker
+from question_planner import create_planner
+from response_cache import create_response_cache, cache_key, normalize_transcript
+from model_backends import create_router
+from job_queue import create_job_queue, FINISHED, QueueFull
+from soap_drafts import create_drafter
+
+# Load environment variables (the platform provides them with FAST_STARTUP=1)
+cold_start.load_env()
+
+# Structured JSON logs via a background thread; LOG_LEVEL=DEBUG adds per-stage spans
+tracing.configure()
 
 app = Flask(__name__, static_folder='static', static_url_path='/static')
 app.secret_key = os.getenv('SECRET_KEY', 'medical-assistant-secret-key-2024')
 app.config['SESSION_PERMANENT'] = True
 app.config['SESSION_TYPE'] = 'filesystem'
 
-# In-memory storage for conversations (in production, use a database)
-conversations_db = {}
+# Precompiled templates from templates/compiled/ when they are up to date (python cold_start.py)
+cold_start.use_compiled_templates(app)
+
+# Conversation storage: in-memory by default, CONVERSATION_STORE=sqlite:///conversations.db to persist
+conversation_store = create_store()
+if isinstance(conversation_store, InMemoryConversationStore) and int(os.getenv('WEB_CONCURRENCY', '1')) > 1:
+    # Each worker would hold its own conversations and the UI would 404 at random
+    tracing.warning('conversation_store_not_shared', workers=os.getenv('WEB_CONCURRENCY'),
+                    hint='set CONVERSATION_STORE=sqlite:///conversations.db')
+
+# Rendered transcripts, extended as messages arrive instead of rebuilt every turn
+transcripts = TranscriptCache()
+
+# Per-conversation prompt prefix reuse, see /conversations/<id>/prompt-stats
+prompt_stats = PrefixReuseTracker()
+
+# Archived conversations leave both caches, so they stay within the store's memory limits
+conversation_store.on_evict(transcripts.discard)
+conversation_store.on_evict(prompt_stats.discard)
+
+# Slot-filling questions asked locally instead of by the model (QUESTION_PLANNER=0 disables)
+question_planner = create_planner()
+
+# Content-addressed cache for near-deterministic completions, see /cache/stats
+response_cache = create_response_cache()
+
+# Model backends with fallback and circuit breaking (MODEL_BACKENDS), see /backends/stats
+model_router = create_router()
+# openai/requests are imported and clients built here, or on first use with FAST_STARTUP=1
+cold_start.warm(model_router)
+
+# Prometheus-style /metrics: route and model latency, tokens, errors, open conversations
+metrics.instrument_flask(app, 'web_chatbot')
+metrics.Gauge('conversations_open', 'Conversations still collecting patient data',
+              callback=lambda: conversation_store.count(open_only=True))
+metrics.Gauge('conversations_total', 'Conversations held by the store',
+              callback=conversation_store.count)
+metrics.Gauge('conversations_resident_bytes', 'Approximate memory held by in-memory conversations',
+              callback=lambda: conversation_store.memory_report(top=0).get('resident_bytes'))
 
 # API Keys from environment variables
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
@@ -31,24 +86,81 @@ HUGGINGFACE_API_KEY = os.getenv('HUGGINGFACE_API_KEY')
 # Model URLs
 MEDICAL_MODEL_URL = "https://en32b8h73rhx94n0.us-east-1.aws.endpoints.huggingface.cloud"
 
-# Configure OpenAI
-if OPENAI_API_KEY:
-    openai.api_key = OPENAI_API_KEY
-else:
+# OpenAI models
+INTERVIEW_MODEL = "gpt-4o-mini-2024-07-18"
+SOAP_MODEL = "gpt-4o-mini"
+
+# Bump a version when its prompt template changes so stale cached responses are not reused
+INTERVIEW_PROMPT_VERSION = "interview-v2"
+SOAP_PROMPT_VERSION = "soap-v1"
+
+INTERVIEW_PARAMS = {"max_tokens": 100, "temperature": 0.0}
+SOAP_PARAMS = {"max_tokens": 300, "temperature": 0.1}
+
+DATA_COLLECTION_COMPLETE_MESSAGE = "Data collection is complete. Please create a new conversation for another patient interview."
+
+# Interview prompt layout:
+#   inline   - transcript embedded in a system prompt that changes every turn
+#   messages - fixed instruction prefix followed by the dialogue as append-only chat turns,
+#              so provider prompt caching can reuse everything but the newest answer
+PROMPT_LAYOUT = os.getenv('PROMPT_LAYOUT', 'inline')
+
+INTERVIEW_INSTRUCTIONS = """You are conducting a medical interview. The patient's answers are the user messages and your earlier questions are the assistant messages.
+
+CRITICAL INSTRUCTIONS:
+1. Review the ENTIRE conversation
+2. NEVER ask questions that have already been answered
+3. Build logically on what the patient has already told you
+4. Ask ONE focused follow-up question to gather missing information
+5. Once the complaint, when it started, its severity and location are clear, reply with only "READY_FOR_ANALYSIS"
+
+EXAMPLES OF WHAT NOT TO DO:
+- If patient said "stomach ache" → DON'T ask "what brings you in today"
+- If patient said "5" for pain scale → DON'T ask for pain scale again
+- If conversation shows symptoms and severity → Ask about location, triggers, or medical history
+
+Reply with ONLY your next question: the most logical follow-up based on the conversation."""
+
+# Estimated tokens of the interview prompt around the transcript; the rest of the
+# backend's budget (MODEL_CONTEXT_BUDGETS) is left for the transcript window
+INTERVIEW_PROMPT_TOKENS = estimate_tokens(INTERVIEW_INSTRUCTIONS) + 100
+
+if not OPENAI_API_KEY:
     print("WARNING: OPENAI_API_KEY not found in environment variables")
 
-def collect_patient_data_openai(conversation_history):
-    """Use OpenAI to systematically collect patient data"""
-    try:
-        # Create conversation summary from the actual conversation
-        conversation_text = ""
-        for msg in conversation_history:
-            role = "Patient" if msg["role"] == "user" else "Doctor"
-            conversation_text += f"{role}: {msg['content']}\n"
-        
-        print(f"DEBUG - Full conversation:\n{conversation_text}")  # Debug output
-        
-        system_prompt = f"""You are conducting a medical interview. Here is the COMPLETE conversation so far:
+def build_interview_messages(conversation_history, layout=None, budget=None):
+    """Build the OpenAI chat messages for the next interview question
+
+    Transcripts longer than the backend budget keep their recent turns
+    verbatim and summarise the rest.
+    """
+    with tracing.span('prompt_build', kind='interview', layout=layout or PROMPT_LAYOUT):
+        return _build_interview_messages(conversation_history, layout, budget or model_router.context_budget())
+
+def _build_interview_messages(conversation_history, layout, budget):
+    # Conversation text from the incrementally rendered transcript
+    transcript = as_transcript(conversation_history)
+    summary, start = transcript.window(budget - INTERVIEW_PROMPT_TOKENS)
+    if summary is None:
+        heading = "Here is the COMPLETE conversation so far:"
+        conversation_text = f"{transcript.text}\n" if len(transcript) else ""
+    else:
+        heading = "Here is a summary of the earlier conversation, then the most recent exchanges word for word:"
+        conversation_text = f"{summary}\n\nMOST RECENT EXCHANGES:\n{transcript.text_from(start)}\n"
+    
+    tracing.debug('interview_prompt', turns=len(transcript), summarized_turns=start,
+                  transcript_tokens=transcript.tokens(start), transcript=conversation_text)
+    
+    if (layout or PROMPT_LAYOUT) == 'messages':
+        # Static prefix + stable role messages; only the tail changes between turns
+        if summary is None:
+            return [{"role": "system", "content": INTERVIEW_INSTRUCTIONS}] + transcript.messages
+        return [
+            {"role": "system", "content": INTERVIEW_INSTRUCTIONS},
+            {"role": "system", "content": summary}
+        ] + transcript.messages[start:]
+    
+    system_prompt = f"""You are conducting a medical interview. {heading}
 
 {conversation_text}
 
@@ -57,7 +169,7 @@ CRITICAL INSTRUCTIONS:
 2. NEVER ask questions that have already been answered
 3. Build logically on what the patient has already told you
 4. Ask ONE focused follow-up question to gather missing information
-5. When you have sufficient data (20+ exchanges), say "READY_FOR_ANALYSIS"
+5. Once the complaint, when it started, its severity and location are clear, reply with only "READY_FOR_ANALYSIS"
 
 EXAMPLES OF WHAT NOT TO DO:
 - If patient said "stomach ache" → DON'T ask "what brings you in today"
@@ -66,123 +178,96 @@ EXAMPLES OF WHAT NOT TO DO:
 
 YOUR NEXT QUESTION should be the most logical follow-up based on the conversation above."""
 
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": "What is your next question for this patient?"}
-        ]
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": "What is your next question for this patient?"}
+    ]
+
+def interview_cache_key(messages):
+    """Cache key for an interview question prompt"""
+    payload = [[msg["role"], normalize_transcript(msg["content"])] for msg in messages]
+    return cache_key(f"{model_router.primary.name}/{INTERVIEW_MODEL}", INTERVIEW_PROMPT_VERSION, INTERVIEW_PARAMS, payload)
+
+def soap_cache_key(patient_data):
+    """Cache key for a SOAP note over a transcript"""
+    return cache_key(f"{model_router.primary.name}/{SOAP_MODEL}", SOAP_PROMPT_VERSION, SOAP_PARAMS,
+                     normalize_transcript(patient_data))
+
+def cached_response(key):
+    return response_cache.get(key) if response_cache else None
+
+def store_response(key, content, backend):
+    # Error strings are returned, never stored. Neither are fallback answers:
+    # the key names the primary model, so a fallback's canned note would be
+    # served in its place for the whole TTL.
+    if response_cache and content and backend == model_router.primary.name:
+        response_cache.set(key, content)
+
+def collect_patient_data_openai(conversation_history, conversation_id=None):
+    """Use OpenAI to systematically collect patient data"""
+    try:
+        messages = build_interview_messages(conversation_history)
+        if conversation_id:
+            prompt_stats.record(conversation_id, messages)
         
-        response = openai.ChatCompletion.create(
-            model="gpt-4o-mini-2024-07-18",
-            messages=messages,
-            max_tokens=100,
-            temperature=0.0
-        )
+        key = interview_cache_key(messages)
+        cached = cached_response(key)
+        if cached:
+            return cached
+        
+        completion = model_router.complete(messages, model=INTERVIEW_MODEL, **INTERVIEW_PARAMS)
+        record_model_question(completion.latency)
+        
+        if conversation_id:
+            prompt_stats.record_usage(conversation_id, completion.usage)
         
-        return response.choices[0].message.content.strip()
+        content = completion.text
+        store_response(key, content, completion.backend)
+        return content
         
     except Exception as e:
+        tracing.warning('interview_model_error', error=str(e))
         return f"Error with OpenAI: {str(e)}"
 
+def stream_patient_data_openai(conversation_history, conversation_id=None):
+    """Stream the next interview question from OpenAI token by token"""
+    try:
+        messages = build_interview_messages(conversation_history)
+        if conversation_id:
+            prompt_stats.record(conversation_id, messages)
+        
+        key = interview_cache_key(messages)
+        cached = cached_response(key)
+        if cached:
+            yield cached
+            return
+        
+        started = time.perf_counter()
+        tokens = []
+        served = {}
+        for token in model_router.stream(messages, model=INTERVIEW_MODEL, served=served, **INTERVIEW_PARAMS):
+            tokens.append(token)
+            yield token
+        record_model_question(time.perf_counter() - started)
+        store_response(key, "".join(tokens).strip(), served.get('backend'))
+        
+    except Exception as e:
+        tracing.warning('interview_model_error', error=str(e))
+        yield f"Error with OpenAI: {str(e)}"
+
 def create_patient_summary(conversation_history):
     """Create a detailed summary of all patient information collected"""
-    
-    # Initialize data structure
-    patient_data = {
-        "demographics": {"age": None, "sex": None},
-        "chief_complaints": [],
-        "symptoms": {},
-        "timeline": [],
-        "severity": {},
-        "location": {},
-        "other_info": []
-    }
-    
-    # Parse all user responses
-    for i, msg in enumerate(conversation_history):
-        if msg["role"] == "user":
-            content = msg["content"].strip()
-            content_lower = content.lower()
-            
-            # Demographics parsing
-            if any(sex in content_lower for sex in ["male", "female", "man", "woman"]):
-                if "male" in content_lower:
-                    patient_data["demographics"]["sex"] = "male"
-                elif "female" in content_lower:
-                    patient_data["demographics"]["sex"] = "female"
-                    
-            # Age parsing
-            import re
-            age_match = re.search(r'\b(\d{1,3})\b', content)
-            if age_match and not patient_data["demographics"]["age"]:
-                potential_age = int(age_match.group(1))
-                if 1 <= potential_age <= 120:
-                    patient_data["demographics"]["age"] = potential_age
-            
-            # Symptoms parsing
-            symptom_keywords = ["pain", "ache", "hurt", "fever", "nausea", "vomit", "cough", "headache", "dizzy"]
-            for keyword in symptom_keywords:
-                if keyword in content_lower and content not in patient_data["chief_complaints"]:
-                    patient_data["chief_complaints"].append(content)
-                    break
-            
-            # Timeline parsing
-            time_keywords = ["day", "hour", "week", "month", "year", "ago", "started", "began", "today", "yesterday"]
-            if any(keyword in content_lower for keyword in time_keywords):
-                if content not in patient_data["timeline"]:
-                    patient_data["timeline"].append(content)
-            
-            # Severity parsing (0-10 scale)
-            severity_match = re.search(r'\b(\d{1,2})/10\b', content)
-            if severity_match:
-                severity_score = severity_match.group(1)
-                patient_data["severity"]["pain"] = f"{severity_score}/10"
-            
-            # Location parsing
-            body_parts = ["abdomen", "stomach", "chest", "head", "back", "leg", "arm", "left", "right", "side"]
-            for part in body_parts:
-                if part in content_lower:
-                    patient_data["location"][part] = content
-                    break
-    
-    # Build comprehensive summary
-    summary_lines = []
-    
-    # Demographics
-    if patient_data["demographics"]["age"] and patient_data["demographics"]["sex"]:
-        summary_lines.append(f"PATIENT: {patient_data['demographics']['age']}-year-old {patient_data['demographics']['sex']}")
-    elif patient_data["demographics"]["age"]:
-        summary_lines.append(f"AGE: {patient_data['demographics']['age']}")
-    elif patient_data["demographics"]["sex"]:
-        summary_lines.append(f"SEX: {patient_data['demographics']['sex']}")
-    
-    # Chief complaints
-    if patient_data["chief_complaints"]:
-        summary_lines.append(f"CHIEF COMPLAINTS: {'; '.join(patient_data['chief_complaints'])}")
-    
-    # Timeline
-    if patient_data["timeline"]:
-        summary_lines.append(f"TIMELINE: {'; '.join(patient_data['timeline'])}")
-    
-    # Severity
-    if patient_data["severity"]:
-        severity_info = '; '.join([f"{k}: {v}" for k, v in patient_data["severity"].items()])
-        summary_lines.append(f"SEVERITY: {severity_info}")
-    
-    # Location
-    if patient_data["location"]:
-        location_info = '; '.join([f"{k}: {v}" for k, v in patient_data["location"].items()])
-        summary_lines.append(f"LOCATION: {location_info}")
-    
-    return "\n".join(summary_lines) if summary_lines else "No patient information collected yet"
+    # Structured fields come from the compiled, incrementally updated extractor
+    return render_patient_summary(as_transcript(conversation_history).patient_data)
 
-def analyze_with_medical_model(patient_data):
-    """Generate SOAP note using OpenAI GPT-4o-mini for reliable medical documentation"""
-    
-    try:
-        print(f"DEBUG - Using OpenAI for SOAP note generation...")
-        
-        # Enhanced medical prompt for OpenAI
-        system_prompt = """You are a medical scribe creating SOAP notes. Follow these strict guidelines:
+def build_soap_messages(patient_data):
+    """Build the OpenAI chat messages for SOAP note generation"""
+    with tracing.span('prompt_build', kind='soap'):
+        return _build_soap_messages(patient_data)
+
+def _build_soap_messages(patient_data):
+    # Enhanced medical prompt for OpenAI
+    system_prompt = """You are a medical scribe creating SOAP notes. Follow these strict guidelines:
 
 1. Use ONLY information explicitly stated in the conversation
 2. Do NOT invent vital signs, lab results, or physical exam findings
@@ -192,45 +277,136 @@ def analyze_with_medical_model(patient_data):
 
 Format: S: O: A: P: (each on separate lines)"""
 
-        user_prompt = f"""Create a SOAP note from this patient conversation:
+    user_prompt = f"""Create a SOAP note from this patient conversation:
 
 {patient_data}
 
 Remember: Only use information explicitly stated. Do not add any data not mentioned."""
 
-        response = openai.ChatCompletion.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=300,
-            temperature=0.1
-        )
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+def analyze_with_medical_model(patient_data):
+    """Generate SOAP note using OpenAI GPT-4o-mini for reliable medical documentation"""
+    
+    try:
+        key = soap_cache_key(patient_data)
+        cached = cached_response(key)
+        if cached:
+            tracing.debug('soap_cache_hit')
+            return cached
         
-        content = response.choices[0].message.content.strip()
+        completion = model_router.complete(build_soap_messages(patient_data), model=SOAP_MODEL, **SOAP_PARAMS)
+        content = completion.text
         
-        print(f"DEBUG - OpenAI SOAP response: {content}")
+        tracing.debug('soap_response', backend=completion.backend, response=content)
         
+        store_response(key, content, completion.backend)
         return content if content else "SOAP note generation failed"
         
     except Exception as e:
-        print(f"DEBUG - OpenAI Exception: {str(e)}")
+        tracing.warning('soap_model_error', error=str(e))
         return f"Error generating SOAP note: {str(e)}"
 
+def draft_soap_note(patient_data):
+    """Speculative SOAP draft; raises on failure so errors are never served as a draft"""
+    return model_router.complete(build_soap_messages(patient_data), model=SOAP_MODEL, **SOAP_PARAMS).text
+
+# Opt-in background SOAP drafts during the interview (SPECULATIVE_SOAP=1), see /drafts/stats
+soap_drafter = create_drafter(draft_soap_note, serverless=cold_start.SERVERLESS)
+
+def take_soap_draft(conversation_id, patient_data, timeout=60):
+    """Speculative draft made from exactly this transcript, or None"""
+    if soap_drafter is None:
+        return None
+    return soap_drafter.take(conversation_id, patient_data, timeout=timeout)
+
+def stream_medical_model(patient_data):
+    """Stream the SOAP note from OpenAI token by token"""
+    
+    try:
+        key = soap_cache_key(patient_data)
+        cached = cached_response(key)
+        if cached:
+            tracing.debug('soap_cache_hit')
+            yield cached
+            return
+        
+        tokens = []
+        served = {}
+        for token in model_router.stream(build_soap_messages(patient_data), model=SOAP_MODEL, served=served, **SOAP_PARAMS):
+            tokens.append(token)
+            yield token
+        store_response(key, "".join(tokens).strip(), served.get('backend'))
+        
+    except Exception as e:
+        tracing.warning('soap_model_error', error=str(e))
+        yield f"Error generating SOAP note: {str(e)}"
+
+def format_soap_note(analysis):
+    """Wrap the generated SOAP note in the clinical note template"""
+    return f"""**📋 SOAP NOTE - STRUCTURED MEDICAL ANALYSIS**
+
+**Generated by II-Medical-8B-1706 Clinical Scribe**
+
+---
+
+{analysis}
+
+---
+
+**📝 CLINICAL NOTE COMPLETED:**
+- ✅ Patient data processed according to standard SOAP format
+- ✅ Information documented without inferences or assumptions
+- ✅ Missing fields explicitly marked as "Not documented"
+- ✅ Clinical evaluation ready for physician review
+
+---
+*SOAP note completed. You can create a new consultation using the sidebar.*"""
+
+def sse_event(event, data):
+    """Format a Server-Sent Events frame with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def sse_response(generator):
+    """Build a streaming text/event-stream response"""
+    return Response(
+        stream_with_context(generator),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
 def create_new_conversation():
     """Create a new conversation and return its ID"""
     conversation_id = str(uuid.uuid4())
-    conversations_db[conversation_id] = {
-        'id': conversation_id,
-        'title': 'New Patient',
-        'messages': [],
-        'data_collection_complete': False,
-        'created_at': datetime.now().isoformat(),
-        'updated_at': datetime.now().isoformat()
-    }
+    conversation_store.create(conversation_id)
     return conversation_id
 
+def conversation_transcript(conversation):
+    """Cached transcript for a conversation snapshot"""
+    messages = conversation['messages']
+    # seq of the first message changes on reset, even one made by another worker
+    first_seq = conversation['last_seq'] - len(messages) + 1 if 'last_seq' in conversation else None
+    return transcripts.sync(conversation['id'], messages, first_seq)
+
+def resolve_conversation_id(conversation_id):
+    """The requested conversation if it exists, otherwise a new one"""
+    if not conversation_id or not conversation_store.exists(conversation_id):
+        return create_new_conversation()
+    return conversation_id
+
+def conversation_busy(conversation_id):
+    """409 body for a conversation whose lock is held by another turn for too long"""
+    return {
+        'error': 'This conversation is still processing another message. Please try again.',
+        'conversation_id': conversation_id
+    }
+
 def get_conversation_title(messages):
     """Generate a conversation title from the first user message"""
     for msg in messages:
@@ -241,6 +417,11 @@ def get_conversation_title(messages):
             return content
     return "New Patient"
 
+@app.before_request
+def begin_trace():
+    """One trace id per request, taken from X-Request-ID when the proxy sets it"""
+    tracing.start_trace(request.headers.get('X-Request-ID'))
+
 @app.route('/')
 def landing():
     return render_template('landing.html')
@@ -251,19 +432,19 @@ def chat_interface():
 
 @app.route('/conversations', methods=['GET'])
 def get_conversations():
-    """Get list of all conversations"""
-    conv_list = []
-    for conv_id, conv_data in conversations_db.items():
-        conv_list.append({
-            'id': conv_id,
-            'title': conv_data['title'],
-            'created_at': conv_data['created_at'],
-            'updated_at': conv_data['updated_at']
-        })
-    
-    # Sort by updated_at descending
-    conv_list.sort(key=lambda x: x['updated_at'], reverse=True)
-    return jsonify({'conversations': conv_list})
+    """Get the most recently updated conversations, one keyset page at a time"""
+    limit = max(1, min(request.args.get('limit', DEFAULT_LIST_LIMIT, type=int), MAX_LIST_LIMIT))
+    before = None
+    if request.args.get('before'):
+        try:
+            before = decode_cursor(request.args['before'])
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+    
+    # Served from the updated_at index, newest first; a full page may have more behind it
+    conversations = conversation_store.list(limit=limit, before=before)
+    next_cursor = encode_cursor(conversations[-1]) if len(conversations) == limit else None
+    return jsonify({'conversations': conversations, 'next_cursor': next_cursor})
 
 @app.route('/conversations', methods=['POST'])
 def create_conversation():
@@ -271,21 +452,144 @@ def create_conversation():
     conversation_id = create_new_conversation()
     return jsonify({'conversation_id': conversation_id})
 
+def conversation_readiness(conversation):
+    """Readiness check over the cached transcript's structured patient data
+
+    The model's READY_FOR_ANALYSIS is stored on the conversation, so the chat
+    turn, /status and /analyze all reach the same verdict.
+    """
+    transcript = conversation_transcript(conversation)
+    return readiness.assess(transcript.patient_data, transcript.user_count, conversation.get('model_ready', False))
+
+def analysis_ready(assessment, data_collection_complete):
+    """SOAP generation is offered once the readiness check passes and no note exists yet"""
+    return assessment.ready and not data_collection_complete
+
+def analysis_forceable(assessment, data_collection_complete):
+    """A note the readiness check does not offer yet can still be forced after the minimum answers"""
+    return not assessment.ready and not data_collection_complete and assessment.answers >= readiness.READINESS_MIN_ANSWERS
+
+def conditional_json(payload, version):
+    """JSON response carrying an ETag; clients revalidate with If-None-Match"""
+    response = jsonify(payload)
+    response.set_etag(version, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def not_modified(version):
+    """304 response if the client already holds this version, otherwise None"""
+    if not request.if_none_match.contains_weak(version):
+        return None
+    response = Response(status=304)
+    response.set_etag(version, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 @app.route('/conversations/<conversation_id>', methods=['GET'])
 def get_conversation(conversation_id):
-    """Get a specific conversation"""
-    if conversation_id not in conversations_db:
+    """Get a specific conversation; ?after=n returns only messages from index n"""
+    after = max(request.args.get('after', 0, type=int), 0)
+    
+    # Counts come from the store without loading messages, so an unchanged
+    # conversation is answered with a 304 before anything is serialised
+    status = conversation_store.status(conversation_id)
+    if status is None:
+        return jsonify({'error': 'Conversation not found'}), 404
+    unchanged = not_modified(conversation_version(status))
+    if unchanged is not None:
+        return unchanged
+    
+    # A reset conversation is shorter than the client's copy; send it whole
+    if after > status['message_count']:
+        after = 0
+    conversation = conversation_store.get(conversation_id, after=after)
+    if conversation is None:
+        return jsonify({'error': 'Conversation not found'}), 404
+    
+    return conditional_json({'conversation': conversation, 'after': after}, conversation_version(conversation))
+
+@app.route('/conversations/<conversation_id>/messages', methods=['GET'])
+def get_conversation_messages(conversation_id):
+    """Messages with seq greater than ?after=, at most ?limit= of them"""
+    after = max(request.args.get('after', 0, type=int), 0)
+    limit = request.args.get('limit', DEFAULT_MESSAGE_LIMIT, type=int)
+    
+    page = conversation_store.messages(conversation_id, after_seq=after, limit=limit)
+    if page is None:
+        return jsonify({'error': 'Conversation not found'}), 404
+    
+    # Clients resume from next_after; seq never goes backwards, even across /reset
+    page['next_after'] = page['messages'][-1]['seq'] if page['messages'] else after
+    return jsonify(page)
+
+@app.route('/conversations/<conversation_id>/status', methods=['GET'])
+def get_conversation_status(conversation_id):
+    """Message counts and flags for polling, without the messages"""
+    status = conversation_store.status(conversation_id)
+    if status is None:
+        return jsonify({'error': 'Conversation not found'}), 404
+    
+    version = conversation_version(status)
+    unchanged = not_modified(version)
+    if unchanged is not None:
+        return unchanged
+    
+    conversation = conversation_store.get(conversation_id)
+    if conversation is None:
         return jsonify({'error': 'Conversation not found'}), 404
+    assessment = conversation_readiness(conversation)
     
-    return jsonify({'conversation': conversations_db[conversation_id]})
+    status['version'] = version
+    status['analysis_ready'] = analysis_ready(assessment, status['data_collection_complete'])
+    status['analysis_forceable'] = analysis_forceable(assessment, status['data_collection_complete'])
+    status['readiness'] = readiness.describe(assessment)
+    return conditional_json(status, version)
+
+@app.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Response cache hit/miss statistics"""
+    if response_cache is None:
+        return jsonify({'enabled': False})
+    
+    return jsonify({'enabled': True, 'stats': response_cache.stats()})
+
+@app.route('/memory/stats', methods=['GET'])
+def get_memory_stats():
+    """Resident and archived conversations, eviction counters and the largest conversations"""
+    return jsonify(conversation_store.memory_report(top=request.args.get('top', 10, type=int)))
+
+@app.route('/planner/stats', methods=['GET'])
+def get_planner_stats():
+    """Planned vs model interview questions and the model latency saved"""
+    if question_planner is None:
+        return jsonify({'enabled': False})
+    
+    return jsonify({'enabled': True, 'stats': question_planner.stats()})
+
+@app.route('/backends/stats', methods=['GET'])
+def get_backend_stats():
+    """Per-backend breaker state, error counts and latency histograms"""
+    return jsonify(model_router.stats())
+
+@app.route('/conversations/<conversation_id>/prompt-stats', methods=['GET'])
+def get_prompt_stats(conversation_id):
+    """Prompt prefix reuse counters for a conversation"""
+    stats = prompt_stats.stats(conversation_id)
+    if stats is None:
+        return jsonify({'error': 'No prompt statistics for this conversation'}), 404
+    
+    return jsonify({'layout': PROMPT_LAYOUT, 'prompt_stats': stats})
 
 @app.route('/conversations/<conversation_id>', methods=['DELETE'])
 def delete_conversation(conversation_id):
     """Delete a conversation"""
-    if conversation_id not in conversations_db:
+    if not conversation_store.delete(conversation_id):
         return jsonify({'error': 'Conversation not found'}), 404
     
-    del conversations_db[conversation_id]
+    transcripts.discard(conversation_id)
+    if soap_drafter is not None:
+        soap_drafter.discard(conversation_id)
+    prompt_stats.discard(conversation_id)    
     return jsonify({'status': 'deleted'})
 
 @app.route('/reset', methods=['POST'])
@@ -293,15 +597,125 @@ def reset_conversation():
     """Reset the current conversation"""
     if 'current_conversation_id' in session:
         conv_id = session['current_conversation_id']
-        if conv_id in conversations_db:
-            conversations_db[conv_id]['messages'] = []
-            conversations_db[conv_id]['data_collection_complete'] = False
-            conversations_db[conv_id]['title'] = 'New Patient'
-            conversations_db[conv_id]['updated_at'] = datetime.now().isoformat()
+        if conversation_store.exists(conv_id):
+            try:
+                with conversation_store.lock(conv_id):
+                    conversation_store.clear_messages(conv_id)
+                    conversation_store.update(conv_id, title='New Patient', data_collection_complete=False,
+                                              model_ready=False)
+            except ConversationBusy:
+                return jsonify(conversation_busy(conv_id)), 409
+            transcripts.discard(conv_id)
+            if soap_drafter is not None:
+                soap_drafter.discard(conv_id)
+            prompt_stats.discard(conv_id)
     
     session.clear()
     return jsonify({'status': 'reset'})
 
+def start_chat_turn(user_message, conversation_id):
+    """Record the user message and return the conversation it belongs to
+
+    Callers hold conversation_store.lock() from here until finish_chat_turn,
+    so concurrent messages to one conversation cannot interleave their turns.
+    """
+    # Get or create conversation
+    conversation_id = resolve_conversation_id(conversation_id)
+    
+    with tracing.span('storage', op='append_user_message', conversation_id=conversation_id):
+        # Add user message to conversation
+        conversation_store.append_message(conversation_id, "user", user_message)
+        conversation = conversation_store.get(conversation_id)
+        
+        # Update conversation title if it's the first user message
+        if conversation['user_message_count'] == 1:
+            conversation['title'] = get_conversation_title(conversation['messages'])
+            conversation_store.update(conversation_id, title=conversation['title'])
+    
+    tracing.debug('chat_turn', conversation_id=conversation_id,
+                  total_messages=len(conversation['messages']), message=user_message)
+    
+    return conversation_id, conversation
+
+def local_interview_reply(conversation):
+    """Reply that needs no model call, or None
+
+    The closing message once the readiness check ends the interview, or a
+    planned question for a slot the patient data is still missing.
+    """
+    assessment = conversation_readiness(conversation)
+    if readiness.INTERVIEW_AUTO_COMPLETE and assessment.ready:
+        readiness.MODEL_CALLS_SKIPPED.inc()
+        return readiness.INTERVIEW_COMPLETE_MESSAGE
+    if question_planner is None:
+        return None
+    return question_planner.plan(conversation_transcript(conversation), assessment)
+
+def record_model_question(seconds):
+    """Latency of an interview question the planner could not ask"""
+    if question_planner is not None:
+        question_planner.record_model_question(seconds)
+
+def finish_chat_turn(conversation, ai_response):
+    """Store the assistant reply and work out whether SOAP generation is available
+
+    An interview the readiness check considers complete ends here: the reply
+    becomes the closing message and the SOAP note is queued straight away.
+    """
+    ai_response, model_ready = readiness.strip_ready_token(ai_response)
+    if model_ready and not conversation.get('model_ready'):
+        conversation_store.update(conversation['id'], model_ready=True)
+        conversation['model_ready'] = True
+    assessment = conversation_readiness(conversation)
+    interview_complete = readiness.INTERVIEW_AUTO_COMPLETE and assessment.ready
+    if interview_complete:
+        ai_response = readiness.INTERVIEW_COMPLETE_MESSAGE
+    elif not ai_response:
+        # The model only said READY_FOR_ANALYSIS: offer the note, or ask for what is missing if it was too early
+        ai_response = readiness.INTERVIEW_READY_MESSAGE if assessment.ready else readiness.follow_up_question(assessment)
+    
+    # Add assistant response to conversation
+    with tracing.span('storage', op='append_assistant_message', conversation_id=conversation['id']):
+        conversation['last_seq'] = conversation_store.append_message(conversation['id'], "assistant", ai_response)
+    conversation['messages'].append({"role": "assistant", "content": ai_response})
+    
+    # Check if we should show the SOAP generation button; the reply does not change the slots
+    user_message_count = conversation['user_message_count']
+    show_soap_button = analysis_ready(assessment, conversation['data_collection_complete'])
+    
+    body = {
+        'response': ai_response,
+        'show_soap_button': show_soap_button,
+        'analysis_forceable': analysis_forceable(assessment, conversation['data_collection_complete']),
+        'user_message_count': user_message_count,
+        'conversation_id': conversation['id'],
+        'interview_complete': interview_complete,
+        'readiness': readiness.describe(assessment)
+    }
+    
+    if show_soap_button and soap_drafter is not None:
+        # Clinicians usually ask for the note a few turns later; draft it while they decide.
+        # An interview that ends here is drafted straight away, and the job below takes the draft
+        soap_drafter.schedule(conversation['id'], conversation_transcript(conversation).text, now=interview_complete)
+    
+    if interview_complete and not conversation['data_collection_complete']:
+        body['analysis'] = queue_interview_analysis(conversation['id'])
+        if body['analysis'] and not body['analysis']['deduplicated']:
+            readiness.INTERVIEWS_COMPLETED.labels(assessment.reason).inc()
+        # The queued job makes the note; the button stays only if the queue was full
+        body['show_soap_button'] = body['analysis'] is None
+    
+    return body
+
+def closed_chat_turn(conversation_id):
+    """Reply for messages sent after the SOAP note was generated"""
+    return {
+        'response': DATA_COLLECTION_COMPLETE_MESSAGE,
+        'show_soap_button': False,
+        'user_message_count': 0,
+        'conversation_id': conversation_id
+    }
+
 @app.route('/chat', methods=['POST'])
 def chat():
     user_message = request.json.get('message', '').strip()
@@ -310,106 +724,313 @@ def chat():
     if not user_message:
         return jsonify({'response': 'Please enter a message.'})
     
-    # Get or create conversation
-    if not conversation_id or conversation_id not in conversations_db:
-        conversation_id = create_new_conversation()
+    requested_id = conversation_id
+    conversation_id = resolve_conversation_id(requested_id)
+    if conversation_id != requested_id:
         session['current_conversation_id'] = conversation_id
     
-    conversation = conversations_db[conversation_id]
+    try:
+        with conversation_store.lock(conversation_id):
+            conversation_id, conversation = start_chat_turn(user_message, conversation_id)
+            
+            if not conversation['data_collection_complete']:
+                # STAGE 1: Data Collection with OpenAI, until the readiness check ends the interview
+                ai_response = local_interview_reply(conversation) or \
+                    collect_patient_data_openai(conversation_transcript(conversation), conversation_id)
+                return jsonify(finish_chat_turn(conversation, ai_response))
+    except ConversationBusy:
+        return jsonify(conversation_busy(conversation_id)), 409
     
-    # Add user message to conversation
-    conversation['messages'].append({"role": "user", "content": user_message})
-    conversation['updated_at'] = datetime.now().isoformat()
+    return jsonify(closed_chat_turn(conversation_id))
+
+@app.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    """Stream the next interview question as Server-Sent Events"""
+    user_message = request.json.get('message', '').strip()
+    conversation_id = request.json.get('conversation_id')
     
-    print(f"DEBUG - Total messages in conversation: {len(conversation['messages'])}")
-    print(f"DEBUG - Current user message: {user_message}")
+    if not user_message:
+        return jsonify({'response': 'Please enter a message.'})
     
-    # Update conversation title if it's the first user message
-    if len([msg for msg in conversation['messages'] if msg['role'] == 'user']) == 1:
-        conversation['title'] = get_conversation_title(conversation['messages'])
+    requested_id = conversation_id
+    conversation_id = resolve_conversation_id(requested_id)
+    if conversation_id != requested_id:
+        session['current_conversation_id'] = conversation_id
     
-    if not conversation['data_collection_complete']:
-        # STAGE 1: Data Collection with OpenAI
-        ai_response = collect_patient_data_openai(conversation['messages'])
-        
-        # Add assistant response to conversation
-        conversation['messages'].append({"role": "assistant", "content": ai_response})
-        
-        # Check if we should show the SOAP generation button
-        user_message_count = len([msg for msg in conversation['messages'] if msg['role'] == 'user'])
-        show_soap_button = user_message_count >= 2 and not conversation['data_collection_complete']
+    # Held until the reply is stored; released on close too, in case the stream never starts
+    turn_lock = conversation_store.lock(conversation_id)
+    try:
+        turn_lock.acquire()
+    except ConversationBusy:
+        return jsonify(conversation_busy(conversation_id)), 409
+    try:
+        conversation_id, conversation = start_chat_turn(user_message, conversation_id)
+    except Exception:
+        turn_lock.release()
+        raise
     
-    else:
-        ai_response = "Data collection is complete. Please create a new conversation for another patient interview."
+    def generate():
+        try:
+            yield sse_event('start', {'conversation_id': conversation_id})
+            
+            if conversation['data_collection_complete']:
+                yield sse_event('done', closed_chat_turn(conversation_id))
+                return
+            
+            # STAGE 1: Data Collection with OpenAI, forwarded as tokens arrive
+            local_reply = local_interview_reply(conversation)
+            tokens = []
+            for token in [local_reply] if local_reply else stream_patient_data_openai(conversation_transcript(conversation), conversation_id):
+                tokens.append(token)
+                yield sse_event('token', {'token': token})
+            
+            yield sse_event('done', finish_chat_turn(conversation, "".join(tokens).strip()))
+        finally:
+            turn_lock.release()
     
-    return jsonify({
-        'response': ai_response,
-        'show_soap_button': show_soap_button if 'show_soap_button' in locals() else False,
-        'user_message_count': user_message_count if 'user_message_count' in locals() else 0,
-        'conversation_id': conversation_id
-    })
+    response = sse_response(generate())
+    response.call_on_close(turn_lock.release)
+    return response
 
-@app.route('/analyze', methods=['POST'])
-def manual_analysis():
-    """Trigger manual medical analysis for a conversation"""
-    conversation_id = request.json.get('conversation_id')
+def analysis_error(conversation_id, force=False):
+    """Why SOAP generation cannot run for a conversation, as (message, status), or None
+
+    force skips the readiness check, for clinicians who want a note from a
+    short interview; the minimum number of answers still applies.
+    """
+    status = conversation_store.status(conversation_id) if conversation_id else None
+    if status is None:
+        return ('Conversation not found', 404)
     
-    if not conversation_id or conversation_id not in conversations_db:
-        return jsonify({'error': 'Conversation not found'}), 404
+    # Check if there are enough messages for analysis
+    if status['user_message_count'] < readiness.READINESS_MIN_ANSWERS:
+        return (f'Insufficient data for analysis. Need at least {readiness.READINESS_MIN_ANSWERS} patient messages.', 400)
     
-    conversation = conversations_db[conversation_id]
+    # Check if analysis was already completed
+    if status['data_collection_complete']:
+        return ('Analysis already completed for this conversation.', 400)
     
-    # Check if there are enough messages for analysis (at least 2 user messages)
-    user_message_count = len([msg for msg in conversation['messages'] if msg['role'] == 'user'])
-    if user_message_count < 2:
-        return jsonify({'error': 'Insufficient data for analysis. Need at least 2 patient messages.'}), 400
+    if not force:
+        conversation = conversation_store.get(conversation_id)
+        if conversation is None:
+            return ('Conversation not found', 404)
+        assessment = conversation_readiness(conversation)
+        if not assessment.ready:
+            return (f"Not enough information for a SOAP note yet (missing: {', '.join(assessment.missing)}). "
+                    "Continue the interview or pass force to generate it anyway.", 400)
     
-    # Check if analysis was already completed
-    if conversation['data_collection_complete']:
-        return jsonify({'error': 'Analysis already completed for this conversation.'}), 400
+    return None
+
+def prepare_analysis(conversation_id, force=False):
+    """Validate a conversation for SOAP generation and compile its transcript"""
+    error = analysis_error(conversation_id, force)
+    if error:
+        return None, None, error
     
-    # Compile patient data from conversation
-    patient_data = "\n".join([
-        f"{'Patient' if msg['role'] == 'user' else 'Doctor'}: {msg['content']}" 
-        for msg in conversation['messages']
-    ])
+    conversation = conversation_store.get(conversation_id)
+    if conversation is None:
+        return None, None, ('Conversation not found', 404)
     
-    print(f"DEBUG - Manual analysis triggered for conversation {conversation_id}")
-    print(f"DEBUG - Patient data for analysis:\n{patient_data}")
+    # Compile patient data from the cached transcript
+    with tracing.span('parse', stage='transcript', conversation_id=conversation_id):
+        patient_data = conversation_transcript(conversation).text
     
-    # Perform medical analysis with II-Medical-8B-1706
-    analysis = analyze_with_medical_model(patient_data)
+    tracing.debug('analysis_triggered', conversation_id=conversation_id, patient_data=patient_data)
     
+    return conversation, patient_data, None
+
+def complete_analysis(conversation, analysis):
+    """Store the SOAP note and mark the conversation as analysed"""
     # Create SOAP note response
-    ai_response = f"""**📋 SOAP NOTE - STRUCTURED MEDICAL ANALYSIS**
+    with tracing.span('parse', stage='soap_note'):
+        ai_response = format_soap_note(analysis)
+    
+    with tracing.span('storage', op='store_analysis', conversation_id=conversation['id']), \
+            conversation_store.lock(conversation['id']):
+        # A stream and a job (or two tabs) may both finish; only the first note is stored
+        status = conversation_store.status(conversation['id'])
+        if status is None or status['data_collection_complete']:
+            tracing.warning('analysis_not_stored', conversation_id=conversation['id'],
+                            reason='deleted' if status is None else 'already_complete')
+            return ai_response
+        
+        # Add the analysis to the conversation
+        conversation_store.append_message(conversation['id'], "assistant", ai_response)
+        
+        # Update conversation title to indicate analysis completion
+        title = conversation['title']
+        if not title.endswith('✅'):
+            title += ' ✅'
+        conversation_store.update(conversation['id'], title=title, data_collection_complete=True)
+    
+    if soap_drafter is not None:
+        soap_drafter.discard(conversation['id'])
+    
+    return ai_response
 
-**Generated by II-Medical-8B-1706 Clinical Scribe**
+def run_analysis_job(payload):
+    """Job runner: generate and store the SOAP note for payload['conversation_id']"""
+    conversation, patient_data, error = prepare_analysis(payload['conversation_id'], payload.get('force', False))
+    if error:
+        raise ValueError(error[0])
+    
+    # Perform medical analysis with II-Medical-8B-1706, unless a draft of this transcript exists
+    analysis = take_soap_draft(conversation['id'], patient_data) or analyze_with_medical_model(patient_data)
+    
+    return {'response': complete_analysis(conversation, analysis)}
 
----
+# SOAP generation runs on a bounded worker pool (ANALYSIS_WORKERS) instead of the request thread,
+# except on serverless instances, which stop running threads once the response is sent
+analysis_jobs = create_job_queue(run_analysis_job, serverless=cold_start.SERVERLESS)
+metrics.Gauge('analysis_jobs_queued', 'SOAP generation jobs waiting for a worker',
+              callback=lambda: analysis_jobs.counts()['queued'])
+metrics.Gauge('analysis_jobs_running', 'SOAP generation jobs being generated',
+              callback=lambda: analysis_jobs.counts()['running'])
 
-{analysis}
+def job_summary(job, deduplicated=False):
+    """Job fields returned to clients; the payload stays server-side"""
+    return {
+        'job_id': job['id'],
+        'status': job['status'],
+        'conversation_id': job['payload'].get('conversation_id'),
+        'result': job['result'],
+        'error': job['error'],
+        'deduplicated': deduplicated,
+        'created_at': job['created_at'],
+        'started_at': job['started_at'],
+        'finished_at': job['finished_at'],
+        'status_url': f"/jobs/{job['id']}",
+        'events_url': f"/jobs/{job['id']}/events"
+    }
 
----
+def queue_interview_analysis(conversation_id):
+    """Queue the SOAP note for an interview the readiness check ended; None if the queue is full
 
-**📝 CLINICAL NOTE COMPLETED:**
-- ✅ Patient data processed according to standard SOAP format
-- ✅ Information documented without inferences or assumptions
-- ✅ Missing fields explicitly marked as "Not documented"
-- ✅ Clinical evaluation ready for physician review
+    An inline queue would generate the note inside this chat turn, which
+    holds the conversation lock the note is stored under. The client is
+    told to request it from /analyze instead.
+    """
+    if analysis_jobs.inline:
+        return {'status': 'deferred', 'conversation_id': conversation_id,
+                'analyze_url': '/analyze', 'deduplicated': False}
+    try:
+        job, created = analysis_jobs.submit({'conversation_id': conversation_id}, key=f"soap:{conversation_id}")
+    except QueueFull:
+        tracing.warning('interview_analysis_rejected', conversation_id=conversation_id, reason='queue_full')
+        return None
+    return job_summary(job, deduplicated=not created)
 
----
-*SOAP note completed. You can create a new consultation using the sidebar.*"""
+def queue_analysis(data):
+    """Validate and enqueue SOAP generation; returns (body, HTTP status)"""
+    conversation_id = data.get('conversation_id')
+    force = bool(data.get('force'))
+    error = analysis_error(conversation_id, force)
+    if error:
+        return {'error': error[0]}, error[1]
     
-    # Add the analysis to the conversation
-    conversation['messages'].append({"role": "assistant", "content": ai_response})
-    conversation['data_collection_complete'] = True
-    conversation['updated_at'] = datetime.now().isoformat()
+    # A finished speculative draft of the current transcript is returned straight away
+    if soap_drafter is not None:
+        conversation, patient_data, error = prepare_analysis(conversation_id, force)
+        if error:
+            return {'error': error[0]}, error[1]
+        draft = take_soap_draft(conversation_id, patient_data, timeout=0)
+        if draft:
+            return {'response': complete_analysis(conversation, draft), 'status': 'succeeded', 'speculative': True}, 200
+    
+    # One job per conversation at a time: a repeated click gets the job already in flight
+    try:
+        job, created = analysis_jobs.submit(
+            {'conversation_id': conversation_id, 'force': force},
+            key=f"soap:{conversation_id}",
+            priority=data.get('priority', 'normal')
+        )
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    except QueueFull:
+        return {'error': 'Too many SOAP notes are being generated. Please try again shortly.'}, 503
     
-    # Update conversation title to indicate analysis completion
-    if not conversation['title'].endswith('✅'):
-        conversation['title'] += ' ✅'
+    # An inline queue (serverless) has already run the job
+    return job_summary(job, deduplicated=not created), 200 if job['status'] in FINISHED else 202
+
+@app.route('/analyze', methods=['POST'])
+def manual_analysis():
+    """Queue medical analysis for a conversation; poll status_url or stream events_url
+
+    On serverless instances the note is generated within the request and
+    returned finished (200).
+    """
+    body, status = queue_analysis(request.json)
+    return jsonify(body), status
+
+@app.route('/drafts/stats', methods=['GET'])
+def get_draft_stats():
+    """Speculative SOAP draft hit rate and wasted calls"""
+    if soap_drafter is None:
+        return jsonify({'enabled': False})
+    
+    return jsonify({'enabled': True, 'stats': soap_drafter.stats()})
+
+@app.route('/jobs/stats', methods=['GET'])
+def get_job_stats():
+    """Analysis queue depth, worker count and outcome counters"""
+    return jsonify(analysis_jobs.stats())
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Current state of an analysis job, with the SOAP note once it has succeeded"""
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    return jsonify(job_summary(job))
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """Server-Sent Events: a status event on each change, then done with the result"""
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    def generate():
+        current = job
+        last_status = None
+        while True:
+            if current['status'] != last_status:
+                last_status = current['status']
+                yield sse_event('status', {'job_id': job_id, 'status': last_status})
+            if current['status'] == 'succeeded':
+                yield sse_event('done', current['result'])
+                return
+            if current['status'] == 'failed':
+                yield sse_event('done', {'error': current['error']})
+                return
+            
+            # Comment frames keep proxies from closing an idle stream
+            yield ": keepalive\n\n"
+            current = analysis_jobs.wait(job_id, timeout=15, status=last_status) or {'status': 'failed', 'error': 'Job expired'}
+    
+    return sse_response(generate())
+
+@app.route('/analyze/stream', methods=['POST'])
+def manual_analysis_stream():
+    """Stream the SOAP note as Server-Sent Events"""
+    conversation, patient_data, error = prepare_analysis(request.json.get('conversation_id'), bool(request.json.get('force')))
+    if error:
+        return jsonify({'error': error[0]}), error[1]
+    
+    def generate():
+        yield sse_event('start', {'conversation_id': conversation['id']})
+        
+        tokens = []
+        draft = take_soap_draft(conversation['id'], patient_data)
+        for token in [draft] if draft else stream_medical_model(patient_data):
+            tokens.append(token)
+            yield sse_event('token', {'token': token})
+        
+        analysis = "".join(tokens).strip() or "SOAP note generation failed"
+        yield sse_event('done', {'response': complete_analysis(conversation, analysis)})
     
-    return jsonify({'response': ai_response})
+    return sse_response(generate())
 
 if __name__ == '__main__':
     app.run(debug=True, host='127.0.0.1', port=5001)
\ No newline at end of file